@@ -63,6 +63,10 @@ class DeleteCourseUseCase:
                 is_active=False
             )
             
+            # update() no dispara signals: invalidar la caché del catálogo manualmente
+            from infrastructure.services.catalog_cache_service import CatalogCacheService
+            CatalogCacheService().bump_version()
+            
             course.refresh_from_db()
             
             logger.info(f"Curso archivado: {course.id} por usuario {user.id}")
@@ -3,11 +3,13 @@ Caso de uso: Obtener estadísticas de instructor - FagSol Escuela Virtual
 """
 
 import logging
-from django.db.models import Count, Avg
+from django.db.models import Count, Avg, F, Q, Sum
+from django.db.models.functions import Coalesce
 from apps.courses.models import Course
-from apps.users.models import Enrollment, Certificate
+from apps.users.models import Enrollment
 from apps.users.permissions import is_instructor
 from application.dtos.use_case_result import UseCaseResult
+from infrastructure.services.metrics_rollup_service import MetricsRollupService
 
 logger = logging.getLogger('apps')
 
@@ -22,6 +24,10 @@ class GetInstructorStatsUseCase:
     - Calcular estadísticas de enrollments
     - Calcular calificación promedio
     - Obtener cursos más populares
+    
+    Los contadores de inscripciones e ingresos se leen de CourseStats (una fila
+    por curso, mantenida por CourseStatsService) en la misma consulta que los
+    contadores de cursos.
     """
     
     def execute(self, user) -> UseCaseResult:
@@ -48,44 +54,51 @@ class GetInstructorStatsUseCase:
                 is_active=True
             ).exclude(status='archived')
             
-            total_courses = instructor_courses.count()
-            published_courses = instructor_courses.filter(status='published').count()
-            draft_courses = instructor_courses.filter(status='draft').count()
-            
-            # Enrollments en cursos del instructor
-            instructor_enrollments = Enrollment.objects.filter(course__created_by=user)
-            total_enrollments = instructor_enrollments.count()
-            active_enrollments = instructor_enrollments.filter(status='active').count()
-            completed_enrollments = instructor_enrollments.filter(status='completed').count()
-            
-            # Estudiantes únicos
-            unique_students = instructor_enrollments.values('user').distinct().count()
-            
-            # Cursos más populares del instructor
-            popular_courses = instructor_courses.annotate(
-                enrollment_count=Count('enrollments')
-            ).order_by('-enrollment_count')[:5]
+            # Contadores de cursos (activos, no archivados) y de inscripciones e ingresos
+            # (todos sus cursos) en una sola consulta: JOIN con CourseStats por clave primaria
+            visible = Q(is_active=True) & ~Q(status='archived')
+            totals = Course.objects.filter(created_by=user).aggregate(
+                total=Count('pk', filter=visible),
+                published=Count('pk', filter=visible & Q(status='published')),
+                draft=Count('pk', filter=visible & Q(status='draft')),
+                avg_rating=Avg('rating', filter=visible),
+                enrollments_total=Sum('stats__enrollments'),
+                enrollments_active=Sum('stats__active_enrollments'),
+                enrollments_completed=Sum('stats__completed_enrollments'),
+                completion_total=Sum('stats__completion_sum'),
+                revenue_total=Sum('stats__revenue'),
+            )
+            total_courses = totals['total']
+            published_courses = totals['published']
+            draft_courses = totals['draft']
+            avg_rating = totals['avg_rating'] or 0.00
+            total_enrollments = totals['enrollments_total'] or 0
+            active_enrollments = totals['enrollments_active'] or 0
+            completed_enrollments = totals['enrollments_completed'] or 0
+            average_completion = (
+                round(float(totals['completion_total']) / total_enrollments, 2) if total_enrollments else 0.0
+            )
             
-            popular_courses_data = [
-                {
-                    'id': course.id,
-                    'title': course.title,
-                    'slug': course.slug,
-                    'enrollments': course.enrollment_count,
-                    'status': course.status,
-                }
-                for course in popular_courses
-            ]
+            # Estudiantes únicos: distintos entre cursos, no se puede sumar por curso
+            unique_students = Enrollment.objects.filter(
+                course__created_by=user
+            ).values('user_id').distinct().count()
             
-            # Calificación promedio
-            avg_rating = instructor_courses.aggregate(
-                avg=Avg('rating')
-            )['avg'] or 0.00
+            # Cursos más populares (inscripciones acumuladas en CourseStats)
+            popular_courses_data = list(
+                instructor_courses.annotate(
+                    enrollments_count=Coalesce('stats__enrollments', 0)
+                ).order_by(
+                    F('stats__enrollments').desc(nulls_last=True), '-created_at'
+                ).values('id', 'title', 'slug', 'enrollments_count', 'status')[:5]
+            )
+            for course in popular_courses_data:
+                course['enrollments'] = course.pop('enrollments_count')
             
-            # Certificados emitidos
-            certificates_count = Certificate.objects.filter(
-                course__created_by=user
-            ).count()
+            # Certificados: rollups diarios por curso
+            certificates_count = MetricsRollupService.activity_totals(
+                Course.objects.filter(created_by=user)
+            )['certificates']
             
             stats = {
                 'courses': {
@@ -97,6 +110,7 @@ class GetInstructorStatsUseCase:
                     'total': total_enrollments,
                     'active': active_enrollments,
                     'completed': completed_enrollments,
+                    'average_completion': average_completion,
                 },
                 'students': {
                     'unique': unique_students,
@@ -107,6 +121,9 @@ class GetInstructorStatsUseCase:
                 'certificates': {
                     'total': certificates_count,
                 },
+                'revenue': {
+                    'total': float(totals['revenue_total'] or 0),
+                },
                 'popular_courses': popular_courses_data,
             }
             
@@ -3,12 +3,15 @@ Caso de uso: Obtener estadísticas públicas - FagSol Escuela Virtual
 """
 
 import logging
-from django.db.models import Avg, Min, Q
+from typing import Dict
+from django.conf import settings
+from django.db.models import Avg, Count, Min, Q
 from django.utils import timezone
 from apps.courses.models import Course
 from apps.core.models import UserProfile
 from django.contrib.auth.models import User
 from application.dtos.use_case_result import UseCaseResult
+from infrastructure.services.stale_cache_service import StaleWhileRevalidateCache
 
 logger = logging.getLogger('apps')
 
@@ -16,73 +19,42 @@ logger = logging.getLogger('apps')
 class GetPublicStatsUseCase:
     """
     Caso de uso: Obtener estadísticas públicas
-    
+
     Responsabilidades:
     - Calcular estadísticas públicas para página de inicio
     - No requiere autenticación
     - Solo datos básicos y seguros
+
+    Las estadísticas se sirven desde una caché stale-while-revalidate
+    (PUBLIC_STATS_CACHE_SECONDS): al vencer se siguen sirviendo mientras una
+    sola tarea en segundo plano (refresh_public_stats) las recalcula.
     """
-    
+
+    CACHE_NAME = 'public_stats'
+
+    def cache(self) -> StaleWhileRevalidateCache:
+        return StaleWhileRevalidateCache(
+            self.CACHE_NAME,
+            self.compute_stats,
+            soft_timeout=getattr(settings, 'PUBLIC_STATS_CACHE_SECONDS', 300),
+            hard_timeout=getattr(settings, 'PUBLIC_STATS_CACHE_MAX_AGE', 60 * 60 * 24),
+        )
+
     def execute(self) -> UseCaseResult:
         """
         Ejecuta el caso de uso de obtener estadísticas públicas
-        
+
         Returns:
             UseCaseResult con las estadísticas públicas
         """
         try:
-            # Estadísticas de estudiantes
-            total_students = UserProfile.objects.filter(role='student', user__is_active=True).count()
-            
-            # Cursos publicados
-            published_courses = Course.objects.filter(status='published', is_active=True).count()
-            
-            # Estadísticas de instructores
-            active_instructors = UserProfile.objects.filter(role='instructor', user__is_active=True).count()
-            
-            # Cursos creados por instructores o FagSol
-            instructor_courses_queryset = Course.objects.filter(
-                status='published',
-                is_active=True
-            ).filter(
-                Q(created_by__profile__role='instructor') | Q(provider='fagsol')
-            )
-            
-            instructor_courses_count = instructor_courses_queryset.count()
-            
-            # Calificación promedio
-            avg_rating = instructor_courses_queryset.aggregate(
-                avg=Avg('rating')
-            )['avg'] or 0.00
-            
-            # Años de experiencia
-            first_course_date = Course.objects.aggregate(Min('created_at'))['created_at__min']
-            first_user_date = User.objects.filter(is_active=True).aggregate(Min('date_joined'))['date_joined__min']
-            
-            years_experience = 10  # Valor por defecto
-            if first_course_date or first_user_date:
-                reference_date = first_course_date if first_course_date else first_user_date
-                if reference_date:
-                    years_experience = max(10, (timezone.now() - reference_date).days // 365)
-            
-            stats = {
-                'students': total_students,
-                'courses': published_courses,
-                'years_experience': years_experience,
-                'instructors': {
-                    'active': active_instructors,
-                    'courses_created': instructor_courses_count,
-                    'average_rating': float(avg_rating),
-                },
-            }
-            
-            logger.info(f"Estadísticas públicas obtenidas: {stats}")
-            
+            stats = self.cache().get(schedule_refresh=self._schedule_refresh)
+
             return UseCaseResult(
                 success=True,
                 data=stats
             )
-            
+
         except Exception as e:
             logger.error(f"Error al obtener estadísticas públicas: {str(e)}", exc_info=True)
             return UseCaseResult(
@@ -90,3 +62,47 @@ class GetPublicStatsUseCase:
                 error_message=f"Error al obtener estadísticas: {str(e)}"
             )
 
+    def refresh(self) -> Dict:
+        """Recalcula las estadísticas y actualiza la caché"""
+        return self.cache().refresh()
+
+    @staticmethod
+    def _schedule_refresh() -> None:
+        from apps.core.tasks import refresh_public_stats
+        refresh_public_stats.delay()
+
+    def compute_stats(self) -> Dict:
+        """Calcula las estadísticas públicas (agregados condicionales)"""
+        # Estudiantes e instructores activos
+        profiles = UserProfile.objects.filter(user__is_active=True).aggregate(
+            students=Count('pk', filter=Q(role='student')),
+            instructors=Count('pk', filter=Q(role='instructor')),
+        )
+
+        # Cursos publicados, y de ellos los creados por instructores o FagSol
+        by_instructors = Q(created_by__profile__role='instructor') | Q(provider='fagsol')
+        courses = Course.objects.filter(status='published', is_active=True).aggregate(
+            published=Count('pk'),
+            instructor_courses=Count('pk', filter=by_instructors),
+            avg_rating=Avg('rating', filter=by_instructors),
+        )
+
+        # Años de experiencia: desde el primer curso o, si no hay cursos, el primer usuario
+        reference_date = Course.objects.aggregate(Min('created_at'))['created_at__min']
+        if reference_date is None:
+            reference_date = User.objects.filter(is_active=True).aggregate(Min('date_joined'))['date_joined__min']
+
+        years_experience = 10  # Valor por defecto
+        if reference_date:
+            years_experience = max(10, (timezone.now() - reference_date).days // 365)
+
+        return {
+            'students': profiles['students'],
+            'courses': courses['published'],
+            'years_experience': years_experience,
+            'instructors': {
+                'active': profiles['instructors'],
+                'courses_created': courses['instructor_courses'],
+                'average_rating': float(courses['avg_rating'] or 0.00),
+            },
+        }
@@ -3,9 +3,10 @@ Caso de uso: Obtener estadísticas de estudiante - FagSol Escuela Virtual
 """
 
 import logging
-from django.db.models import Avg
+from django.db.models import Avg, Count, Q
 from apps.users.models import Enrollment, Certificate
 from application.dtos.use_case_result import UseCaseResult
+from infrastructure.services.student_stats_cache_service import StudentStatsCacheService
 
 logger = logging.getLogger('apps')
 
@@ -19,8 +20,15 @@ class GetStudentStatsUseCase:
     - Calcular progreso promedio
     - Obtener certificados
     - Obtener cursos recientes y completados
+    
+    Las estadísticas se calculan con un número fijo de consultas (un agregado
+    de inscripciones, los cursos recientes y completados, y los certificados
+    del usuario en un set) y se cachean por usuario (StudentStatsCacheService),
+    invalidándose al cambiar sus inscripciones, progreso o certificados.
     """
     
+    COURSE_FIELDS = ('course_id', 'course__title', 'course__slug', 'course__thumbnail_url')
+    
     def execute(self, user) -> UseCaseResult:
         """
         Ejecuta el caso de uso de obtener estadísticas de estudiante
@@ -32,88 +40,7 @@ class GetStudentStatsUseCase:
             UseCaseResult con las estadísticas
         """
         try:
-            # Enrollments del estudiante
-            student_enrollments = Enrollment.objects.filter(user=user).select_related('course')
-            total_enrollments = student_enrollments.count()
-            active_enrollments = student_enrollments.filter(status='active').count()
-            completed_enrollments = student_enrollments.filter(status='completed').count()
-            
-            # Progreso promedio
-            if total_enrollments > 0:
-                avg_progress = student_enrollments.aggregate(
-                    avg=Avg('completion_percentage')
-                )['avg'] or 0.00
-            else:
-                avg_progress = 0.00
-            
-            # Certificados obtenidos
-            certificates_count = Certificate.objects.filter(user=user).count()
-            
-            # Cursos en progreso
-            in_progress = student_enrollments.filter(
-                status='active',
-                completion_percentage__gt=0,
-                completion_percentage__lt=100
-            ).count()
-            
-            # Cursos recientes (últimos 5)
-            recent_enrollments = student_enrollments.order_by('-enrolled_at')[:5]
-            recent_courses_data = []
-            for enrollment in recent_enrollments:
-                try:
-                    recent_courses_data.append({
-                        'id': enrollment.course.id if enrollment.course else '',
-                        'title': enrollment.course.title if enrollment.course else 'Curso eliminado',
-                        'slug': enrollment.course.slug if enrollment.course else '',
-                        'thumbnail_url': enrollment.course.thumbnail_url if enrollment.course and enrollment.course.thumbnail_url else '',
-                        'progress': float(enrollment.completion_percentage),
-                        'status': enrollment.status,
-                        'enrolled_at': enrollment.enrolled_at.isoformat() if enrollment.enrolled_at else '',
-                    })
-                except Exception as e:
-                    logger.warning(f"Error al procesar enrollment {enrollment.id}: {str(e)}")
-                    continue
-            
-            # Cursos completados
-            completed_courses_data = []
-            completed_enrollments_list = student_enrollments.filter(status='completed')[:5]
-            for enrollment in completed_enrollments_list:
-                try:
-                    has_cert = Certificate.objects.filter(
-                        user=user,
-                        course=enrollment.course
-                    ).exists() if enrollment.course else False
-                    
-                    completed_courses_data.append({
-                        'id': enrollment.course.id if enrollment.course else '',
-                        'title': enrollment.course.title if enrollment.course else 'Curso eliminado',
-                        'slug': enrollment.course.slug if enrollment.course else '',
-                        'thumbnail_url': enrollment.course.thumbnail_url if enrollment.course and enrollment.course.thumbnail_url else '',
-                        'completed_at': enrollment.completed_at.isoformat() if enrollment.completed_at else None,
-                        'has_certificate': has_cert,
-                    })
-                except Exception as e:
-                    logger.warning(f"Error al procesar enrollment completado {enrollment.id}: {str(e)}")
-                    continue
-            
-            stats = {
-                'enrollments': {
-                    'total': total_enrollments,
-                    'active': active_enrollments,
-                    'completed': completed_enrollments,
-                    'in_progress': in_progress,
-                },
-                'progress': {
-                    'average': float(avg_progress),
-                },
-                'certificates': {
-                    'total': certificates_count,
-                },
-                'recent_courses': recent_courses_data,
-                'completed_courses': completed_courses_data,
-            }
-            
-            logger.info(f"Estadísticas de estudiante obtenidas para usuario {user.id}: {total_enrollments} enrollments")
+            stats = StudentStatsCacheService().get_or_compute(user.id, lambda: self.compute_stats(user))
             
             return UseCaseResult(
                 success=True,
@@ -126,4 +53,78 @@ class GetStudentStatsUseCase:
                 success=False,
                 error_message=f"Error al obtener estadísticas: {str(e)}"
             )
-
+    
+    def compute_stats(self, user) -> dict:
+        """Calcula las estadísticas del estudiante (hasta 4 consultas)"""
+        student_enrollments = Enrollment.objects.filter(user=user)
+        
+        # Contadores y progreso promedio en una sola consulta
+        counts = student_enrollments.aggregate(
+            total=Count('pk'),
+            active=Count('pk', filter=Q(status='active')),
+            completed=Count('pk', filter=Q(status='completed')),
+            in_progress=Count('pk', filter=Q(
+                status='active',
+                completion_percentage__gt=0,
+                completion_percentage__lt=100
+            )),
+            avg_progress=Avg('completion_percentage'),
+        )
+        total_enrollments = counts['total']
+        completed_enrollments = counts['completed']
+        
+        # Certificados obtenidos: una consulta, cursos en un set
+        certificate_course_ids = list(Certificate.objects.filter(user=user).values_list('course_id', flat=True))
+        certified_course_ids = set(certificate_course_ids)
+        
+        # Cursos recientes (últimos 5)
+        recent_courses_data = []
+        if total_enrollments:
+            recent_courses_data = [
+                {
+                    'id': enrollment['course_id'],
+                    'title': enrollment['course__title'],
+                    'slug': enrollment['course__slug'],
+                    'thumbnail_url': enrollment['course__thumbnail_url'] or '',
+                    'progress': float(enrollment['completion_percentage']),
+                    'status': enrollment['status'],
+                    'enrolled_at': enrollment['enrolled_at'].isoformat() if enrollment['enrolled_at'] else '',
+                }
+                for enrollment in student_enrollments.order_by('-enrolled_at').values(
+                    *self.COURSE_FIELDS, 'completion_percentage', 'status', 'enrolled_at'
+                )[:5]
+            ]
+        
+        # Cursos completados
+        completed_courses_data = []
+        if completed_enrollments:
+            completed_courses_data = [
+                {
+                    'id': enrollment['course_id'],
+                    'title': enrollment['course__title'],
+                    'slug': enrollment['course__slug'],
+                    'thumbnail_url': enrollment['course__thumbnail_url'] or '',
+                    'completed_at': enrollment['completed_at'].isoformat() if enrollment['completed_at'] else None,
+                    'has_certificate': enrollment['course_id'] in certified_course_ids,
+                }
+                for enrollment in student_enrollments.filter(status='completed').values(
+                    *self.COURSE_FIELDS, 'completed_at'
+                )[:5]
+            ]
+        
+        return {
+            'enrollments': {
+                'total': total_enrollments,
+                'active': counts['active'],
+                'completed': completed_enrollments,
+                'in_progress': counts['in_progress'],
+            },
+            'progress': {
+                'average': float(counts['avg_progress'] or 0.00),
+            },
+            'certificates': {
+                'total': len(certificate_course_ids),
+            },
+            'recent_courses': recent_courses_data,
+            'completed_courses': completed_courses_data,
+        }
@@ -6,17 +6,20 @@ Casos de uso relacionados con progreso de lecciones:
 - Marcar lección como incompleta
 - Obtener progreso de lección
 - Obtener progreso completo de curso
+- Sincronizar progreso en lote (heartbeat)
 """
 
 from .mark_lesson_completed_use_case import MarkLessonCompletedUseCase
 from .mark_lesson_incomplete_use_case import MarkLessonIncompleteUseCase
 from .get_lesson_progress_use_case import GetLessonProgressUseCase
 from .get_course_progress_use_case import GetCourseProgressUseCase
+from .sync_lesson_progress_batch_use_case import SyncLessonProgressBatchUseCase
 
 __all__ = [
     'MarkLessonCompletedUseCase',
     'MarkLessonIncompleteUseCase',
     'GetLessonProgressUseCase',
     'GetCourseProgressUseCase',
+    'SyncLessonProgressBatchUseCase',
 ]
 
@@ -3,8 +3,8 @@ Caso de uso: Obtener progreso completo de curso - FagSol Escuela Virtual
 """
 
 import logging
-from apps.users.models import Enrollment, LessonProgress
-from apps.courses.models import Lesson
+from apps.users.models import Enrollment
+from infrastructure.services.enrollment_progress_service import EnrollmentProgressService
 from application.dtos.use_case_result import UseCaseResult
 
 logger = logging.getLogger('apps')
@@ -16,15 +16,15 @@ class GetCourseProgressUseCase:
     
     Responsabilidades:
     - Validar enrollment
-    - Obtener todas las lecciones del curso
-    - Obtener progreso de cada lección
+    - Obtener las lecciones del curso con su progreso (una consulta)
     - Calcular estadísticas de completitud
     """
     
     def execute(
         self,
         user,
-        enrollment_id: str
+        enrollment_id: str,
+        compact: bool = False
     ) -> UseCaseResult:
         """
         Ejecuta el caso de uso de obtener progreso completo de curso
@@ -32,6 +32,8 @@ class GetCourseProgressUseCase:
         Args:
             user: Usuario autenticado
             enrollment_id: ID del enrollment
+            compact: Devolver el progreso como arrays paralelos en el orden del
+                temario, sin títulos ni fechas ISO (ver _compact_progress)
             
         Returns:
             UseCaseResult con el progreso completo del curso
@@ -46,43 +48,16 @@ class GetCourseProgressUseCase:
                     error_message="Enrollment no encontrado o no tienes acceso"
                 )
             
-            course = enrollment.course
+            # 2. Lecciones activas con su progreso en una sola consulta (orden del temario)
+            rows = EnrollmentProgressService.lesson_progress_rows(enrollment)
             
-            # 2. Obtener todas las lecciones activas del curso
-            lessons = Lesson.objects.filter(
-                module__course=course,
-                is_active=True
-            ).select_related('module').order_by('module__order', 'order')
+            # 3. Construir respuesta
+            if compact:
+                lessons_progress, completed_count = self._compact_progress(rows)
+            else:
+                lessons_progress, completed_count = self._full_progress(rows)
             
-            # 3. Obtener todos los progresos del usuario para este enrollment
-            progresses = LessonProgress.objects.filter(
-                user=user,
-                enrollment=enrollment
-            ).select_related('lesson')
-            
-            # 4. Crear dict de progresos por lesson_id
-            progress_dict = {p.lesson_id: p for p in progresses}
-            
-            # 5. Construir respuesta
-            lessons_progress = {}
-            completed_count = 0
-            
-            for lesson in lessons:
-                progress = progress_dict.get(lesson.id)
-                lessons_progress[lesson.id] = {
-                    'lesson_id': lesson.id,
-                    'lesson_title': lesson.title,
-                    'module_id': lesson.module.id,
-                    'module_title': lesson.module.title,
-                    'is_completed': progress.is_completed if progress else False,
-                    'progress_percentage': float(progress.progress_percentage) if progress else 0.0,
-                    'completed_at': progress.completed_at.isoformat() if progress and progress.completed_at else None,
-                    'last_accessed_at': progress.last_accessed_at.isoformat() if progress and progress.last_accessed_at else None,
-                }
-                if lessons_progress[lesson.id]['is_completed']:
-                    completed_count += 1
-            
-            total_lessons = len(lessons)
+            total_lessons = len(rows)
             completion_percentage = (completed_count / total_lessons * 100) if total_lessons > 0 else 0.0
             
             result = {
@@ -109,4 +84,52 @@ class GetCourseProgressUseCase:
                 success=False,
                 error_message=f"Error al obtener progreso del curso: {str(e)}"
             )
-
+    
+    @staticmethod
+    def _full_progress(rows):
+        """Progreso por lección como dict lesson_id -> datos (formato original)"""
+        lessons_progress = {}
+        completed_count = 0
+        for lesson_id, lesson_title, module_id, module_title, is_completed, percentage, completed_at, last_accessed_at in rows:
+            lessons_progress[lesson_id] = {
+                'lesson_id': lesson_id,
+                'lesson_title': lesson_title,
+                'module_id': module_id,
+                'module_title': module_title,
+                'is_completed': bool(is_completed),
+                'progress_percentage': float(percentage) if percentage is not None else 0.0,
+                'completed_at': completed_at.isoformat() if completed_at else None,
+                'last_accessed_at': last_accessed_at.isoformat() if last_accessed_at else None,
+            }
+            if is_completed:
+                completed_count += 1
+        return lessons_progress, completed_count
+    
+    @staticmethod
+    def _compact_progress(rows):
+        """
+        Progreso como arrays paralelos en el orden del temario (orden del
+        módulo y de la lección, como GET /courses/{id}/content/, de donde el
+        cliente toma títulos y módulos):
+        - lesson_ids: IDs de las lecciones
+        - completed: bitmap '1'/'0' por lección
+        - progress: porcentaje por lección
+        - last_accessed_at: timestamp Unix por lección (null sin progreso)
+        """
+        lesson_ids = []
+        completed = []
+        progress = []
+        last_accessed = []
+        for lesson_id, _, _, _, is_completed, percentage, _, last_accessed_at in rows:
+            lesson_ids.append(lesson_id)
+            completed.append('1' if is_completed else '0')
+            progress.append(float(percentage) if percentage is not None else 0.0)
+            last_accessed.append(int(last_accessed_at.timestamp()) if last_accessed_at else None)
+        
+        lessons_progress = {
+            'lesson_ids': lesson_ids,
+            'completed': ''.join(completed),
+            'progress': progress,
+            'last_accessed_at': last_accessed,
+        }
+        return lessons_progress, completed.count('1')
@@ -5,6 +5,7 @@ Caso de uso: Obtener progreso de lección - FagSol Escuela Virtual
 import logging
 from apps.users.models import Enrollment, LessonProgress
 from apps.courses.models import Lesson
+from infrastructure.services.watch_time_buffer_service import WatchTimeBufferService
 from application.dtos.use_case_result import UseCaseResult
 
 logger = logging.getLogger('apps')
@@ -16,7 +17,7 @@ class GetLessonProgressUseCase:
     
     Responsabilidades:
     - Validar enrollment y lección
-    - Obtener progreso de la lección
+    - Obtener progreso de la lección (incluye el tiempo visto aún en el buffer)
     """
     
     def execute(
@@ -66,6 +67,9 @@ class GetLessonProgressUseCase:
                 enrollment=enrollment
             ).first()
             
+            # 4. Sumar el tiempo visto que aún está en el buffer (no volcado a la base de datos)
+            buffered_seconds, buffered_accessed_at = WatchTimeBufferService().pending(enrollment.id, lesson.id)
+            
             # Si no hay progreso, retornar datos por defecto
             if not lesson_progress:
                 return UseCaseResult(
@@ -75,10 +79,15 @@ class GetLessonProgressUseCase:
                         'is_completed': False,
                         'progress_percentage': 0.0,
                         'completed_at': None,
-                        'last_accessed_at': None,
+                        'last_accessed_at': buffered_accessed_at.isoformat() if buffered_accessed_at else None,
+                        'time_watched_seconds': buffered_seconds,
                     }
                 )
             
+            last_accessed_at = lesson_progress.last_accessed_at
+            if buffered_accessed_at and (not last_accessed_at or buffered_accessed_at > last_accessed_at):
+                last_accessed_at = buffered_accessed_at
+            
             return UseCaseResult(
                 success=True,
                 data={
@@ -87,8 +96,8 @@ class GetLessonProgressUseCase:
                     'is_completed': lesson_progress.is_completed,
                     'progress_percentage': float(lesson_progress.progress_percentage),
                     'completed_at': lesson_progress.completed_at.isoformat() if lesson_progress.completed_at else None,
-                    'last_accessed_at': lesson_progress.last_accessed_at.isoformat() if lesson_progress.last_accessed_at else None,
-                    'time_watched_seconds': lesson_progress.time_watched_seconds,
+                    'last_accessed_at': last_accessed_at.isoformat() if last_accessed_at else None,
+                    'time_watched_seconds': lesson_progress.time_watched_seconds + buffered_seconds,
                 },
                 extra={'lesson_progress': lesson_progress}
             )
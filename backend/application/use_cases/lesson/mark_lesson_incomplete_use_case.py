@@ -3,11 +3,10 @@ Caso de uso: Marcar lección como incompleta - FagSol Escuela Virtual
 """
 
 import logging
-from decimal import Decimal
 from django.db import transaction
-from django.utils import timezone
 from apps.users.models import Enrollment, LessonProgress
 from apps.courses.models import Lesson
+from infrastructure.services.enrollment_progress_service import EnrollmentProgressService
 from application.dtos.use_case_result import UseCaseResult
 
 logger = logging.getLogger('apps')
@@ -78,10 +77,10 @@ class MarkLessonIncompleteUseCase:
             
             # 4. Marcar como incompleta
             with transaction.atomic():
-                lesson_progress.mark_as_incomplete()
-                
-                # 5. Actualizar porcentaje de completitud del enrollment
-                self._update_enrollment_progress(enrollment)
+                progress_service = EnrollmentProgressService()
+                if progress_service.set_lesson_completed(lesson_progress, False):
+                    # 5. Actualizar contadores y porcentaje del enrollment (UPDATE atómico)
+                    progress_service.apply_completion_delta(enrollment, -1)
                 
                 logger.info(f"Lección {lesson_id} marcada como incompleta por usuario {user.id}")
                 
@@ -100,61 +99,3 @@ class MarkLessonIncompleteUseCase:
                 success=False,
                 error_message=f"Error al marcar lección como incompleta: {str(e)}"
             )
-    
-    def _update_enrollment_progress(self, enrollment: Enrollment):
-        """
-        Actualiza el porcentaje de completitud del enrollment basado en las lecciones completadas
-        
-        Args:
-            enrollment: Instancia de Enrollment
-        """
-        try:
-            course = enrollment.course
-            
-            # Obtener todas las lecciones activas del curso
-            total_lessons = Lesson.objects.filter(
-                module__course=course,
-                is_active=True
-            ).count()
-            
-            if total_lessons == 0:
-                # Si no hay lecciones, el curso está 100% completo (vacío)
-                enrollment.completion_percentage = Decimal('100.00')
-                enrollment.completed = True
-                enrollment.completed_at = timezone.now()
-                enrollment.status = 'completed'
-                enrollment.save()
-                return
-            
-            # Contar lecciones completadas
-            completed_lessons = LessonProgress.objects.filter(
-                user=enrollment.user,
-                enrollment=enrollment,
-                is_completed=True
-            ).count()
-            
-            # Calcular porcentaje
-            completion_percentage = Decimal(str(round(completed_lessons / total_lessons * 100, 2)))
-            
-            # Actualizar enrollment
-            enrollment.completion_percentage = completion_percentage
-            
-            # Si todas las lecciones están completadas, marcar curso como completado
-            if completed_lessons == total_lessons:
-                enrollment.completed = True
-                enrollment.completed_at = timezone.now()
-                enrollment.status = 'completed'
-            else:
-                enrollment.completed = False
-                enrollment.completed_at = None
-                if enrollment.status == 'completed':
-                    enrollment.status = 'active'
-            
-            enrollment.save()
-            
-            logger.info(f"Enrollment {enrollment.id} actualizado: {completion_percentage}% completado")
-            
-        except Exception as e:
-            logger.error(f"Error al actualizar progreso del enrollment: {str(e)}", exc_info=True)
-            raise
-
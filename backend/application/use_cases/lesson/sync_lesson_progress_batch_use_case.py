@@ -0,0 +1,245 @@
+"""
+Caso de uso: Sincronizar progreso de lecciones en lote - FagSol Escuela Virtual
+"""
+
+import logging
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Optional, Tuple
+from django.db import transaction
+from django.utils import timezone
+from apps.users.models import Enrollment, LessonProgress
+from apps.courses.models import Lesson
+from infrastructure.services.enrollment_progress_service import EnrollmentProgressService
+from application.dtos.use_case_result import UseCaseResult
+
+logger = logging.getLogger('apps')
+
+
+class SyncLessonProgressBatchUseCase:
+    """
+    Caso de uso: Sincronizar progreso de lecciones en lote (heartbeat del reproductor)
+
+    Responsabilidades:
+    - Validar todas las actualizaciones con una consulta de enrollments y una de lecciones
+    - Aplicar el progreso con un bulk_update sobre las filas (user, lesson, enrollment)
+      bloqueadas, creando antes las que falten
+    - Actualizar los contadores de cada enrollment una sola vez por lote
+
+    El progreso y el tiempo visto nunca retroceden (se guarda el máximo), por lo
+    que los heartbeats pueden llegar desordenados. completed=true marca la
+    lección como completada; para desmarcarla se usa el endpoint de incompleta.
+    """
+
+    MAX_BATCH_SIZE = 100
+
+    UPDATE_FIELDS = [
+        'progress_percentage', 'time_watched_seconds', 'is_completed',
+        'completed_at', 'last_accessed_at', 'updated_at'
+    ]
+
+    def execute(self, user, updates: List[Dict]) -> UseCaseResult:
+        """
+        Ejecuta el caso de uso de sincronizar progreso en lote
+
+        Args:
+            user: Usuario autenticado
+            updates: Lista de dicts con lesson_id, enrollment_id y opcionalmente
+                progress_percentage, time_watched_seconds y completed
+
+        Returns:
+            UseCaseResult con procesadas, rechazadas y el progreso de cada enrollment
+        """
+        if not isinstance(updates, list) or not updates:
+            return UseCaseResult(success=False, error_message="updates debe ser una lista no vacía")
+        if len(updates) > self.MAX_BATCH_SIZE:
+            return UseCaseResult(
+                success=False,
+                error_message=f"Máximo {self.MAX_BATCH_SIZE} actualizaciones por lote"
+            )
+
+        try:
+            # 1. Normalizar y fusionar entradas repetidas de la misma lección
+            rejected = []
+            merged: Dict[Tuple[str, str], Dict] = {}
+            for index, update in enumerate(updates):
+                entry, error = self._parse_update(update)
+                if error:
+                    rejected.append({'index': index, 'message': error})
+                    continue
+                key = (entry['lesson_id'], entry['enrollment_id'])
+                entry['index'] = index
+                if key in merged:
+                    entry = self._merge(merged[key], entry)
+                merged[key] = entry
+
+            # 2. Validar enrollments y lecciones (una consulta cada uno)
+            enrollments = {
+                enrollment.id: enrollment
+                for enrollment in Enrollment.objects.filter(
+                    id__in={enrollment_id for _, enrollment_id in merged},
+                    user=user,
+                    status='active'
+                )
+            }
+            lesson_courses = dict(
+                Lesson.objects.filter(
+                    id__in={lesson_id for lesson_id, _ in merged},
+                    is_active=True
+                ).values_list('id', 'module__course_id')
+            )
+
+            valid = {}
+            for key, entry in merged.items():
+                lesson_id, enrollment_id = key
+                enrollment = enrollments.get(enrollment_id)
+                if enrollment is None:
+                    rejected.append({'index': entry['index'], 'message': "Enrollment no encontrado o no tienes acceso"})
+                elif lesson_courses.get(lesson_id) != enrollment.course_id:
+                    rejected.append({'index': entry['index'], 'message': "Lección no encontrada o no pertenece a este curso"})
+                else:
+                    valid[key] = entry
+
+            completed_by_enrollment = defaultdict(int)
+            if valid:
+                with transaction.atomic():
+                    completed_by_enrollment = self._upsert(user, valid)
+
+                    # 3. Contadores: un UPDATE por enrollment con lecciones recién completadas
+                    progress_service = EnrollmentProgressService()
+                    for enrollment_id, newly_completed in completed_by_enrollment.items():
+                        progress_service.apply_completion_delta(enrollments[enrollment_id], newly_completed)
+
+            touched = {enrollment_id for _, enrollment_id in valid}
+            logger.info(
+                f"Progreso en lote de usuario {user.id}: {len(valid)} lecciones, "
+                f"{len(rejected)} rechazadas"
+            )
+
+            return UseCaseResult(
+                success=True,
+                data={
+                    'processed': len(valid),
+                    'rejected': sorted(rejected, key=lambda item: item['index']),
+                    'enrollments': [
+                        {
+                            'id': enrollment_id,
+                            'completion_percentage': float(enrollments[enrollment_id].completion_percentage),
+                            'completed': enrollments[enrollment_id].completed,
+                        }
+                        for enrollment_id in sorted(touched)
+                    ],
+                }
+            )
+
+        except Exception as e:
+            logger.error(f"Error al sincronizar progreso en lote: {str(e)}", exc_info=True)
+            return UseCaseResult(
+                success=False,
+                error_message=f"Error al sincronizar progreso en lote: {str(e)}"
+            )
+
+    def _upsert(self, user, valid: Dict[Tuple[str, str], Dict]) -> Dict[str, int]:
+        """
+        Aplica el lote sobre filas bloqueadas (debe llamarse dentro de una transacción).
+
+        Primero crea en 0 los LessonProgress que falten (INSERT ... ON CONFLICT
+        DO NOTHING) y luego bloquea todas las filas del lote con
+        select_for_update(), de modo que los valores nuevos se calculan sobre
+        el estado confirmado: un lote concurrente, un mark_lesson_completed o
+        el volcado del tiempo visto esperan al bloqueo en lugar de ser pisados,
+        y una lección solo cuenta como recién completada una vez.
+
+        Returns:
+            dict: enrollment_id -> lecciones que pasaron a completadas en este lote
+        """
+        enrollment_ids = {enrollment_id for _, enrollment_id in valid}
+        lesson_ids = {lesson_id for lesson_id, _ in valid}
+
+        LessonProgress.objects.bulk_create(
+            [
+                LessonProgress(user=user, lesson_id=lesson_id, enrollment_id=enrollment_id)
+                for lesson_id, enrollment_id in valid
+            ],
+            ignore_conflicts=True,
+        )
+        locked = {
+            (progress.lesson_id, progress.enrollment_id): progress
+            for progress in LessonProgress.objects.select_for_update().filter(
+                user=user,
+                enrollment_id__in=enrollment_ids,
+                lesson_id__in=lesson_ids,
+            ).order_by('pk')
+        }
+
+        now = timezone.now()
+        completed_by_enrollment = defaultdict(int)
+        rows = []
+        for key, entry in valid.items():
+            progress = locked.get(key)
+            if progress is None:
+                # Enrollment o lección eliminados mientras tanto
+                continue
+
+            if entry['progress_percentage'] is not None:
+                progress.progress_percentage = max(Decimal(progress.progress_percentage), entry['progress_percentage'])
+            if entry['time_watched_seconds'] is not None:
+                progress.time_watched_seconds = max(progress.time_watched_seconds, entry['time_watched_seconds'])
+            if entry['completed'] and not progress.is_completed:
+                progress.is_completed = True
+                progress.completed_at = now
+                progress.progress_percentage = Decimal('100.00')
+                completed_by_enrollment[key[1]] += 1
+            progress.last_accessed_at = now
+            progress.updated_at = now
+            rows.append(progress)
+
+        LessonProgress.objects.bulk_update(rows, self.UPDATE_FIELDS)
+        return completed_by_enrollment
+
+    @staticmethod
+    def _parse_update(update) -> Tuple[Optional[Dict], Optional[str]]:
+        """Valida una actualización del lote. Returns: (entrada, mensaje de error)"""
+        if not isinstance(update, dict):
+            return None, "Formato inválido"
+
+        lesson_id = update.get('lesson_id')
+        enrollment_id = update.get('enrollment_id')
+        if not lesson_id or not enrollment_id:
+            return None, "lesson_id y enrollment_id son requeridos"
+
+        progress_percentage = update.get('progress_percentage')
+        if progress_percentage is not None:
+            try:
+                progress_percentage = Decimal(str(progress_percentage)).quantize(Decimal('0.01'))
+            except (InvalidOperation, ValueError):
+                return None, "progress_percentage inválido"
+            if not Decimal('0') <= progress_percentage <= Decimal('100'):
+                return None, "progress_percentage debe estar entre 0 y 100"
+
+        time_watched_seconds = update.get('time_watched_seconds')
+        if time_watched_seconds is not None:
+            if isinstance(time_watched_seconds, bool) or not isinstance(time_watched_seconds, int) or time_watched_seconds < 0:
+                return None, "time_watched_seconds debe ser un entero mayor o igual a 0"
+
+        return {
+            'lesson_id': str(lesson_id),
+            'enrollment_id': str(enrollment_id),
+            'progress_percentage': progress_percentage,
+            'time_watched_seconds': time_watched_seconds,
+            'completed': update.get('completed') is True,
+        }, None
+
+    @staticmethod
+    def _merge(previous: Dict, current: Dict) -> Dict:
+        """Fusiona dos heartbeats de la misma lección dentro de un lote"""
+        def highest(field):
+            values = [value for value in (previous[field], current[field]) if value is not None]
+            return max(values) if values else None
+
+        return {
+            **current,
+            'progress_percentage': highest('progress_percentage'),
+            'time_watched_seconds': highest('time_watched_seconds'),
+            'completed': previous['completed'] or current['completed'],
+        }
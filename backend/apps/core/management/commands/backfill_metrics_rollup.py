@@ -0,0 +1,47 @@
+"""
+Comando de Django para reconstruir los rollups diarios de métricas
+Recalcula DailyRevenue y DailyCourseActivity de un rango de fechas desde Payment, Enrollment y Certificate
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from infrastructure.services.metrics_rollup_service import MetricsRollupService
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye los rollups diarios de métricas (por defecto, desde el primer pago o inscripción)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            type=str,
+            help='Fecha inicial YYYY-MM-DD (por defecto, la del primer pago o inscripción)',
+        )
+        parser.add_argument(
+            '--until',
+            type=str,
+            help='Fecha final YYYY-MM-DD (por defecto, hoy)',
+        )
+
+    def handle(self, *args, **options):
+        until = self._parse_date(options['until']) if options['until'] else timezone.localdate()
+        since = self._parse_date(options['since']) if options['since'] else MetricsRollupService.first_day(until)
+        if since > until:
+            raise CommandError('--since debe ser anterior o igual a --until')
+
+        self.stdout.write(self.style.WARNING(f'Reconstruyendo rollups del {since} al {until}...'))
+        counts = MetricsRollupService().backfill(since, until)
+
+        self.stdout.write(f"   Filas de ingresos diarios: {counts.get('revenue_rows', 0)}")
+        self.stdout.write(f"   Filas de actividad diaria por curso: {counts.get('activity_rows', 0)}")
+        self.stdout.write(self.style.SUCCESS('✅ Rollups reconstruidos'))
+
+    @staticmethod
+    def _parse_date(value: str) -> date:
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise CommandError(f'Fecha inválida: {value} (formato YYYY-MM-DD)')
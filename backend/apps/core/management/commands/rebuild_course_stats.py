@@ -0,0 +1,26 @@
+"""
+Comando de Django para reconstruir las estadísticas por curso
+Recalcula CourseStats desde Enrollment y Payment (ej: después de migrar o ante una desviación)
+"""
+
+from django.core.management.base import BaseCommand
+from infrastructure.services.course_stats_service import CourseStatsService
+
+
+class Command(BaseCommand):
+    help = 'Recalcula las estadísticas acumuladas de los cursos (CourseStats)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--course',
+            type=str,
+            help='ID del curso a recalcular (por defecto, todos)',
+        )
+
+    def handle(self, *args, **options):
+        course_id = options.get('course')
+        service = CourseStatsService()
+
+        self.stdout.write(self.style.WARNING('Recalculando estadísticas de cursos...'))
+        written = service.refresh([course_id]) if course_id else service.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'✅ {written} cursos recalculados'))
@@ -0,0 +1,130 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("courses", "0010_course_localized_prices"),
+        ("core", "0006_contactmessage"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyCourseActivity",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Fecha")),
+                (
+                    "enrollments",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Inscripciones nuevas"
+                    ),
+                ),
+                (
+                    "completions",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Cursos completados"
+                    ),
+                ),
+                (
+                    "certificates",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Certificados emitidos"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, verbose_name="Fecha de actualización"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Actividad diaria de curso",
+                "verbose_name_plural": "Actividad diaria de cursos",
+                "db_table": "daily_course_activity",
+                "ordering": ["-date", "course"],
+            },
+        ),
+        migrations.CreateModel(
+            name="DailyRevenue",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Fecha")),
+                ("currency", models.CharField(max_length=3, verbose_name="Moneda")),
+                (
+                    "payments_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Pagos aprobados"
+                    ),
+                ),
+                (
+                    "total",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=14,
+                        verbose_name="Ingresos",
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, verbose_name="Fecha de actualización"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Ingreso diario",
+                "verbose_name_plural": "Ingresos diarios",
+                "db_table": "daily_revenue",
+                "ordering": ["-date", "currency"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="dailyrevenue",
+            constraint=models.UniqueConstraint(
+                fields=("date", "currency"), name="daily_revenue_date_currency_uniq"
+            ),
+        ),
+        migrations.AddField(
+            model_name="dailycourseactivity",
+            name="course",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="daily_activity",
+                to="courses.course",
+                verbose_name="Curso",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dailycourseactivity",
+            index=models.Index(
+                fields=["course", "date"], name="daily_cours_course__14b80a_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="dailycourseactivity",
+            constraint=models.UniqueConstraint(
+                fields=("date", "course"), name="daily_course_activity_uniq"
+            ),
+        ),
+    ]
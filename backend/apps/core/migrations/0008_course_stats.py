@@ -0,0 +1,141 @@
+# Generated by Django 4.2.30 on 2026-10-17 21:14
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+import django.db.models.deletion
+
+
+def backfill_course_stats(apps, schema_editor):
+    """
+    Carga una fila por curso con inscripciones, recalculada desde Enrollment y
+    Payment (misma regla que CourseStatsService.refresh: el monto de cada pago
+    aprobado se reparte en partes iguales entre sus inscripciones y los
+    centavos sobrantes van a la primera por ID).
+    """
+    Course = apps.get_model("courses", "Course")
+    CourseStats = apps.get_model("core", "CourseStats")
+    Enrollment = apps.get_model("users", "Enrollment")
+
+    stats = {}
+    for row in (
+        Enrollment.objects.values("course_id")
+        .annotate(
+            total=Count("pk"),
+            active=Count("pk", filter=Q(status="active")),
+            completed_count=Count("pk", filter=Q(status="completed")),
+            percentage_sum=Sum("completion_percentage"),
+            last_enrolled=Max("enrolled_at"),
+        )
+        .order_by()
+    ):
+        stats[row["course_id"]] = CourseStats(
+            course_id=row["course_id"],
+            enrollments=row["total"],
+            active_enrollments=row["active"],
+            completed_enrollments=row["completed_count"],
+            completion_sum=row["percentage_sum"] or Decimal("0.00"),
+            last_enrollment_at=row["last_enrolled"],
+        )
+
+    by_payment = defaultdict(list)
+    for payment_id, course_id, amount in (
+        Enrollment.objects.filter(payment__status="approved")
+        .order_by("payment_id", "pk")
+        .values_list("payment_id", "course_id", "payment__amount")
+    ):
+        by_payment[payment_id].append((course_id, amount))
+    for items in by_payment.values():
+        amount, parts = items[0][1], len(items)
+        share = (amount / parts).quantize(Decimal("0.01"))
+        for index, (course_id, _) in enumerate(items):
+            if course_id in stats:
+                stats[course_id].revenue += amount - share * (parts - 1) if index == 0 else share
+
+    existing = set(Course.objects.filter(id__in=stats).values_list("id", flat=True))
+    CourseStats.objects.bulk_create(
+        [row for course_id, row in stats.items() if course_id in existing], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("courses", "0010_course_localized_prices"),
+        ("core", "0007_daily_metrics_rollup"),
+        ("users", "0003_enrollment_progress_counters"),
+        ("payments", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CourseStats",
+            fields=[
+                (
+                    "course",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="courses.course",
+                        verbose_name="Curso",
+                    ),
+                ),
+                (
+                    "enrollments",
+                    models.IntegerField(default=0, verbose_name="Inscripciones"),
+                ),
+                (
+                    "active_enrollments",
+                    models.IntegerField(
+                        default=0, verbose_name="Inscripciones activas"
+                    ),
+                ),
+                (
+                    "completed_enrollments",
+                    models.IntegerField(
+                        default=0, verbose_name="Inscripciones completadas"
+                    ),
+                ),
+                (
+                    "completion_sum",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="Promedio de completitud = completion_sum / enrollments",
+                        max_digits=14,
+                        verbose_name="Suma de porcentajes de completitud",
+                    ),
+                ),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=14,
+                        verbose_name="Ingresos",
+                    ),
+                ),
+                (
+                    "last_enrollment_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Última inscripción"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, verbose_name="Fecha de actualización"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Estadísticas de curso",
+                "verbose_name_plural": "Estadísticas de cursos",
+                "db_table": "course_stats",
+            },
+        ),
+        migrations.RunPython(backfill_course_stats, migrations.RunPython.noop),
+    ]
@@ -301,4 +301,104 @@ class ContactMessage(models.Model):
     @property
     def is_read(self):
         """Verifica si el mensaje ha sido leído"""
-        return self.status in ['read', 'replied']
\ No newline at end of file
+        return self.status in ['read', 'replied']
+
+
+class DailyRevenue(models.Model):
+    """
+    Rollup diario de pagos aprobados por moneda.
+    Lo mantiene MetricsRollupService (tarea refresh_metrics_rollup y comando backfill_metrics_rollup).
+    """
+    date = models.DateField(verbose_name="Fecha")
+    currency = models.CharField(max_length=3, verbose_name="Moneda")
+    payments_count = models.PositiveIntegerField(default=0, verbose_name="Pagos aprobados")
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Ingresos")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Fecha de actualización")
+    
+    class Meta:
+        db_table = 'daily_revenue'
+        verbose_name = 'Ingreso diario'
+        verbose_name_plural = 'Ingresos diarios'
+        ordering = ['-date', 'currency']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'currency'], name='daily_revenue_date_currency_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} {self.currency}: {self.total} ({self.payments_count} pagos)"
+
+
+class DailyCourseActivity(models.Model):
+    """
+    Rollup diario por curso: inscripciones nuevas, cursos completados y certificados emitidos.
+    Lo mantiene MetricsRollupService (tarea refresh_metrics_rollup y comando backfill_metrics_rollup).
+    """
+    date = models.DateField(verbose_name="Fecha")
+    course = models.ForeignKey(
+        'courses.Course',
+        on_delete=models.CASCADE,
+        related_name='daily_activity',
+        verbose_name="Curso"
+    )
+    enrollments = models.PositiveIntegerField(default=0, verbose_name="Inscripciones nuevas")
+    completions = models.PositiveIntegerField(default=0, verbose_name="Cursos completados")
+    certificates = models.PositiveIntegerField(default=0, verbose_name="Certificados emitidos")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Fecha de actualización")
+    
+    class Meta:
+        db_table = 'daily_course_activity'
+        verbose_name = 'Actividad diaria de curso'
+        verbose_name_plural = 'Actividad diaria de cursos'
+        ordering = ['-date', 'course']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'course'], name='daily_course_activity_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['course', 'date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} {self.course_id}: {self.enrollments} inscripciones"
+
+
+class CourseStats(models.Model):
+    """
+    Estadísticas acumuladas de un curso (una fila por curso).
+    Las mantiene CourseStatsService en la misma transacción que cada inscripción,
+    cambio de progreso o de estado; el comando rebuild_course_stats las recalcula.
+    """
+    course = models.OneToOneField(
+        'courses.Course',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name="Curso"
+    )
+    enrollments = models.IntegerField(default=0, verbose_name="Inscripciones")
+    active_enrollments = models.IntegerField(default=0, verbose_name="Inscripciones activas")
+    completed_enrollments = models.IntegerField(default=0, verbose_name="Inscripciones completadas")
+    completion_sum = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name="Suma de porcentajes de completitud",
+        help_text="Promedio de completitud = completion_sum / enrollments"
+    )
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Ingresos")
+    last_enrollment_at = models.DateTimeField(null=True, blank=True, verbose_name="Última inscripción")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Fecha de actualización")
+    
+    class Meta:
+        db_table = 'course_stats'
+        verbose_name = 'Estadísticas de curso'
+        verbose_name_plural = 'Estadísticas de cursos'
+    
+    def __str__(self):
+        return f"{self.course_id}: {self.enrollments} inscripciones"
+    
+    @property
+    def average_completion(self):
+        """Porcentaje de completitud promedio de las inscripciones"""
+        if not self.enrollments:
+            return 0.0
+        return round(float(self.completion_sum) / self.enrollments, 2)
@@ -0,0 +1,29 @@
+"""
+Tareas asíncronas de Core - FagSol Escuela Virtual
+"""
+
+from celery import shared_task
+
+
+@shared_task
+def refresh_metrics_rollup():
+    """
+    Tarea periódica: recalcula los rollups diarios de métricas (ingresos,
+    inscripciones, completados y certificados) de los últimos
+    METRICS_ROLLUP_LOOKBACK_DAYS días. Devuelve las filas escritas.
+    """
+    from infrastructure.services.metrics_rollup_service import MetricsRollupService
+    
+    return MetricsRollupService().refresh()
+
+
+@shared_task
+def refresh_public_stats():
+    """
+    Recalcula en segundo plano las estadísticas públicas de la página de
+    inicio cuando su caché vence (stale-while-revalidate). Solo la encola
+    la request que obtuvo el candado de recálculo.
+    """
+    from application.use_cases.dashboard import GetPublicStatsUseCase
+    
+    GetPublicStatsUseCase().refresh()
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class CoursesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.courses"
+    
+    def ready(self):
+        """
+        Importa signals cuando la app está lista
+        """
+        import apps.courses.signals  # noqa
@@ -0,0 +1,18 @@
+"""
+Comando de Django para reconstruir el índice de búsqueda de cursos
+Útil después de cargas masivas (fixtures, importaciones) o restauraciones
+"""
+
+from django.core.management.base import BaseCommand
+from infrastructure.services.course_search_service import CourseSearchService
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el índice de búsqueda de texto completo de los cursos'
+
+    def handle(self, *args, **options):
+        service = CourseSearchService()
+
+        self.stdout.write(self.style.WARNING(f'Reconstruyendo índice de búsqueda ({service.vendor})...'))
+        count = service.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'✅ {count} cursos indexados'))
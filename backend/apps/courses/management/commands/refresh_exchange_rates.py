@@ -0,0 +1,25 @@
+"""
+Comando de Django para refrescar las tasas de cambio y recalcular los precios
+por moneda de todos los cursos (Course.localized_prices).
+
+Normalmente lo ejecuta celery beat (apps.courses.tasks.refresh_exchange_rates);
+este comando permite hacerlo manualmente, por ejemplo después de un deploy.
+"""
+
+from django.core.management.base import BaseCommand
+from infrastructure.services.currency_service import CurrencyService
+
+
+class Command(BaseCommand):
+    help = 'Refresca las tasas de cambio y recalcula los precios por moneda de los cursos'
+
+    def handle(self, *args, **options):
+        self.stdout.write('💱 Descargando tasas de cambio...')
+        
+        success, updated = CurrencyService().refresh_rates()
+        
+        if not success:
+            self.stdout.write(self.style.ERROR('❌ No se pudieron obtener las tasas de cambio'))
+            return
+        
+        self.stdout.write(self.style.SUCCESS(f'✅ Precios por moneda recalculados para {updated} cursos'))
@@ -0,0 +1,82 @@
+# Generated by Django 4.2.30 on 2026-10-17 19:37
+
+import django.contrib.postgres.search
+from django.db import migrations
+from django.db.utils import OperationalError
+
+
+# Debe coincidir con CourseSearchService (infrastructure/services/course_search_service.py)
+POSTGRES_SEARCH_VECTOR_SQL = """
+    UPDATE courses SET search_vector =
+        setweight(to_tsvector('spanish', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('spanish', coalesce(short_description, '')), 'B') ||
+        setweight(to_tsvector('spanish', coalesce(tags::text, '')), 'B') ||
+        setweight(to_tsvector('spanish', coalesce(category, '')), 'C') ||
+        setweight(to_tsvector('spanish', coalesce(description, '')), 'D')
+"""
+
+SQLITE_FTS_TABLE_SQL = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS courses_fts USING fts5(
+        course_id UNINDEXED,
+        title,
+        short_description,
+        tags,
+        category,
+        description,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+"""
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Crea el índice de búsqueda según el motor de base de datos:
+    - PostgreSQL: índice GIN sobre courses.search_vector + carga inicial
+    - SQLite (desarrollo/tests): tabla virtual FTS5 courses_fts + carga inicial
+    """
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS courses_search_vector_gin "
+            "ON courses USING GIN (search_vector)"
+        )
+        schema_editor.execute(POSTGRES_SEARCH_VECTOR_SQL)
+    elif vendor == 'sqlite':
+        try:
+            schema_editor.execute(SQLITE_FTS_TABLE_SQL)
+        except OperationalError:
+            # SQLite compilado sin FTS5: la búsqueda usará icontains como respaldo
+            print("⚠️  FTS5 no disponible en SQLite, la búsqueda usará icontains")
+            return
+        schema_editor.execute(
+            "INSERT INTO courses_fts (course_id, title, short_description, tags, category, description) "
+            "SELECT id, title, short_description, tags, category, description FROM courses"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    """Elimina el índice de búsqueda"""
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS courses_search_vector_gin")
+    elif vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS courses_fts")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("courses", "0007_convert_pen_to_usd"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                blank=True, editable=False, null=True, verbose_name="Vector de búsqueda"
+            ),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
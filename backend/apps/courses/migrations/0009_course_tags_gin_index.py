@@ -0,0 +1,28 @@
+from django.db import migrations
+
+
+def create_tags_index(apps, schema_editor):
+    """
+    Índice GIN sobre courses.tags (jsonb) para el filtro por tags del catálogo.
+    Solo PostgreSQL: en SQLite el filtro usa json_each sin índice.
+    """
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS courses_tags_gin "
+            "ON courses USING GIN (tags jsonb_path_ops)"
+        )
+
+
+def drop_tags_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS courses_tags_gin")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("courses", "0008_course_search_vector"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_tags_index, drop_tags_index),
+    ]
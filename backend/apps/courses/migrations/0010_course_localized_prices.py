@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 19:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("courses", "0009_course_tags_gin_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="localized_prices",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                help_text="JSON {moneda: {price, discount_price}} calculado desde price_usd",
+                verbose_name="Precios por moneda",
+            ),
+        ),
+    ]
@@ -4,6 +4,7 @@ Modelos de Cursos - FagSol Escuela Virtual
 
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from decimal import Decimal
@@ -154,6 +155,25 @@ class Course(models.Model):
         help_text="Comentarios del administrador sobre la revisión (máximo 2000 caracteres)"
     )
     
+    # Precios precalculados por moneda. Se recalculan en bloque al refrescar las
+    # tasas de cambio (CoursePricingService) y al guardar el curso.
+    localized_prices = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name="Precios por moneda",
+        help_text="JSON {moneda: {price, discount_price}} calculado desde price_usd"
+    )
+    
+    # Búsqueda de texto completo (PostgreSQL). Se mantiene desde CourseSearchService
+    # al guardar el curso; el índice GIN se crea en la migración 0008.
+    search_vector = SearchVectorField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="Vector de búsqueda"
+    )
+    
     class Meta:
         db_table = 'courses'
         verbose_name = 'Curso'
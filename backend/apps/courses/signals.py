@@ -0,0 +1,163 @@
+"""
+Signals de Cursos - FagSol Escuela Virtual
+
+Mantiene actualizados los datos derivados de los cursos cuando cambian.
+"""
+
+import logging
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.contrib.auth.models import User
+from apps.core.models import UserProfile
+from apps.courses.models import Course, Module, Lesson, Material
+
+logger = logging.getLogger('apps')
+
+
+@receiver(pre_save, sender=Course)
+def update_course_localized_prices(sender, instance, raw=False, **kwargs):
+    """
+    Signal: Recalcula los precios por moneda del curso con las tasas en caché.
+    """
+    if raw:
+        return
+    
+    from infrastructure.services.course_pricing_service import CoursePricingService
+    instance.localized_prices = CoursePricingService().localize(instance)
+
+
+@receiver(post_save, sender=Course)
+def update_course_search_index(sender, instance, raw=False, **kwargs):
+    """
+    Signal: Actualiza el índice de búsqueda de texto completo del curso guardado.
+    """
+    if raw:
+        # Carga de fixtures: el índice se reconstruye con rebuild_course_search_index
+        return
+    
+    from infrastructure.services.course_search_service import CourseSearchService
+    CourseSearchService().index_course(instance)
+
+
+@receiver(post_delete, sender=Course)
+def remove_course_from_search_index(sender, instance, **kwargs):
+    """
+    Signal: Elimina el curso del índice de búsqueda.
+    """
+    from infrastructure.services.course_search_service import CourseSearchService
+    CourseSearchService().remove_course(instance.pk)
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=Module)
+@receiver(post_delete, sender=Module)
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+@receiver(post_save, sender=Material)
+@receiver(post_delete, sender=Material)
+def invalidate_catalog_cache(sender, **kwargs):
+    """
+    Signal: Invalida la caché del catálogo cuando cambia un curso o su contenido.
+    """
+    from infrastructure.services.catalog_cache_service import CatalogCacheService
+    CatalogCacheService().bump_version()
+
+
+# Campos del creador que aparecen en provider / instructor de los payloads cacheados
+CREATOR_USER_FIELDS = {'first_name', 'last_name', 'email'}
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_catalog_cache_on_creator_change(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Signal: Invalida la caché del catálogo cuando cambia el nombre, email o rol
+    de un usuario que creó cursos (provider e instructor se derivan de ellos).
+    """
+    if raw:
+        return
+    
+    relevant_fields = CREATOR_USER_FIELDS if sender is User else {'role'}
+    if update_fields is not None and not relevant_fields.intersection(update_fields):
+        # ej: update_last_login en cada inicio de sesión
+        return
+    
+    user_id = instance.pk if sender is User else instance.user_id
+    if Course.objects.filter(created_by_id=user_id).exists():
+        from infrastructure.services.catalog_cache_service import CatalogCacheService
+        CatalogCacheService().bump_version()
+
+
+def _content_course_id(sender, instance):
+    """Curso al que pertenece una instancia de contenido"""
+    if sender is Course:
+        return instance.pk
+    if sender is Lesson:
+        # En un borrado en cascada el módulo puede no existir ya (su propio signal invalida)
+        return Module.objects.filter(pk=instance.module_id).values_list('course_id', flat=True).first()
+    return instance.course_id
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=Module)
+@receiver(post_delete, sender=Module)
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+@receiver(post_save, sender=Material)
+@receiver(post_delete, sender=Material)
+def invalidate_course_content_snapshot(sender, instance, **kwargs):
+    """
+    Signal: Invalida el snapshot del árbol de contenido del curso modificado.
+    """
+    course_id = _content_course_id(sender, instance)
+    if not course_id:
+        return
+    
+    from infrastructure.services.course_content_snapshot_service import CourseContentSnapshotService
+    CourseContentSnapshotService().invalidate(course_id)
+
+
+@receiver(pre_save, sender=Lesson)
+def remember_lesson_structure(sender, instance, raw=False, **kwargs):
+    """
+    Signal: Guarda el estado previo de la lección (activa y curso) para
+    detectar en post_save si cambió la estructura del curso.
+    """
+    if raw or instance._state.adding:
+        return
+    
+    instance._previous_structure = Lesson.objects.filter(pk=instance.pk).values_list(
+        'is_active', 'module__course_id'
+    ).first()
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def recompute_enrollment_progress(sender, instance, raw=False, created=False, **kwargs):
+    """
+    Signal: Encola el recálculo del progreso de las inscripciones del curso
+    cuando se agrega, activa, desactiva, mueve o elimina una lección.
+    Editar el contenido de una lección no dispara el recálculo.
+    """
+    if raw:
+        return
+
+    course_id = _content_course_id(sender, instance)
+    course_ids = {course_id} if course_id else set()
+
+    if kwargs.get('signal') is post_save and not created:
+        previous = getattr(instance, '_previous_structure', None)
+        if previous is not None:
+            was_active, previous_course_id = previous
+            if was_active == instance.is_active and previous_course_id == course_id:
+                return
+            if previous_course_id:
+                course_ids.add(previous_course_id)
+
+    from infrastructure.services.enrollment_progress_service import EnrollmentProgressService
+    service = EnrollmentProgressService()
+    for affected_course_id in course_ids:
+        service.schedule_course_recompute(affected_course_id)
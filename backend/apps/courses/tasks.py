@@ -0,0 +1,22 @@
+"""
+Tareas asíncronas de Cursos - FagSol Escuela Virtual
+"""
+
+import logging
+from celery import shared_task
+
+logger = logging.getLogger('apps')
+
+
+@shared_task(ignore_result=True)
+def refresh_exchange_rates():
+    """
+    Tarea periódica: descarga las tasas de cambio (una sola llamada a la API)
+    y recalcula en bloque los precios por moneda de todos los cursos.
+    """
+    from infrastructure.services.currency_service import CurrencyService
+    
+    success, updated = CurrencyService().refresh_rates()
+    if not success:
+        logger.warning("No se pudieron refrescar las tasas de cambio; se mantienen los precios anteriores")
+    return updated
@@ -63,10 +63,10 @@ class PaymentAdmin(admin.ModelAdmin):
 
 @admin.register(PaymentWebhook)
 class PaymentWebhookAdmin(admin.ModelAdmin):
-    list_display = ['id', 'mercado_pago_id', 'event_type', 'payment_id', 'processed', 'created_at']
+    list_display = ['id', 'mercado_pago_id', 'event_type', 'payment_id', 'processed', 'attempts', 'created_at']
     list_filter = ['event_type', 'processed', 'created_at']
     search_fields = ['mercado_pago_id', 'payment_id']
-    readonly_fields = ['id', 'mercado_pago_id', 'event_type', 'payment_id', 'data', 'created_at', 'processed_at']
+    readonly_fields = ['id', 'mercado_pago_id', 'event_type', 'payment_id', 'data', 'created_at', 'processed_at', 'claimed_at']
     ordering = ['-created_at']
     
     fieldsets = (
@@ -78,7 +78,7 @@ class PaymentWebhookAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('Estado de Procesamiento', {
-            'fields': ('processed', 'processed_at', 'error_message')
+            'fields': ('processed', 'processed_at', 'claimed_at', 'attempts', 'error_message')
         }),
         ('Metadatos', {
             'fields': ('created_at',),
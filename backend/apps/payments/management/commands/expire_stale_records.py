@@ -0,0 +1,38 @@
+"""
+Comando de Django para barrer payment intents e inscripciones vencidas
+Cancela los intents pendientes y expira las inscripciones activas cuyo expires_at ya pasó
+"""
+
+from django.core.management.base import BaseCommand
+from infrastructure.services.expiry_sweeper_service import ExpirySweeperService
+
+
+class Command(BaseCommand):
+    help = 'Cancela los payment intents pendientes vencidos y expira las inscripciones vencidas, en bloques'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=ExpirySweeperService.BATCH_SIZE,
+            help=f'Filas por UPDATE (por defecto {ExpirySweeperService.BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Solo mostrar cuántas filas se actualizarían',
+        )
+
+    def handle(self, *args, **options):
+        service = ExpirySweeperService(batch_size=options['batch_size'])
+
+        if options['dry_run']:
+            counts = service.pending_counts()
+            self.stdout.write(self.style.WARNING('Modo simulación: no se modifican filas'))
+        else:
+            self.stdout.write(self.style.WARNING('Barriendo registros vencidos...'))
+            counts = service.sweep()
+
+        self.stdout.write(f"   Payment intents cancelados: {counts['payment_intents_expired']}")
+        self.stdout.write(f"   Inscripciones expiradas: {counts['enrollments_expired']}")
+        self.stdout.write(self.style.SUCCESS('✅ Barrido completado'))
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("payments", "0002_add_installments_to_payment"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="paymentwebhook",
+            name="attempts",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Intentos fallidos"
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("payments", "0003_payment_webhook_attempts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="paymentwebhook",
+            name="claimed_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="En proceso desde"
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("payments", "0004_payment_webhook_claimed_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="paymentintent",
+            index=models.Index(
+                condition=models.Q(("status", "pending")),
+                fields=["expires_at"],
+                name="payment_intent_pending_exp_idx",
+            ),
+        ),
+    ]
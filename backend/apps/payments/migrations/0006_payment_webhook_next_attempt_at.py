@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-17 22:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("payments", "0005_payment_intent_pending_expiry_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="paymentwebhook",
+            name="next_attempt_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Próximo reintento"
+            ),
+        ),
+    ]
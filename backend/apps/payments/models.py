@@ -64,6 +64,12 @@ class PaymentIntent(models.Model):
         indexes = [
             models.Index(fields=['user', 'status']),
             models.Index(fields=['status', 'created_at']),
+            # Barrido de intents vencidos (ExpirySweeperService)
+            models.Index(
+                fields=['expires_at'],
+                condition=models.Q(status='pending'),
+                name='payment_intent_pending_exp_idx'
+            ),
         ]
     
     def __str__(self):
@@ -151,6 +157,9 @@ class PaymentWebhook(models.Model):
     processed = models.BooleanField(default=False, verbose_name="Procesado")
     processed_at = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de procesamiento")
     error_message = models.TextField(blank=True, null=True, verbose_name="Mensaje de error")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Intentos fallidos")
+    claimed_at = models.DateTimeField(null=True, blank=True, verbose_name="En proceso desde")
+    next_attempt_at = models.DateTimeField(null=True, blank=True, verbose_name="Próximo reintento")
     
     # Metadatos
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de recepción")
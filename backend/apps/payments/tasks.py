@@ -0,0 +1,81 @@
+"""
+Tareas asíncronas de Pagos - FagSol Escuela Virtual
+"""
+
+import logging
+from datetime import timedelta
+from celery import shared_task
+from django.utils import timezone
+
+logger = logging.getLogger('apps')
+
+# Antigüedad mínima (o atraso de su reintento) para reencolar un webhook pendiente:
+# su tarea pudo perderse
+WEBHOOK_REQUEUE_AFTER = timedelta(minutes=5)
+
+
+@shared_task(bind=True, ignore_result=True, max_retries=None)
+def process_payment_webhook(self, webhook_pk):
+    """
+    Tarea: procesa un webhook de Mercado Pago registrado por el endpoint y los
+    demás pendientes del mismo pago, en orden. Los intentos se cuentan en
+    PaymentWebhook.attempts; PaymentService descarta el webhook al agotarlos.
+    """
+    from infrastructure.services.payment_service import PaymentService, WebhookRetryError
+    
+    payment_service = PaymentService()
+    try:
+        return payment_service.process_queued_webhooks(webhook_pk)
+    except WebhookRetryError as e:
+        countdown = payment_service.webhook_retry_delay(e.webhook.attempts)
+        logger.warning(f"{str(e)}; reintento en {countdown}s")
+        raise self.retry(exc=e, countdown=countdown)
+
+
+@shared_task(ignore_result=True)
+def requeue_pending_payment_webhooks():
+    """
+    Tarea periódica: reencola los webhooks que siguen pendientes (p. ej. si el
+    broker no estaba disponible al recibirlos). Una tarea por pago.
+    
+    Los pagos cuyo primer webhook pendiente ya falló y espera su reintento con
+    backoff (next_attempt_at) no se tocan: process_payment_webhook ya lo tiene
+    programado. Solo se reencolan si el reintento lleva WEBHOOK_REQUEUE_AFTER
+    de atraso (la tarea se perdió).
+    """
+    from infrastructure.services.payment_service import PaymentService
+    
+    payment_service = PaymentService()
+    now = timezone.now()
+    pending = payment_service.pending_webhooks().filter(
+        created_at__lt=now - WEBHOOK_REQUEUE_AFTER
+    ).order_by('created_at', 'id').values_list('pk', 'payment_id', 'next_attempt_at')
+    
+    seen_payments = set()
+    requeued = 0
+    for webhook_pk, payment_id, next_attempt_at in pending:
+        if payment_id:
+            # Solo el primero pendiente de cada pago: la tarea procesa el resto en orden
+            if payment_id in seen_payments:
+                continue
+            seen_payments.add(payment_id)
+        if next_attempt_at and next_attempt_at > now - WEBHOOK_REQUEUE_AFTER:
+            continue
+        payment_service.dispatch_webhook(webhook_pk)
+        requeued += 1
+    
+    if requeued:
+        logger.info(f"{requeued} webhooks pendientes reencolados")
+    return requeued
+
+
+@shared_task
+def expire_stale_records():
+    """
+    Tarea periódica: cancela los payment intents pendientes vencidos y marca
+    como expiradas las inscripciones activas vencidas, en bloques.
+    Devuelve los conteos (métricas del barrido).
+    """
+    from infrastructure.services.expiry_sweeper_service import ExpirySweeperService
+    
+    return ExpirySweeperService().sweep()
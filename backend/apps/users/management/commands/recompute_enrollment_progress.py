@@ -0,0 +1,57 @@
+"""
+Comando de Django para recalcular el progreso de las inscripciones de uno o varios cursos
+Recalcula contadores, porcentaje y estado de completitud por bloques, informando el avance
+"""
+
+from django.core.management.base import BaseCommand
+from apps.courses.models import Course
+from apps.users.models import Enrollment
+from infrastructure.services.enrollment_progress_service import EnrollmentProgressService
+
+
+class Command(BaseCommand):
+    help = 'Recalcula por bloques el progreso de las inscripciones de los cursos indicados (o de todos)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--course',
+            type=str,
+            action='append',
+            help='ID del curso a recalcular (se puede repetir; por defecto, todos los cursos con inscripciones)',
+        )
+        parser.add_argument(
+            '--async',
+            action='store_true',
+            dest='run_async',
+            help='Encolar una tarea por curso en lugar de recalcular en este proceso',
+        )
+
+    def handle(self, *args, **options):
+        course_ids = options.get('course') or list(
+            Enrollment.objects.order_by().values_list('course_id', flat=True).distinct()
+        )
+        service = EnrollmentProgressService()
+
+        if options['run_async']:
+            from apps.users.tasks import recompute_course_progress
+            for course_id in course_ids:
+                recompute_course_progress.delay(course_id)
+            self.stdout.write(self.style.SUCCESS(f'✅ {len(course_ids)} recálculos encolados'))
+            return
+
+        total_updated = 0
+        for index, course_id in enumerate(course_ids, start=1):
+            if not Course.objects.filter(pk=course_id).exists():
+                self.stdout.write(self.style.ERROR(f'❌ Curso {course_id} no encontrado'))
+                continue
+
+            self.stdout.write(self.style.WARNING(f'[{index}/{len(course_ids)}] Recalculando curso {course_id}...'))
+
+            def report(processed, total):
+                self.stdout.write(f'   {processed}/{total} inscripciones procesadas')
+
+            updated = service.recompute_course(course_id, on_progress=report)
+            total_updated += updated
+            self.stdout.write(f'   {updated} inscripciones actualizadas')
+
+        self.stdout.write(self.style.SUCCESS(f'✅ {total_updated} inscripciones actualizadas en {len(course_ids)} cursos'))
@@ -0,0 +1,25 @@
+"""
+Comando de Django para reconciliar los contadores de progreso de las inscripciones
+Recalcula completed_lessons / total_lessons desde LessonProgress y corrige desviaciones
+"""
+
+from django.core.management.base import BaseCommand
+from infrastructure.services.enrollment_progress_service import EnrollmentProgressService
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los contadores de progreso de las inscripciones y corrige desviaciones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--course',
+            type=str,
+            help='ID del curso a reconciliar (por defecto, todos)',
+        )
+
+    def handle(self, *args, **options):
+        course_id = options.get('course')
+
+        self.stdout.write(self.style.WARNING('Reconciliando contadores de progreso...'))
+        fixed = EnrollmentProgressService().reconcile(course_id=course_id)
+        self.stdout.write(self.style.SUCCESS(f'✅ {fixed} inscripciones corregidas'))
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:02
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_progress_counters(apps, schema_editor):
+    """
+    Inicializa los contadores de las inscripciones existentes en un solo UPDATE.
+    El porcentaje ya guardado se conserva (se recalcula con el próximo toggle
+    o con reconcile_enrollment_progress).
+    """
+    Enrollment = apps.get_model("users", "Enrollment")
+    LessonProgress = apps.get_model("users", "LessonProgress")
+    Lesson = apps.get_model("courses", "Lesson")
+
+    Enrollment.objects.update(
+        total_lessons=Coalesce(
+            Subquery(
+                Lesson.objects.filter(module__course_id=OuterRef("course_id"), is_active=True)
+                .order_by()
+                .values("module__course_id")
+                .annotate(total=Count("id"))
+                .values("total")[:1]
+            ),
+            0,
+        ),
+        completed_lessons=Coalesce(
+            Subquery(
+                LessonProgress.objects.filter(
+                    enrollment_id=OuterRef("pk"), is_completed=True, lesson__is_active=True
+                )
+                .order_by()
+                .values("enrollment_id")
+                .annotate(total=Count("id"))
+                .values("total")[:1]
+            ),
+            0,
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0002_add_lesson_progress"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="enrollment",
+            name="completed_lessons",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Lecciones completadas"
+            ),
+        ),
+        migrations.AddField(
+            model_name="enrollment",
+            name="total_lessons",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Lecciones activas del curso, actualizado al cambiar el contenido",
+                verbose_name="Total de lecciones",
+            ),
+        ),
+        migrations.RunPython(backfill_progress_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0003_enrollment_progress_counters"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="enrollment",
+            index=models.Index(
+                condition=models.Q(("status", "active")),
+                fields=["expires_at"],
+                name="enrollment_active_exp_idx",
+            ),
+        ),
+    ]
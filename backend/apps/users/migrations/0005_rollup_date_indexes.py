@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0004_enrollment_active_expiry_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="certificate",
+            index=models.Index(fields=["issued_at"], name="certificate_issued_at_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="enrollment",
+            index=models.Index(
+                fields=["enrolled_at"], name="enrollment_enrolled_at_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="enrollment",
+            index=models.Index(
+                condition=models.Q(("completed_at__isnull", False)),
+                fields=["completed_at"],
+                name="enrollment_completed_at_idx",
+            ),
+        ),
+    ]
@@ -53,6 +53,14 @@ class Enrollment(models.Model):
         verbose_name="Porcentaje de completitud"
     )
     
+    # Contadores desnormalizados de progreso (ver EnrollmentProgressService)
+    completed_lessons = models.PositiveIntegerField(default=0, verbose_name="Lecciones completadas")
+    total_lessons = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Total de lecciones",
+        help_text="Lecciones activas del curso, actualizado al cambiar el contenido"
+    )
+    
     # Fechas
     enrolled_at = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de inscripción")
     completed_at = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de finalización")
@@ -83,6 +91,19 @@ class Enrollment(models.Model):
             models.Index(fields=['user', 'status']),
             models.Index(fields=['course', 'status']),
             models.Index(fields=['status', 'completed']),
+            # Barrido de inscripciones vencidas (ExpirySweeperService)
+            models.Index(
+                fields=['expires_at'],
+                condition=models.Q(status='active'),
+                name='enrollment_active_exp_idx'
+            ),
+            # Rollups diarios por rango de fechas (MetricsRollupService)
+            models.Index(fields=['enrolled_at'], name='enrollment_enrolled_at_idx'),
+            models.Index(
+                fields=['completed_at'],
+                condition=models.Q(completed_at__isnull=False),
+                name='enrollment_completed_at_idx'
+            ),
         ]
     
     def __str__(self):
@@ -120,6 +141,7 @@ class Certificate(models.Model):
             models.Index(fields=['user']),
             models.Index(fields=['course']),
             models.Index(fields=['verification_code']),
+            models.Index(fields=['issued_at'], name='certificate_issued_at_idx'),
         ]
     
     def __str__(self):
@@ -140,6 +140,56 @@ def can_view_course(user, course):
     return False
 
 
+def visible_courses_for(user, queryset=None):
+    """
+    Policy (queryset): Restringe un queryset de cursos a los que el usuario puede ver.
+
+    Expresa las mismas reglas que can_view_course como un único filtro SQL,
+    evitando evaluar la policy curso por curso en Python.
+
+    Reglas:
+    - Admin e instructores pueden ver todos los cursos
+    - Estudiantes pueden ver cursos publicados o cursos en los que están inscritos
+    - Invitados solo pueden ver cursos publicados
+
+    Args:
+        user: Usuario de Django
+        queryset: QuerySet de Course a filtrar (por defecto, todos los cursos)
+
+    Returns:
+        QuerySet: Cursos visibles para el usuario
+    """
+    from django.db.models import Exists, OuterRef, Q
+    from apps.courses.models import Course
+
+    if queryset is None:
+        queryset = Course.objects.all()
+
+    published = Q(status='published', is_active=True)
+
+    if not user or not user.is_authenticated:
+        # Invitados solo pueden ver cursos publicados
+        return queryset.filter(published)
+
+    user_role = get_user_role(user)
+
+    # Admin e instructores pueden ver todo
+    if user_role in [ROLE_ADMIN, ROLE_INSTRUCTOR]:
+        return queryset
+
+    # Estudiantes: publicados o con enrollment activo (EXISTS evita filas duplicadas por el JOIN)
+    if user_role == ROLE_STUDENT:
+        from apps.users.models import Enrollment
+        active_enrollment = Enrollment.objects.filter(
+            user=user,
+            course=OuterRef('pk'),
+            status='active'
+        )
+        return queryset.filter(published | Q(Exists(active_enrollment)))
+
+    return queryset.none()
+
+
 def can_create_course(user):
     """
     Verifica si el usuario puede crear cursos
@@ -3,13 +3,25 @@ Signals para gestión automática de roles y grupos - FagSol Escuela Virtual
 
 Este módulo maneja la asignación automática de usuarios a grupos de Django
 cuando se crea o actualiza un UserProfile.
+
+También inicializa los contadores de progreso de las nuevas inscripciones y
+recalcula las estadísticas por curso (CourseStats) cuando una inscripción o
+un pago cambian con save() / delete() (los flujos en bloque aplican sus
+propios deltas con CourseStatsService). Los cambios de inscripciones y
+certificados invalidan la caché de estadísticas del estudiante.
+
+Los pagos que cambian de estado y las inscripciones o certificados
+eliminados recalculan los rollups diarios de métricas de su día
+(MetricsRollupService.schedule_days).
 """
 
 import logging
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User, Group
 from apps.core.models import UserProfile
+from apps.payments.models import Payment
+from apps.users.models import Certificate, Enrollment
 from apps.users.permissions import (
     GROUP_ADMIN, GROUP_INSTRUCTOR, GROUP_STUDENT, GROUP_GUEST,
     ROLE_ADMIN, ROLE_INSTRUCTOR, ROLE_STUDENT, ROLE_GUEST
@@ -64,6 +76,119 @@ def assign_user_to_group_on_profile_save(sender, instance, created, **kwargs):
             )
 
 
+@receiver(pre_save, sender=Enrollment)
+def initialize_enrollment_total_lessons(sender, instance, raw=False, **kwargs):
+    """
+    Signal: Inicializa total_lessons al crear una inscripción.
+    Luego se mantiene con EnrollmentProgressService al cambiar las lecciones del curso.
+    """
+    if raw or not instance._state.adding or instance.total_lessons:
+        return
+    
+    from infrastructure.services.enrollment_progress_service import EnrollmentProgressService
+    instance.total_lessons = EnrollmentProgressService.count_active_lessons(instance.course_id)
+
+
+@receiver(post_save, sender=Enrollment)
+def refresh_course_stats_on_enrollment_save(sender, instance, raw=False, **kwargs):
+    """
+    Signal: Recalcula las estadísticas del curso al guardar una inscripción
+    con save() (administración, altas individuales).
+    """
+    if raw:
+        return
+    
+    from infrastructure.services.course_stats_service import CourseStatsService
+    from infrastructure.services.student_stats_cache_service import StudentStatsCacheService
+    CourseStatsService().refresh([instance.course_id])
+    StudentStatsCacheService().invalidate([instance.user_id])
+
+
+@receiver(post_delete, sender=Enrollment)
+def refresh_course_stats_on_enrollment_delete(sender, instance, **kwargs):
+    """
+    Signal: Recalcula las estadísticas del curso al eliminar una inscripción
+    (y de los otros cursos del mismo pago, que se reparten su ingreso).
+    Solo actualiza filas existentes: el curso puede estar eliminándose en cascada.
+    """
+    course_ids = [instance.course_id]
+    if instance.payment_id:
+        course_ids += Enrollment.objects.filter(payment_id=instance.payment_id).values_list('course_id', flat=True)
+    
+    from infrastructure.services.course_stats_service import CourseStatsService
+    from infrastructure.services.metrics_rollup_service import MetricsRollupService
+    from infrastructure.services.student_stats_cache_service import StudentStatsCacheService
+    CourseStatsService().refresh(course_ids, create_missing=False)
+    StudentStatsCacheService().invalidate([instance.user_id])
+    MetricsRollupService().schedule_days([instance.enrolled_at, instance.completed_at])
+
+
+@receiver(pre_save, sender=Payment)
+def remember_payment_status(sender, instance, raw=False, **kwargs):
+    """
+    Signal: Guarda el estado previo del pago para detectar en post_save si cambió.
+    """
+    if raw or instance._state.adding:
+        return
+    
+    instance._previous_status = Payment.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+
+
+@receiver(post_save, sender=Payment)
+def refresh_course_stats_on_payment_save(sender, instance, created, raw=False, **kwargs):
+    """
+    Signal: Recalcula los ingresos de los cursos de un pago cuando cambia su
+    estado (ej: reembolso). Al aprobarse todavía no tiene inscripciones: las
+    crea EnrollmentService, que suma el ingreso en la misma transacción.
+    """
+    if raw or created:
+        return
+    
+    course_ids = list(Enrollment.objects.filter(payment=instance).values_list('course_id', flat=True))
+    if course_ids:
+        from infrastructure.services.course_stats_service import CourseStatsService
+        CourseStatsService().refresh(course_ids)
+
+
+@receiver(post_save, sender=Payment)
+def rollup_metrics_on_payment_status_change(sender, instance, created, raw=False, **kwargs):
+    """
+    Signal: Recalcula los ingresos diarios del día del pago cuando entra o
+    sale del estado aprobado (ej: reembolso o cancelación de un pago antiguo).
+    """
+    if raw:
+        return
+    
+    previous_status = None if created else getattr(instance, '_previous_status', None)
+    if previous_status == instance.status or 'approved' not in (previous_status, instance.status):
+        return
+    
+    from infrastructure.services.metrics_rollup_service import MetricsRollupService
+    MetricsRollupService().schedule_days([instance.created_at])
+
+
+@receiver(post_save, sender=Certificate)
+@receiver(post_delete, sender=Certificate)
+def invalidate_student_stats_on_certificate_change(sender, instance, raw=False, **kwargs):
+    """
+    Signal: Invalida la caché de estadísticas del estudiante al emitir o eliminar un certificado.
+    """
+    if raw:
+        return
+    
+    from infrastructure.services.student_stats_cache_service import StudentStatsCacheService
+    StudentStatsCacheService().invalidate([instance.user_id])
+
+
+@receiver(post_delete, sender=Certificate)
+def rollup_metrics_on_certificate_delete(sender, instance, **kwargs):
+    """
+    Signal: Recalcula la actividad diaria del día de emisión de un certificado eliminado.
+    """
+    from infrastructure.services.metrics_rollup_service import MetricsRollupService
+    MetricsRollupService().schedule_days([instance.issued_at])
+
+
 def ensure_groups_exist():
     """
     Asegura que los grupos de roles existan en la base de datos.
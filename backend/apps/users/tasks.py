@@ -0,0 +1,30 @@
+"""
+Tareas asíncronas de Usuarios - FagSol Escuela Virtual
+"""
+
+import logging
+from celery import shared_task
+
+logger = logging.getLogger('apps')
+
+
+@shared_task(ignore_result=True)
+def flush_watch_time_buffer():
+    """
+    Tarea periódica: vuelca a LessonProgress el tiempo visto acumulado en la
+    caché por el reproductor (buffer write-behind).
+    """
+    from infrastructure.services.watch_time_buffer_service import WatchTimeBufferService
+    
+    return WatchTimeBufferService().flush()
+
+
+@shared_task(ignore_result=True)
+def recompute_course_progress(course_id):
+    """
+    Tarea: recalcula por bloques el progreso de todas las inscripciones de un
+    curso tras un cambio en sus lecciones.
+    """
+    from infrastructure.services.enrollment_progress_service import EnrollmentProgressService
+    
+    return EnrollmentProgressService().recompute_course(course_id)
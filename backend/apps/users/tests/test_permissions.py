@@ -8,7 +8,7 @@ from apps.core.models import UserProfile
 from apps.users.permissions import (
     get_user_role, has_role, has_any_role,
     is_admin, is_instructor, is_student, is_guest,
-    can_view_course, can_edit_course, can_access_course_content,
+    can_view_course, visible_courses_for, can_edit_course, can_access_course_content,
     can_view_enrollment, can_view_certificate, can_process_payment,
     can_create_course,
     ROLE_ADMIN, ROLE_INSTRUCTOR, ROLE_STUDENT, ROLE_GUEST
@@ -138,7 +138,54 @@ class PermissionsTestCase(TestCase):
         self.course.status = 'draft'
         self.course.save()
         self.assertFalse(can_view_course(self.student_user, self.course))
-    
+
+    def test_visible_courses_for_matches_can_view_course(self):
+        """Test: visible_courses_for aplica las mismas reglas que can_view_course"""
+        draft_course = Course.objects.create(
+            id='test-course-draft',
+            title='Curso Borrador',
+            slug='curso-borrador',
+            description='Descripción',
+            price=50.00,
+            status='draft',
+            is_active=True
+        )
+        enrolled_draft = Course.objects.create(
+            id='test-course-enrolled',
+            title='Curso Inscrito',
+            slug='curso-inscrito',
+            description='Descripción',
+            price=50.00,
+            status='draft',
+            is_active=True
+        )
+        Enrollment.objects.create(user=self.student_user, course=enrolled_draft, status='active')
+
+        for user in [self.admin_user, self.instructor_user, self.student_user, self.guest_user]:
+            visible_ids = set(visible_courses_for(user).values_list('id', flat=True))
+            expected_ids = {
+                course.id for course in Course.objects.all()
+                if can_view_course(user, course)
+            }
+            self.assertEqual(visible_ids, expected_ids)
+
+        student_ids = set(visible_courses_for(self.student_user).values_list('id', flat=True))
+        self.assertEqual(student_ids, {self.course.id, enrolled_draft.id})
+        self.assertNotIn(draft_course.id, student_ids)
+
+    def test_visible_courses_for_no_duplicates(self):
+        """Test: Cursos publicados con varias inscripciones no se duplican"""
+        other_student = User.objects.create_user(
+            username='other@test.com',
+            email='other@test.com',
+            password='testpass123'
+        )
+        UserProfile.objects.create(user=other_student, role=ROLE_STUDENT)
+        Enrollment.objects.create(user=self.student_user, course=self.course, status='active')
+        Enrollment.objects.create(user=other_student, course=self.course, status='active')
+
+        self.assertEqual(visible_courses_for(self.student_user).count(), 1)
+
     def test_can_edit_course_admin(self):
         """Test: Admin puede editar cualquier curso"""
         self.assertTrue(can_edit_course(self.admin_user, self.course))
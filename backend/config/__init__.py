@@ -1,2 +1,6 @@
 # Config package
 
+# Cargar la app de Celery al iniciar Django para que @shared_task la use
+from .celery import app as celery_app
+
+__all__ = ('celery_app',)
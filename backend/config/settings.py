@@ -3,8 +3,10 @@ Django settings for FagSol Escuela Virtual project.
 """
 
 import os
+import sys
 from pathlib import Path
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -38,6 +40,7 @@ INSTALLED_APPS = [
     'corsheaders',
     'axes',  # Rate limiting y lockouts
     'drf_yasg',  # OpenAPI/Swagger
+    'django_celery_beat',  # Programación de tareas periódicas en la base de datos
     
     # Django Apps (Models & Admin)
     'apps.core',
@@ -407,6 +410,13 @@ MERCADOPAGO_ACCESS_TOKEN = config('MERCADOPAGO_ACCESS_TOKEN', default='')
 MERCADOPAGO_WEBHOOK_SECRET = config('MERCADOPAGO_WEBHOOK_SECRET', default='')
 MERCADOPAGO_PUBLIC_KEY = config('NEXT_PUBLIC_MERCADOPAGO_PUBLIC_KEY', default='')
 
+# Cliente HTTP (infrastructure/services/mercadopago_client.py)
+MERCADOPAGO_API_URL = config('MERCADOPAGO_API_URL', default='https://api.mercadopago.com')
+MERCADOPAGO_POOL_SIZE = config('MERCADOPAGO_POOL_SIZE', default=10, cast=int)
+# Circuit breaker: fallos seguidos que abren el circuito y segundos que permanece abierto
+MERCADOPAGO_BREAKER_THRESHOLD = config('MERCADOPAGO_BREAKER_THRESHOLD', default=5, cast=int)
+MERCADOPAGO_BREAKER_COOLDOWN = config('MERCADOPAGO_BREAKER_COOLDOWN', default=30, cast=int)
+
 # ==================================
 # CURRENCY & GEOIP CONFIGURATION
 # ==================================
@@ -422,6 +432,108 @@ GEOIP_SERVICE_API_KEY = config('GEOIP_SERVICE_API_KEY', default='')  # Opcional
 # Tasa de cambio USD -> PEN por defecto (fallback si API falla)
 DEFAULT_USD_TO_PEN_RATE = config('DEFAULT_USD_TO_PEN_RATE', default='3.75', cast=float)
 
+# Frecuencia de refresco de tasas y recálculo de precios por moneda (segundos)
+EXCHANGE_RATE_REFRESH_SECONDS = config('EXCHANGE_RATE_REFRESH_SECONDS', default=3600, cast=int)
+
+# ==================================
+# CACHE CONFIGURATION
+# ==================================
+
+# Con CACHE_URL (ej: redis://localhost:6379/1) la caché se comparte entre procesos.
+# Es obligatoria en producción: las versiones del catálogo y de las estadísticas por
+# usuario, el buffer de tiempo visto y las marcas de recálculo pendiente se escriben
+# en un proceso (worker de gunicorn o de Celery) y se leen en otros; con LocMemCache
+# cada proceso seguiría sirviendo datos viejos hasta que expiren.
+# Si no se define se usa REDIS_URL (el mismo Redis que ya levanta docker-compose)
+CACHE_URL = config('CACHE_URL', default=config('REDIS_URL', default=''))
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+else:
+    if not DEBUG:
+        raise ImproperlyConfigured(
+            'CACHE_URL (o REDIS_URL) es obligatorio con DEBUG=False: la caché debe compartirse entre procesos'
+        )
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# El tiempo visto se acumula en la caché solo si es compartida: con LocMemCache cada
+# proceso tiene la suya y el worker de Celery volcaría un buffer vacío, así que se
+# escribe directo en la base de datos
+WATCH_TIME_BUFFER_ENABLED = config('WATCH_TIME_BUFFER_ENABLED', default=bool(CACHE_URL), cast=bool)
+
+# Frecuencia con la que se vuelca a la base de datos el tiempo visto acumulado (segundos)
+WATCH_TIME_FLUSH_SECONDS = config('WATCH_TIME_FLUSH_SECONDS', default=60, cast=int)
+
+# Intervalo del barrido de payment intents e inscripciones vencidas (segundos)
+EXPIRY_SWEEP_SECONDS = config('EXPIRY_SWEEP_SECONDS', default=300, cast=int)
+
+# Rollups diarios de métricas: intervalo de recálculo (segundos) y días recalculados en cada pasada
+METRICS_ROLLUP_SECONDS = config('METRICS_ROLLUP_SECONDS', default=300, cast=int)
+METRICS_ROLLUP_LOOKBACK_DAYS = config('METRICS_ROLLUP_LOOKBACK_DAYS', default=3, cast=int)
+
+# Estadísticas públicas (stale-while-revalidate): segundos que se consideran frescas
+# y segundos que permanecen en la caché sirviéndose mientras se recalculan
+PUBLIC_STATS_CACHE_SECONDS = config('PUBLIC_STATS_CACHE_SECONDS', default=300, cast=int)
+PUBLIC_STATS_CACHE_MAX_AGE = config('PUBLIC_STATS_CACHE_MAX_AGE', default=60 * 60 * 24, cast=int)
+
+# Caché por usuario de las estadísticas del dashboard de estudiante (segundos);
+# se invalida con cada cambio de inscripciones, progreso o certificados
+STUDENT_STATS_CACHE_SECONDS = config('STUDENT_STATS_CACHE_SECONDS', default=600, cast=int)
+
+# Hilos (una conexión cada uno) para las secciones de las estadísticas de admin en PostgreSQL
+ADMIN_STATS_PARALLELISM = config('ADMIN_STATS_PARALLELISM', default=4, cast=int)
+
+# ==================================
+# CELERY CONFIGURATION
+# ==================================
+
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://localhost:6379/0')
+CELERY_RESULT_BACKEND = config('CELERY_RESULT_BACKEND', default='redis://localhost:6379/0')
+CELERY_TASK_SERIALIZER = 'json'
+CELERY_RESULT_SERIALIZER = 'json'
+CELERY_ACCEPT_CONTENT = ['json']
+CELERY_TIMEZONE = TIME_ZONE
+# En desarrollo sin worker se puede ejecutar las tareas en el mismo proceso;
+# los tests (manage.py test) siempre las ejecutan así
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+CELERY_TASK_ALWAYS_EAGER = config('CELERY_TASK_ALWAYS_EAGER', default=TESTING, cast=bool)
+CELERY_TASK_EAGER_PROPAGATES = True
+
+# Tareas periódicas (celery beat)
+CELERY_BEAT_SCHEDULE = {
+    'refresh-exchange-rates': {
+        'task': 'apps.courses.tasks.refresh_exchange_rates',
+        'schedule': EXCHANGE_RATE_REFRESH_SECONDS,
+    },
+    'flush-watch-time-buffer': {
+        'task': 'apps.users.tasks.flush_watch_time_buffer',
+        'schedule': WATCH_TIME_FLUSH_SECONDS,
+    },
+    'requeue-pending-payment-webhooks': {
+        'task': 'apps.payments.tasks.requeue_pending_payment_webhooks',
+        'schedule': 60 * 5,
+    },
+    'expire-stale-records': {
+        'task': 'apps.payments.tasks.expire_stale_records',
+        'schedule': EXPIRY_SWEEP_SECONDS,
+    },
+    'refresh-metrics-rollup': {
+        'task': 'apps.core.tasks.refresh_metrics_rollup',
+        'schedule': METRICS_ROLLUP_SECONDS,
+    },
+}
+# django-celery-beat: las entradas anteriores se sincronizan con la base de datos
+# al iniciar beat y se pueden ajustar desde el admin (Periodic tasks)
+CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
+
 # PASSWORD RESET CONFIGURATION
 
 # Tiempo de expiración del token de reset (en horas)
@@ -2,11 +2,11 @@
 Implementaciones específicas de servicios externos - FagSol Escuela Virtual
 """
 
-import requests
 from decimal import Decimal
 from typing import Dict, Any
 from django.conf import settings
 from django.utils import timezone
+from infrastructure.services.mercadopago_client import MercadoPagoClient
 from ..adapters import PaymentGateway, EmailService, NotificationService, FileStorageService
 
 
@@ -17,19 +17,13 @@ class MercadoPagoPaymentGateway(PaymentGateway):
     
     def __init__(self):
         self.access_token = getattr(settings, 'MERCADOPAGO_ACCESS_TOKEN', '')
-        self.base_url = 'https://api.mercadopago.com'
-        self.headers = {
-            'Authorization': f'Bearer {self.access_token}',
-            'Content-Type': 'application/json'
-        }
+        self.client = MercadoPagoClient(self.access_token)
 
     def create_payment_preference(self, amount: Decimal, currency: str, description: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """
         Crea una preferencia de pago en MercadoPago
         """
         try:
-            url = f"{self.base_url}/checkout/preferences"
-            
             preference_data = {
                 "items": [
                     {
@@ -48,12 +42,13 @@ class MercadoPagoPaymentGateway(PaymentGateway):
                 }
             }
             
-            response = requests.post(url, json=preference_data, headers=self.headers)
-            response.raise_for_status()
+            result = self.client.create_preference(preference_data)
+            if result['status'] >= 400:
+                raise Exception(f"Mercado Pago respondió {result['status']}: {result['response']}")
             
-            return response.json()
+            return result['response']
             
-        except requests.RequestException as e:
+        except Exception as e:
             raise Exception(f"Error al crear preferencia de pago: {str(e)}")
 
     def get_payment_status(self, payment_id: str) -> Dict[str, Any]:
@@ -61,14 +56,13 @@ class MercadoPagoPaymentGateway(PaymentGateway):
         Obtiene el estado de un pago en MercadoPago
         """
         try:
-            url = f"{self.base_url}/v1/payments/{payment_id}"
+            result = self.client.get_payment(payment_id)
+            if result['status'] >= 400:
+                raise Exception(f"Mercado Pago respondió {result['status']}: {result['response']}")
             
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
+            return result['response']
             
-            return response.json()
-            
-        except requests.RequestException as e:
+        except Exception as e:
             raise Exception(f"Error al obtener estado del pago: {str(e)}")
 
     def process_webhook(self, webhook_data: Dict[str, Any]) -> bool:
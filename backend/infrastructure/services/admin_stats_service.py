@@ -0,0 +1,159 @@
+"""
+Servicio de Estadísticas de Administrador - FagSol Escuela Virtual
+
+Estadísticas generales del dashboard de administrador:
+
+- Una consulta agrupada por tabla con agregados condicionales
+  (Count/Sum con filter=Q(...)) en lugar de un COUNT por contador.
+- Ingresos, certificados y cursos populares se leen de los rollups diarios
+  (MetricsRollupService): el costo depende de los días, no de las filas.
+- En PostgreSQL, fuera de una transacción, las secciones se consultan en
+  paralelo (una conexión por hilo, ADMIN_STATS_PARALLELISM). Dentro de una
+  transacción o en SQLite se consultan en secuencia: otra conexión no vería
+  los datos no confirmados.
+- Se mide el tiempo de cada sección (timings) para el header Server-Timing
+  y el log.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Count, Q
+
+from apps.courses.models import Course
+from apps.users.models import Enrollment
+from infrastructure.services.metrics_rollup_service import MetricsRollupService
+
+logger = logging.getLogger('apps')
+
+
+class AdminStatsService:
+    """
+    Servicio de estadísticas generales del sistema para administradores
+    """
+
+    POPULAR_COURSES_LIMIT = 5
+
+    def __init__(self, parallelism: Optional[int] = None):
+        self.parallelism = parallelism or getattr(settings, 'ADMIN_STATS_PARALLELISM', 4)
+
+    def sections(self) -> Dict[str, Callable[[], object]]:
+        """Secciones del dashboard: nombre -> función que ejecuta su consulta"""
+        return {
+            'courses': self.course_counts,
+            'users': self.user_counts,
+            'enrollments': self.enrollment_counts,
+            'payments': self.payment_totals,
+            'certificates': self.certificate_counts,
+            'popular_courses': self.popular_courses,
+            'revenue_by_month': self.revenue_by_month,
+        }
+
+    def get_stats(self) -> Tuple[Dict, Dict[str, float]]:
+        """
+        Calcula todas las secciones.
+
+        Returns:
+            Tuple[estadísticas por sección, milisegundos por sección (incluye 'total')]
+        """
+        started = time.monotonic()
+        sections = self.sections()
+
+        if self.can_run_concurrently():
+            with ThreadPoolExecutor(max_workers=min(self.parallelism, len(sections))) as executor:
+                futures = {name: executor.submit(self._timed_in_thread, query) for name, query in sections.items()}
+                results = {name: future.result() for name, future in futures.items()}
+        else:
+            results = {name: self._timed(query) for name, query in sections.items()}
+
+        stats = {name: value for name, (value, _) in results.items()}
+        timings = {name: elapsed for name, (_, elapsed) in results.items()}
+        timings['total'] = (time.monotonic() - started) * 1000
+
+        # Métricas en formato clave=valor para el agregador de logs
+        logger.info('admin_stats ' + ' '.join(f'{name}_ms={elapsed:.1f}' for name, elapsed in timings.items()))
+        return stats, timings
+
+    def can_run_concurrently(self) -> bool:
+        return (
+            self.parallelism > 1
+            and connection.vendor == 'postgresql'
+            and not connection.in_atomic_block
+        )
+
+    @staticmethod
+    def _timed(query: Callable[[], object]) -> Tuple[object, float]:
+        started = time.monotonic()
+        value = query()
+        return value, (time.monotonic() - started) * 1000
+
+    def _timed_in_thread(self, query: Callable[[], object]) -> Tuple[object, float]:
+        try:
+            return self._timed(query)
+        finally:
+            # Cada hilo abre su propia conexión: se cierra al terminar
+            connection.close()
+
+    # ------------------------------------------------------------------
+    # Secciones (una consulta cada una)
+    # ------------------------------------------------------------------
+
+    def course_counts(self) -> Dict[str, int]:
+        # Total y borradores: solo cursos activos, excluyendo archivados (consistente con admin)
+        active = Q(is_active=True) & ~Q(status='archived')
+        return Course.objects.aggregate(
+            total=Count('pk', filter=active),
+            published=Count('pk', filter=Q(status='published', is_active=True)),
+            draft=Count('pk', filter=active & Q(status='draft')),
+            archived=Count('pk', filter=Q(status='archived')),
+        )
+
+    def user_counts(self) -> Dict[str, int]:
+        return User.objects.aggregate(
+            total=Count('pk', filter=Q(is_active=True)),
+            students=Count('profile', filter=Q(profile__role='student')),
+            instructors=Count('profile', filter=Q(profile__role='instructor')),
+            admins=Count('profile', filter=Q(profile__role='admin')),
+        )
+
+    def enrollment_counts(self) -> Dict[str, int]:
+        return Enrollment.objects.aggregate(
+            total=Count('pk'),
+            active=Count('pk', filter=Q(status='active')),
+            completed=Count('pk', filter=Q(status='completed')),
+        )
+
+    def payment_totals(self) -> Dict[str, float]:
+        return MetricsRollupService.revenue_totals(last_days=30)
+
+    def certificate_counts(self) -> Dict[str, int]:
+        return {'total': MetricsRollupService.activity_totals()['certificates']}
+
+    def popular_courses(self) -> List[Dict]:
+        # Solo cursos publicados y activos (los borradores no deberían aparecer en "más populares")
+        return [
+            {
+                'id': course['course_id'],
+                'title': course['course__title'],
+                'enrollments': course['enrollments'],
+                'status': course['course__status'],
+            }
+            for course in MetricsRollupService.popular_courses(
+                Course.objects.filter(status='published', is_active=True),
+                limit=self.POPULAR_COURSES_LIMIT
+            )
+        ]
+
+    def revenue_by_month(self) -> List[Dict]:
+        """Ingresos aprobados por mes (últimos 6 meses)"""
+        return MetricsRollupService.revenue_by_month(days=180)
+
+    @staticmethod
+    def server_timing(timings: Dict[str, float]) -> str:
+        """Valor del header Server-Timing (ej: 'courses;dur=1.2, users;dur=0.8')"""
+        return ', '.join(f'{name};dur={elapsed:.1f}' for name, elapsed in timings.items())
@@ -0,0 +1,91 @@
+"""
+Servicio de Caché del Catálogo - FagSol Escuela Virtual
+
+Caché de respuestas para los endpoints públicos del catálogo (listado y
+detalle de cursos). Las claves incluyen un contador de versión del catálogo
+que se incrementa en cada cambio de Course, Module, Lesson o Material, y
+del nombre, email o rol (User / UserProfile) de quien creó cursos (ver
+apps/courses/signals.py), por lo que la invalidación es exacta: las
+entradas de una versión anterior simplemente dejan de leerse y expiran solas.
+
+Solo se guardan datos compartidos por todos los usuarios. Los datos propios
+de cada usuario (is_enrolled, is_creator) se calculan aparte y se superponen
+sobre el payload cacheado.
+
+Requiere una caché compartida (CACHE_URL): el contador de versión se
+incrementa en el proceso que hizo el cambio (un worker de gunicorn o la
+tarea refresh_exchange_rates de Celery) y lo leen todos los demás.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Optional
+
+from django.core.cache import cache
+
+logger = logging.getLogger('apps')
+
+
+class CatalogCacheService:
+    """
+    Servicio de caché versionada para el catálogo de cursos
+    """
+
+    VERSION_KEY = 'catalog:version'
+    KEY_PREFIX = 'catalog'
+
+    # TTL de seguridad: la invalidación real la hace el contador de versión
+    DEFAULT_TIMEOUT = 60 * 60
+
+    def get_version(self, version_key: Optional[str] = None) -> int:
+        """
+        Obtiene la versión actual del catálogo (o de otro contador, ej: por curso).
+
+        Si la clave no existe (primer uso o expulsada de la caché) se inicializa
+        con un timestamp, de forma que nunca se reutilicen versiones anteriores.
+        """
+        version_key = version_key or self.VERSION_KEY
+        version = cache.get(version_key)
+        if version is None:
+            cache.add(version_key, int(time.time() * 1000), timeout=None)
+            version = cache.get(version_key)
+        return version
+
+    def bump_version(self, version_key: Optional[str] = None) -> None:
+        """Invalida todas las respuestas cacheadas asociadas al contador"""
+        version_key = version_key or self.VERSION_KEY
+        try:
+            cache.incr(version_key)
+        except ValueError:
+            # La clave no existe: inicializarla ya equivale a una versión nueva
+            self.get_version(version_key)
+        except Exception as e:
+            logger.warning(f"No se pudo invalidar la caché del catálogo: {str(e)}")
+
+    def build_key(self, scope: str, params: Optional[dict] = None) -> str:
+        """
+        Construye la clave de caché para un endpoint y sus parámetros.
+
+        Args:
+            scope: Nombre del endpoint (ej: 'list', 'slug', 'detail')
+            params: Parámetros que determinan la respuesta
+        """
+        digest = hashlib.md5(
+            json.dumps(params or {}, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+        return f'{self.KEY_PREFIX}:v{self.get_version()}:{scope}:{digest}'
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            return cache.get(key)
+        except Exception as e:
+            logger.warning(f"Error leyendo caché del catálogo: {str(e)}")
+            return None
+
+    def set(self, key: str, value: Any, timeout: Optional[int] = None) -> None:
+        try:
+            cache.set(key, value, timeout or self.DEFAULT_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Error guardando caché del catálogo: {str(e)}")
@@ -0,0 +1,150 @@
+"""
+Servicio de Snapshots de Contenido - FagSol Escuela Virtual
+
+Materializa el árbol módulos → lecciones → materiales de un curso, tal como lo
+devuelve GET /api/v1/courses/{id}/content/, y lo guarda en caché por curso.
+
+- El árbol se construye con un número fijo de consultas (prefetch de lecciones
+  y select_related de módulo/lección en materiales), sin importar cuántos
+  módulos tenga el curso.
+- Cada curso tiene su propio contador de versión, que se incrementa cuando
+  cambian el curso, sus módulos, lecciones o materiales (apps/courses/signals.py).
+  Un snapshot construido mientras el contenido cambia queda guardado bajo la
+  versión anterior y nunca se lee.
+- El snapshot incluye los validadores de GET condicional (ETag / Last-Modified).
+
+Los datos propios del usuario (enrollment) no forman parte del snapshot.
+"""
+
+import logging
+from typing import Dict
+
+from django.db.models import Prefetch
+
+from apps.courses.models import Course, Lesson
+from infrastructure.services.catalog_cache_service import CatalogCacheService
+from infrastructure.utils.conditional_get import course_tree_validators
+
+logger = logging.getLogger('apps')
+
+
+class CourseContentSnapshotService:
+    """
+    Servicio de snapshots del árbol de contenido de un curso
+    """
+
+    KEY_PREFIX = 'course_content'
+
+    # Sin actividad el snapshot expira solo; mientras tanto lo invalida el contador de versión
+    DEFAULT_TIMEOUT = 60 * 60 * 24
+
+    def __init__(self):
+        self.cache_service = CatalogCacheService()
+
+    def _version_key(self, course_id: str) -> str:
+        return f'{self.KEY_PREFIX}:version:{course_id}'
+
+    def _snapshot_key(self, course_id: str) -> str:
+        version = self.cache_service.get_version(self._version_key(course_id))
+        return f'{self.KEY_PREFIX}:v{version}:{course_id}'
+
+    def get_snapshot(self, course: Course) -> Dict:
+        """
+        Obtiene el snapshot del contenido de un curso (lo construye si no existe).
+
+        Returns:
+            dict: {'tree': {course, modules, materials}, 'last_modified', 'signature'}
+        """
+        # La clave (con la versión) se obtiene antes de construir el árbol: si el
+        # contenido cambia mientras tanto, el snapshot queda bajo una versión vieja
+        key = self._snapshot_key(course.id)
+        snapshot = self.cache_service.get(key)
+        if snapshot is None:
+            snapshot = self.build_snapshot(course)
+            self.cache_service.set(key, snapshot, timeout=self.DEFAULT_TIMEOUT)
+        return snapshot
+
+    def invalidate(self, course_id: str) -> None:
+        """Descarta el snapshot de un curso (se regenera en la siguiente lectura)"""
+        self.cache_service.bump_version(self._version_key(course_id))
+
+    def build_snapshot(self, course: Course) -> Dict:
+        """
+        Construye el árbol de contenido de un curso en 4 consultas:
+        validadores, módulos, lecciones (prefetch) y materiales.
+        """
+        last_modified, signature = course_tree_validators(course.id)
+
+        module_queryset = course.modules.filter(is_active=True).order_by('order').prefetch_related(
+            Prefetch(
+                'lessons',
+                queryset=Lesson.objects.filter(is_active=True).order_by('order'),
+                to_attr='active_lessons'
+            )
+        )
+
+        modules = []
+        for module in module_queryset:
+            lessons = []
+            for lesson in module.active_lessons:
+                lesson_data = {
+                    'id': lesson.id,
+                    'title': lesson.title,
+                    'description': lesson.description,
+                    'lesson_type': lesson.lesson_type,
+                    'duration_minutes': lesson.duration_minutes,
+                    'order': lesson.order
+                }
+
+                # Incluir URL de contenido solo si está disponible
+                if lesson.content_url:
+                    lesson_data['content_url'] = lesson.content_url
+                if lesson.content_text:
+                    lesson_data['content_text'] = lesson.content_text
+
+                lessons.append(lesson_data)
+
+            modules.append({
+                'id': module.id,
+                'title': module.title,
+                'description': module.description,
+                'lessons': lessons,
+                'order': module.order
+            })
+
+        # Materiales activos con su módulo/lección en el mismo JOIN
+        materials = []
+        for material in course.materials.filter(is_active=True).select_related('module', 'lesson').order_by('order'):
+            material_data = {
+                'id': material.id,
+                'title': material.title,
+                'description': material.description,
+                'material_type': material.material_type,
+                'url': material.url,
+                'order': material.order,
+            }
+
+            # Incluir información de asociación si existe
+            if material.module:
+                material_data['module_id'] = material.module.id
+                material_data['module_title'] = material.module.title
+            if material.lesson:
+                material_data['lesson_id'] = material.lesson.id
+                material_data['lesson_title'] = material.lesson.title
+
+            materials.append(material_data)
+
+        return {
+            'tree': {
+                'course': {
+                    'id': course.id,
+                    'title': course.title,
+                    'description': course.description,
+                    'slug': course.slug,
+                },
+                'modules': modules,
+                'materials': materials,
+            },
+            'last_modified': last_modified,
+            'signature': signature,
+        }
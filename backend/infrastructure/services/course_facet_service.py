@@ -0,0 +1,301 @@
+"""
+Servicio de Facetas del Catálogo - FagSol Escuela Virtual
+
+Filtros del catálogo (categoría, nivel, tags, precio, horas, calificación) y
+conteos por faceta para los filtros laterales.
+
+Todos los conteos salen de una sola consulta: un UNION ALL de un GROUP BY por
+faceta (valor, rango o tag) sobre los cursos que cumplen los demás filtros.
+Cada faceta se cuenta aplicando los demás filtros pero no el suyo (faceta
+disyuntiva), de modo que el usuario ve cuántos cursos obtendría al cambiar la
+selección de esa faceta. La base de datos devuelve solo las filas de conteo,
+no una fila por curso.
+"""
+
+import logging
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Optional, Tuple
+
+from django.db import connection
+from django.db.models import Case, CharField, Count, F, Q, QuerySet, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+
+from apps.courses.models import Course
+
+logger = logging.getLogger('apps')
+
+
+class CourseFacetService:
+    """
+    Servicio de filtros y facetas del catálogo de cursos
+    """
+
+    # Filtros de selección múltiple (valores separados por coma)
+    LIST_FILTERS = ('category', 'level', 'tags')
+
+    # Filtros de rango: parámetro -> (campo anotado, operador)
+    RANGE_FILTERS = {
+        'min_price': ('effective_price', 'gte'),
+        'max_price': ('effective_price', 'lte'),
+        'min_hours': ('hours', 'gte'),
+        'max_hours': ('hours', 'lte'),
+        'min_rating': ('rating', 'gte'),
+    }
+
+    # Faceta a la que pertenece cada filtro (para excluirlo al contar su propia faceta)
+    FILTER_FACETS = {
+        'category': 'category',
+        'level': 'level',
+        'tags': 'tags',
+        'min_price': 'price',
+        'max_price': 'price',
+        'min_hours': 'hours',
+        'max_hours': 'hours',
+        'min_rating': 'rating',
+    }
+
+    # Rangos de las facetas numéricas: (valor, mínimo, máximo). None = sin límite
+    PRICE_RANGES = (
+        ('0', Decimal('0'), Decimal('0')),
+        ('0-50', Decimal('0.01'), Decimal('50')),
+        ('50-100', Decimal('50.01'), Decimal('100')),
+        ('100-200', Decimal('100.01'), Decimal('200')),
+        ('200+', Decimal('200.01'), None),
+    )
+    HOURS_RANGES = (
+        ('0-5', 0, 5),
+        ('5-10', 6, 10),
+        ('10-20', 11, 20),
+        ('20+', 21, None),
+    )
+    RATING_RANGES = (
+        ('4+', Decimal('4'), None),
+        ('3+', Decimal('3'), None),
+        ('2+', Decimal('2'), None),
+        ('1+', Decimal('1'), None),
+    )
+
+    # ==================================
+    # FILTROS
+    # ==================================
+
+    def parse_filters(self, params) -> Tuple[Dict, List[str]]:
+        """
+        Lee los filtros del catálogo desde los query params.
+
+        Returns:
+            Tuple[filters, errors]: Filtros normalizados y mensajes de error
+        """
+        filters = {}
+        errors = []
+
+        for name in self.LIST_FILTERS:
+            raw_value = params.get(name, '')
+            values = [value.strip() for value in raw_value.split(',') if value.strip()]
+            if values:
+                filters[name] = values
+
+        if 'level' in filters:
+            valid_levels = {choice for choice, _ in Course.LEVEL_CHOICES}
+            invalid_levels = [level for level in filters['level'] if level not in valid_levels]
+            if invalid_levels:
+                errors.append(f"Nivel inválido: {', '.join(invalid_levels)}")
+
+        for name in self.RANGE_FILTERS:
+            raw_value = params.get(name)
+            if raw_value in (None, ''):
+                continue
+            try:
+                value = Decimal(raw_value)
+            except (InvalidOperation, ValueError):
+                errors.append(f"{name} debe ser un número")
+                continue
+            if value < 0:
+                errors.append(f"{name} no puede ser negativo")
+                continue
+            filters[name] = value
+
+        return filters, errors
+
+    def apply_filters(self, queryset: QuerySet, filters: Dict) -> QuerySet:
+        """Aplica los filtros del catálogo a un queryset de cursos"""
+        if not filters:
+            return queryset
+
+        queryset = queryset.annotate(effective_price=Coalesce('discount_price', 'price'))
+        for name, value in filters.items():
+            queryset = queryset.filter(self._filter_condition(name, value))
+        return queryset
+
+    def _filter_condition(self, name: str, value) -> Q:
+        """Condición de un filtro (requiere la anotación effective_price)"""
+        if name in ('category', 'level'):
+            return Q(**{f'{name}__in': value})
+        if name == 'tags':
+            return self._tags_condition(value)
+        field, lookup = self.RANGE_FILTERS[name]
+        return Q(**{f'{field}__{lookup}': value})
+
+    def _tags_condition(self, tags: List[str]) -> Q:
+        """
+        Condición "tiene alguno de estos tags".
+
+        En PostgreSQL usa el operador @> de jsonb (índice GIN courses_tags_gin).
+        En SQLite, contains no está soportado para JSONField y se usa json_each.
+        """
+        condition = Q()
+        if connection.vendor == 'postgresql':
+            for tag in tags:
+                condition |= Q(tags__contains=[tag])
+            return condition
+
+        placeholders = ', '.join(['%s'] * len(tags))
+        return Q(id__in=RawSQL(
+            f"SELECT courses.id FROM courses, json_each(courses.tags) "
+            f"WHERE json_each.value IN ({placeholders})",
+            list(tags)
+        ))
+
+    # ==================================
+    # FACETAS
+    # ==================================
+
+    def get_facets(self, queryset: QuerySet, filters: Optional[Dict] = None) -> Dict:
+        """
+        Calcula los conteos de todas las facetas en una sola consulta.
+
+        Args:
+            queryset: Cursos visibles sin los filtros de facetas aplicados
+            filters: Filtros seleccionados (ver parse_filters)
+
+        Returns:
+            dict: total de cursos que cumplen todos los filtros y conteos por faceta
+        """
+        filters = filters or {}
+        conditions = {name: self._filter_condition(name, value) for name, value in filters.items()}
+
+        # order_by() vacío: el ordering del modelo no debe entrar en el GROUP BY
+        base = queryset.order_by().annotate(effective_price=Coalesce('discount_price', 'price'))
+
+        def matching(facet=None):
+            """Cursos que cumplen todos los filtros salvo los de `facet`"""
+            condition = Q()
+            for name, name_condition in conditions.items():
+                if self.FILTER_FACETS[name] != facet:
+                    condition &= name_condition
+            return base.filter(condition)
+
+        parts = [
+            self._group_counts('total', matching(), Value('')),
+            self._group_counts('category', matching('category'), F('category')),
+            self._group_counts('level', matching('level'), F('level')),
+            self._group_counts('price', matching('price'), self._range_bucket('effective_price', self.PRICE_RANGES)),
+            self._group_counts('hours', matching('hours'), self._range_bucket('hours', self.HOURS_RANGES)),
+            self._group_counts('rating', matching('rating'), self._range_bucket('rating', self.RATING_RANGES)),
+            self._tag_counts(matching('tags')),
+        ]
+        sql = ' UNION ALL '.join(part_sql for part_sql, _ in parts)
+        params = [param for _, part_params in parts for param in part_params]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+        counts = {facet: {} for facet in ('total', 'category', 'level', 'price', 'hours', 'rating', 'tags')}
+        for facet, value, count in rows:
+            if value is not None:
+                counts[facet][value] = count
+
+        return {
+            'total': counts['total'].get('', 0),
+            'facets': {
+                'category': self._sorted_counts(counts['category']),
+                'level': [
+                    {'value': value, 'label': label, 'count': counts['level'].get(value, 0)}
+                    for value, label in Course.LEVEL_CHOICES
+                ],
+                'tags': self._sorted_counts(counts['tags']),
+                'price': self._count_ranges(counts['price'], self.PRICE_RANGES),
+                'hours': self._count_ranges(counts['hours'], self.HOURS_RANGES),
+                'rating': self._count_ranges(counts['rating'], self.RATING_RANGES),
+            }
+        }
+
+    @staticmethod
+    def _group_counts(facet: str, queryset: QuerySet, value) -> Tuple[str, List]:
+        """SQL de (faceta, valor, cursos) agrupando el queryset por la expresión `value`"""
+        sql, params = queryset.annotate(facet_value=value).values('facet_value').annotate(
+            facet_count=Count('id')
+        ).query.sql_with_params()
+        return (
+            f"SELECT * FROM (SELECT %s AS facet_name, facet_value, facet_count FROM ({sql}) facet_{facet}) facet_{facet}_counts",
+            [facet, *params],
+        )
+
+    def _tag_counts(self, queryset: QuerySet) -> Tuple[str, List]:
+        """SQL de (faceta, tag, cursos) expandiendo el arreglo JSON de tags de cada curso"""
+        sql, params = queryset.values('id', 'tags').query.sql_with_params()
+        if connection.vendor == 'postgresql':
+            from_tags = (
+                "CROSS JOIN LATERAL jsonb_array_elements("
+                "CASE WHEN jsonb_typeof(course_tags.tags) = 'array' THEN course_tags.tags ELSE '[]'::jsonb END"
+                ") AS tag WHERE jsonb_typeof(tag.value) = 'string'"
+            )
+            tag_value = "tag.value #>> '{}'"
+        else:
+            from_tags = (
+                ", json_each(CASE WHEN json_type(course_tags.tags) = 'array' THEN course_tags.tags ELSE '[]' END) AS tag "
+                "WHERE tag.type = 'text'"
+            )
+            tag_value = 'tag.value'
+        return (
+            f"SELECT * FROM (SELECT %s AS facet_name, {tag_value} AS facet_value, "
+            f"COUNT(DISTINCT course_tags.id) AS facet_count FROM ({sql}) course_tags {from_tags} "
+            f"GROUP BY {tag_value}) facet_tags_counts",
+            ['tags', *params],
+        )
+
+    @staticmethod
+    def _range_bucket(field: str, ranges) -> Case:
+        """
+        Expresión con el primer rango que contiene el valor (los rangos abiertos
+        como '3+' se recorren de mayor a menor, así cada curso cae en uno solo).
+        """
+        ordered = sorted(ranges, key=lambda item: item[1], reverse=True)
+        return Case(
+            *[
+                When(
+                    Q(**{f'{field}__gte': minimum}) & (Q(**{f'{field}__lte': maximum}) if maximum is not None else Q()),
+                    then=Value(value)
+                )
+                for value, minimum, maximum in ordered
+            ],
+            default=Value(None),
+            output_field=CharField(),
+        )
+
+    @staticmethod
+    def _sorted_counts(counts: Dict) -> List[Dict]:
+        return [
+            {'value': value, 'count': count}
+            for value, count in sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))
+        ]
+
+    @staticmethod
+    def _count_ranges(bucket_counts: Dict[str, int], ranges) -> List[Dict]:
+        """Conteo de cada rango: suma de los buckets de _range_bucket contenidos en él"""
+        bounds = {value: (minimum, maximum) for value, minimum, maximum in ranges}
+        facet = []
+        for value, minimum, maximum in ranges:
+            count = sum(
+                bucket_count for bucket, bucket_count in bucket_counts.items()
+                if bounds[bucket][0] >= minimum
+                and (maximum is None or (bounds[bucket][1] is not None and bounds[bucket][1] <= maximum))
+            )
+            facet.append({
+                'value': value,
+                'min': float(minimum),
+                'max': float(maximum) if maximum is not None else None,
+                'count': count,
+            })
+        return facet
@@ -0,0 +1,148 @@
+"""
+Servicio de Precios por Moneda - FagSol Escuela Virtual
+
+Precalcula el precio de cada curso en todas las monedas soportadas y lo guarda
+en Course.localized_prices, para que el catálogo pueda responder en la moneda
+del cliente sin conversiones por request.
+
+- Se recalcula en bloque cada vez que CurrencyService refresca las tasas
+  (tarea periódica refresh_exchange_rates o comando del mismo nombre).
+- Al guardar un curso se recalcula solo ese curso con las tasas en caché
+  (apps/courses/signals.py).
+
+Formato de localized_prices:
+    {"COP": {"price": "80000.00", "discount_price": null}, "USD": {...}, ...}
+"""
+
+import logging
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Optional
+
+from apps.courses.models import Course
+from infrastructure.services.currency_service import CurrencyService
+
+logger = logging.getLogger('apps')
+
+
+class CoursePricingService:
+    """
+    Servicio de precios precalculados por moneda
+    """
+
+    BATCH_SIZE = 500
+
+    def __init__(self, currency_service: Optional[CurrencyService] = None):
+        self.currency_service = currency_service or CurrencyService()
+
+    @staticmethod
+    def _quantize(amount: Decimal) -> str:
+        return str(amount.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+
+    def _base_price_usd(self, course: Course, rates: Dict[str, Decimal]) -> Optional[Decimal]:
+        """Precio base en USD (price_usd, o price en PEN convertido si falta)"""
+        if course.price_usd is not None:
+            return Decimal(course.price_usd)
+        pen_rate = rates.get('PEN') or self.currency_service.default_usd_to_pen_rate
+        if course.price is not None and course.currency == 'PEN':
+            return Decimal(course.price) / pen_rate
+        return None
+
+    def localize(self, course: Course, rates: Optional[Dict[str, Decimal]] = None) -> Dict:
+        """
+        Calcula los precios de un curso en todas las monedas soportadas.
+
+        Args:
+            course: Curso
+            rates: Tabla de tasas USD -> X. Por defecto se usan las tasas en caché,
+                sin llamar a la API; si no hay, solo se incluyen la moneda del curso y USD.
+
+        Returns:
+            dict: {moneda: {'price': str, 'discount_price': str | None}}
+        """
+        if rates is None:
+            rates = self.currency_service.get_cached_usd_rates() or {}
+
+        base_usd = self._base_price_usd(course, rates)
+
+        # El descuento se guarda en la moneda del curso: conservar la proporción
+        discount_ratio = None
+        if course.discount_price is not None and course.price:
+            discount_ratio = Decimal(course.discount_price) / Decimal(course.price)
+
+        prices = {}
+        for currency in self.currency_service.get_supported_currencies():
+            if currency == course.currency:
+                # El precio en la moneda del curso es el definido por el admin, sin redondeos
+                price = Decimal(course.price)
+                discount = Decimal(course.discount_price) if course.discount_price is not None else None
+            else:
+                if base_usd is None:
+                    continue
+                rate = Decimal('1.00') if currency == 'USD' else rates.get(currency)
+                if rate is None:
+                    continue
+                price = base_usd * rate
+                discount = price * discount_ratio if discount_ratio is not None else None
+
+            prices[currency] = {
+                'price': self._quantize(price),
+                'discount_price': self._quantize(discount) if discount is not None else None,
+            }
+        return prices
+
+    def recompute_all(self, rates: Optional[Dict[str, Decimal]] = None) -> int:
+        """
+        Recalcula localized_prices de todos los cursos con bulk_update.
+
+        Returns:
+            int: Número de cursos actualizados
+        """
+        rates = rates if rates is not None else self.currency_service.get_cached_usd_rates()
+        if not rates:
+            logger.warning("No hay tasas de cambio disponibles, no se recalcularon precios")
+            return 0
+
+        updated = 0
+        batch = []
+        courses = Course.objects.only(
+            'id', 'price', 'price_usd', 'discount_price', 'currency', 'localized_prices'
+        ).order_by('id')
+        for course in courses.iterator(chunk_size=self.BATCH_SIZE):
+            course.localized_prices = self.localize(course, rates)
+            batch.append(course)
+            if len(batch) >= self.BATCH_SIZE:
+                Course.objects.bulk_update(batch, ['localized_prices'])
+                updated += len(batch)
+                batch = []
+        if batch:
+            Course.objects.bulk_update(batch, ['localized_prices'])
+            updated += len(batch)
+
+        # bulk_update no dispara signals: invalidar la caché del catálogo manualmente
+        from infrastructure.services.catalog_cache_service import CatalogCacheService
+        CatalogCacheService().bump_version()
+
+        logger.info(f"Precios por moneda recalculados para {updated} cursos")
+        return updated
+
+    def get_localized_price(self, course: Course, currency: str) -> Optional[Dict]:
+        """
+        Precio de un curso en una moneda para el catálogo.
+
+        Usa el valor precalculado; si el curso aún no lo tiene en esa moneda
+        (ej: creado antes del primer refresco de tasas) lo calcula con las
+        tasas en caché, sin llamar a la API.
+        """
+        prices = course.localized_prices or {}
+        localized = prices.get(currency)
+        if localized is None:
+            localized = self.localize(course).get(currency)
+        if localized is None:
+            return None
+
+        return {
+            'currency': currency,
+            'symbol': self.currency_service.get_currency_symbol(currency),
+            'price': float(localized['price']),
+            'discount_price': float(localized['discount_price']) if localized['discount_price'] is not None else None,
+        }
@@ -0,0 +1,179 @@
+"""
+Servicio de Roster de Progreso - FagSol Escuela Virtual
+
+Matriz alumnos × lecciones de un curso para instructores y administradores.
+
+- El temario (lecciones activas en orden de módulo y lección) se lee una vez.
+- Las lecciones completadas de una página de alumnos se obtienen con una sola
+  consulta sobre LessonProgress y se agrupan por inscripción, sin consultas
+  por alumno ni por módulo.
+- Cada fila de la matriz es un bitmap '1'/'0' alineado con el temario (el
+  mismo formato que el modo compacto de GET /progress/course/).
+- La exportación CSV se genera en streaming por bloques de alumnos. Los
+  textos que escriben los usuarios (email, nombres, títulos de lecciones) se
+  neutralizan para que Excel o Sheets no los evalúen como fórmulas.
+"""
+
+import csv
+import logging
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional
+
+from django.db.models import QuerySet
+
+from apps.courses.models import Course, Lesson
+from apps.users.models import Enrollment, LessonProgress
+from infrastructure.utils.pagination import paginate_by_keyset
+
+logger = logging.getLogger('apps')
+
+
+# Caracteres iniciales que las hojas de cálculo interpretan como fórmula
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _csv_text(value: str) -> str:
+    """Antepone una comilla a los textos que una hoja de cálculo ejecutaría como fórmula"""
+    if value and value.startswith(CSV_FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+class _Echo:
+    """Buffer mínimo para csv.writer: devuelve cada línea en lugar de guardarla"""
+
+    def write(self, value):
+        return value
+
+
+class CourseRosterService:
+    """
+    Servicio de matriz de progreso de los alumnos de un curso
+    """
+
+    ORDERING = ['enrolled_at', 'id']
+    CSV_CHUNK_SIZE = 500
+
+    def get_outline(self, course: Course) -> List[Dict]:
+        """Lecciones activas del curso en el orden del temario"""
+        return list(
+            Lesson.objects.filter(module__course=course, is_active=True)
+            .order_by('module__order', 'order')
+            .values('id', 'title', 'module_id', 'module__title')
+        )
+
+    def get_enrollments(self, course: Course, status: Optional[str] = None) -> QuerySet:
+        enrollments = Enrollment.objects.filter(course=course).select_related('user')
+        if status:
+            enrollments = enrollments.filter(status=status)
+        return enrollments
+
+    def completion_rows(self, enrollments: List[Enrollment], lesson_ids: List[str]) -> Dict[str, str]:
+        """
+        Bitmap de lecciones completadas por inscripción, con una sola consulta.
+
+        Returns:
+            dict: enrollment_id -> '1'/'0' por lección, en el orden de lesson_ids
+        """
+        completed_by_enrollment = defaultdict(set)
+        if enrollments and lesson_ids:
+            for enrollment_id, lesson_id in LessonProgress.objects.filter(
+                enrollment_id__in=[enrollment.id for enrollment in enrollments],
+                lesson_id__in=lesson_ids,
+                is_completed=True
+            ).order_by('enrollment_id').values_list('enrollment_id', 'lesson_id'):
+                completed_by_enrollment[enrollment_id].add(lesson_id)
+
+        return {
+            enrollment.id: ''.join(
+                '1' if lesson_id in completed_by_enrollment[enrollment.id] else '0'
+                for lesson_id in lesson_ids
+            )
+            for enrollment in enrollments
+        }
+
+    def get_page(
+        self,
+        course: Course,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None,
+        page_size: Optional[int] = None
+    ) -> Dict:
+        """
+        Página de la matriz (paginación keyset por alumno).
+
+        Raises:
+            InvalidCursorError: Si el cursor no es válido
+        """
+        outline = self.get_outline(course)
+        lesson_ids = [lesson['id'] for lesson in outline]
+
+        enrollments, next_cursor = paginate_by_keyset(
+            self.get_enrollments(course, status), self.ORDERING, cursor=cursor, page_size=page_size
+        )
+        rows = self.completion_rows(enrollments, lesson_ids)
+
+        return {
+            'course': {'id': course.id, 'title': course.title},
+            'lessons': [
+                {
+                    'id': lesson['id'],
+                    'title': lesson['title'],
+                    'module_id': lesson['module_id'],
+                    'module_title': lesson['module__title'],
+                }
+                for lesson in outline
+            ],
+            'students': [
+                {
+                    'enrollment_id': enrollment.id,
+                    'user_id': enrollment.user.id,
+                    'email': enrollment.user.email,
+                    'first_name': enrollment.user.first_name,
+                    'last_name': enrollment.user.last_name,
+                    'status': enrollment.status,
+                    'completion_percentage': float(enrollment.completion_percentage),
+                    'completed': rows[enrollment.id],
+                }
+                for enrollment in enrollments
+            ],
+            'next_cursor': next_cursor,
+        }
+
+    def iter_csv(self, course: Course, status: Optional[str] = None) -> Iterator[str]:
+        """
+        Genera la matriz completa como CSV, línea por línea.
+        Una consulta de LessonProgress por bloque de CSV_CHUNK_SIZE alumnos.
+        """
+        outline = self.get_outline(course)
+        lesson_ids = [lesson['id'] for lesson in outline]
+        writer = csv.writer(_Echo())
+
+        yield writer.writerow(
+            ['email', 'first_name', 'last_name', 'status', 'completion_percentage']
+            + [_csv_text(lesson['title']) for lesson in outline]
+        )
+
+        for chunk in self._chunks(self.get_enrollments(course, status).order_by(*self.ORDERING)):
+            rows = self.completion_rows(chunk, lesson_ids)
+            for enrollment in chunk:
+                yield writer.writerow(
+                    [
+                        _csv_text(enrollment.user.email),
+                        _csv_text(enrollment.user.first_name),
+                        _csv_text(enrollment.user.last_name),
+                        enrollment.status,
+                        enrollment.completion_percentage,
+                    ]
+                    + list(rows[enrollment.id])
+                )
+
+    def _chunks(self, enrollments: QuerySet) -> Iterator[List[Enrollment]]:
+        chunk = []
+        for enrollment in enrollments.iterator(chunk_size=self.CSV_CHUNK_SIZE):
+            chunk.append(enrollment)
+            if len(chunk) >= self.CSV_CHUNK_SIZE:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
@@ -0,0 +1,347 @@
+"""
+Servicio de Búsqueda de Cursos - FagSol Escuela Virtual
+
+Búsqueda de texto completo sobre título, descripción corta, tags, categoría y
+descripción de los cursos, con ranking por relevancia y fragmentos resaltados.
+
+- PostgreSQL: columna courses.search_vector (tsvector, configuración 'spanish')
+  con índice GIN. Pesos: título (A), descripción corta y tags (B),
+  categoría (C), descripción (D).
+- SQLite (desarrollo/tests): tabla virtual FTS5 courses_fts con ranking bm25.
+  FTS5 no incluye stemming en español, así que los términos se buscan por
+  prefijo tras quitar el plural.
+
+Los resultados se paginan por cursor sobre (relevancia, id) con el límite
+dentro de la consulta de texto completo (search_page).
+
+El índice se actualiza de forma incremental al guardar/eliminar un curso
+(ver apps/courses/signals.py) y se puede reconstruir con el comando
+rebuild_course_search_index.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from django.contrib.postgres.search import (
+    SearchHeadline, SearchQuery, SearchRank, SearchVector
+)
+from django.db import connection, transaction, DatabaseError
+from django.db.models import F, FloatField, Q, QuerySet, TextField
+from django.db.models.functions import Cast
+
+from apps.courses.models import Course
+from infrastructure.utils.pagination import InvalidCursorError, decode_cursor_values, encode_cursor
+
+logger = logging.getLogger('apps')
+
+
+@dataclass
+class CourseSearchResult:
+    """Resultado de búsqueda: curso, relevancia y fragmento resaltado"""
+    course: Course
+    rank: float
+    snippet: str
+
+
+class CourseSearchService:
+    """
+    Servicio de búsqueda de texto completo para el catálogo de cursos
+    """
+
+    SEARCH_CONFIG = 'spanish'
+    FTS_TABLE = 'courses_fts'
+    DEFAULT_LIMIT = 100
+    HIGHLIGHT_START = '<mark>'
+    HIGHLIGHT_STOP = '</mark>'
+
+    # Pesos bm25 de FTS5 por columna: course_id, title, short_description, tags, category, description
+    FTS_WEIGHTS = (0.0, 10.0, 4.0, 4.0, 2.0, 1.0)
+
+    # Campos de respaldo cuando no hay motor de texto completo disponible
+    FALLBACK_FIELDS = ('title', 'short_description', 'description', 'category')
+
+    @property
+    def vendor(self) -> str:
+        return connection.vendor
+
+    # ==================================
+    # BÚSQUEDA
+    # ==================================
+
+    def search(self, queryset: QuerySet, query: str, limit: Optional[int] = None) -> List[CourseSearchResult]:
+        """
+        Busca cursos dentro de un queryset y los ordena por relevancia (primera página).
+
+        Args:
+            queryset: QuerySet de Course ya filtrado (visibilidad, estado, etc.)
+            query: Texto de búsqueda del usuario
+            limit: Máximo de resultados (por defecto DEFAULT_LIMIT)
+
+        Returns:
+            Lista de CourseSearchResult ordenada por relevancia descendente
+        """
+        return self.search_page(queryset, query, limit=limit)[0]
+
+    def search_page(
+        self,
+        queryset: QuerySet,
+        query: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[CourseSearchResult], Optional[str]]:
+        """
+        Página de resultados ordenada por (relevancia descendente, id), con
+        paginación keyset: el cursor guarda la relevancia y el id del último
+        resultado y la página siguiente se filtra en la consulta de texto completo.
+
+        Args:
+            queryset: QuerySet de Course ya filtrado (visibilidad, estado, etc.)
+            query: Texto de búsqueda del usuario
+            limit: Tamaño de página (por defecto DEFAULT_LIMIT)
+            cursor: next_cursor de la página anterior (None = primera página)
+
+        Returns:
+            Tuple[resultados, next_cursor]: next_cursor es None si no hay más resultados
+
+        Raises:
+            InvalidCursorError: Si el cursor no es válido
+        """
+        limit = limit or self.DEFAULT_LIMIT
+        after = self._decode_cursor(cursor) if cursor else None
+        query = (query or '').strip()
+        if not query:
+            return [], None
+
+        # Un resultado extra indica si existe una página siguiente
+        results = None
+        try:
+            if self.vendor == 'postgresql':
+                results = self._search_postgres(queryset, query, limit + 1, after)
+            elif self.vendor == 'sqlite':
+                results = self._search_sqlite(queryset, query, limit + 1, after)
+        except DatabaseError as e:
+            logger.warning(f"Búsqueda de texto completo no disponible, usando icontains: {str(e)}")
+        if results is None:
+            results = self._search_fallback(queryset, query, limit + 1, after)
+
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            next_cursor = encode_cursor([results[-1].rank, results[-1].course.id])
+        return results, next_cursor
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[float, str]:
+        rank, course_id = decode_cursor_values(cursor, 2)
+        if isinstance(rank, bool) or not isinstance(rank, (int, float)) or not isinstance(course_id, str):
+            raise InvalidCursorError('Cursor inválido')
+        return float(rank), course_id
+
+    def _search_postgres(
+        self, queryset: QuerySet, query: str, limit: int, after: Optional[Tuple[float, str]]
+    ) -> List[CourseSearchResult]:
+        search_query = SearchQuery(query, config=self.SEARCH_CONFIG, search_type='websearch')
+
+        # 1. Ranking usando el índice GIN (sin calcular fragmentos para todas las filas).
+        #    ts_rank devuelve real: se convierte a double para que el valor del
+        #    cursor se compare exacto con el de la fila.
+        ranked = queryset.filter(search_vector=search_query).annotate(
+            search_rank=Cast(SearchRank(F('search_vector'), search_query), FloatField())
+        )
+        if after:
+            rank, course_id = after
+            ranked = ranked.filter(Q(search_rank__lt=rank) | Q(search_rank=rank, id__gt=course_id))
+        ranked = list(ranked.order_by('-search_rank', 'id').values_list('id', 'search_rank')[:limit])
+        if not ranked:
+            return []
+
+        # 2. Fragmentos resaltados solo para la página de resultados
+        courses = queryset.filter(id__in=[course_id for course_id, _ in ranked]).annotate(
+            search_snippet=SearchHeadline(
+                'description',
+                search_query,
+                config=self.SEARCH_CONFIG,
+                start_sel=self.HIGHLIGHT_START,
+                stop_sel=self.HIGHLIGHT_STOP,
+                max_words=35,
+                min_words=15,
+            )
+        ).in_bulk()
+
+        return [
+            CourseSearchResult(
+                course=courses[course_id],
+                rank=float(rank),
+                snippet=courses[course_id].search_snippet
+            )
+            for course_id, rank in ranked
+            if course_id in courses
+        ]
+
+    def _search_sqlite(
+        self, queryset: QuerySet, query: str, limit: int, after: Optional[Tuple[float, str]]
+    ) -> List[CourseSearchResult]:
+        match_expression = self._build_fts_match(query)
+        if not match_expression:
+            return []
+
+        # El índice FTS5 no conoce los filtros del queryset: se recorre por bloques
+        # de `limit` coincidencias (LIMIT y cursor dentro de la consulta FTS5)
+        # hasta completar la página con cursos visibles.
+        # bm25 devuelve valores negativos: más bajo = más relevante (rank = -bm25)
+        results = []
+        position = (-after[0], after[1]) if after else None
+        while len(results) < limit:
+            matches = self._fts_matches(match_expression, position, limit)
+            courses = queryset.filter(id__in=[course_id for course_id, _, _ in matches]).in_bulk()
+            results += [
+                CourseSearchResult(course=courses[course_id], rank=-score, snippet=snippet)
+                for course_id, score, snippet in matches
+                if course_id in courses
+            ]
+            if len(matches) < limit:
+                break
+            position = matches[-1][1], matches[-1][0]
+        return results[:limit]
+
+    def _fts_matches(self, match_expression: str, position: Optional[Tuple[float, str]], limit: int) -> List[tuple]:
+        """Coincidencias FTS5 (course_id, bm25, fragmento) posteriores a position, en orden de relevancia"""
+        weights = ', '.join(str(weight) for weight in self.FTS_WEIGHTS)
+        params = [self.HIGHLIGHT_START, self.HIGHLIGHT_STOP, match_expression]
+        where = ''
+        if position:
+            where = 'WHERE score > %s OR (score = %s AND course_id > %s)'
+            params += [position[0], position[0], position[1]]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT course_id, score, snippet FROM ("
+                f"SELECT course_id, bm25({self.FTS_TABLE}, {weights}) AS score, "
+                f"snippet({self.FTS_TABLE}, -1, %s, %s, '…', 24) AS snippet "
+                f"FROM {self.FTS_TABLE} WHERE {self.FTS_TABLE} MATCH %s"
+                f") {where} ORDER BY score, course_id LIMIT %s",
+                params + [limit]
+            )
+            return cursor.fetchall()
+
+    def _search_fallback(
+        self, queryset: QuerySet, query: str, limit: int, after: Optional[Tuple[float, str]]
+    ) -> List[CourseSearchResult]:
+        # Sin relevancia (rank 0): los resultados se ordenan por id
+        condition = Q()
+        for field in self.FALLBACK_FIELDS:
+            condition |= Q(**{f'{field}__icontains': query})
+        courses = queryset.filter(condition)
+        if after:
+            courses = courses.filter(id__gt=after[1])
+        return [
+            CourseSearchResult(course=course, rank=0.0, snippet=course.short_description or '')
+            for course in courses.order_by('id')[:limit]
+        ]
+
+    @staticmethod
+    def _light_stem(token: str) -> str:
+        """Quita el plural de términos en español para buscarlos por prefijo"""
+        if len(token) > 4 and token.endswith('es') and token[-3] not in 'aeiou':
+            return token[:-2]
+        if len(token) > 3 and token.endswith('s'):
+            return token[:-1]
+        return token
+
+    def _build_fts_match(self, query: str) -> str:
+        """
+        Convierte el texto del usuario en una expresión MATCH de FTS5 segura.
+
+        Cada palabra se busca por prefijo y todas deben aparecer (AND implícito).
+        Se descarta cualquier operador o sintaxis de FTS5 del texto original.
+        """
+        tokens = re.findall(r'\w+', query.lower())
+        return ' '.join(f'"{self._light_stem(token)}"*' for token in tokens)
+
+    # ==================================
+    # MANTENIMIENTO DEL ÍNDICE
+    # ==================================
+
+    @classmethod
+    def search_vector_expression(cls):
+        """Expresión tsvector ponderada de un curso (debe coincidir con la migración 0008)"""
+        return (
+            SearchVector('title', weight='A', config=cls.SEARCH_CONFIG)
+            + SearchVector('short_description', weight='B', config=cls.SEARCH_CONFIG)
+            + SearchVector(Cast('tags', TextField()), weight='B', config=cls.SEARCH_CONFIG)
+            + SearchVector('category', weight='C', config=cls.SEARCH_CONFIG)
+            + SearchVector('description', weight='D', config=cls.SEARCH_CONFIG)
+        )
+
+    def index_course(self, course: Course) -> bool:
+        """
+        Actualiza la entrada del índice para un curso.
+
+        Returns:
+            bool: True si se actualizó el índice
+        """
+        try:
+            with transaction.atomic():
+                if self.vendor == 'postgresql':
+                    # update() no dispara post_save, evitando recursión
+                    Course.objects.filter(pk=course.pk).update(
+                        search_vector=self.search_vector_expression()
+                    )
+                elif self.vendor == 'sqlite':
+                    with connection.cursor() as cursor:
+                        cursor.execute(f"DELETE FROM {self.FTS_TABLE} WHERE course_id = %s", [course.pk])
+                        cursor.execute(
+                            f"INSERT INTO {self.FTS_TABLE} "
+                            f"(course_id, title, short_description, tags, category, description) "
+                            f"VALUES (%s, %s, %s, %s, %s, %s)",
+                            [
+                                course.pk,
+                                course.title or '',
+                                course.short_description or '',
+                                ' '.join(str(tag) for tag in (course.tags or [])),
+                                course.category or '',
+                                course.description or '',
+                            ]
+                        )
+                else:
+                    return False
+            return True
+        except DatabaseError as e:
+            logger.warning(f"No se pudo indexar el curso {course.pk} para búsqueda: {str(e)}")
+            return False
+
+    def remove_course(self, course_id: str) -> None:
+        """Elimina la entrada del índice de un curso (solo necesario en SQLite)"""
+        if self.vendor != 'sqlite':
+            return
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute(f"DELETE FROM {self.FTS_TABLE} WHERE course_id = %s", [course_id])
+        except DatabaseError as e:
+            logger.warning(f"No se pudo eliminar el curso {course_id} del índice de búsqueda: {str(e)}")
+
+    def rebuild_index(self) -> int:
+        """
+        Reconstruye el índice de búsqueda completo.
+
+        Returns:
+            int: Número de cursos indexados
+        """
+        if self.vendor == 'postgresql':
+            return Course.objects.update(search_vector=self.search_vector_expression())
+
+        if self.vendor == 'sqlite':
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute(f"DELETE FROM {self.FTS_TABLE}")
+            count = 0
+            for course in Course.objects.only(
+                'id', 'title', 'short_description', 'tags', 'category', 'description'
+            ).iterator():
+                if self.index_course(course):
+                    count += 1
+            return count
+
+        return 0
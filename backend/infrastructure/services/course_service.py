@@ -489,6 +489,10 @@ class CourseService:
                 is_active=False
             )
             
+            # update() no dispara signals: invalidar la caché del catálogo manualmente
+            from infrastructure.services.catalog_cache_service import CatalogCacheService
+            CatalogCacheService().bump_version()
+            
             # Refrescar el objeto desde la BD para confirmar
             course.refresh_from_db()
             
@@ -0,0 +1,290 @@
+"""
+Servicio de Estadísticas por Curso - FagSol Escuela Virtual
+
+Mantiene CourseStats (una fila por curso): inscripciones, activas,
+completadas, suma de porcentajes de completitud (para el promedio), ingresos
+y fecha de la última inscripción. Los dashboards y el listado de cursos del
+instructor leen esas filas con un JOIN por clave primaria en lugar de agregar
+Enrollment en cada request.
+
+- Cada evento aplica un delta con expresiones F en un único UPDATE, dentro de
+  la transacción del evento: inscripciones nuevas (EnrollmentService),
+  lecciones completadas o desmarcadas (EnrollmentProgressService),
+  recálculos de progreso y vencimientos (ExpirySweeperService). Si el curso
+  todavía no tiene fila, el primer evento la crea recalculándola desde las
+  tablas fuente.
+- Los cambios hechos con save() / delete() sobre Enrollment (administración)
+  o sobre Payment (cambios de estado) recalculan los cursos afectados desde
+  las tablas fuente (signals en apps/users/signals.py).
+- El ingreso de un pago aprobado se reparte en partes iguales entre las
+  inscripciones que creó (el resto de centavos va a la primera por ID).
+- rebuild() recalcula todas las filas (comando rebuild_course_stats); la
+  migración core/0008 carga las filas iniciales.
+"""
+
+import logging
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, List
+
+from django.db.models import Case, Count, F, Max, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from apps.core.models import CourseStats
+from apps.courses.models import Course
+from apps.users.models import Enrollment
+
+logger = logging.getLogger('apps')
+
+
+class CourseStatsService:
+    """
+    Servicio que mantiene las estadísticas acumuladas por curso
+    """
+
+    BATCH_SIZE = 500
+
+    STAT_FIELDS = [
+        'enrollments', 'active_enrollments', 'completed_enrollments',
+        'completion_sum', 'revenue', 'last_enrollment_at',
+    ]
+
+    # ------------------------------------------------------------------
+    # Deltas por evento
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def split_amount(amount: Decimal, parts: int) -> List[Decimal]:
+        """Reparte un monto en partes iguales; los centavos sobrantes van a la primera"""
+        if parts <= 0:
+            return []
+        share = (amount / parts).quantize(Decimal('0.01'))
+        return [amount - share * (parts - 1)] + [share] * (parts - 1)
+
+    def apply_status_changes(self, course_id: str, changes: Iterable[tuple]) -> None:
+        """
+        Aplica cambios de estado / porcentaje de inscripciones de un curso (un UPDATE).
+
+        Args:
+            course_id: ID del curso
+            changes: (estado anterior, porcentaje anterior, estado nuevo, porcentaje nuevo)
+        """
+        active = completed = 0
+        completion = Decimal('0')
+        for old_status, old_percentage, new_status, new_percentage in changes:
+            active += (new_status == 'active') - (old_status == 'active')
+            completed += (new_status == 'completed') - (old_status == 'completed')
+            completion += Decimal(new_percentage) - Decimal(old_percentage)
+        self.apply_delta(
+            course_id,
+            active_enrollments=active,
+            completed_enrollments=completed,
+            completion_sum=completion,
+        )
+
+    def apply_delta(self, course_id: str, last_enrollment_at=None, **deltas) -> None:
+        """
+        Suma los deltas a la fila de un curso (ver apply_deltas).
+
+        Args:
+            course_id: ID del curso
+            last_enrollment_at: Fecha de una inscripción nueva (se guarda la mayor)
+            **deltas: Incrementos por campo (enrollments, active_enrollments, ...)
+        """
+        self.apply_deltas({course_id: dict(deltas, last_enrollment_at=last_enrollment_at)})
+
+    def apply_deltas(self, deltas_by_course: Dict[str, Dict]) -> None:
+        """
+        Suma deltas a las filas de varios cursos en un único UPDATE (CASE por
+        curso); las filas que falten se crean con refresh(). El número de
+        consultas no depende de la cantidad de cursos.
+
+        Args:
+            deltas_by_course: course_id -> {campo: incremento, 'last_enrollment_at': fecha}
+        """
+        deltas_by_course = {
+            course_id: {field: value for field, value in deltas.items() if value}
+            for course_id, deltas in deltas_by_course.items()
+        }
+        deltas_by_course = {course_id: deltas for course_id, deltas in deltas_by_course.items() if deltas}
+        if not deltas_by_course:
+            return
+
+        updated = self._update(deltas_by_course)
+        if updated < len(deltas_by_course):
+            self._create_missing(list(deltas_by_course))
+
+    def _create_missing(self, course_ids: List[str]) -> None:
+        """
+        Crea las filas que falten recalculando los cursos desde las tablas fuente.
+
+        Los deltas se aplican después de modificar Enrollment / Payment en la
+        misma transacción, por lo que el recálculo ya incluye el evento (una
+        fila nueva en 0 más el delta dejaría fuera las inscripciones previas).
+        Se recalculan todos los cursos del llamado, también los que ya
+        recibieron el delta, tras bloquear los cursos (serializa la creación)
+        y sus filas de estadísticas (espera a los deltas en curso).
+        """
+        list(Course.objects.select_for_update().filter(id__in=course_ids).order_by('pk').values_list('pk', flat=True))
+        list(
+            CourseStats.objects.select_for_update().filter(course_id__in=course_ids)
+            .order_by('pk').values_list('pk', flat=True)
+        )
+        self.refresh(course_ids)
+
+    @staticmethod
+    def _update(deltas_by_course: Dict[str, Dict]) -> int:
+        fields = {field for deltas in deltas_by_course.values() for field in deltas}
+        values = {}
+        for field in fields:
+            output_field = CourseStats._meta.get_field(field)
+            if field == 'last_enrollment_at':
+                values[field] = Case(
+                    *[
+                        When(course_id=course_id, then=Greatest(
+                            Coalesce(F(field), Value(deltas[field])), Value(deltas[field])
+                        ))
+                        for course_id, deltas in deltas_by_course.items() if field in deltas
+                    ],
+                    default=F(field),
+                    output_field=output_field,
+                )
+            else:
+                values[field] = F(field) + Case(
+                    *[
+                        When(course_id=course_id, then=Value(deltas[field]))
+                        for course_id, deltas in deltas_by_course.items() if field in deltas
+                    ],
+                    default=Value(0),
+                    output_field=output_field,
+                )
+        return CourseStats.objects.filter(course_id__in=deltas_by_course).update(
+            updated_at=timezone.now(), **values
+        )
+
+    def record_enrollments(self, enrollments: Iterable[Enrollment], payment=None) -> None:
+        """
+        Suma inscripciones nuevas a sus cursos (un solo UPDATE para todos los cursos).
+
+        Args:
+            enrollments: Inscripciones recién creadas
+            payment: Pago que las originó; si está aprobado, su monto se reparte entre ellas
+        """
+        enrollments = sorted(enrollments, key=lambda enrollment: enrollment.id)
+        if not enrollments:
+            return
+
+        shares = {}
+        if payment is not None and payment.status == 'approved':
+            paid = [enrollment.id for enrollment in enrollments if enrollment.payment_id == payment.id]
+            shares = dict(zip(paid, self.split_amount(payment.amount, len(paid))))
+
+        by_course = defaultdict(list)
+        for enrollment in enrollments:
+            by_course[enrollment.course_id].append(enrollment)
+
+        self.apply_deltas({
+            course_id: {
+                'last_enrollment_at': max(enrollment.enrolled_at for enrollment in items),
+                'enrollments': len(items),
+                'active_enrollments': sum(enrollment.status == 'active' for enrollment in items),
+                'completed_enrollments': sum(enrollment.status == 'completed' for enrollment in items),
+                'completion_sum': sum((Decimal(enrollment.completion_percentage) for enrollment in items), Decimal('0')),
+                'revenue': sum((shares.get(enrollment.id, Decimal('0')) for enrollment in items), Decimal('0')),
+            }
+            for course_id, items in by_course.items()
+        })
+
+    # ------------------------------------------------------------------
+    # Recálculo desde las tablas fuente
+    # ------------------------------------------------------------------
+
+    def refresh(self, course_ids: Iterable[str], create_missing: bool = True) -> int:
+        """
+        Recalcula las filas de unos cursos desde Enrollment y Payment (dos consultas agrupadas).
+
+        Args:
+            course_ids: Cursos a recalcular
+            create_missing: False para solo actualizar filas existentes (ej: mientras
+                se elimina el curso en cascada)
+
+        Returns:
+            int: Filas escritas
+        """
+        course_ids = list(set(course_ids))
+        if not course_ids:
+            return 0
+
+        values = {course_id: self._empty() for course_id in course_ids}
+        for row in Enrollment.objects.filter(course_id__in=course_ids).values('course_id').annotate(
+            total=Count('pk'),
+            active=Count('pk', filter=Q(status='active')),
+            completed_count=Count('pk', filter=Q(status='completed')),
+            percentage_sum=Sum('completion_percentage'),
+            last_enrolled=Max('enrolled_at'),
+        ).order_by():
+            values[row['course_id']].update(
+                enrollments=row['total'],
+                active_enrollments=row['active'],
+                completed_enrollments=row['completed_count'],
+                completion_sum=row['percentage_sum'] or Decimal('0.00'),
+                last_enrollment_at=row['last_enrolled'],
+            )
+        for course_id, revenue in self._revenue_by_course(course_ids).items():
+            if course_id in values:
+                values[course_id]['revenue'] = revenue
+
+        now = timezone.now()
+        if create_missing:
+            existing = set(Course.objects.filter(id__in=course_ids).values_list('id', flat=True))
+            CourseStats.objects.bulk_create(
+                [
+                    CourseStats(course_id=course_id, updated_at=now, **stats)
+                    for course_id, stats in values.items() if course_id in existing
+                ],
+                update_conflicts=True,
+                unique_fields=['course'],
+                update_fields=self.STAT_FIELDS + ['updated_at'],
+            )
+            return len(existing)
+
+        return sum(
+            CourseStats.objects.filter(course_id=course_id).update(updated_at=now, **stats)
+            for course_id, stats in values.items()
+        )
+
+    def rebuild(self) -> int:
+        """Recalcula las filas de todos los cursos, en bloques de BATCH_SIZE"""
+        course_ids = list(Course.objects.order_by('pk').values_list('pk', flat=True))
+        written = 0
+        for start in range(0, len(course_ids), self.BATCH_SIZE):
+            written += self.refresh(course_ids[start:start + self.BATCH_SIZE])
+        logger.info(f"course_stats_rebuild courses={written}")
+        return written
+
+    def _revenue_by_course(self, course_ids: List[str]) -> Dict[str, Decimal]:
+        """Ingresos de pagos aprobados repartidos entre las inscripciones de cada pago"""
+        by_payment = defaultdict(list)
+        for payment_id, course_id, amount in Enrollment.objects.filter(
+            payment__status='approved',
+            payment__enrollments__course_id__in=course_ids,
+        ).distinct().order_by('payment_id', 'pk').values_list('payment_id', 'course_id', 'payment__amount'):
+            by_payment[payment_id].append((course_id, amount))
+
+        revenue = defaultdict(Decimal)
+        for items in by_payment.values():
+            for (course_id, _), share in zip(items, self.split_amount(items[0][1], len(items))):
+                revenue[course_id] += share
+        return revenue
+
+    @staticmethod
+    def _empty() -> Dict:
+        return {
+            'enrollments': 0,
+            'active_enrollments': 0,
+            'completed_enrollments': 0,
+            'completion_sum': Decimal('0.00'),
+            'revenue': Decimal('0.00'),
+            'last_enrollment_at': None,
+        }
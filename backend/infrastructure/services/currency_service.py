@@ -110,25 +110,23 @@ class CurrencyService:
             logger.error(f"Error inesperado al detectar país: {str(e)}")
             return 'PE', 'PEN'
     
-    def get_exchange_rate(self, from_currency: str, to_currency: str) -> Decimal:
+    # Tabla completa de tasas USD -> X (una sola llamada a la API por ciclo de refresco)
+    RATES_CACHE_KEY = 'exchange_rates_USD'
+    RATES_CACHE_TIMEOUT = 3600  # 1 hora
+    
+    def get_supported_currencies(self) -> list:
         """
-        Obtiene tasa de cambio entre monedas
+        Monedas soportadas (monedas de la región + USD), sin duplicados
+        """
+        return sorted(set(self.COUNTRY_CURRENCY_MAP.values()) | {'USD'})
+    
+    def fetch_usd_rates(self) -> Optional[Dict[str, Decimal]]:
+        """
+        Descarga la tabla completa de tasas USD -> X desde la API
         
-        Args:
-            from_currency: Moneda origen (ej: 'USD')
-            to_currency: Moneda destino (ej: 'PEN')
-            
         Returns:
-            Tasa de cambio como Decimal
+            Dict[moneda, tasa] o None si la API falla
         """
-        if from_currency == to_currency:
-            return Decimal('1.00')
-        
-        cache_key = f'exchange_rate_{from_currency}_{to_currency}'
-        cached_rate = cache.get(cache_key)
-        if cached_rate:
-            return Decimal(str(cached_rate))
-        
         try:
             # Usar ExchangeRate API (gratis hasta 1,500 requests/mes)
             url = self.exchange_rate_api_url
@@ -139,35 +137,103 @@ class CurrencyService:
             response.raise_for_status()
             data = response.json()
             
-            rates = data.get('rates', {})
-            
-            # Si la moneda origen es USD, usar tasa directa
-            if from_currency == 'USD':
-                rate = Decimal(str(rates.get(to_currency, 1.0)))
-            else:
-                # Convertir desde moneda origen a USD, luego a destino
-                from_to_usd = Decimal(str(rates.get(from_currency, 1.0)))
-                usd_to_dest = Decimal(str(rates.get(to_currency, 1.0)))
-                rate = usd_to_dest / from_to_usd
+            rates = {
+                code: Decimal(str(rate))
+                for code, rate in data.get('rates', {}).items()
+                if rate
+            }
+            rates['USD'] = Decimal('1.00')
+            return rates
             
-            # Cachear por 1 hora
-            cache.set(cache_key, float(rate), 3600)
+        except requests.RequestException as e:
+            logger.warning(f"Error al obtener tasas de cambio: {str(e)}")
+            return None
+        except Exception as e:
+            logger.error(f"Error inesperado al obtener tasas de cambio: {str(e)}")
+            return None
+    
+    def get_cached_usd_rates(self) -> Optional[Dict[str, Decimal]]:
+        """
+        Tabla de tasas USD -> X en caché, sin llamar a la API
+        """
+        cached_rates = cache.get(self.RATES_CACHE_KEY)
+        if not cached_rates:
+            return None
+        return {code: Decimal(rate) for code, rate in cached_rates.items()}
+    
+    def get_usd_rates(self, force_refresh: bool = False) -> Optional[Dict[str, Decimal]]:
+        """
+        Obtiene la tabla de tasas USD -> X desde caché (o la descarga si expiró)
+        
+        Args:
+            force_refresh: Ignorar la caché y descargar las tasas
             
-            logger.info(f"Tasa de cambio obtenida: {from_currency} -> {to_currency} = {rate}")
-            return rate
+        Returns:
+            Dict[moneda, tasa] o None si no hay tasas disponibles
+        """
+        if not force_refresh:
+            cached_rates = self.get_cached_usd_rates()
+            if cached_rates:
+                return cached_rates
+        
+        rates = self.fetch_usd_rates()
+        if rates:
+            cache.set(
+                self.RATES_CACHE_KEY,
+                {code: str(rate) for code, rate in rates.items()},
+                self.RATES_CACHE_TIMEOUT
+            )
+            logger.info(f"Tasas de cambio actualizadas: {len(rates)} monedas")
+        return rates
+    
+    def refresh_rates(self) -> Tuple[bool, int]:
+        """
+        Refresca las tasas de cambio y recalcula en bloque los precios por moneda
+        de todos los cursos (ver CoursePricingService).
+        
+        Returns:
+            Tuple[success, cursos_actualizados]
+        """
+        rates = self.get_usd_rates(force_refresh=True)
+        if not rates:
+            return False, 0
+        
+        from infrastructure.services.course_pricing_service import CoursePricingService
+        updated = CoursePricingService(currency_service=self).recompute_all(rates)
+        return True, updated
+    
+    def get_exchange_rate(self, from_currency: str, to_currency: str) -> Decimal:
+        """
+        Obtiene tasa de cambio entre monedas
+        
+        Args:
+            from_currency: Moneda origen (ej: 'USD')
+            to_currency: Moneda destino (ej: 'PEN')
             
-        except requests.RequestException as e:
-            logger.warning(f"Error al obtener tasa de cambio: {str(e)}")
+        Returns:
+            Tasa de cambio como Decimal
+        """
+        if from_currency == to_currency:
+            return Decimal('1.00')
+        
+        rates = self.get_usd_rates()
+        if not rates:
             # Fallback: usar tasa por defecto para USD -> PEN
             if from_currency == 'USD' and to_currency == 'PEN':
                 return self.default_usd_to_pen_rate
             # Para otras conversiones, usar tasa aproximada
             return Decimal('1.00')
-        except Exception as e:
-            logger.error(f"Error inesperado al obtener tasa de cambio: {str(e)}")
-            if from_currency == 'USD' and to_currency == 'PEN':
-                return self.default_usd_to_pen_rate
-            return Decimal('1.00')
+        
+        # Si la moneda origen es USD, usar tasa directa
+        if from_currency == 'USD':
+            rate = rates.get(to_currency, Decimal('1.0'))
+        else:
+            # Convertir desde moneda origen a USD, luego a destino
+            from_to_usd = rates.get(from_currency, Decimal('1.0'))
+            usd_to_dest = rates.get(to_currency, Decimal('1.0'))
+            rate = usd_to_dest / from_to_usd
+        
+        return rate
     
     def convert_price(self, amount_usd: Decimal, target_currency: str) -> Decimal:
         """
@@ -16,17 +16,16 @@ Se eliminará en una versión futura.
 
 import logging
 from typing import Dict, Optional, Tuple
-from django.db.models import Count, Sum, Avg, Q, DecimalField, Min
-from django.db.models.functions import TruncMonth, TruncDay
+from django.db.models import Count, Avg, Q, Min
+from django.db.models.functions import TruncDay
 from django.utils import timezone
-from datetime import timedelta
-from decimal import Decimal
 
 from apps.courses.models import Course
 from apps.users.models import Enrollment, Certificate
-from apps.payments.models import Payment, PaymentIntent
+from apps.payments.models import PaymentIntent
 from apps.core.models import UserProfile
 from django.contrib.auth.models import User
+from infrastructure.services.admin_stats_service import AdminStatsService
 
 logger = logging.getLogger('apps')
 
@@ -55,111 +54,8 @@ class DashboardService:
             if not is_admin(user):
                 return False, None, "No tienes permiso para ver estadísticas de administrador"
             
-            # Estadísticas generales
-            # Total: solo cursos activos, excluyendo archivados (consistente con admin)
-            total_courses = Course.objects.filter(is_active=True).exclude(status='archived').count()
-            published_courses = Course.objects.filter(status='published', is_active=True).count()
-            # Borradores: solo activos, excluyendo archivados
-            draft_courses = Course.objects.filter(status='draft', is_active=True).exclude(status='archived').count()
-            archived_courses = Course.objects.filter(status='archived').count()
-            
-            # Estadísticas de usuarios
-            total_users = User.objects.filter(is_active=True).count()
-            total_students = UserProfile.objects.filter(role='student').count()
-            total_instructors = UserProfile.objects.filter(role='instructor').count()
-            total_admins = UserProfile.objects.filter(role='admin').count()
-            
-            # Estadísticas de enrollments
-            total_enrollments = Enrollment.objects.count()
-            active_enrollments = Enrollment.objects.filter(status='active').count()
-            completed_enrollments = Enrollment.objects.filter(status='completed').count()
-            
-            # Estadísticas de pagos (últimos 30 días)
-            thirty_days_ago = timezone.now() - timedelta(days=30)
-            payments_last_month = Payment.objects.filter(
-                status='approved',
-                created_at__gte=thirty_days_ago
-            )
-            
-            revenue_last_month = payments_last_month.aggregate(
-                total=Sum('amount', output_field=DecimalField())
-            )['total'] or Decimal('0.00')
-            
-            total_payments = Payment.objects.filter(status='approved').count()
-            total_revenue = Payment.objects.filter(status='approved').aggregate(
-                total=Sum('amount', output_field=DecimalField())
-            )['total'] or Decimal('0.00')
-            
-            # Estadísticas de certificados
-            total_certificates = Certificate.objects.count()
-            
-            # Cursos más populares (por enrollments)
-            # Solo mostrar cursos publicados y activos (los borradores no deberían aparecer en "más populares")
-            popular_courses = Course.objects.filter(
-                status='published',
-                is_active=True
-            ).annotate(
-                enrollment_count=Count('enrollments')
-            ).order_by('-enrollment_count')[:5]
-            
-            popular_courses_data = [
-                {
-                    'id': course.id,
-                    'title': course.title,
-                    'enrollments': course.enrollment_count,
-                    'status': course.status,
-                }
-                for course in popular_courses
-            ]
-            
-            # Ingresos por mes (últimos 6 meses)
-            six_months_ago = timezone.now() - timedelta(days=180)
-            revenue_by_month = Payment.objects.filter(
-                status='approved',
-                created_at__gte=six_months_ago
-            ).annotate(
-                month=TruncMonth('created_at')
-            ).values('month').annotate(
-                total=Sum('amount', output_field=DecimalField())
-            ).order_by('month')
-            
-            revenue_by_month_data = [
-                {
-                    'month': item['month'].strftime('%Y-%m'),
-                    'total': float(item['total']),
-                }
-                for item in revenue_by_month
-            ]
-            
-            stats = {
-                'courses': {
-                    'total': total_courses,
-                    'published': published_courses,
-                    'draft': draft_courses,
-                    'archived': archived_courses,
-                },
-                'users': {
-                    'total': total_users,
-                    'students': total_students,
-                    'instructors': total_instructors,
-                    'admins': total_admins,
-                },
-                'enrollments': {
-                    'total': total_enrollments,
-                    'active': active_enrollments,
-                    'completed': completed_enrollments,
-                },
-                'payments': {
-                    'total': total_payments,
-                    'total_revenue': float(total_revenue),
-                    'revenue_last_month': float(revenue_last_month),
-                },
-                'certificates': {
-                    'total': total_certificates,
-                },
-                'popular_courses': popular_courses_data,
-                'revenue_by_month': revenue_by_month_data,
-            }
+            # Una consulta agrupada por sección (ver AdminStatsService)
+            stats, _ = AdminStatsService().get_stats()
             
             logger.info(f"Estadísticas de admin obtenidas para usuario {user.id}")
             return True, stats, ""
@@ -0,0 +1,436 @@
+"""
+Servicio de Contadores de Progreso - FagSol Escuela Virtual
+
+Mantiene los contadores desnormalizados de Enrollment (completed_lessons y
+total_lessons) y el porcentaje de completitud derivado de ellos.
+
+- Marcar / desmarcar una lección aplica un incremento atómico con expresiones
+  F en un único UPDATE, sin contar lecciones ni progresos (O(1)).
+- Cuando cambian las lecciones de un curso se encola recompute_course_progress
+  (apps/users/tasks.py), que recalcula contadores, porcentaje y estado de
+  completitud de todas sus inscripciones por bloques (apps/courses/signals.py).
+- lesson_progress_rows() arma el progreso por lección de un curso en una
+  sola consulta (GET /progress/course/).
+- reconcile() recalcula los contadores desde LessonProgress, y con ellos el
+  porcentaje y el estado de completitud, para corregir cualquier desviación
+  (comando reconcile_enrollment_progress).
+- Cada cambio de porcentaje o estado se aplica a CourseStats en la misma
+  transacción (CourseStatsService) e invalida la caché de estadísticas de
+  los estudiantes afectados (StudentStatsCacheService). Un curso completado
+  que se reabre recalcula el rollup diario del día en que se había
+  completado (MetricsRollupService).
+"""
+
+import logging
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Callable, Dict, List, Optional
+
+from django.db.models import (
+    BooleanField, Case, Count, DecimalField, F, FilteredRelation, FloatField, OuterRef, Q, Subquery, Value,
+    When
+)
+from django.db.models.functions import Cast, Coalesce, Greatest
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.lookups import GreaterThan, GreaterThanOrEqual
+from django.utils import timezone
+
+from apps.courses.models import Lesson
+from apps.users.models import Enrollment, LessonProgress
+from infrastructure.services.course_stats_service import CourseStatsService
+from infrastructure.services.metrics_rollup_service import MetricsRollupService
+from infrastructure.services.student_stats_cache_service import StudentStatsCacheService
+
+logger = logging.getLogger('apps')
+
+
+class EnrollmentProgressService:
+    """
+    Servicio de contadores de progreso de inscripciones
+    """
+
+    BATCH_SIZE = 1000
+
+    # Recálculos encolados por curso: varios cambios seguidos de lecciones
+    # (p. ej. reordenar o editar varias) generan una sola tarea. La marca vive en
+    # la caché compartida: la pone el proceso web y la borra el worker de Celery
+    RECOMPUTE_PENDING_KEY = 'enrollment_progress:recompute:{course_id}'
+    RECOMPUTE_PENDING_TIMEOUT = 60 * 10
+
+    PROGRESS_FIELDS = [
+        'completed_lessons', 'total_lessons', 'completion_percentage',
+        'completed', 'completed_at', 'status', 'updated_at'
+    ]
+
+    @staticmethod
+    def count_active_lessons(course_id: str) -> int:
+        """Cantidad de lecciones activas de un curso"""
+        return Lesson.objects.filter(module__course_id=course_id, is_active=True).count()
+
+    @staticmethod
+    def count_active_lessons_by_course(course_ids: List[str]) -> Dict[str, int]:
+        """Cantidad de lecciones activas por curso, en una sola consulta agrupada"""
+        return dict(
+            Lesson.objects.filter(module__course_id__in=course_ids, is_active=True)
+            .order_by()
+            .values('module__course_id')
+            .annotate(total=Count('id'))
+            .values_list('module__course_id', 'total')
+        )
+
+    @staticmethod
+    def _percentage(completed, total):
+        """Expresión SQL del porcentaje de completitud (100 si no hay lecciones pendientes)"""
+        return Case(
+            When(GreaterThanOrEqual(completed, total), then=Value(Decimal('100.00'))),
+            default=Cast(
+                Cast(completed, FloatField()) * Value(100.0) / total,
+                DecimalField(max_digits=5, decimal_places=2)
+            ),
+            output_field=DecimalField(max_digits=5, decimal_places=2)
+        )
+
+    @staticmethod
+    def lesson_progress_rows(enrollment: Enrollment) -> List[tuple]:
+        """
+        Lecciones activas del curso con el progreso del enrollment, en una sola
+        consulta (LEFT JOIN de Lesson con LessonProgress) y en el orden del
+        temario (orden del módulo, orden de la lección).
+
+        Returns:
+            list: (lesson_id, lesson_title, module_id, module_title, is_completed,
+                progress_percentage, completed_at, last_accessed_at); los campos de
+                progreso son None si la lección no tiene progreso
+        """
+        return list(
+            Lesson.objects.filter(module__course_id=enrollment.course_id, is_active=True)
+            .annotate(progress=FilteredRelation(
+                'progresses',
+                condition=Q(progresses__enrollment_id=enrollment.id, progresses__user_id=enrollment.user_id)
+            ))
+            .order_by('module__order', 'order')
+            .values_list(
+                'id', 'title', 'module_id', 'module__title', 'progress__is_completed',
+                'progress__progress_percentage', 'progress__completed_at', 'progress__last_accessed_at'
+            )
+        )
+
+    def set_lesson_completed(self, lesson_progress: LessonProgress, completed: bool) -> bool:
+        """
+        Cambia is_completed de un LessonProgress con un UPDATE condicional.
+
+        Returns:
+            bool: True si este llamado hizo la transición (y debe ajustar los
+            contadores); False si la lección ya estaba en ese estado.
+        """
+        now = timezone.now()
+        values = {
+            'is_completed': completed,
+            'completed_at': now if completed else None,
+            'last_accessed_at': now,
+            'updated_at': now,
+        }
+        if completed:
+            values['progress_percentage'] = Decimal('100.00')
+
+        changed = LessonProgress.objects.filter(
+            pk=lesson_progress.pk, is_completed=not completed
+        ).update(**values)
+
+        if not changed:
+            # Otro request hizo la transición antes: devolver el estado real
+            lesson_progress.refresh_from_db()
+            return False
+        for field, value in values.items():
+            setattr(lesson_progress, field, value)
+        return True
+
+    def apply_completion_delta(self, enrollment: Enrollment, delta: int) -> Enrollment:
+        """
+        Suma (o resta) lecciones completadas al enrollment en un único UPDATE.
+
+        El porcentaje, el flag completed y el estado se derivan en la misma
+        sentencia a partir de los contadores, por lo que dos toggles
+        concurrentes nunca pierden un incremento. La fila se bloquea antes
+        para leer el estado anterior y aplicar el delta exacto a CourseStats.
+
+        Args:
+            enrollment: Instancia de Enrollment (se refresca con los valores nuevos)
+            delta: +1 al completar una lección, -1 al desmarcarla
+        """
+        completed = Greatest(F('completed_lessons') + Value(delta), Value(0))
+        total = F('total_lessons')
+        # Misma regla que _apply_counts: solo las inscripciones activas o completadas
+        # cambian de estado, y sin lecciones activas ninguna se marca completada
+        tracks_completion = Q(status__in=('active', 'completed'))
+        is_done = tracks_completion & GreaterThan(total, Value(0)) & GreaterThanOrEqual(completed, total)
+        now = timezone.now()
+
+        with transaction.atomic():
+            old_status, old_percentage, old_completed_at = Enrollment.objects.select_for_update().filter(
+                pk=enrollment.pk
+            ).values_list('status', 'completion_percentage', 'completed_at').get()
+
+            Enrollment.objects.filter(pk=enrollment.pk).update(
+                completed_lessons=completed,
+                completion_percentage=self._percentage(completed, total),
+                completed=Case(
+                    When(is_done, then=Value(True)),
+                    When(tracks_completion, then=Value(False)),
+                    default=F('completed')
+                ),
+                completed_at=Case(
+                    When(is_done, then=Coalesce(F('completed_at'), Value(now))),
+                    When(tracks_completion, then=Value(None)),
+                    default=F('completed_at')
+                ),
+                status=Case(
+                    When(is_done, then=Value('completed')),
+                    When(status='completed', then=Value('active')),
+                    default=F('status')
+                ),
+                updated_at=now,
+            )
+            enrollment.refresh_from_db(fields=self.PROGRESS_FIELDS)
+
+            CourseStatsService().apply_status_changes(
+                enrollment.course_id,
+                [(old_status, old_percentage, enrollment.status, enrollment.completion_percentage)]
+            )
+            StudentStatsCacheService().invalidate([enrollment.user_id])
+            if enrollment.completed_at is None:
+                MetricsRollupService().schedule_days([old_completed_at])
+
+        logger.info(
+            f"Enrollment {enrollment.id} actualizado: {enrollment.completion_percentage}% completado"
+        )
+        return enrollment
+
+    def schedule_course_recompute(self, course_id: str) -> None:
+        """
+        Encola el recálculo del progreso de un curso cuando se confirme la
+        transacción actual (agregar, activar, desactivar o eliminar lecciones).
+        """
+        transaction.on_commit(lambda: self._enqueue_course_recompute(course_id))
+
+    def _enqueue_course_recompute(self, course_id: str) -> None:
+        pending_key = self.RECOMPUTE_PENDING_KEY.format(course_id=course_id)
+        if not cache.add(pending_key, True, self.RECOMPUTE_PENDING_TIMEOUT):
+            # Ya hay un recálculo encolado que todavía no empezó
+            return
+
+        from apps.users.tasks import recompute_course_progress
+        try:
+            recompute_course_progress.delay(course_id)
+        except Exception as e:
+            # Sin broker disponible: recalcular en el proceso para no dejar contadores viejos
+            logger.warning(f"No se pudo encolar el recálculo del curso {course_id}: {str(e)}")
+            cache.delete(pending_key)
+            self.recompute_course(course_id)
+
+    def recompute_course(
+        self,
+        course_id: str,
+        on_progress: Optional[Callable[[int, int], None]] = None
+    ) -> int:
+        """
+        Recalcula contadores, porcentaje y estado de completitud de todas las
+        inscripciones de un curso, en bloques de BATCH_SIZE.
+
+        Por bloque: una consulta agrupada de lecciones completadas (solo
+        lecciones activas) y un bulk_update de las inscripciones que cambiaron.
+        Las filas del bloque se bloquean mientras se recalculan para no pisar
+        un toggle concurrente.
+
+        Args:
+            course_id: ID del curso
+            on_progress: Callback opcional (procesadas, total) tras cada bloque
+
+        Returns:
+            int: Número de inscripciones actualizadas
+        """
+        cache.delete(self.RECOMPUTE_PENDING_KEY.format(course_id=course_id))
+
+        total_lessons = self.count_active_lessons(course_id)
+        enrollments = Enrollment.objects.filter(course_id=course_id).order_by('pk')
+        total_enrollments = enrollments.count()
+        processed = updated = 0
+        last_pk = None
+
+        while True:
+            with transaction.atomic():
+                chunk_qs = enrollments if last_pk is None else enrollments.filter(pk__gt=last_pk)
+                chunk = list(chunk_qs.select_for_update()[:self.BATCH_SIZE])
+                if not chunk:
+                    break
+                last_pk = chunk[-1].pk
+
+                completed_counts = dict(
+                    LessonProgress.objects.filter(
+                        enrollment_id__in=[enrollment.pk for enrollment in chunk],
+                        is_completed=True,
+                        lesson__is_active=True
+                    )
+                    .order_by()
+                    .values('enrollment_id')
+                    .annotate(total=Count('id'))
+                    .values_list('enrollment_id', 'total')
+                )
+
+                now = timezone.now()
+                previous = {
+                    enrollment.pk: (enrollment.status, enrollment.completion_percentage)
+                    for enrollment in chunk
+                }
+                previous_completed_at = {enrollment.pk: enrollment.completed_at for enrollment in chunk}
+                changed = [
+                    enrollment for enrollment in chunk
+                    if self._apply_counts(enrollment, completed_counts.get(enrollment.pk, 0), total_lessons, now)
+                ]
+                if changed:
+                    Enrollment.objects.bulk_update(changed, self.PROGRESS_FIELDS)
+                    CourseStatsService().apply_status_changes(course_id, [
+                        (*previous[enrollment.pk], enrollment.status, enrollment.completion_percentage)
+                        for enrollment in changed
+                    ])
+                    StudentStatsCacheService().invalidate(enrollment.user_id for enrollment in changed)
+                    MetricsRollupService().schedule_days(
+                        previous_completed_at[enrollment.pk] for enrollment in changed
+                        if enrollment.completed_at is None
+                    )
+
+            processed += len(chunk)
+            updated += len(changed)
+            if on_progress:
+                on_progress(processed, total_enrollments)
+
+        logger.info(
+            f"Progreso recalculado para el curso {course_id}: "
+            f"{updated} de {processed} inscripciones actualizadas"
+        )
+        return updated
+
+    @staticmethod
+    def _apply_counts(enrollment: Enrollment, completed: int, total: int, now) -> bool:
+        """
+        Aplica los contadores recalculados a la instancia (misma regla que
+        apply_completion_delta). Solo las inscripciones activas o completadas
+        cambian de estado; sin lecciones activas ninguna se marca completada.
+
+        Returns:
+            bool: True si algún campo cambió
+        """
+        if completed >= total:
+            percentage = Decimal('100.00')
+        else:
+            percentage = (Decimal(completed * 100) / total).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+        values = {
+            'completed_lessons': completed,
+            'total_lessons': total,
+            'completion_percentage': percentage,
+        }
+        if enrollment.status in ('active', 'completed'):
+            is_done = total > 0 and completed >= total
+            values['completed'] = is_done
+            values['completed_at'] = (enrollment.completed_at or now) if is_done else None
+            values['status'] = 'completed' if is_done else 'active'
+
+        changed = any(getattr(enrollment, field) != value for field, value in values.items())
+        if changed:
+            for field, value in values.items():
+                setattr(enrollment, field, value)
+            enrollment.updated_at = now
+        return changed
+
+    def reconcile(self, course_id: Optional[str] = None) -> int:
+        """
+        Recalcula los contadores desde Lesson y LessonProgress y corrige las
+        inscripciones cuyo valor guardado no coincide. Porcentaje, completed,
+        completed_at y estado se derivan en el mismo UPDATE con la regla de
+        _apply_counts, así que también se corrigen las inscripciones con los
+        contadores bien pero el estado de completitud desviado.
+
+        Args:
+            course_id: Limitar a un curso (por defecto, todas las inscripciones)
+
+        Returns:
+            int: Número de inscripciones corregidas
+        """
+        actual_total = Coalesce(
+            Subquery(
+                Lesson.objects.filter(module__course_id=OuterRef('course_id'), is_active=True)
+                .order_by()
+                .values('module__course_id')
+                .annotate(total=Count('id'))
+                .values('total')[:1]
+            ),
+            0
+        )
+        actual_completed = Coalesce(
+            Subquery(
+                LessonProgress.objects.filter(
+                    enrollment_id=OuterRef('pk'), is_completed=True, lesson__is_active=True
+                )
+                .order_by()
+                .values('enrollment_id')
+                .annotate(total=Count('id'))
+                .values('total')[:1]
+            ),
+            0
+        )
+
+        # Solo las inscripciones activas o completadas cambian de estado
+        tracks_completion = Q(status__in=('active', 'completed'))
+        is_done = GreaterThan(actual_total, Value(0)) & GreaterThanOrEqual(actual_completed, actual_total)
+
+        enrollments = Enrollment.objects.all()
+        if course_id:
+            enrollments = enrollments.filter(course_id=course_id)
+
+        drifted_rows = list(
+            enrollments.annotate(
+                actual_total=actual_total,
+                actual_completed=actual_completed,
+                actual_done=Case(When(is_done, then=Value(True)), default=Value(False), output_field=BooleanField()),
+            )
+            .filter(
+                ~Q(total_lessons=F('actual_total'))
+                | ~Q(completed_lessons=F('actual_completed'))
+                | (tracks_completion & ~Q(completed=F('actual_done')))
+            )
+            .values_list('pk', 'course_id', 'user_id', 'completed_at')
+        )
+        drifted = [pk for pk, _, _, _ in drifted_rows]
+
+        for start in range(0, len(drifted), self.BATCH_SIZE):
+            now = timezone.now()
+            Enrollment.objects.filter(pk__in=drifted[start:start + self.BATCH_SIZE]).update(
+                total_lessons=actual_total,
+                completed_lessons=actual_completed,
+                completion_percentage=self._percentage(actual_completed, actual_total),
+                completed=Case(
+                    When(tracks_completion & is_done, then=Value(True)),
+                    When(tracks_completion, then=Value(False)),
+                    default=F('completed')
+                ),
+                completed_at=Case(
+                    When(tracks_completion & is_done, then=Coalesce(F('completed_at'), Value(now))),
+                    When(tracks_completion, then=Value(None)),
+                    default=F('completed_at')
+                ),
+                status=Case(
+                    When(tracks_completion & is_done, then=Value('completed')),
+                    When(tracks_completion, then=Value('active')),
+                    default=F('status')
+                ),
+                updated_at=now,
+            )
+
+        if drifted:
+            # El porcentaje cambió con UPDATE ... SET = subconsulta: recalcular los cursos afectados
+            CourseStatsService().refresh({course_id for _, course_id, _, _ in drifted_rows})
+            StudentStatsCacheService().invalidate(user_id for _, _, user_id, _ in drifted_rows)
+            MetricsRollupService().schedule_days(completed_at for _, _, _, completed_at in drifted_rows)
+            logger.warning(f"Contadores de progreso corregidos en {len(drifted)} inscripciones")
+        return len(drifted)
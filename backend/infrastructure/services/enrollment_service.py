@@ -0,0 +1,179 @@
+"""
+Servicio de Inscripciones - FagSol Escuela Virtual
+
+Crea inscripciones en bloque para un usuario (pago aprobado, webhook de
+Mercado Pago o alta manual desde administración):
+
+- Los cursos y sus lecciones activas se leen con una consulta cada uno.
+- Las inscripciones nuevas se insertan con un solo bulk_create que ignora las
+  que ya existen (restricción única user + course), así los reintentos y los
+  webhooks duplicados no fallan.
+- bulk_create no dispara pre_save, por lo que total_lessons se asigna aquí.
+- Con un pago, las inscripciones existentes vencidas o canceladas se
+  reactivan con ese pago (el estudiante pagó de nuevo por el acceso).
+- Las estadísticas por curso (CourseStats) se actualizan en la misma
+  transacción que el alta (CourseStatsService.record_enrollments) y se
+  invalida la caché de estadísticas del estudiante.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Iterable, List
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.courses.models import Course
+from apps.users.models import Enrollment
+from infrastructure.services.course_stats_service import CourseStatsService
+from infrastructure.services.enrollment_progress_service import EnrollmentProgressService
+from infrastructure.services.student_stats_cache_service import StudentStatsCacheService
+
+logger = logging.getLogger('apps')
+
+
+@dataclass
+class BulkEnrollmentResult:
+    """
+    Inscripciones creadas, reactivadas por un pago, las que ya existían y los
+    títulos de los cursos (en el orden pedido)
+    """
+    created: List[Enrollment] = field(default_factory=list)
+    reactivated: List[Enrollment] = field(default_factory=list)
+    existing: List[Enrollment] = field(default_factory=list)
+    course_titles: List[str] = field(default_factory=list)
+    missing_course_ids: List[str] = field(default_factory=list)
+
+    @property
+    def enrollments(self) -> List[Enrollment]:
+        return self.created + self.reactivated + self.existing
+
+
+class EnrollmentService:
+    """
+    Servicio de creación de inscripciones en bloque
+    """
+
+    # Estados que un pago nuevo vuelve a activar
+    REACTIVABLE_STATUSES = ('expired', 'cancelled')
+
+    def enroll(self, user, course_ids: Iterable[str], payment=None, status: str = 'active') -> BulkEnrollmentResult:
+        """
+        Inscribe a un usuario en varios cursos con un número fijo de consultas.
+
+        Args:
+            user: Usuario a inscribir
+            course_ids: IDs de los cursos (se ignoran duplicados y cursos inexistentes)
+            payment: Pago que origina las inscripciones (None en altas manuales);
+                reactiva las inscripciones vencidas o canceladas de esos cursos
+            status: Estado inicial de las inscripciones nuevas (y de las reactivadas)
+
+        Returns:
+            BulkEnrollmentResult
+        """
+        requested = list(dict.fromkeys(str(course_id) for course_id in course_ids))
+        result = BulkEnrollmentResult()
+        if not requested:
+            return result
+
+        titles = dict(Course.objects.filter(id__in=requested).values_list('id', 'title'))
+        result.missing_course_ids = [course_id for course_id in requested if course_id not in titles]
+        if result.missing_course_ids:
+            logger.warning(f"Cursos no encontrados al inscribir al usuario {user.id}: {result.missing_course_ids}")
+
+        course_ids_found = [course_id for course_id in requested if course_id in titles]
+        result.course_titles = [titles[course_id] for course_id in course_ids_found]
+        if not course_ids_found:
+            return result
+
+        lesson_totals = EnrollmentProgressService.count_active_lessons_by_course(course_ids_found)
+        candidates = [
+            Enrollment(
+                user=user,
+                course_id=course_id,
+                payment=payment,
+                status=status,
+                completed=False,
+                total_lessons=lesson_totals.get(course_id, 0),
+            )
+            for course_id in course_ids_found
+        ]
+        with transaction.atomic():
+            Enrollment.objects.bulk_create(candidates, ignore_conflicts=True)
+
+            # Los IDs se generan en la aplicación: los que están en la base son los insertados
+            candidate_ids = {enrollment.id for enrollment in candidates}
+            by_course = {
+                enrollment.course_id: enrollment
+                for enrollment in Enrollment.objects.filter(user=user, course_id__in=course_ids_found)
+            }
+            for course_id in course_ids_found:
+                enrollment = by_course.get(course_id)
+                if enrollment is None:
+                    continue
+                if enrollment.id in candidate_ids:
+                    result.created.append(enrollment)
+                else:
+                    result.existing.append(enrollment)
+
+            stale_payment_ids = []
+            if payment is not None:
+                stale_payment_ids = self._reactivate(result, payment, status)
+
+            if result.reactivated:
+                # El pago (y su reparto de ingresos) cambió en filas existentes: recalcular
+                course_ids = {enrollment.course_id for enrollment in result.created + result.reactivated}
+                course_ids.update(
+                    Enrollment.objects.filter(payment_id__in=stale_payment_ids).values_list('course_id', flat=True)
+                )
+                CourseStatsService().refresh(course_ids)
+            else:
+                CourseStatsService().record_enrollments(result.created, payment=payment)
+            if result.created or result.reactivated:
+                StudentStatsCacheService().invalidate([user.id])
+
+        logger.info(
+            f"Inscripciones para usuario {user.id}: {len(result.created)} creadas, "
+            f"{len(result.reactivated)} reactivadas, {len(result.existing)} ya existentes"
+        )
+        return result
+
+    def _reactivate(self, result: BulkEnrollmentResult, payment, status: str) -> List[str]:
+        """
+        Reactiva con el pago las inscripciones existentes vencidas o canceladas
+        (las mueve de result.existing a result.reactivated). Las filas se
+        bloquean antes para no pisar un cambio concurrente.
+
+        Returns:
+            list: IDs de los pagos que tenían antes esas inscripciones
+        """
+        candidates = [
+            enrollment.pk for enrollment in result.existing if enrollment.status in self.REACTIVABLE_STATUSES
+        ]
+        if not candidates:
+            return []
+
+        stale = dict(
+            Enrollment.objects.select_for_update()
+            .filter(pk__in=candidates, status__in=self.REACTIVABLE_STATUSES)
+            .order_by('pk')
+            .values_list('pk', 'payment_id')
+        )
+        if not stale:
+            return []
+
+        values = {'status': status, 'payment': payment, 'expires_at': None, 'updated_at': timezone.now()}
+        Enrollment.objects.filter(pk__in=stale).update(**values)
+
+        existing = []
+        for enrollment in result.existing:
+            if enrollment.pk in stale:
+                for name, value in values.items():
+                    setattr(enrollment, name, value)
+                result.reactivated.append(enrollment)
+            else:
+                existing.append(enrollment)
+        result.existing = existing
+
+        logger.info(f"Inscripciones reactivadas con el pago {payment.id}: {sorted(stale)}")
+        return [payment_id for payment_id in stale.values() if payment_id and payment_id != payment.id]
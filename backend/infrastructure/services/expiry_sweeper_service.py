@@ -0,0 +1,115 @@
+"""
+Servicio de Barrido de Vencimientos - FagSol Escuela Virtual
+
+Pasa a su estado final, en bloque, los registros cuyo expires_at ya venció:
+
+- PaymentIntent pendiente -> 'cancelled' (el mismo estado que asigna
+  process_payment al detectar un intent vencido).
+- Enrollment activo -> 'expired' (las vistas de acceso filtran por 'active').
+
+Cada bloque es un único UPDATE ... WHERE pk IN (SELECT ... WHERE expires_at < now
+LIMIT n), repetido hasta que no quedan filas, para no bloquear la tabla entera
+en una sola transacción larga. Las consultas usan los índices parciales
+payment_intent_pending_exp_idx y enrollment_active_exp_idx.
+
+Las inscripciones vencidas de cada bloque se bloquean y se descuentan de las
+inscripciones activas de su curso (CourseStats) en la misma transacción, y se
+invalida la caché de estadísticas de sus estudiantes.
+
+Se ejecuta periódicamente con celery beat (apps/payments/tasks.py) o con el
+comando expire_stale_records. Los conteos se registran como métricas en el log.
+"""
+
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from apps.payments.models import PaymentIntent
+from apps.users.models import Enrollment
+from infrastructure.services.course_stats_service import CourseStatsService
+from infrastructure.services.student_stats_cache_service import StudentStatsCacheService
+
+logger = logging.getLogger('apps')
+
+
+class ExpirySweeperService:
+    """
+    Servicio de barrido de payment intents e inscripciones vencidas
+    """
+
+    BATCH_SIZE = 1000
+
+    def __init__(self, batch_size: Optional[int] = None):
+        self.batch_size = batch_size or self.BATCH_SIZE
+
+    def expired_payment_intents(self, now: datetime) -> QuerySet:
+        return PaymentIntent.objects.filter(status='pending', expires_at__lt=now)
+
+    def expired_enrollments(self, now: datetime) -> QuerySet:
+        return Enrollment.objects.filter(status='active', expires_at__lt=now)
+
+    def sweep(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Barre intents e inscripciones vencidas.
+
+        Returns:
+            dict: {'payment_intents_expired': n, 'enrollments_expired': n}
+        """
+        now = now or timezone.now()
+        counts = {
+            'payment_intents_expired': self._sweep(self.expired_payment_intents(now), status='cancelled', now=now),
+            'enrollments_expired': self._sweep_enrollments(now),
+        }
+
+        # Métricas en formato clave=valor para el agregador de logs
+        logger.info('expiry_sweep ' + ' '.join(f'{name}={value}' for name, value in counts.items()))
+        return counts
+
+    def pending_counts(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Filas que el próximo barrido actualizaría (sin modificar nada)"""
+        now = now or timezone.now()
+        return {
+            'payment_intents_expired': self.expired_payment_intents(now).count(),
+            'enrollments_expired': self.expired_enrollments(now).count(),
+        }
+
+    def _sweep(self, expired: QuerySet, status: str, now: datetime) -> int:
+        """Actualiza las filas vencidas en bloques de batch_size (un UPDATE por bloque)"""
+        total = 0
+        while True:
+            batch = expired.order_by().values('pk')[:self.batch_size]
+            # La condición se repite en el UPDATE: una fila cambiada mientras tanto no se pisa
+            updated = expired.filter(pk__in=batch).update(status=status, updated_at=now)
+            total += updated
+            if updated < self.batch_size:
+                return total
+
+    def _sweep_enrollments(self, now: datetime) -> int:
+        """
+        Vence inscripciones en bloques de batch_size: las filas del bloque se
+        bloquean, se actualizan con un UPDATE y se descuentan de CourseStats.
+        """
+        expired = self.expired_enrollments(now)
+        stats_service = CourseStatsService()
+        total = 0
+        while True:
+            with transaction.atomic():
+                batch = list(
+                    expired.select_for_update().order_by().values_list('pk', 'course_id', 'user_id')[:self.batch_size]
+                )
+                updated = Enrollment.objects.filter(pk__in=[pk for pk, _, _ in batch]).update(
+                    status='expired', updated_at=now
+                )
+                expired_by_course = Counter(course_id for _, course_id, _ in batch)
+                stats_service.apply_deltas({
+                    course_id: {'active_enrollments': -count} for course_id, count in expired_by_course.items()
+                })
+                StudentStatsCacheService().invalidate(user_id for _, _, user_id in batch)
+            total += updated
+            if updated < self.batch_size:
+                return total
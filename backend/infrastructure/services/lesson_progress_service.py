@@ -20,6 +20,7 @@ from django.db import transaction
 from django.utils import timezone
 from apps.users.models import Enrollment, LessonProgress
 from apps.courses.models import Lesson, Course
+from infrastructure.services.enrollment_progress_service import EnrollmentProgressService
 
 logger = logging.getLogger('apps')
 
@@ -76,13 +77,13 @@ class LessonProgressService:
                     }
                 )
                 
-                # Si ya existe, actualizar
-                if not created:
-                    if not lesson_progress.is_completed:
-                        lesson_progress.mark_as_completed()
+                # Si ya existe, actualizar (solo cuenta si este request hizo la transición)
+                progress_service = EnrollmentProgressService()
+                newly_completed = created or progress_service.set_lesson_completed(lesson_progress, True)
                 
-                # 4. Actualizar porcentaje de completitud del enrollment
-                self._update_enrollment_progress(enrollment)
+                # 4. Actualizar contadores y porcentaje del enrollment (UPDATE atómico)
+                if newly_completed:
+                    progress_service.apply_completion_delta(enrollment, 1)
                 
                 logger.info(f"Lección {lesson_id} marcada como completada por usuario {user.id}")
                 return True, lesson_progress, ""
@@ -137,10 +138,10 @@ class LessonProgressService:
             
             # 4. Marcar como incompleta
             with transaction.atomic():
-                lesson_progress.mark_as_incomplete()
-                
-                # 5. Actualizar porcentaje de completitud del enrollment
-                self._update_enrollment_progress(enrollment)
+                progress_service = EnrollmentProgressService()
+                if progress_service.set_lesson_completed(lesson_progress, False):
+                    # 5. Actualizar contadores y porcentaje del enrollment (UPDATE atómico)
+                    progress_service.apply_completion_delta(enrollment, -1)
                 
                 logger.info(f"Lección {lesson_id} marcada como incompleta por usuario {user.id}")
                 return True, lesson_progress, ""
@@ -224,43 +225,28 @@ class LessonProgressService:
             except Enrollment.DoesNotExist:
                 return False, None, "Enrollment no encontrado o no tienes acceso"
             
-            course = enrollment.course
-            
-            # Obtener todas las lecciones activas del curso
-            lessons = Lesson.objects.filter(
-                module__course=course,
-                is_active=True
-            ).select_related('module').order_by('module__order', 'order')
-            
-            # Obtener todos los progresos del usuario para este enrollment
-            progresses = LessonProgress.objects.filter(
-                user=user,
-                enrollment=enrollment
-            ).select_related('lesson')
-            
-            # Crear dict de progresos por lesson_id
-            progress_dict = {p.lesson_id: p for p in progresses}
+            # Lecciones activas con su progreso en una sola consulta
+            rows = EnrollmentProgressService.lesson_progress_rows(enrollment)
             
             # Construir respuesta
             lessons_progress = {}
             completed_count = 0
             
-            for lesson in lessons:
-                progress = progress_dict.get(lesson.id)
-                lessons_progress[lesson.id] = {
-                    'lesson_id': lesson.id,
-                    'lesson_title': lesson.title,
-                    'module_id': lesson.module.id,
-                    'module_title': lesson.module.title,
-                    'is_completed': progress.is_completed if progress else False,
-                    'progress_percentage': float(progress.progress_percentage) if progress else 0.0,
-                    'completed_at': progress.completed_at.isoformat() if progress and progress.completed_at else None,
-                    'last_accessed_at': progress.last_accessed_at.isoformat() if progress else None,
+            for lesson_id, lesson_title, module_id, module_title, is_completed, percentage, completed_at, last_accessed_at in rows:
+                lessons_progress[lesson_id] = {
+                    'lesson_id': lesson_id,
+                    'lesson_title': lesson_title,
+                    'module_id': module_id,
+                    'module_title': module_title,
+                    'is_completed': bool(is_completed),
+                    'progress_percentage': float(percentage) if percentage is not None else 0.0,
+                    'completed_at': completed_at.isoformat() if completed_at else None,
+                    'last_accessed_at': last_accessed_at.isoformat() if last_accessed_at else None,
                 }
-                if lessons_progress[lesson.id]['is_completed']:
+                if is_completed:
                     completed_count += 1
             
-            total_lessons = len(lessons)
+            total_lessons = len(rows)
             completion_percentage = (completed_count / total_lessons * 100) if total_lessons > 0 else 0.0
             
             result = {
@@ -281,61 +267,3 @@ class LessonProgressService:
         except Exception as e:
             logger.error(f"Error al obtener progreso del curso: {str(e)}")
             return False, None, f"Error al obtener progreso del curso: {str(e)}"
-    
-    def _update_enrollment_progress(self, enrollment: Enrollment):
-        """
-        Actualiza el porcentaje de completitud del enrollment basado en las lecciones completadas
-        
-        Args:
-            enrollment: Instancia de Enrollment
-        """
-        try:
-            course = enrollment.course
-            
-            # Obtener todas las lecciones activas del curso
-            total_lessons = Lesson.objects.filter(
-                module__course=course,
-                is_active=True
-            ).count()
-            
-            if total_lessons == 0:
-                # Si no hay lecciones, el curso está 100% completo (vacío)
-                enrollment.completion_percentage = Decimal('100.00')
-                enrollment.completed = True
-                enrollment.completed_at = timezone.now()
-                enrollment.status = 'completed'
-                enrollment.save()
-                return
-            
-            # Contar lecciones completadas
-            completed_lessons = LessonProgress.objects.filter(
-                user=enrollment.user,
-                enrollment=enrollment,
-                is_completed=True
-            ).count()
-            
-            # Calcular porcentaje
-            completion_percentage = Decimal(str(round(completed_lessons / total_lessons * 100, 2)))
-            
-            # Actualizar enrollment
-            enrollment.completion_percentage = completion_percentage
-            
-            # Si todas las lecciones están completadas, marcar curso como completado
-            if completed_lessons == total_lessons:
-                enrollment.completed = True
-                enrollment.completed_at = timezone.now()
-                enrollment.status = 'completed'
-            else:
-                enrollment.completed = False
-                enrollment.completed_at = None
-                if enrollment.status == 'completed':
-                    enrollment.status = 'active'
-            
-            enrollment.save()
-            
-            logger.info(f"Enrollment {enrollment.id} actualizado: {completion_percentage}% completado")
-            
-        except Exception as e:
-            logger.error(f"Error al actualizar progreso del enrollment: {str(e)}")
-            raise
-
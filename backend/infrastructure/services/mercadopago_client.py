@@ -0,0 +1,397 @@
+"""
+Cliente HTTP de Mercado Pago - FagSol Escuela Virtual
+
+Transporte compartido por PaymentService (a través del SDK) y
+MercadoPagoPaymentGateway:
+
+- Una sesión keep-alive por proceso con pool de conexiones: las llamadas
+  reutilizan la conexión TLS en lugar de negociar una nueva por request
+  (el HttpClient por defecto del SDK crea una sesión por llamada).
+- Timeouts (conexión, lectura) por operación, configurables con
+  MERCADOPAGO_TIMEOUTS.
+- Circuit breaker compartido en la caché: tras MERCADOPAGO_BREAKER_THRESHOLD
+  fallos seguidos (timeouts, errores de conexión o 5xx) las llamadas fallan
+  de inmediato con MercadoPagoCircuitOpenError durante
+  MERCADOPAGO_BREAKER_COOLDOWN segundos; luego se deja pasar una sola
+  llamada de prueba (half-open) que cierra o vuelve a abrir el circuito.
+- Histogramas de latencia y contadores de errores por operación en la caché
+  (metrics()), además de una línea clave=valor en el log por llamada.
+
+Las llamadas no se reintentan: crear un pago no es idempotente.
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from mercadopago.http import HttpClient
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger('apps')
+
+DEFAULT_API_URL = 'https://api.mercadopago.com'
+
+
+class MercadoPagoUnavailableError(Exception):
+    """Mercado Pago no respondió (timeout, error de conexión o 5xx)"""
+
+
+class MercadoPagoCircuitOpenError(MercadoPagoUnavailableError):
+    """El circuit breaker está abierto: la llamada no se envió"""
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Sesión HTTP compartida por el proceso (pool de conexiones keep-alive)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                pool_size = getattr(settings, 'MERCADOPAGO_POOL_SIZE', 10)
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+def reset_session() -> None:
+    """Cierra la sesión compartida (se recrea en la siguiente llamada)"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+class MercadoPagoClient(HttpClient):
+    """
+    Cliente HTTP de Mercado Pago con pool de conexiones, timeouts por
+    operación, circuit breaker y métricas.
+
+    Extiende el HttpClient del SDK (request/get/post/put/delete), de modo
+    que se puede pasar como mercadopago.SDK(token, http_client=...).
+    """
+
+    KEY_PREFIX = 'mercadopago'
+
+    # (conexión, lectura) en segundos
+    DEFAULT_TIMEOUTS = {
+        'card_token': (3.05, 10),
+        'payment_create': (3.05, 30),
+        'payment_get': (3.05, 10),
+        'preference_create': (3.05, 15),
+        'other': (3.05, 20),
+    }
+
+    # Límites superiores de los buckets del histograma de latencia (ms)
+    LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    ERROR_KINDS = ('timeout', 'connection', 'server_error', 'client_error', 'circuit_open')
+
+    METRICS_TIMEOUT = 60 * 60 * 24 * 7
+
+    def __init__(self, access_token: Optional[str] = None, base_url: Optional[str] = None):
+        self.access_token = access_token if access_token is not None else getattr(settings, 'MERCADOPAGO_ACCESS_TOKEN', '')
+        self.base_url = (base_url or getattr(settings, 'MERCADOPAGO_API_URL', DEFAULT_API_URL)).rstrip('/')
+        self.timeouts = {**self.DEFAULT_TIMEOUTS, **getattr(settings, 'MERCADOPAGO_TIMEOUTS', {})}
+        self.breaker_threshold = getattr(settings, 'MERCADOPAGO_BREAKER_THRESHOLD', 5)
+        self.breaker_cooldown = getattr(settings, 'MERCADOPAGO_BREAKER_COOLDOWN', 30)
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def call(
+        self,
+        operation: str,
+        method: str,
+        path: str,
+        json_body: Optional[Dict] = None,
+        data: Optional[str] = None,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+    ) -> Dict:
+        """
+        Ejecuta una llamada a la API de Mercado Pago.
+
+        Args:
+            operation: Nombre de la operación (define el timeout y las métricas)
+            method: Método HTTP
+            path: Ruta relativa (ej: /v1/payments) o URL absoluta de la API
+
+        Returns:
+            dict: {'status': código HTTP, 'response': cuerpo JSON} (mismo formato que el SDK)
+
+        Raises:
+            MercadoPagoCircuitOpenError: Circuito abierto (no se envió la llamada)
+            MercadoPagoUnavailableError: Timeout, error de conexión o respuesta 5xx
+        """
+        if not self._allow_request():
+            self._record(operation, None, 'circuit_open')
+            raise MercadoPagoCircuitOpenError(
+                "Mercado Pago no está disponible temporalmente. Intenta nuevamente en unos minutos."
+            )
+
+        request_headers = {
+            'Authorization': f'Bearer {self.access_token}',
+            'Content-Type': 'application/json',
+        }
+        request_headers.update(headers or {})
+
+        started = time.monotonic()
+        try:
+            response = get_session().request(
+                method,
+                self._url(path),
+                json=json_body,
+                data=data,
+                params=params,
+                headers=request_headers,
+                timeout=self.timeouts.get(operation, self.timeouts['other']),
+            )
+        except requests.Timeout as e:
+            self._record(operation, self._elapsed_ms(started), 'timeout')
+            self._record_failure()
+            raise MercadoPagoUnavailableError(f"Mercado Pago no respondió a tiempo ({operation})") from e
+        except requests.RequestException as e:
+            self._record(operation, self._elapsed_ms(started), 'connection')
+            self._record_failure()
+            raise MercadoPagoUnavailableError(f"Error de conexión con Mercado Pago ({operation}): {str(e)}") from e
+
+        elapsed_ms = self._elapsed_ms(started)
+        if response.status_code >= 500:
+            self._record(operation, elapsed_ms, 'server_error', response.status_code)
+            self._record_failure()
+            raise MercadoPagoUnavailableError(
+                f"Mercado Pago respondió {response.status_code} ({operation})"
+            )
+
+        # Un 4xx es una respuesta válida de la API (datos rechazados), no una caída
+        self._record(operation, elapsed_ms, 'client_error' if response.status_code >= 400 else None, response.status_code)
+        self._record_success()
+
+        try:
+            body = response.json() if response.content else {}
+        except ValueError:
+            body = {}
+        return {'status': response.status_code, 'response': body}
+
+    def create_card_token(self, card_data: Dict) -> Dict:
+        return self.call('card_token', 'POST', '/v1/card_tokens', json_body=card_data)
+
+    def create_payment(self, payment_data: Dict, idempotency_key: Optional[str] = None) -> Dict:
+        headers = {'X-Idempotency-Key': idempotency_key} if idempotency_key else None
+        return self.call('payment_create', 'POST', '/v1/payments', json_body=payment_data, headers=headers)
+
+    def get_payment(self, payment_id: str) -> Dict:
+        return self.call('payment_get', 'GET', f'/v1/payments/{payment_id}')
+
+    def create_preference(self, preference_data: Dict) -> Dict:
+        return self.call('preference_create', 'POST', '/checkout/preferences', json_body=preference_data)
+
+    # ------------------------------------------------------------------
+    # Interfaz HttpClient del SDK de Mercado Pago
+    # ------------------------------------------------------------------
+
+    def request(self, method, url, maxretries=None, **kwargs):
+        """
+        Punto de entrada del SDK. Se ignoran maxretries y el timeout del SDK:
+        rigen los timeouts por operación y no se reintenta.
+        """
+        headers = dict(kwargs.get('headers') or {})
+        # El cliente pone su propio token; el SDK ya lo incluye en los headers
+        headers.pop('Authorization', None)
+        data = kwargs.get('data')
+        if isinstance(data, (dict, list)):
+            data = json.dumps(data)
+        return self.call(
+            self.operation_for(method, url),
+            method,
+            url,
+            data=data,
+            params=kwargs.get('params'),
+            headers=headers,
+        )
+
+    def get(self, url, headers, params=None, timeout=None, maxretries=None):
+        return self.request('GET', url, headers=headers, params=params)
+
+    def post(self, url, headers, data=None, params=None, timeout=None, maxretries=None):
+        return self.request('POST', url, headers=headers, data=data, params=params)
+
+    def put(self, url, headers, data=None, params=None, timeout=None, maxretries=None):
+        return self.request('PUT', url, headers=headers, data=data, params=params)
+
+    def delete(self, url, headers, params=None, timeout=None, maxretries=None):
+        return self.request('DELETE', url, headers=headers, params=params)
+
+    @staticmethod
+    def operation_for(method: str, url: str) -> str:
+        """Operación (timeout y métricas) correspondiente a una llamada del SDK"""
+        path = urlsplit(url).path.rstrip('/')
+        method = method.upper()
+        if path == '/v1/card_tokens' and method == 'POST':
+            return 'card_token'
+        if path == '/v1/payments' and method == 'POST':
+            return 'payment_create'
+        if path.startswith('/v1/payments/') and method == 'GET':
+            return 'payment_get'
+        if path == '/checkout/preferences' and method == 'POST':
+            return 'preference_create'
+        return 'other'
+
+    def _url(self, path: str) -> str:
+        """
+        URL final de la llamada. Las URLs absolutas del SDK apuntan siempre a
+        la API pública; se redirigen a MERCADOPAGO_API_URL (ej: el servidor
+        falso de los tests).
+        """
+        if path.startswith(DEFAULT_API_URL):
+            path = path[len(DEFAULT_API_URL):]
+        if path.startswith('http://') or path.startswith('https://'):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    # ------------------------------------------------------------------
+    # Circuit breaker
+    # ------------------------------------------------------------------
+
+    def _key(self, *parts) -> str:
+        return ':'.join([self.KEY_PREFIX, *map(str, parts)])
+
+    def circuit_state(self) -> str:
+        """'closed', 'open' o 'half_open'"""
+        opened_at = cache.get(self._key('breaker', 'opened_at'))
+        if opened_at is None:
+            return 'closed'
+        if time.time() - opened_at < self.breaker_cooldown:
+            return 'open'
+        return 'half_open'
+
+    def _allow_request(self) -> bool:
+        state = self.circuit_state()
+        if state == 'closed':
+            return True
+        if state == 'open':
+            return False
+        # Half-open: una sola llamada de prueba por ventana de enfriamiento
+        return cache.add(self._key('breaker', 'probe'), True, self.breaker_cooldown)
+
+    def _record_failure(self) -> None:
+        failures_key = self._key('breaker', 'failures')
+        cache.add(failures_key, 0, self.METRICS_TIMEOUT)
+        try:
+            failures = cache.incr(failures_key)
+        except ValueError:
+            failures = 1
+
+        state = self.circuit_state()
+        if state == 'half_open' or (state == 'closed' and failures >= self.breaker_threshold):
+            cache.set(self._key('breaker', 'opened_at'), time.time(), self.METRICS_TIMEOUT)
+            cache.delete(self._key('breaker', 'probe'))
+            logger.warning(
+                f"mercadopago_circuit state=open failures={failures} cooldown={self.breaker_cooldown}"
+            )
+
+    def _record_success(self) -> None:
+        keys = [self._key('breaker', 'failures'), self._key('breaker', 'opened_at')]
+        state = cache.get_many(keys)
+        if not state:
+            return
+        if state.get(keys[1]) is not None:
+            logger.info("mercadopago_circuit state=closed")
+        cache.delete_many(keys + [self._key('breaker', 'probe')])
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _elapsed_ms(started: float) -> float:
+        return (time.monotonic() - started) * 1000
+
+    def _bucket(self, elapsed_ms: float) -> str:
+        for upper in self.LATENCY_BUCKETS_MS:
+            if elapsed_ms <= upper:
+                return str(upper)
+        return '+Inf'
+
+    def _incr(self, key: str, delta: int = 1) -> None:
+        cache.add(key, 0, self.METRICS_TIMEOUT)
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            # La clave expiró entre add e incr: se pierde una muestra
+            pass
+
+    def _record(
+        self,
+        operation: str,
+        elapsed_ms: Optional[float],
+        error: Optional[str],
+        status_code: Optional[int] = None
+    ) -> None:
+        if elapsed_ms is not None:
+            self._incr(self._key('latency', operation, self._bucket(elapsed_ms)))
+            self._incr(self._key('latency', operation, 'count'))
+            self._incr(self._key('latency', operation, 'sum_ms'), int(round(elapsed_ms)))
+        if error:
+            self._incr(self._key('errors', operation, error))
+
+        # Métricas en formato clave=valor para el agregador de logs
+        logger.info(
+            f"mercadopago_request operation={operation} status={status_code or '-'} "
+            f"error={error or '-'} ms={int(round(elapsed_ms)) if elapsed_ms is not None else '-'}"
+        )
+
+    def metrics(self) -> Dict[str, Dict]:
+        """
+        Histograma de latencia (conteo por bucket, no acumulado) y errores por operación.
+
+        Returns:
+            dict: operación -> {'count', 'sum_ms', 'latency_ms': {bucket: n}, 'errors': {tipo: n}}
+        """
+        buckets = [str(upper) for upper in self.LATENCY_BUCKETS_MS] + ['+Inf']
+        operations = list(self.DEFAULT_TIMEOUTS)
+        keys = []
+        for operation in operations:
+            keys += [self._key('latency', operation, bucket) for bucket in buckets]
+            keys += [self._key('latency', operation, 'count'), self._key('latency', operation, 'sum_ms')]
+            keys += [self._key('errors', operation, kind) for kind in self.ERROR_KINDS]
+        values = cache.get_many(keys)
+
+        result = {}
+        for operation in operations:
+            result[operation] = {
+                'count': values.get(self._key('latency', operation, 'count'), 0),
+                'sum_ms': values.get(self._key('latency', operation, 'sum_ms'), 0),
+                'latency_ms': {
+                    bucket: values.get(self._key('latency', operation, bucket), 0) for bucket in buckets
+                },
+                'errors': {
+                    kind: values.get(self._key('errors', operation, kind), 0) for kind in self.ERROR_KINDS
+                },
+            }
+        return result
+
+    def reset_metrics(self) -> None:
+        cache.delete_many([
+            self._key(*key_parts)
+            for operation in self.DEFAULT_TIMEOUTS
+            for key_parts in (
+                [('latency', operation, str(upper)) for upper in self.LATENCY_BUCKETS_MS]
+                + [('latency', operation, '+Inf'), ('latency', operation, 'count'), ('latency', operation, 'sum_ms')]
+                + [('errors', operation, kind) for kind in self.ERROR_KINDS]
+            )
+        ])
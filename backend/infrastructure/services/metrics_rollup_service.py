@@ -0,0 +1,247 @@
+"""
+Servicio de Rollups Diarios de Métricas - FagSol Escuela Virtual
+
+Tablas de agregados diarios que leen los dashboards en lugar de recorrer
+Payment, Enrollment y Certificate en cada visita:
+
+- DailyRevenue: pagos aprobados e ingresos por día y moneda (día de created_at).
+- DailyCourseActivity: por día y curso, inscripciones nuevas (enrolled_at),
+  cursos completados (completed_at) y certificados emitidos (issued_at).
+
+Cada rango de días se recalcula con una consulta agrupada por tabla fuente
+(rango indexado) y se reemplaza en una transacción, así que recalcular es
+idempotente. La tarea periódica refresh_metrics_rollup recalcula los últimos
+METRICS_ROLLUP_LOOKBACK_DAYS días (cubre aprobaciones y completados tardíos);
+el comando backfill_metrics_rollup reconstruye cualquier rango histórico.
+
+- Con las tablas vacías (recién migradas), refresh() reconstruye toda la
+  historia desde el primer pago o inscripción.
+- Los cambios sobre días anteriores (un pago que cambia de estado, una
+  inscripción o certificado eliminados, un curso completado que se reabre)
+  recalculan su día al confirmarse la transacción (schedule_days, llamado
+  desde apps/users/signals.py y EnrollmentProgressService).
+
+Los días son fechas locales (TIME_ZONE).
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, DecimalField, Min, Q, QuerySet, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from apps.core.models import DailyCourseActivity, DailyRevenue
+from apps.payments.models import Payment
+from apps.users.models import Certificate, Enrollment
+
+logger = logging.getLogger('apps')
+
+
+class MetricsRollupService:
+    """
+    Servicio que mantiene y consulta los rollups diarios de métricas
+    """
+
+    # Días recalculados por bloque en un backfill
+    CHUNK_DAYS = 31
+
+    def __init__(self, lookback_days: Optional[int] = None):
+        self.lookback_days = lookback_days or getattr(settings, 'METRICS_ROLLUP_LOOKBACK_DAYS', 3)
+
+    # ------------------------------------------------------------------
+    # Mantenimiento
+    # ------------------------------------------------------------------
+
+    def refresh(self, today: Optional[date] = None) -> Dict[str, int]:
+        """
+        Recalcula los últimos lookback_days días (incluido hoy), o toda la
+        historia si los rollups todavía están vacíos.
+        """
+        today = today or timezone.localdate()
+        if not DailyRevenue.objects.exists() and not DailyCourseActivity.objects.exists():
+            return self.backfill(min(self.first_day(today), today), today)
+        return self.rollup_range(today - timedelta(days=self.lookback_days - 1), today)
+
+    @staticmethod
+    def first_day(default: date) -> date:
+        """Día local del primer pago o inscripción (default si no hay ninguno)"""
+        first = [
+            timezone.localtime(moment).date()
+            for moment in (
+                Payment.objects.aggregate(first=Min('created_at'))['first'],
+                Enrollment.objects.aggregate(first=Min('enrolled_at'))['first'],
+            )
+            if moment
+        ]
+        return min(first) if first else default
+
+    def schedule_days(self, moments: Iterable[Optional[datetime]]) -> None:
+        """
+        Recalcula los días (locales) de esos instantes al confirmarse la
+        transacción actual, para los cambios fuera de la ventana de refresh().
+        """
+        days = sorted({timezone.localtime(moment).date() for moment in moments if moment})
+        if days:
+            transaction.on_commit(lambda: self._rollup_days(days))
+
+    def _rollup_days(self, days: List[date]) -> None:
+        for day in days:
+            self.rollup_range(day, day)
+
+    def backfill(self, start: date, end: date) -> Dict[str, int]:
+        """Recalcula [start, end] en bloques de CHUNK_DAYS días"""
+        totals = defaultdict(int)
+        for chunk_start, chunk_end in self._chunks(start, end):
+            for name, value in self.rollup_range(chunk_start, chunk_end).items():
+                totals[name] += value
+        return dict(totals)
+
+    def rollup_range(self, start: date, end: date) -> Dict[str, int]:
+        """
+        Recalcula y reemplaza los rollups de los días [start, end].
+
+        Returns:
+            dict: filas escritas por tabla
+        """
+        since, until = self._bounds(start, end)
+
+        revenue_rows = [
+            DailyRevenue(
+                date=row['day'],
+                currency=row['currency'],
+                payments_count=row['payments_count'],
+                total=row['total'] or Decimal('0.00'),
+            )
+            for row in Payment.objects.filter(
+                status='approved', created_at__gte=since, created_at__lt=until
+            ).annotate(day=TruncDate('created_at')).values('day', 'currency').annotate(
+                payments_count=Count('pk'),
+                total=Sum('amount', output_field=DecimalField()),
+            ).order_by()
+        ]
+
+        activity = defaultdict(lambda: {'enrollments': 0, 'completions': 0, 'certificates': 0})
+        for field, queryset, date_field in (
+            ('enrollments', Enrollment.objects.all(), 'enrolled_at'),
+            ('completions', Enrollment.objects.filter(completed=True), 'completed_at'),
+            ('certificates', Certificate.objects.all(), 'issued_at'),
+        ):
+            for day, course_id, count in self._count_by_day(queryset, date_field, since, until):
+                activity[(day, course_id)][field] = count
+
+        activity_rows = [
+            DailyCourseActivity(date=day, course_id=course_id, **counts)
+            for (day, course_id), counts in activity.items()
+        ]
+
+        with transaction.atomic():
+            DailyRevenue.objects.filter(date__gte=start, date__lte=end).delete()
+            DailyRevenue.objects.bulk_create(revenue_rows)
+            DailyCourseActivity.objects.filter(date__gte=start, date__lte=end).delete()
+            DailyCourseActivity.objects.bulk_create(activity_rows)
+
+        counts = {'revenue_rows': len(revenue_rows), 'activity_rows': len(activity_rows)}
+        # Métricas en formato clave=valor para el agregador de logs
+        logger.info(
+            f'metrics_rollup start={start.isoformat()} end={end.isoformat()} '
+            + ' '.join(f'{name}={value}' for name, value in counts.items())
+        )
+        return counts
+
+    @staticmethod
+    def _count_by_day(queryset: QuerySet, date_field: str, since: datetime, until: datetime) -> Iterator[Tuple]:
+        return queryset.filter(
+            **{f'{date_field}__gte': since, f'{date_field}__lt': until}
+        ).annotate(day=TruncDate(date_field)).values('day', 'course_id').annotate(
+            count=Count('pk')
+        ).order_by().values_list('day', 'course_id', 'count').iterator()
+
+    @staticmethod
+    def _bounds(start: date, end: date) -> Tuple[datetime, datetime]:
+        """Inicio del día start y del día siguiente a end, en hora local"""
+        tz = timezone.get_current_timezone()
+        return (
+            timezone.make_aware(datetime.combine(start, time.min), tz),
+            timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz),
+        )
+
+    def _chunks(self, start: date, end: date) -> Iterator[Tuple[date, date]]:
+        while start <= end:
+            chunk_end = min(start + timedelta(days=self.CHUNK_DAYS - 1), end)
+            yield start, chunk_end
+            start = chunk_end + timedelta(days=1)
+
+    # ------------------------------------------------------------------
+    # Consultas de los dashboards (O(días), no O(filas))
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def revenue_totals(last_days: int = 30) -> Dict:
+        """Pagos aprobados e ingresos históricos y de los últimos last_days días"""
+        since = timezone.localdate() - timedelta(days=last_days)
+        totals = DailyRevenue.objects.aggregate(
+            payments=Sum('payments_count'),
+            total_revenue=Sum('total'),
+            revenue_last_month=Sum('total', filter=Q(date__gte=since)),
+        )
+        return {
+            'total': totals['payments'] or 0,
+            'total_revenue': float(totals['total_revenue'] or Decimal('0.00')),
+            'revenue_last_month': float(totals['revenue_last_month'] or Decimal('0.00')),
+        }
+
+    @staticmethod
+    def revenue_by_month(days: int = 180) -> List[Dict]:
+        """Ingresos por mes de los últimos `days` días"""
+        since = timezone.localdate() - timedelta(days=days)
+        return [
+            {
+                'month': item['month'].strftime('%Y-%m'),
+                'total': float(item['month_total']),
+            }
+            for item in DailyRevenue.objects.filter(date__gte=since).annotate(
+                month=TruncMonth('date')
+            ).values('month').annotate(month_total=Sum('total')).order_by('month')
+        ]
+
+    @staticmethod
+    def activity_totals(courses: Optional[QuerySet] = None) -> Dict[str, int]:
+        """Inscripciones, completados y certificados acumulados (opcionalmente de unos cursos)"""
+        activity = DailyCourseActivity.objects.all()
+        if courses is not None:
+            activity = activity.filter(course__in=courses)
+        totals = activity.aggregate(
+            total_enrollments=Sum('enrollments'),
+            total_completions=Sum('completions'),
+            total_certificates=Sum('certificates'),
+        )
+        return {name.replace('total_', ''): value or 0 for name, value in totals.items()}
+
+    @staticmethod
+    def popular_courses(courses: QuerySet, limit: int = 5) -> List[Dict]:
+        """
+        Cursos con más inscripciones acumuladas. Si hay menos de `limit` cursos
+        con actividad, se completa con cursos sin inscripciones (como antes de los rollups).
+        """
+        fields = ('course_id', 'course__title', 'course__slug', 'course__status')
+        popular = list(
+            DailyCourseActivity.objects.filter(course__in=courses).values(*fields).annotate(
+                total_enrollments=Sum('enrollments')
+            ).order_by('-total_enrollments', 'course_id')[:limit]
+        )
+        for course in popular:
+            course['enrollments'] = course.pop('total_enrollments')
+        if len(popular) < limit:
+            popular += [
+                {'course_id': course_id, 'course__title': title, 'course__slug': slug, 'course__status': status, 'enrollments': 0}
+                for course_id, title, slug, status in courses.exclude(
+                    pk__in=[course['course_id'] for course in popular]
+                ).order_by('-created_at').values_list('id', 'title', 'slug', 'status')[:limit - len(popular)]
+            ]
+        return popular
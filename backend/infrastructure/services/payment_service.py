@@ -6,10 +6,11 @@ Integración con Mercado Pago
 import logging
 import hashlib
 import hmac
-import requests
 from typing import Dict, List, Optional, Tuple
 from decimal import Decimal
 from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
 from django.utils import timezone
 from datetime import timedelta
 import mercadopago
@@ -17,6 +18,8 @@ from apps.courses.models import Course
 from apps.payments.models import PaymentIntent, Payment, PaymentWebhook
 from apps.users.models import Enrollment
 from infrastructure.external_services import DjangoEmailService
+from infrastructure.services.enrollment_service import EnrollmentService
+from infrastructure.services.mercadopago_client import MercadoPagoClient, MercadoPagoCircuitOpenError, MercadoPagoUnavailableError
 
 logger = logging.getLogger('apps')
 
@@ -46,18 +49,39 @@ def get_user_friendly_error_message(status_detail: str) -> str:
     return error_messages.get(status_detail, f'Tu pago fue rechazado. Razón: {status_detail}')
 
 
+class WebhookRetryError(Exception):
+    """Un webhook falló y debe reintentarse más tarde"""
+    
+    def __init__(self, webhook: PaymentWebhook, error: Exception):
+        self.webhook = webhook
+        super().__init__(f"Webhook {webhook.mercado_pago_id} falló (intento {webhook.attempts}): {str(error)}")
+
+
 class PaymentService:
     """
     Servicio de pagos que maneja la integración con Mercado Pago
     """
     
+    # Intentos de procesamiento de un webhook antes de descartarlo
+    WEBHOOK_MAX_ATTEMPTS = 5
+    
+    # Tiempo tras el cual un webhook en proceso se considera abandonado
+    WEBHOOK_CLAIM_TIMEOUT = timedelta(minutes=10)
+    
+    # Backoff de reintentos de un webhook: 30s, 60s, 120s, ... hasta 1 hora
+    WEBHOOK_RETRY_BASE_SECONDS = 30
+    WEBHOOK_RETRY_MAX_SECONDS = 60 * 60
+    
     def __init__(self):
         self.mp_access_token = settings.MERCADOPAGO_ACCESS_TOKEN
         self.mp_webhook_secret = settings.MERCADOPAGO_WEBHOOK_SECRET
         
         if self.mp_access_token:
-            self.mp = mercadopago.SDK(self.mp_access_token)
+            # El SDK usa el cliente con pool de conexiones, timeouts por operación y circuit breaker
+            self.mp_client = MercadoPagoClient(self.mp_access_token)
+            self.mp = mercadopago.SDK(self.mp_access_token, http_client=self.mp_client)
         else:
+            self.mp_client = None
             self.mp = None
             logger.warning("Mercado Pago Access Token no configurado")
     
@@ -224,6 +248,9 @@ class PaymentService:
                 logger.error(f"Error al tokenizar tarjeta: {error_message}")
                 return False, None, None, f"Error al tokenizar la tarjeta: {error_message}"
                 
+        except MercadoPagoUnavailableError as e:
+            logger.error(f"Mercado Pago no disponible al tokenizar tarjeta: {str(e)}")
+            return False, None, None, str(e)
         except Exception as e:
             logger.error(f"Error al tokenizar tarjeta: {str(e)}")
             return False, None, None, f"Error al tokenizar la tarjeta: {str(e)}"
@@ -394,22 +421,11 @@ class PaymentService:
                 if not isinstance(payment_result, dict):
                     # Si el SDK retorna algo diferente, intentar con API REST como fallback
                     logger.warning("SDK retornó formato inesperado, intentando con API REST...")
-                    headers = {
-                        "Authorization": f"Bearer {self.mp_access_token}",
-                        "Content-Type": "application/json",
-                        "X-Idempotency-Key": idempotency_key or f"{payment_intent_id}_{int(timezone.now().timestamp())}"
-                    }
-                    response = requests.post(
-                        "https://api.mercadopago.com/v1/payments",
-                        json=payment_data,
-                        headers=headers,
-                        timeout=30
+                    payment_result = self.mp_client.create_payment(
+                        payment_data,
+                        idempotency_key=idempotency_key or f"{payment_intent_id}_{int(timezone.now().timestamp())}"
                     )
-                    payment_result = {
-                        "status": response.status_code,
-                        "response": response.json() if response.content else {}
-                    }
-                    logger.info(f"Respuesta de API REST (fallback): Status {response.status_code}")
+                    logger.info(f"Respuesta de API REST (fallback): Status {payment_result.get('status')}")
                 else:
                     logger.info(f"Respuesta de SDK: Status {payment_result.get('status')}")
                 
@@ -422,6 +438,12 @@ class PaymentService:
                 
                 logger.info(f"Respuesta de Mercado Pago recibida. Status: {payment_result.get('status') if isinstance(payment_result, dict) else 'N/A'}, Tipo: {type(payment_result)}")
                 logger.info(f"Respuesta completa de Mercado Pago: {payment_result}")
+            except MercadoPagoCircuitOpenError as mp_error:
+                # La llamada no se envió: el payment intent vuelve a pending para reintentar
+                logger.error(f"Mercado Pago no disponible: {str(mp_error)}")
+                payment_intent.status = 'pending'
+                payment_intent.save()
+                return False, None, str(mp_error)
             except Exception as mp_error:
                 logger.error(f"Excepción al llamar a Mercado Pago: {str(mp_error)}")
                 logger.error(f"Tipo de error: {type(mp_error)}")
@@ -460,8 +482,8 @@ class PaymentService:
                     payment_intent.status = 'succeeded'
                     payment_intent.save()
                     
-                    # Crear enrollments y obtener nombres de cursos
-                    enrollments, course_names = self._create_enrollments(user, payment_intent.course_ids, payment)
+                    # Crear enrollments (en bloque) y obtener nombres de cursos
+                    course_names = EnrollmentService().enroll(user, payment_intent.course_ids, payment=payment).course_titles
                     
                     # Enviar email de confirmación de pago (en background, no bloquea la respuesta)
                     try:
@@ -538,41 +560,6 @@ class PaymentService:
                 payment_intent.save()
             return False, None, f"Error al procesar pago: {str(e)}"
     
-    def _create_enrollments(self, user, course_ids: List[str], payment):
-        """
-        Crea enrollments después de un pago exitoso
-        
-        Returns:
-            Tuple[enrollments, course_names]: Lista de enrollments creados y nombres de cursos
-        """
-        try:
-            enrollments = []
-            course_names = []
-            
-            for course_id in course_ids:
-                # Obtener curso para obtener el nombre
-                try:
-                    course = Course.objects.get(id=course_id)
-                    course_names.append(course.title)
-                except Course.DoesNotExist:
-                    logger.warning(f"Curso {course_id} no encontrado, usando ID como nombre")
-                    course_names.append(f"Curso {course_id}")
-                
-                enrollment = Enrollment.objects.create(
-                    user=user,
-                    course_id=course_id,
-                    payment=payment,
-                    status='active',
-                    completed=False
-                )
-                enrollments.append(enrollment)
-            
-            logger.info(f"Enrollments creados: {len(enrollments)} para usuario {user.id}")
-            return enrollments, course_names
-        except Exception as e:
-            logger.error(f"Error al crear enrollments: {str(e)}")
-            raise
-    
     def verify_webhook_signature(self, x_signature: str, x_request_id: str, data_id: str) -> bool:
         """
         Verifica la firma del webhook de Mercado Pago
@@ -620,9 +607,15 @@ class PaymentService:
             logger.error(f"Error al verificar firma de webhook: {str(e)}")
             return False
     
-    def process_webhook(self, webhook_data: Dict) -> Tuple[bool, str]:
+    def enqueue_webhook(self, webhook_data: Dict) -> Tuple[bool, str]:
         """
-        Procesa un webhook de Mercado Pago
+        Registra un webhook de Mercado Pago y encola su procesamiento.
+        
+        Solo guarda la fila de PaymentWebhook: el pago, el intent y los
+        enrollments se actualizan en la tarea process_payment_webhook
+        (apps/payments/tasks.py), para responder a Mercado Pago de inmediato.
+        Solo la primera entrega de cada evento inserta la fila y encola la
+        tarea; los reintentos en paralelo se confirman sin hacer nada más.
         
         Args:
             webhook_data: Datos del webhook
@@ -631,84 +624,206 @@ class PaymentService:
             Tuple[success, error_message]
         """
         try:
-            # Obtener ID del webhook
             webhook_id = webhook_data.get("id")
             if not webhook_id:
                 return False, "ID de webhook no encontrado"
             
-            # Verificar si ya fue procesado o crear/obtener registro
-            existing_webhook = PaymentWebhook.objects.filter(mercado_pago_id=webhook_id).first()
-            if existing_webhook:
-                if existing_webhook.processed:
-                    logger.info(f"Webhook ya procesado: {webhook_id}")
-                    return True, ""
-                # Si existe pero no está procesado, usar el existente
-                webhook = existing_webhook
-                # Actualizar datos del webhook
-                webhook.event_type = webhook_data.get("type", "unknown")
-                webhook.payment_id = webhook_data.get("data", {}).get("id")
-                webhook.data = webhook_data
-                webhook.save()
-            else:
-                # Crear nuevo registro de webhook
-                webhook = PaymentWebhook.objects.create(
-                    mercado_pago_id=webhook_id,
-                    event_type=webhook_data.get("type", "unknown"),
-                    payment_id=webhook_data.get("data", {}).get("id"),
-                    data=webhook_data
-                )
+            webhook_pk = self._insert_webhook(str(webhook_id), webhook_data)
+            if webhook_pk is None:
+                # Reintento de Mercado Pago de un evento ya registrado: solo confirmar
+                logger.info(f"Webhook duplicado ignorado: {webhook_id}")
+                return True, ""
             
-            # Procesar según tipo de evento
-            event_type = webhook_data.get("type")
-            if event_type == "payment":
-                payment_data = webhook_data.get("data", {})
-                payment_id = payment_data.get("id")
-                
-                # Buscar pago por ID de Mercado Pago
-                payment = Payment.objects.filter(mercado_pago_payment_id=payment_id).first()
-                if payment:
-                    # Actualizar estado del pago
-                    mp_status = payment_data.get("status")
-                    if mp_status == "approved" and payment.status != "approved":
-                        payment.status = "approved"
-                        payment.mercado_pago_status = mp_status
-                        payment.save()
-                        
-                        # Actualizar payment intent
-                        if payment.payment_intent:
-                            payment.payment_intent.status = "succeeded"
-                            payment.payment_intent.save()
-                        
-                        # Crear enrollments si no existen
-                        if not Enrollment.objects.filter(payment=payment).exists():
-                            self._create_enrollments(
-                                payment.user,
-                                payment.payment_intent.course_ids,
-                                payment
-                            )
+            transaction.on_commit(lambda: self.dispatch_webhook(webhook_pk))
+            return True, ""
+            
+        except Exception as e:
+            logger.error(f"Error al registrar webhook: {str(e)}")
+            return False, f"Error al registrar webhook: {str(e)}"
+    
+    def _insert_webhook(self, mercado_pago_id: str, webhook_data: Dict) -> Optional[int]:
+        """
+        Inserta el webhook en una sola sentencia
+        (INSERT ... ON CONFLICT (mercado_pago_id) DO NOTHING RETURNING id).
+        
+        Returns:
+            int: ID del webhook insertado, o None si ya estaba registrado
+        """
+        values = {
+            'mercado_pago_id': mercado_pago_id,
+            'event_type': webhook_data.get("type", "unknown"),
+            'payment_id': webhook_data.get("data", {}).get("id"),
+            'data': webhook_data,
+            'processed': False,
+            'attempts': 0,
+            'created_at': timezone.now(),
+        }
+        opts = PaymentWebhook._meta
+        quote = connection.ops.quote_name
+        fields = [opts.get_field(name) for name in values]
+        params = [field.get_db_prep_save(values[field.name], connection) for field in fields]
+        
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {quote(opts.db_table)} ({', '.join(quote(field.column) for field in fields)}) "
+                f"VALUES ({', '.join(['%s'] * len(fields))}) "
+                f"ON CONFLICT ({quote(opts.get_field('mercado_pago_id').column)}) DO NOTHING "
+                f"RETURNING {quote(opts.pk.column)}",
+                params
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
+    
+    def dispatch_webhook(self, webhook_pk: int) -> None:
+        """
+        Encola la tarea de procesamiento de un webhook. Si el broker no está
+        disponible el webhook queda pendiente y lo reencola
+        requeue_pending_payment_webhooks.
+        """
+        from celery.exceptions import Retry
+        from apps.payments.tasks import process_payment_webhook
+        try:
+            process_payment_webhook.delay(webhook_pk)
+        except Retry:
+            # Modo eager (CELERY_TASK_ALWAYS_EAGER): el reintento queda registrado en el webhook
+            logger.warning(f"Webhook {webhook_pk} pendiente de reintento")
+        except Exception as e:
+            logger.error(f"No se pudo encolar el webhook {webhook_pk}: {str(e)}")
+    
+    def webhook_retry_delay(self, attempts: int) -> int:
+        """Segundos de espera antes de reintentar un webhook con `attempts` intentos fallidos"""
+        return min(self.WEBHOOK_RETRY_BASE_SECONDS * 2 ** (attempts - 1), self.WEBHOOK_RETRY_MAX_SECONDS)
+    
+    def pending_webhooks(self):
+        """Webhooks sin procesar que todavía tienen intentos disponibles"""
+        return PaymentWebhook.objects.filter(processed=False, attempts__lt=self.WEBHOOK_MAX_ATTEMPTS)
+    
+    def process_queued_webhooks(self, webhook_pk: int) -> int:
+        """
+        Procesa un webhook encolado junto con los demás pendientes del mismo
+        pago, en orden de llegada. Cada webhook se reclama con un UPDATE
+        condicional antes de aplicarlo, así dos workers nunca aplican el mismo.
+        
+        Si un webhook falla se registra el intento en attempts y error_message
+        y la hora del próximo reintento en next_attempt_at, y se lanza
+        WebhookRetryError para que la tarea reintente con backoff; los
+        siguientes del mismo pago esperan a ese reintento. Al agotar
+        WEBHOOK_MAX_ATTEMPTS el webhook queda descartado (processed=False con
+        error_message) y se sigue con el resto.
+        
+        Returns:
+            int: Número de webhooks procesados
+        
+        Raises:
+            WebhookRetryError: Si un webhook falló y todavía puede reintentarse
+        """
+        webhook = PaymentWebhook.objects.filter(pk=webhook_pk).first()
+        if webhook is None:
+            return 0
+        
+        queue = self.pending_webhooks()
+        if webhook.payment_id:
+            queue = queue.filter(payment_id=webhook.payment_id)
+        else:
+            queue = queue.filter(pk=webhook.pk)
+        
+        processed = 0
+        for pk in list(queue.order_by('created_at', 'id').values_list('pk', flat=True)):
+            if not self._claim_webhook(pk):
+                if self.pending_webhooks().filter(pk=pk).exists():
+                    # Otro worker lo tiene y sigue con los siguientes del pago
+                    break
+                # Se terminó (o descartó) entre el listado y el reclamo
+                continue
+            
+            current = PaymentWebhook.objects.get(pk=pk)
+            try:
+                with transaction.atomic():
+                    self._apply_webhook(current)
+                processed += 1
+                continue
+            except Exception as e:
+                error = e
+            
+            # El reclamo es nuestro: nadie más escribe este webhook hasta liberarlo
+            current.attempts += 1
+            current.error_message = f"Intento {current.attempts}/{self.WEBHOOK_MAX_ATTEMPTS}: {str(error)}"
+            current.claimed_at = None
+            current.next_attempt_at = timezone.now() + timedelta(seconds=self.webhook_retry_delay(current.attempts))
+            current.save(update_fields=['attempts', 'error_message', 'claimed_at', 'next_attempt_at'])
+            
+            if current.attempts >= self.WEBHOOK_MAX_ATTEMPTS:
+                logger.error(
+                    f"Webhook {current.mercado_pago_id} descartado tras "
+                    f"{current.attempts} intentos: {str(error)}"
+                )
+                continue
+            raise WebhookRetryError(current, error)
+        
+        return processed
+    
+    def _claim_webhook(self, webhook_pk: int) -> bool:
+        """
+        Marca el webhook como en proceso en una sola sentencia. Solo un worker
+        lo consigue; un reclamo más antiguo que WEBHOOK_CLAIM_TIMEOUT se
+        considera abandonado (worker caído) y puede volver a reclamarse.
+        
+        Returns:
+            bool: True si este worker reclamó el webhook
+        """
+        now = timezone.now()
+        return self.pending_webhooks().filter(pk=webhook_pk).filter(
+            Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - self.WEBHOOK_CLAIM_TIMEOUT)
+        ).update(claimed_at=now) == 1
+    
+    def _apply_webhook(self, webhook: PaymentWebhook) -> None:
+        """
+        Aplica un webhook registrado: actualiza el pago, el intent y crea los
+        enrollments. Lanza excepción si algo falla (la transacción se revierte).
+        """
+        webhook_data = webhook.data
+        event_type = webhook_data.get("type")
+        
+        if event_type == "payment":
+            payment_data = webhook_data.get("data", {})
+            payment_id = payment_data.get("id")
+            
+            # Buscar pago por ID de Mercado Pago y bloquearlo durante la transición de estado
+            payment = Payment.objects.select_for_update().filter(
+                mercado_pago_payment_id=payment_id
+            ).first()
+            if payment:
+                # Actualizar estado del pago
+                mp_status = payment_data.get("status")
+                if mp_status == "approved" and payment.status != "approved":
+                    payment.status = "approved"
+                    payment.mercado_pago_status = mp_status
+                    payment.save()
                     
-                    webhook.processed = True
-                    webhook.processed_at = timezone.now()
-                    webhook.save()
+                    # Actualizar payment intent
+                    if payment.payment_intent:
+                        payment.payment_intent.status = "succeeded"
+                        payment.payment_intent.save()
                     
-                    logger.info(f"Webhook procesado: {webhook_id}")
-                    return True, ""
-                else:
-                    # Si el pago no existe, registrar el error pero retornar éxito
-                    # para evitar que Mercado Pago siga reintentando (especialmente en pruebas)
-                    webhook.error_message = f"Pago no encontrado: {payment_id}"
-                    webhook.processed = True  # Marcar como procesado para evitar reintentos
-                    webhook.processed_at = timezone.now()
-                    webhook.save()
-                    logger.warning(f"Webhook recibido para pago inexistente: {payment_id} (puede ser una prueba)")
-                    return True, ""  # Retornar éxito para que Mercado Pago no reintente
-            else:
-                webhook.processed = True
-                webhook.processed_at = timezone.now()
-                webhook.save()
-                logger.info(f"Webhook de tipo desconocido procesado: {event_type}")
-                return True, ""
+                    # Crear enrollments (las inscripciones existentes se conservan)
+                    EnrollmentService().enroll(
+                        payment.user,
+                        payment.payment_intent.course_ids,
+                        payment=payment
+                    )
                 
-        except Exception as e:
-            logger.error(f"Error al procesar webhook: {str(e)}")
-            return False, f"Error al procesar webhook: {str(e)}"
+                webhook.error_message = None
+                logger.info(f"Webhook procesado: {webhook.mercado_pago_id}")
+            else:
+                # Si el pago no existe, registrar el error pero marcar como procesado
+                # para no reintentar (especialmente en pruebas)
+                webhook.error_message = f"Pago no encontrado: {payment_id}"
+                logger.warning(f"Webhook recibido para pago inexistente: {payment_id} (puede ser una prueba)")
+        else:
+            webhook.error_message = None
+            logger.info(f"Webhook de tipo desconocido procesado: {event_type}")
+        
+        webhook.processed = True
+        webhook.processed_at = timezone.now()
+        webhook.claimed_at = None
+        webhook.save(update_fields=['processed', 'processed_at', 'claimed_at', 'error_message'])
@@ -0,0 +1,160 @@
+"""
+Servicio de Caché Stale-While-Revalidate - FagSol Escuela Virtual
+
+Caché con dos plazos para valores caros de calcular y que toleran algunos
+minutos de antigüedad (ej: estadísticas públicas de la página de inicio):
+
+- soft_timeout: mientras no vence, el valor se sirve tal cual.
+- Vencido el soft_timeout, el valor se sigue sirviendo (stale) y UN solo
+  proceso obtiene el candado (cache.add, singleflight) y encola el recálculo
+  en segundo plano. El resto de las requests no toca la base de datos.
+- hard_timeout: TTL real de la entrada en la caché. Solo si la entrada no
+  existe (primer uso, expulsión o caché vaciada) se calcula en la request:
+  quien tiene el candado calcula y los demás esperan su resultado hasta
+  wait_timeout segundos antes de calcular por su cuenta.
+
+El candado expira solo (lock_timeout), así que un worker caído no bloquea
+los recálculos siguientes.
+"""
+
+import logging
+import time
+from typing import Any, Callable, Optional
+
+from django.core.cache import cache
+
+logger = logging.getLogger('apps')
+
+
+class StaleWhileRevalidateCache:
+    """
+    Caché de un valor con recálculo en segundo plano y un solo recalculador
+    """
+
+    KEY_PREFIX = 'swr'
+
+    # Intervalo de sondeo mientras otro proceso calcula un valor ausente (segundos)
+    POLL_INTERVAL = 0.05
+
+    def __init__(
+        self,
+        name: str,
+        compute: Callable[[], Any],
+        soft_timeout: int,
+        hard_timeout: Optional[int] = None,
+        lock_timeout: int = 60,
+        wait_timeout: float = 5,
+    ):
+        """
+        Args:
+            name: Nombre del valor (parte de la clave de caché)
+            compute: Función que calcula el valor
+            soft_timeout: Segundos durante los que el valor se considera fresco
+            hard_timeout: Segundos que la entrada permanece en la caché (por defecto 24 veces soft_timeout)
+            lock_timeout: Duración máxima del candado de recálculo
+            wait_timeout: Espera máxima por el cálculo de otro proceso cuando no hay valor
+        """
+        self.name = name
+        self.compute = compute
+        self.soft_timeout = soft_timeout
+        self.hard_timeout = hard_timeout or soft_timeout * 24
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+
+    @property
+    def key(self) -> str:
+        return f'{self.KEY_PREFIX}:{self.name}'
+
+    @property
+    def lock_key(self) -> str:
+        return f'{self.KEY_PREFIX}:{self.name}:lock'
+
+    def get(self, schedule_refresh: Optional[Callable[[], None]] = None) -> Any:
+        """
+        Obtiene el valor, fresco o vencido.
+
+        Args:
+            schedule_refresh: Encola el recálculo en segundo plano (ej: tarea de
+                Celery que llama a refresh()). Sin él, el recálculo de un valor
+                vencido se hace en la request que obtuvo el candado.
+        """
+        entry = self._read()
+        if entry is not None:
+            if entry['fresh_until'] <= time.time() and self._acquire():
+                self._revalidate(schedule_refresh)
+            return entry['value']
+
+        # Sin valor: un solo proceso calcula, el resto espera su resultado
+        if self._acquire():
+            return self.refresh()
+
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.POLL_INTERVAL)
+            entry = self._read()
+            if entry is not None:
+                return entry['value']
+
+        logger.warning(f"swr_wait_timeout name={self.name}")
+        return self.compute()
+
+    def refresh(self) -> Any:
+        """Recalcula y guarda el valor, y libera el candado"""
+        started = time.monotonic()
+        try:
+            value = self.compute()
+            self._write(value)
+        finally:
+            self._release()
+        # Métricas en formato clave=valor para el agregador de logs
+        logger.info(f"swr_refresh name={self.name} ms={(time.monotonic() - started) * 1000:.1f}")
+        return value
+
+    def invalidate(self) -> None:
+        """Elimina el valor (la próxima lectura lo calcula en la request)"""
+        cache.delete_many([self.key, self.lock_key])
+
+    def _revalidate(self, schedule_refresh: Optional[Callable[[], None]]) -> None:
+        if schedule_refresh is not None:
+            try:
+                schedule_refresh()
+                return
+            except Exception as e:
+                # Sin broker disponible: recalcular en esta request (solo la que tiene el candado)
+                logger.warning(f"No se pudo encolar el recálculo de {self.name}: {str(e)}")
+        try:
+            self.refresh()
+        except Exception as e:
+            # Se sigue sirviendo el valor vencido hasta el próximo intento
+            logger.error(f"Error al recalcular {self.name}: {str(e)}", exc_info=True)
+
+    def _read(self) -> Optional[dict]:
+        try:
+            return cache.get(self.key)
+        except Exception as e:
+            logger.warning(f"Error leyendo caché {self.name}: {str(e)}")
+            return None
+
+    def _write(self, value: Any) -> None:
+        try:
+            cache.set(
+                self.key,
+                {'value': value, 'fresh_until': time.time() + self.soft_timeout},
+                self.hard_timeout,
+            )
+        except Exception as e:
+            logger.warning(f"Error guardando caché {self.name}: {str(e)}")
+
+    def _acquire(self) -> bool:
+        try:
+            return cache.add(self.lock_key, True, self.lock_timeout)
+        except Exception as e:
+            # Sin caché no hay candado compartido: cada proceso calcula por su cuenta
+            logger.warning(f"Error tomando el candado de {self.name}: {str(e)}")
+            return True
+
+    def _release(self) -> None:
+        try:
+            cache.delete(self.lock_key)
+        except Exception as e:
+            logger.warning(f"Error liberando el candado de {self.name}: {str(e)}")
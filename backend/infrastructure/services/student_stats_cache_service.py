@@ -0,0 +1,66 @@
+"""
+Servicio de Caché de Estadísticas de Estudiante - FagSol Escuela Virtual
+
+Caché por usuario de GET /api/v1/dashboard/student/stats/ (página de inicio
+de cada estudiante autenticado).
+
+- Cada usuario tiene su propio contador de versión, que se incrementa cuando
+  cambian sus inscripciones, su progreso o sus certificados. Las estadísticas
+  calculadas mientras tanto quedan guardadas bajo la versión anterior y nunca
+  se leen.
+- El contador se incrementa al confirmarse la transacción del cambio
+  (transaction.on_commit): antes, una lectura concurrente podría guardar
+  bajo la versión nueva datos todavía sin confirmar.
+- Como en el catálogo, el contador vive en la caché compartida (CACHE_URL)
+  para que el incremento hecho en un proceso lo vean los demás.
+"""
+
+import logging
+from typing import Any, Callable, Iterable
+
+from django.conf import settings
+from django.db import transaction
+
+from infrastructure.services.catalog_cache_service import CatalogCacheService
+
+logger = logging.getLogger('apps')
+
+
+class StudentStatsCacheService:
+    """
+    Servicio de caché versionada por usuario para las estadísticas de estudiante
+    """
+
+    KEY_PREFIX = 'student_stats'
+
+    def __init__(self):
+        self.cache_service = CatalogCacheService()
+        self.timeout = getattr(settings, 'STUDENT_STATS_CACHE_SECONDS', 60 * 10)
+
+    def _version_key(self, user_id: int) -> str:
+        return f'{self.KEY_PREFIX}:version:{user_id}'
+
+    def _stats_key(self, user_id: int) -> str:
+        version = self.cache_service.get_version(self._version_key(user_id))
+        return f'{self.KEY_PREFIX}:v{version}:{user_id}'
+
+    def get_or_compute(self, user_id: int, compute: Callable[[], Any]) -> Any:
+        """Estadísticas cacheadas del usuario (las calcula si no existen)"""
+        # La clave (con la versión) se obtiene antes de calcular: ver docstring del módulo
+        key = self._stats_key(user_id)
+        stats = self.cache_service.get(key)
+        if stats is None:
+            stats = compute()
+            self.cache_service.set(key, stats, timeout=self.timeout)
+        return stats
+
+    def invalidate(self, user_ids: Iterable[int]) -> None:
+        """Descarta las estadísticas de los usuarios al confirmarse la transacción actual"""
+        version_keys = [self._version_key(user_id) for user_id in set(user_ids)]
+        if not version_keys:
+            return
+        transaction.on_commit(lambda: self._bump(version_keys))
+
+    def _bump(self, version_keys: Iterable[str]) -> None:
+        for version_key in version_keys:
+            self.cache_service.bump_version(version_key)
@@ -0,0 +1,140 @@
+"""
+Servidor falso de la API de Mercado Pago para tests - FagSol Escuela Virtual
+
+Servidor HTTP/1.1 local (keep-alive) en un hilo. Responde a las rutas que usa
+el backend con respuestas válidas y permite programar fallos y demoras:
+
+    with FakeMercadoPagoServer() as server:
+        server.fail_next(3, status=503)
+        server.delay = 0.5
+        with override_settings(MERCADOPAGO_API_URL=server.url):
+            ...
+
+Registra cada request (server.requests) y cada conexión TCP aceptada
+(server.connections), para verificar la reutilización del pool.
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        with self.server.fake.lock:
+            self.server.fake.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch()
+
+    def do_POST(self):
+        self._dispatch()
+
+    def do_PUT(self):
+        self._dispatch()
+
+    def _dispatch(self):
+        fake = self.server.fake
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            body = None
+
+        with fake.lock:
+            fake.requests.append({
+                'method': self.command,
+                'path': self.path,
+                'headers': dict(self.headers),
+                'body': body,
+            })
+            scripted = fake.failures.pop(0) if fake.failures else None
+
+        if fake.delay:
+            time.sleep(fake.delay)
+
+        status, payload = scripted or fake.respond(self.command, self.path.split('?')[0], body)
+        content = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class FakeMercadoPagoServer:
+    """Servidor falso de Mercado Pago (usar como context manager)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests: List[Dict] = []
+        self.connections = 0
+        self.failures: List[Tuple[int, Dict]] = []
+        self.delay = 0
+        self.payment_status = 'approved'
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'FakeMercadoPagoServer':
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self) -> 'FakeMercadoPagoServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def fail_next(self, count: int, status: int = 503) -> None:
+        """Las próximas `count` requests responden con `status`"""
+        with self.lock:
+            self.failures.extend([(status, {'message': 'fake failure', 'status': status})] * count)
+
+    def respond(self, method: str, path: str, body: Optional[Dict]) -> Tuple[int, Dict]:
+        """Respuesta por defecto de cada ruta"""
+        if method == 'POST' and path == '/v1/card_tokens':
+            number = (body or {}).get('card_number', '')
+            return 201, {
+                'id': f'fake_token_{number[-4:]}',
+                'payment_method_id': 'visa',
+                'last_four_digits': number[-4:],
+            }
+        if method == 'POST' and path == '/v1/payments':
+            payment_id = str(1000 + len(self.requests))
+            return 201, {
+                'id': payment_id,
+                'status': self.payment_status,
+                'status_detail': 'accredited' if self.payment_status == 'approved' else 'cc_rejected_other_reason',
+                'transaction_amount': (body or {}).get('transaction_amount'),
+                'metadata': (body or {}).get('metadata', {}),
+            }
+        match = re.fullmatch(r'/v1/payments/([^/]+)', path)
+        if method == 'GET' and match:
+            return 200, {'id': match.group(1), 'status': self.payment_status}
+        if method == 'POST' and path == '/checkout/preferences':
+            return 201, {'id': 'fake_preference', 'init_point': 'https://example.test/checkout'}
+        return 404, {'message': 'not_found', 'status': 404}
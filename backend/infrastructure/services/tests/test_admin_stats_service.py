@@ -0,0 +1,109 @@
+"""
+Tests unitarios para AdminStatsService
+Estadísticas de administrador con una consulta agrupada por sección (y rollups diarios)
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.core.models import UserProfile
+from apps.courses.models import Course
+from apps.payments.models import Payment, PaymentIntent
+from apps.users.models import Certificate, Enrollment
+from apps.users.permissions import ROLE_ADMIN, ROLE_INSTRUCTOR, ROLE_STUDENT
+from infrastructure.services.admin_stats_service import AdminStatsService
+from infrastructure.services.metrics_rollup_service import MetricsRollupService
+
+
+class AdminStatsServiceTestCase(TestCase):
+    """Tests para AdminStatsService y GET /api/v1/dashboard/admin/stats/"""
+
+    def setUp(self):
+        """Configuración inicial para cada test"""
+        self.admin = User.objects.create_user(username='admin@test.com', email='admin@test.com', password='testpass123')
+        UserProfile.objects.create(user=self.admin, role=ROLE_ADMIN)
+        instructor = User.objects.create_user(username='inst@test.com', email='inst@test.com', password='testpass123')
+        UserProfile.objects.create(user=instructor, role=ROLE_INSTRUCTOR)
+        self.students = []
+        for index in range(3):
+            student = User.objects.create_user(
+                username=f'student{index}@test.com', email=f'student{index}@test.com', password='testpass123'
+            )
+            UserProfile.objects.create(user=student, role=ROLE_STUDENT)
+            self.students.append(student)
+        User.objects.create_user(username='inactive@test.com', password='testpass123', is_active=False)
+
+        def course(course_id, status, is_active=True):
+            return Course.objects.create(
+                id=course_id, title=course_id, slug=course_id, description='Descripción',
+                price=Decimal('100.00'), status=status, is_active=is_active
+            )
+
+        self.popular = course('c-stats-popular', 'published')
+        self.other = course('c-stats-other', 'published')
+        course('c-stats-draft', 'draft')
+        course('c-stats-archived', 'archived')
+        course('c-stats-inactive-draft', 'draft', is_active=False)
+
+        enrollments = [
+            Enrollment.objects.create(user=student, course=self.popular, status='active')
+            for student in self.students
+        ]
+        enrollments[0].status = 'completed'
+        enrollments[0].save()
+        Enrollment.objects.create(user=self.students[0], course=self.other, status='expired')
+        Certificate.objects.create(
+            enrollment=enrollments[0], user=self.students[0], course=self.popular, verification_code='STATS-1'
+        )
+
+        def payment(student, amount, status):
+            intent = PaymentIntent.objects.create(
+                user=student, total=amount, currency='PEN', status='succeeded', course_ids=[self.popular.id]
+            )
+            return Payment.objects.create(user=student, payment_intent=intent, amount=amount, status=status)
+
+        payment(self.students[0], Decimal('100.00'), 'approved')
+        old = payment(self.students[1], Decimal('50.00'), 'approved')
+        Payment.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=60))
+        payment(self.students[2], Decimal('70.00'), 'rejected')
+
+        today = timezone.localdate()
+        MetricsRollupService().backfill(today - timedelta(days=90), today)
+
+    def test_stats_use_one_query_per_section(self):
+        """Test: Cada sección es una sola consulta y los contadores coinciden"""
+        service = AdminStatsService()
+        # +1: hay menos de 5 cursos con inscripciones y se completa con cursos sin actividad
+        with self.assertNumQueries(len(service.sections()) + 1):
+            stats, timings = service.get_stats()
+
+        self.assertEqual(stats['courses'], {'total': 3, 'published': 2, 'draft': 1, 'archived': 1})
+        self.assertEqual(stats['users'], {'total': 5, 'students': 3, 'instructors': 1, 'admins': 1})
+        self.assertEqual(stats['enrollments'], {'total': 4, 'active': 2, 'completed': 1})
+        self.assertEqual(
+            stats['payments'], {'total': 2, 'total_revenue': 150.0, 'revenue_last_month': 100.0}
+        )
+        self.assertEqual(stats['certificates'], {'total': 1})
+        self.assertEqual(
+            [(course['id'], course['enrollments']) for course in stats['popular_courses']],
+            [(self.popular.id, 3), (self.other.id, 1)]
+        )
+        self.assertEqual(sum(item['total'] for item in stats['revenue_by_month']), 150.0)
+        self.assertEqual(set(timings), set(service.sections()) | {'total'})
+
+    def test_endpoint_reports_section_timings(self):
+        """Test: El endpoint expone los tiempos por sección en Server-Timing"""
+        client = APIClient()
+        client.force_authenticate(user=self.admin)
+
+        response = client.get('/api/v1/dashboard/admin/stats/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data']['courses']['total'], 3)
+        self.assertIn('courses;dur=', response['Server-Timing'])
+        self.assertIn('total;dur=', response['Server-Timing'])
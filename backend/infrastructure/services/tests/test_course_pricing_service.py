@@ -0,0 +1,105 @@
+"""
+Tests unitarios para CoursePricingService
+Precios por moneda precalculados al refrescar las tasas de cambio
+"""
+
+from decimal import Decimal
+from unittest.mock import patch, MagicMock
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.courses.models import Course
+from infrastructure.services.currency_service import CurrencyService
+
+
+def _rates_response():
+    response = MagicMock()
+    response.json.return_value = {'rates': {'USD': 1, 'PEN': 3.75, 'COP': 4000, 'MXN': 17.5}}
+    response.raise_for_status.return_value = None
+    return response
+
+
+class CoursePricingServiceTestCase(TestCase):
+    """Tests para CoursePricingService y el refresco de tasas"""
+
+    def setUp(self):
+        """Configuración inicial para cada test"""
+        cache.clear()
+        self.course = Course.objects.create(
+            id='c-price-1',
+            title='Curso con Precio',
+            slug='curso-con-precio',
+            description='Descripción',
+            price=Decimal('375.00'),
+            price_usd=Decimal('100.00'),
+            discount_price=Decimal('300.00'),
+            currency='PEN',
+            status='published',
+            is_active=True
+        )
+
+    @patch('infrastructure.services.currency_service.requests.get')
+    def test_refresh_rates_fetches_once_and_recomputes(self, mock_get):
+        """Test: Un refresco hace una sola llamada a la API y actualiza todos los cursos"""
+        mock_get.return_value = _rates_response()
+
+        success, updated = CurrencyService().refresh_rates()
+
+        self.assertTrue(success)
+        self.assertEqual(updated, 1)
+        self.assertEqual(mock_get.call_count, 1)
+
+        self.course.refresh_from_db()
+        prices = self.course.localized_prices
+        self.assertEqual(prices['PEN'], {'price': '375.00', 'discount_price': '300.00'})
+        self.assertEqual(prices['USD'], {'price': '100.00', 'discount_price': '80.00'})
+        self.assertEqual(prices['COP'], {'price': '400000.00', 'discount_price': '320000.00'})
+
+    @patch('infrastructure.services.currency_service.requests.get')
+    def test_conversions_reuse_cached_rate_table(self, mock_get):
+        """Test: Las conversiones de distintas monedas comparten una sola descarga"""
+        mock_get.return_value = _rates_response()
+        service = CurrencyService()
+
+        self.assertEqual(service.get_exchange_rate('USD', 'COP'), Decimal('4000'))
+        self.assertEqual(service.get_exchange_rate('USD', 'MXN'), Decimal('17.5'))
+        self.assertEqual(service.convert_price(Decimal('10'), 'PEN'), Decimal('37.50'))
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch('infrastructure.services.currency_service.requests.get')
+    def test_list_courses_with_currency(self, mock_get):
+        """Test: El catálogo devuelve precios localizados sin llamar a la API"""
+        mock_get.return_value = _rates_response()
+        CurrencyService().refresh_rates()
+        mock_get.reset_mock()
+
+        response = APIClient().get('/api/v1/courses/', {'currency': 'cop'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        localized = response.data['data'][0]['localized_price']
+        self.assertEqual(localized['currency'], 'COP')
+        self.assertEqual(localized['price'], 400000.0)
+        self.assertEqual(localized['discount_price'], 320000.0)
+        mock_get.assert_not_called()
+
+    def test_list_courses_invalid_currency(self):
+        """Test: Una moneda no soportada devuelve 400"""
+        response = APIClient().get('/api/v1/courses/', {'currency': 'XYZ'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @patch('infrastructure.services.currency_service.requests.get')
+    def test_course_save_localizes_with_cached_rates(self, mock_get):
+        """Test: Guardar un curso recalcula sus precios con las tasas en caché"""
+        mock_get.return_value = _rates_response()
+        CurrencyService().get_usd_rates()
+
+        self.course.price_usd = Decimal('50.00')
+        self.course.save()
+
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.localized_prices['MXN']['price'], '875.00')
+        self.assertEqual(mock_get.call_count, 1)
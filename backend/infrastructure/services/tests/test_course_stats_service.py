@@ -0,0 +1,161 @@
+"""
+Tests unitarios para CourseStatsService
+Estadísticas por curso mantenidas en cada evento e iguales a un recálculo completo
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.forms.models import model_to_dict
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.core.models import CourseStats, UserProfile
+from apps.courses.models import Course, Lesson, Module
+from apps.payments.models import Payment, PaymentIntent
+from apps.users.models import Enrollment
+from apps.users.permissions import ROLE_INSTRUCTOR, ROLE_STUDENT
+from infrastructure.services.course_stats_service import CourseStatsService
+from infrastructure.services.enrollment_progress_service import EnrollmentProgressService
+from infrastructure.services.enrollment_service import EnrollmentService
+from infrastructure.services.expiry_sweeper_service import ExpirySweeperService
+
+
+class CourseStatsServiceTestCase(TestCase):
+    """Tests para CourseStatsService y los endpoints del instructor que leen CourseStats"""
+
+    STAT_FIELDS = CourseStatsService.STAT_FIELDS
+
+    def setUp(self):
+        """Configuración inicial para cada test"""
+        self.instructor = User.objects.create_user(username='inst@test.com', email='inst@test.com', password='testpass123')
+        UserProfile.objects.create(user=self.instructor, role=ROLE_INSTRUCTOR)
+        self.students = []
+        for index in range(3):
+            student = User.objects.create_user(
+                username=f'student{index}@test.com', email=f'student{index}@test.com', password='testpass123'
+            )
+            UserProfile.objects.create(user=student, role=ROLE_STUDENT)
+            self.students.append(student)
+
+        self.courses = []
+        for index, price in enumerate([Decimal('100.00'), Decimal('50.00')]):
+            course = Course.objects.create(
+                id=f'c-stats-{index}', title=f'Curso {index}', slug=f'curso-stats-{index}', description='Descripción',
+                price=price, status='published', is_active=True, created_by=self.instructor
+            )
+            module = Module.objects.create(id=f'm-stats-{index}', course=course, title='Módulo', order=1)
+            for order in range(2):
+                Lesson.objects.create(
+                    id=f'l-stats-{index}-{order}', module=module, title=f'Lección {order}',
+                    lesson_type='text', order=order, is_active=True
+                )
+            self.courses.append(course)
+
+    def paid_enrollments(self, student, amount):
+        """Pago aprobado de los dos cursos e inscripciones creadas por EnrollmentService"""
+        intent = PaymentIntent.objects.create(
+            user=student, total=amount, currency='PEN', status='succeeded',
+            course_ids=[course.id for course in self.courses]
+        )
+        payment = Payment.objects.create(user=student, payment_intent=intent, amount=amount, status='approved')
+        return EnrollmentService().enroll(student, intent.course_ids, payment=payment).created
+
+    def snapshot(self):
+        return {
+            stats.course_id: model_to_dict(stats, fields=self.STAT_FIELDS)
+            for stats in CourseStats.objects.order_by('course_id')
+        }
+
+    def test_event_deltas_match_full_rebuild(self):
+        """Test: Inscripciones, progreso, vencimientos y altas manuales dejan las filas igual que un recálculo"""
+        first = self.paid_enrollments(self.students[0], Decimal('150.01'))
+        self.paid_enrollments(self.students[1], Decimal('150.00'))
+        Enrollment.objects.create(
+            user=self.students[2], course=self.courses[0], status='active',
+            expires_at=timezone.now() - timedelta(days=1)
+        )
+
+        progress = EnrollmentProgressService()
+        progress.apply_completion_delta(first[0], 1)
+        progress.apply_completion_delta(first[0], 1)
+        progress.apply_completion_delta(first[1], 1)
+        ExpirySweeperService().sweep()
+
+        stats = CourseStats.objects.get(course=first[0].course_id)
+        self.assertEqual(stats.enrollments, 3)
+        self.assertEqual(stats.active_enrollments, 1)
+        self.assertEqual(stats.completed_enrollments, 1)
+        self.assertEqual(stats.completion_sum, Decimal('100.00'))
+        self.assertEqual(stats.average_completion, 33.33)
+        # 150.01 se reparte 75.01 / 75.00 (el centavo sobrante va a la primera inscripción por ID)
+        self.assertIn(stats.revenue, {Decimal('150.00'), Decimal('150.01')})
+        self.assertEqual(
+            sum(CourseStats.objects.values_list('revenue', flat=True), Decimal('0')), Decimal('300.01')
+        )
+
+        incremental = self.snapshot()
+        CourseStats.objects.all().delete()
+        CourseStatsService().rebuild()
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_first_event_on_course_without_row_recomputes_it(self):
+        """Test: Un curso sin fila (anterior a la migración) la crea desde las tablas fuente"""
+        enrollments = [
+            Enrollment.objects.create(user=student, course=self.courses[0], status='active')
+            for student in self.students
+        ]
+        CourseStats.objects.all().delete()
+
+        EnrollmentProgressService().apply_completion_delta(enrollments[0], 2)
+
+        stats = CourseStats.objects.get(course=self.courses[0])
+        self.assertEqual(stats.enrollments, 3)
+        self.assertEqual(stats.active_enrollments, 2)
+        self.assertEqual(stats.completed_enrollments, 1)
+        self.assertEqual(stats.completion_sum, Decimal('100.00'))
+
+        incremental = self.snapshot()[self.courses[0].id]
+        CourseStats.objects.all().delete()
+        CourseStatsService().rebuild()
+        self.assertEqual(self.snapshot()[self.courses[0].id], incremental)
+
+    def test_delete_and_course_cascade_keep_stats_consistent(self):
+        """Test: Eliminar inscripciones o el curso completo no deja filas inconsistentes"""
+        enrollments = self.paid_enrollments(self.students[0], Decimal('150.00'))
+
+        enrollments[0].delete()
+        self.assertEqual(CourseStats.objects.get(course=enrollments[0].course_id).enrollments, 0)
+        self.assertEqual(CourseStats.objects.get(course=enrollments[0].course_id).revenue, Decimal('0.00'))
+        # El pago queda con una sola inscripción: el ingreso completo pasa al otro curso
+        self.assertEqual(CourseStats.objects.get(course=enrollments[1].course_id).revenue, Decimal('150.00'))
+
+        self.courses[1].delete()
+        self.assertFalse(CourseStats.objects.filter(course=enrollments[1].course_id).exists())
+
+    def test_instructor_endpoints_read_course_stats(self):
+        """Test: Dashboard y listado del instructor leen las inscripciones de CourseStats"""
+        for student in self.students[:2]:
+            enrollments = self.paid_enrollments(student, Decimal('150.00'))
+        EnrollmentProgressService().apply_completion_delta(enrollments[0], 1)
+        client = APIClient()
+        client.force_authenticate(user=self.instructor)
+
+        response = client.get('/api/v1/dashboard/instructor/stats/')
+        self.assertEqual(response.status_code, 200)
+        data = response.data['data']
+        self.assertEqual(data['enrollments']['total'], 4)
+        self.assertEqual(data['enrollments']['active'], 4)
+        self.assertEqual(data['enrollments']['average_completion'], 12.5)
+        self.assertEqual(data['students']['unique'], 2)
+        self.assertEqual(data['revenue']['total'], 300.0)
+        self.assertEqual([course['enrollments'] for course in data['popular_courses']], [2, 2])
+
+        response = client.get('/api/v1/instructor/courses/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({course['id']: course['enrollments'] for course in response.data['data']}, {
+            self.courses[0].id: 2,
+            self.courses[1].id: 2,
+        })
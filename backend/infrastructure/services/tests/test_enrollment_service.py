@@ -0,0 +1,149 @@
+"""
+Tests unitarios para EnrollmentService
+Inscripciones en bloque con un número fijo de consultas
+"""
+
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.core.models import CourseStats, UserProfile
+from apps.courses.models import Course, Module, Lesson
+from apps.payments.models import Payment, PaymentIntent
+from apps.users.models import Enrollment
+from infrastructure.services.enrollment_service import EnrollmentService
+
+
+class EnrollmentServiceTestCase(TestCase):
+    """Tests para EnrollmentService"""
+
+    def setUp(self):
+        """Configuración inicial para cada test"""
+        self.student = User.objects.create_user(
+            username='student@test.com',
+            email='student@test.com',
+            password='testpass123'
+        )
+        UserProfile.objects.create(user=self.student, role='student')
+
+        self.courses = []
+        for index in range(4):
+            course = Course.objects.create(
+                id=f'c-enroll-{index}',
+                title=f'Curso {index}',
+                slug=f'curso-{index}',
+                description='Descripción',
+                price=100.00,
+                status='published',
+                is_active=True
+            )
+            module = Module.objects.create(id=f'm-enroll-{index}', course=course, title='Módulo', order=1)
+            for order in range(index):
+                Lesson.objects.create(
+                    id=f'l-enroll-{index}-{order}',
+                    module=module,
+                    title=f'Lección {order}',
+                    lesson_type='text',
+                    order=order,
+                    is_active=True
+                )
+            self.courses.append(course)
+
+    def test_enroll_creates_enrollments_with_lesson_totals(self):
+        """Test: Crea las inscripciones y asigna total_lessons sin pasar por pre_save"""
+        result = EnrollmentService().enroll(self.student, [course.id for course in self.courses])
+
+        self.assertEqual(len(result.created), 4)
+        self.assertEqual(result.existing, [])
+        self.assertEqual(result.course_titles, ['Curso 0', 'Curso 1', 'Curso 2', 'Curso 3'])
+        totals = dict(Enrollment.objects.filter(user=self.student).values_list('course_id', 'total_lessons'))
+        self.assertEqual(totals, {'c-enroll-0': 0, 'c-enroll-1': 1, 'c-enroll-2': 2, 'c-enroll-3': 3})
+
+    def test_enroll_keeps_existing_and_skips_missing(self):
+        """Test: Las inscripciones existentes se conservan y los cursos inexistentes se ignoran"""
+        existing = Enrollment.objects.create(user=self.student, course=self.courses[0], status='active')
+
+        result = EnrollmentService().enroll(
+            self.student, [self.courses[0].id, self.courses[1].id, self.courses[1].id, 'no-existe']
+        )
+
+        self.assertEqual([enrollment.course_id for enrollment in result.created], [self.courses[1].id])
+        self.assertEqual([enrollment.id for enrollment in result.existing], [existing.id])
+        self.assertEqual(result.missing_course_ids, ['no-existe'])
+        self.assertEqual(result.course_titles, ['Curso 0', 'Curso 1'])
+        self.assertEqual(Enrollment.objects.filter(user=self.student).count(), 2)
+
+    def test_paid_enroll_reactivates_expired_and_cancelled(self):
+        """Test: Un pago aprobado reactiva las inscripciones vencidas o canceladas de sus cursos"""
+        expired = Enrollment.objects.create(user=self.student, course=self.courses[0], status='expired')
+        cancelled = Enrollment.objects.create(user=self.student, course=self.courses[1], status='cancelled')
+        active = Enrollment.objects.create(user=self.student, course=self.courses[2], status='active')
+        course_ids = [course.id for course in self.courses]
+        intent = PaymentIntent.objects.create(
+            user=self.student, total=Decimal('400.00'), currency='PEN', status='succeeded', course_ids=course_ids
+        )
+        payment = Payment.objects.create(
+            user=self.student, payment_intent=intent, amount=Decimal('400.00'), status='approved'
+        )
+
+        result = EnrollmentService().enroll(self.student, course_ids, payment=payment)
+
+        self.assertEqual([enrollment.course_id for enrollment in result.created], [self.courses[3].id])
+        self.assertEqual({enrollment.id for enrollment in result.reactivated}, {expired.id, cancelled.id})
+        self.assertEqual([enrollment.id for enrollment in result.existing], [active.id])
+        for enrollment in (expired, cancelled):
+            enrollment.refresh_from_db()
+            self.assertEqual(enrollment.status, 'active')
+            self.assertEqual(enrollment.payment_id, payment.id)
+            self.assertIsNone(enrollment.expires_at)
+        active.refresh_from_db()
+        self.assertIsNone(active.payment_id)
+
+        # El ingreso se reparte entre las tres inscripciones del pago
+        stats = CourseStats.objects.in_bulk([course.id for course in self.courses])
+        self.assertEqual(sum(row.revenue for row in stats.values()), Decimal('400.00'))
+        self.assertEqual(stats[self.courses[0].id].active_enrollments, 1)
+        self.assertEqual(stats[self.courses[2].id].revenue, Decimal('0.00'))
+
+    def test_enroll_constant_queries(self):
+        """Test: El número de consultas no depende de la cantidad de cursos"""
+        service = EnrollmentService()
+        other = User.objects.create_user(username='other@test.com', email='other@test.com', password='testpass123')
+
+        with CaptureQueriesContext(connection) as one_course:
+            service.enroll(self.student, [self.courses[0].id])
+        with CaptureQueriesContext(connection) as many_courses:
+            service.enroll(other, [course.id for course in self.courses])
+
+        self.assertEqual(len(one_course), len(many_courses))
+
+    def test_admin_grant_user_enrollments(self):
+        """Test: El endpoint de administración inscribe con el servicio en bloque"""
+        admin = User.objects.create_user(username='admin@test.com', email='admin@test.com', password='testpass123')
+        UserProfile.objects.create(user=admin, role='admin')
+        Enrollment.objects.create(user=self.student, course=self.courses[0], status='active')
+        client = APIClient()
+        client.force_authenticate(user=admin)
+
+        response = client.post(
+            f'/api/v1/admin/users/{self.student.id}/enrollments/',
+            {'course_ids': [self.courses[0].id, self.courses[2].id]},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([item['course_id'] for item in response.data['data']['created']], [self.courses[2].id])
+        self.assertEqual([item['course_id'] for item in response.data['data']['existing']], [self.courses[0].id])
+
+        client.force_authenticate(user=self.student)
+        response = client.post(
+            f'/api/v1/admin/users/{self.student.id}/enrollments/',
+            {'course_ids': [self.courses[3].id]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
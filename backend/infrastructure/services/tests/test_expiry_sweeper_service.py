@@ -0,0 +1,100 @@
+"""
+Tests unitarios para ExpirySweeperService
+Barrido en bloque de payment intents e inscripciones vencidas
+"""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.courses.models import Course
+from apps.payments.models import PaymentIntent
+from apps.users.models import Enrollment
+from infrastructure.services.expiry_sweeper_service import ExpirySweeperService
+
+
+class ExpirySweeperServiceTestCase(TestCase):
+    """Tests para ExpirySweeperService y el comando expire_stale_records"""
+
+    def setUp(self):
+        """Configuración inicial para cada test"""
+        self.now = timezone.now()
+        self.past = self.now - timedelta(hours=2)
+        self.future = self.now + timedelta(hours=2)
+        self.courses = [
+            Course.objects.create(
+                id=f'c-expiry-{index}',
+                title=f'Curso {index}',
+                slug=f'curso-expiry-{index}',
+                description='Descripción',
+                price=100.00,
+                status='published',
+                is_active=True
+            )
+            for index in range(3)
+        ]
+        self.users = [
+            User.objects.create_user(username=f'user{index}', email=f'user{index}@test.com', password='testpass123')
+            for index in range(3)
+        ]
+
+    def _intent(self, user, status, expires_at):
+        return PaymentIntent.objects.create(
+            user=user, total=100.00, currency='PEN', status=status,
+            course_ids=[self.courses[0].id], expires_at=expires_at
+        )
+
+    def _enrollment(self, course, status, expires_at):
+        return Enrollment.objects.create(user=self.users[0], course=course, status=status, expires_at=expires_at)
+
+    def test_sweep_transitions_only_expired_rows(self):
+        """Test: Solo los intents pendientes e inscripciones activas vencidas cambian de estado"""
+        expired_intents = [self._intent(user, 'pending', self.past) for user in self.users]
+        live_intent = self._intent(self.users[0], 'pending', self.future)
+        succeeded_intent = self._intent(self.users[1], 'succeeded', self.past)
+        no_expiry_intent = self._intent(self.users[2], 'pending', None)
+
+        expired_enrollment = self._enrollment(self.courses[0], 'active', self.past)
+        live_enrollment = self._enrollment(self.courses[1], 'active', self.future)
+        completed_enrollment = self._enrollment(self.courses[2], 'completed', self.past)
+
+        counts = ExpirySweeperService(batch_size=2).sweep(now=self.now)
+
+        self.assertEqual(counts, {'payment_intents_expired': 3, 'enrollments_expired': 1})
+        statuses = dict(PaymentIntent.objects.values_list('id', 'status'))
+        for intent in expired_intents:
+            self.assertEqual(statuses[intent.id], 'cancelled')
+        self.assertEqual(statuses[live_intent.id], 'pending')
+        self.assertEqual(statuses[succeeded_intent.id], 'succeeded')
+        self.assertEqual(statuses[no_expiry_intent.id], 'pending')
+
+        statuses = dict(Enrollment.objects.values_list('id', 'status'))
+        self.assertEqual(statuses[expired_enrollment.id], 'expired')
+        self.assertEqual(statuses[live_enrollment.id], 'active')
+        self.assertEqual(statuses[completed_enrollment.id], 'completed')
+
+        # Un segundo barrido no encuentra nada
+        self.assertEqual(
+            ExpirySweeperService().sweep(now=self.now),
+            {'payment_intents_expired': 0, 'enrollments_expired': 0}
+        )
+
+    def test_expire_stale_records_command(self):
+        """Test: El comando informa los conteos y --dry-run no modifica filas"""
+        intent = self._intent(self.users[0], 'pending', self.past)
+
+        out = StringIO()
+        call_command('expire_stale_records', '--dry-run', stdout=out)
+        self.assertIn('Payment intents cancelados: 1', out.getvalue())
+        intent.refresh_from_db()
+        self.assertEqual(intent.status, 'pending')
+
+        out = StringIO()
+        call_command('expire_stale_records', stdout=out)
+        self.assertIn('Payment intents cancelados: 1', out.getvalue())
+        intent.refresh_from_db()
+        self.assertEqual(intent.status, 'cancelled')
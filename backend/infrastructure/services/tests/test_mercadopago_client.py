@@ -0,0 +1,145 @@
+"""
+Tests unitarios para MercadoPagoClient
+Pool de conexiones, timeouts por operación, circuit breaker y métricas
+contra el servidor falso de Mercado Pago
+"""
+
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.courses.models import Course
+from apps.payments.models import PaymentIntent
+from infrastructure.external_services import MercadoPagoPaymentGateway
+from infrastructure.services.mercadopago_client import (
+    MercadoPagoCircuitOpenError,
+    MercadoPagoClient,
+    MercadoPagoUnavailableError,
+    reset_session,
+)
+from infrastructure.services.payment_service import PaymentService
+from infrastructure.services.tests.fake_mercadopago import FakeMercadoPagoServer
+
+
+class MercadoPagoClientTestCase(TestCase):
+    """Tests para MercadoPagoClient, PaymentService y MercadoPagoPaymentGateway con el servidor falso"""
+
+    def setUp(self):
+        """Configuración inicial para cada test"""
+        cache.clear()
+        reset_session()
+        self.server = FakeMercadoPagoServer().start()
+        self.settings_override = override_settings(
+            MERCADOPAGO_ACCESS_TOKEN='test_token',
+            MERCADOPAGO_API_URL=self.server.url,
+            MERCADOPAGO_BREAKER_THRESHOLD=3,
+            MERCADOPAGO_BREAKER_COOLDOWN=30,
+        )
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        reset_session()
+        self.server.stop()
+        cache.clear()
+
+    def test_calls_reuse_one_keep_alive_connection(self):
+        """Test: Llamadas sucesivas (cliente, SDK y gateway) reutilizan la misma conexión"""
+        client = MercadoPagoClient()
+        for index in range(3):
+            result = client.get_payment(f'pay-{index}')
+            self.assertEqual(result['status'], 200)
+            self.assertEqual(result['response']['id'], f'pay-{index}')
+
+        success, token, payment_method_id, _ = PaymentService().tokenize_card(
+            '4509 9535 6623 3704', 'APRO', '11', '30', '123'
+        )
+        self.assertTrue(success)
+        self.assertEqual(token, 'fake_token_3704')
+        self.assertEqual(payment_method_id, 'visa')
+
+        self.assertEqual(MercadoPagoPaymentGateway().get_payment_status('pay-9')['status'], 'approved')
+
+        self.assertEqual(len(self.server.requests), 5)
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(self.server.requests[3]['path'], '/v1/card_tokens')
+        self.assertEqual(self.server.requests[3]['headers']['Authorization'], 'Bearer test_token')
+
+        metrics = client.metrics()
+        self.assertEqual(metrics['payment_get']['count'], 4)
+        self.assertEqual(metrics['card_token']['count'], 1)
+        self.assertEqual(sum(metrics['payment_get']['latency_ms'].values()), 4)
+
+    def test_operation_timeout_fails_and_is_counted(self):
+        """Test: Cada operación usa su timeout de lectura"""
+        self.server.delay = 0.5
+        with override_settings(MERCADOPAGO_TIMEOUTS={'payment_get': (1, 0.1)}):
+            client = MercadoPagoClient()
+            started = time.monotonic()
+            with self.assertRaises(MercadoPagoUnavailableError):
+                client.get_payment('slow')
+            self.assertLess(time.monotonic() - started, 0.5)
+
+        self.assertEqual(client.metrics()['payment_get']['errors']['timeout'], 1)
+
+    def test_circuit_breaker_fails_fast_and_recovers(self):
+        """Test: El circuito se abre tras el umbral de fallos y se cierra con una prueba exitosa"""
+        client = MercadoPagoClient()
+        self.server.fail_next(3, status=503)
+        for _ in range(3):
+            with self.assertRaises(MercadoPagoUnavailableError):
+                client.get_payment('down')
+        self.assertEqual(client.circuit_state(), 'open')
+
+        # Abierto: falla sin llegar al servidor
+        with self.assertRaises(MercadoPagoCircuitOpenError):
+            client.get_payment('down')
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(client.metrics()['payment_get']['errors']['circuit_open'], 1)
+
+        # Fin del enfriamiento: una llamada de prueba cierra el circuito
+        cache.set('mercadopago:breaker:opened_at', time.time() - 60)
+        self.assertEqual(client.circuit_state(), 'half_open')
+        self.assertEqual(client.get_payment('up')['status'], 200)
+        self.assertEqual(client.circuit_state(), 'closed')
+
+    def test_client_errors_do_not_open_circuit(self):
+        """Test: Una respuesta 4xx es una respuesta válida, no una caída"""
+        client = MercadoPagoClient()
+        self.server.fail_next(5, status=400)
+        for _ in range(5):
+            self.assertEqual(client.create_payment({'token': 'bad'})['status'], 400)
+
+        self.assertEqual(client.circuit_state(), 'closed')
+        self.assertEqual(client.metrics()['payment_create']['errors']['client_error'], 5)
+
+    def test_process_payment_with_open_circuit_keeps_intent_pending(self):
+        """Test: Con el circuito abierto el pago falla rápido y el intent se puede reintentar"""
+        student = User.objects.create_user(username='mp@test.com', email='mp@test.com', password='testpass123')
+        course = Course.objects.create(
+            id='c-mp-client', title='Curso', slug='curso-mp-client', description='Descripción',
+            price=Decimal('100.00'), status='published', is_active=True
+        )
+        payment_intent = PaymentIntent.objects.create(
+            user=student, total=Decimal('100.00'), currency='PEN', status='pending', course_ids=[course.id]
+        )
+        cache.set('mercadopago:breaker:opened_at', time.time())
+
+        success, payment, error_message = PaymentService().process_payment(
+            user=student,
+            payment_intent_id=payment_intent.id,
+            payment_token='tok',
+            payment_method_id='visa',
+            installments=1,
+            amount=Decimal('100.00'),
+        )
+
+        self.assertFalse(success)
+        self.assertIsNone(payment)
+        self.assertIn('no está disponible', error_message)
+        self.assertEqual(self.server.requests, [])
+        payment_intent.refresh_from_db()
+        self.assertEqual(payment_intent.status, 'pending')
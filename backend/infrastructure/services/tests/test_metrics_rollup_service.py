@@ -0,0 +1,181 @@
+"""
+Tests unitarios para MetricsRollupService
+Rollups diarios de ingresos y actividad por curso, y comando backfill_metrics_rollup
+"""
+
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.core.models import DailyCourseActivity, DailyRevenue
+from apps.courses.models import Course
+from apps.payments.models import Payment, PaymentIntent
+from apps.users.models import Certificate, Enrollment
+from infrastructure.services.enrollment_progress_service import EnrollmentProgressService
+from infrastructure.services.metrics_rollup_service import MetricsRollupService
+
+
+class MetricsRollupServiceTestCase(TestCase):
+    """Tests para MetricsRollupService"""
+
+    def setUp(self):
+        """Configuración inicial para cada test"""
+        self.today = timezone.localdate()
+        self.yesterday = self.today - timedelta(days=1)
+        self.course = Course.objects.create(
+            id='c-rollup', title='Curso', slug='curso-rollup', description='Descripción',
+            price=Decimal('100.00'), status='published', is_active=True
+        )
+        self.users = [
+            User.objects.create_user(username=f'rollup{index}@test.com', password='testpass123')
+            for index in range(3)
+        ]
+
+    def at(self, day, hour=12):
+        return timezone.make_aware(datetime.combine(day, time(hour)))
+
+    def payment(self, user, amount, currency='PEN', status='approved', created_at=None):
+        intent = PaymentIntent.objects.create(
+            user=user, total=amount, currency=currency, status='succeeded', course_ids=[self.course.id]
+        )
+        payment = Payment.objects.create(
+            user=user, payment_intent=intent, amount=amount, currency=currency, status=status
+        )
+        if created_at:
+            Payment.objects.filter(pk=payment.pk).update(created_at=created_at)
+        return payment
+
+    def enrollment(self, user, enrolled_at, completed_at=None):
+        enrollment = Enrollment.objects.create(user=user, course=self.course, status='active')
+        Enrollment.objects.filter(pk=enrollment.pk).update(
+            enrolled_at=enrolled_at,
+            completed=completed_at is not None,
+            completed_at=completed_at,
+        )
+        return enrollment
+
+    def test_rollup_groups_by_local_day_and_currency(self):
+        """Test: Los rollups agrupan por día local, moneda y curso"""
+        # 23:30 hora local pertenece al día local, aunque en UTC ya sea el día siguiente
+        self.payment(self.users[0], Decimal('100.00'), created_at=self.at(self.yesterday, 23).replace(minute=30))
+        self.payment(self.users[1], Decimal('40.00'), created_at=self.at(self.today))
+        self.payment(self.users[1], Decimal('25.00'), currency='USD', created_at=self.at(self.today))
+        self.payment(self.users[2], Decimal('999.00'), status='rejected', created_at=self.at(self.today))
+
+        completed = self.enrollment(self.users[0], self.at(self.yesterday), completed_at=self.at(self.today))
+        self.enrollment(self.users[1], self.at(self.today))
+        Certificate.objects.create(
+            enrollment=completed, user=self.users[0], course=self.course, verification_code='ROLLUP-1'
+        )
+
+        MetricsRollupService().refresh()
+
+        revenue = {
+            (row.date, row.currency): (row.payments_count, row.total)
+            for row in DailyRevenue.objects.all()
+        }
+        self.assertEqual(revenue, {
+            (self.yesterday, 'PEN'): (1, Decimal('100.00')),
+            (self.today, 'PEN'): (1, Decimal('40.00')),
+            (self.today, 'USD'): (1, Decimal('25.00')),
+        })
+        activity = {
+            row.date: (row.enrollments, row.completions, row.certificates)
+            for row in DailyCourseActivity.objects.filter(course=self.course)
+        }
+        self.assertEqual(activity, {self.yesterday: (1, 0, 0), self.today: (1, 1, 1)})
+
+        totals = MetricsRollupService.revenue_totals()
+        self.assertEqual(totals['total'], 3)
+        self.assertEqual(totals['total_revenue'], 165.0)
+
+    def test_refresh_is_idempotent_and_picks_up_late_changes(self):
+        """Test: Recalcular reemplaza los días del rango sin duplicar filas"""
+        payment = self.payment(self.users[0], Decimal('100.00'), status='pending', created_at=self.at(self.yesterday))
+        service = MetricsRollupService()
+        service.refresh()
+        self.assertFalse(DailyRevenue.objects.exists())
+
+        # Aprobado tarde (webhook): el día de creación se recalcula en la siguiente pasada
+        Payment.objects.filter(pk=payment.pk).update(status='approved')
+        service.refresh()
+        service.refresh()
+
+        self.assertEqual(DailyRevenue.objects.count(), 1)
+        self.assertEqual(DailyRevenue.objects.get().total, Decimal('100.00'))
+
+    def test_backfill_command_rebuilds_history(self):
+        """Test: El comando reconstruye desde el primer pago o inscripción"""
+        old_day = self.today - timedelta(days=75)
+        self.payment(self.users[0], Decimal('30.00'), created_at=self.at(old_day))
+        self.enrollment(self.users[0], self.at(old_day))
+        self.payment(self.users[1], Decimal('20.00'), created_at=self.at(self.today))
+
+        out = StringIO()
+        call_command('backfill_metrics_rollup', stdout=out)
+
+        self.assertIn('Rollups reconstruidos', out.getvalue())
+        self.assertEqual(
+            list(DailyRevenue.objects.order_by('date').values_list('date', 'total')),
+            [(old_day, Decimal('30.00')), (self.today, Decimal('20.00'))]
+        )
+        self.assertEqual(DailyCourseActivity.objects.get(date=old_day).enrollments, 1)
+        self.assertEqual(
+            MetricsRollupService.revenue_by_month(days=180)[-1]['month'], self.today.strftime('%Y-%m')
+        )
+
+    def test_first_refresh_backfills_empty_rollups(self):
+        """Test: Con las tablas vacías, refresh() reconstruye toda la historia"""
+        old_day = self.today - timedelta(days=40)
+        self.payment(self.users[0], Decimal('30.00'), created_at=self.at(old_day))
+        self.enrollment(self.users[0], self.at(old_day))
+
+        MetricsRollupService().refresh()
+
+        self.assertEqual(MetricsRollupService.revenue_totals()['total_revenue'], 30.0)
+        self.assertEqual(DailyCourseActivity.objects.get(date=old_day).enrollments, 1)
+
+    def test_changes_outside_lookback_recompute_their_day(self):
+        """Test: Reembolsos y eliminaciones de días antiguos actualizan los rollups"""
+        old_day = self.today - timedelta(days=40)
+        payment = self.payment(self.users[0], Decimal('30.00'), created_at=self.at(old_day))
+        enrollment = self.enrollment(self.users[1], self.at(old_day), completed_at=self.at(old_day))
+        Certificate.objects.create(
+            enrollment=enrollment, user=self.users[1], course=self.course, verification_code='ROLLUP-2'
+        )
+        self.payment(self.users[2], Decimal('20.00'), created_at=self.at(self.today))
+        MetricsRollupService().refresh()
+        self.assertEqual(MetricsRollupService.activity_totals(), {'enrollments': 1, 'completions': 1, 'certificates': 1})
+
+        payment.refresh_from_db()
+        with self.captureOnCommitCallbacks(execute=True):
+            payment.status = 'refunded'
+            payment.save()
+        self.assertEqual(MetricsRollupService.revenue_totals()['total_revenue'], 20.0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Certificate.objects.filter(enrollment=enrollment).delete()
+        self.assertEqual(MetricsRollupService.activity_totals()['certificates'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Enrollment.objects.get(pk=enrollment.pk).delete()
+        self.assertEqual(MetricsRollupService.activity_totals(), {'enrollments': 0, 'completions': 0, 'certificates': 0})
+
+    def test_reopened_completion_recomputes_its_day(self):
+        """Test: Un curso completado hace tiempo que se reabre deja de contar en su día"""
+        old_day = self.today - timedelta(days=40)
+        enrollment = self.enrollment(self.users[0], self.at(old_day), completed_at=self.at(old_day))
+        Enrollment.objects.filter(pk=enrollment.pk).update(status='completed', completed_lessons=1, total_lessons=1)
+        MetricsRollupService().refresh()
+        self.assertEqual(MetricsRollupService.activity_totals()['completions'], 1)
+
+        enrollment.refresh_from_db()
+        with self.captureOnCommitCallbacks(execute=True):
+            EnrollmentProgressService().apply_completion_delta(enrollment, -1)
+        self.assertEqual(enrollment.status, 'active')
+        self.assertEqual(MetricsRollupService.activity_totals()['completions'], 0)
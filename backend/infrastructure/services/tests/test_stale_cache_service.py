@@ -0,0 +1,123 @@
+"""
+Tests unitarios para StaleWhileRevalidateCache
+Valor vencido servido mientras un solo proceso recalcula, y estadísticas públicas cacheadas
+"""
+
+import threading
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.core.models import UserProfile
+from apps.courses.models import Course
+from apps.users.permissions import ROLE_STUDENT
+from application.use_cases.dashboard import GetPublicStatsUseCase
+from infrastructure.services.stale_cache_service import StaleWhileRevalidateCache
+
+
+class StaleWhileRevalidateCacheTestCase(TestCase):
+    """Tests para StaleWhileRevalidateCache y GET /api/v1/stats/public/"""
+
+    def setUp(self):
+        """Configuración inicial para cada test"""
+        cache.clear()
+        self.calls = 0
+
+    def tearDown(self):
+        cache.clear()
+
+    def compute(self):
+        self.calls += 1
+        return self.calls
+
+    def expire(self, swr):
+        entry = cache.get(swr.key)
+        entry['fresh_until'] = time.time() - 1
+        cache.set(swr.key, entry)
+
+    def test_fresh_value_is_computed_once(self):
+        """Test: Mientras el valor es fresco no se recalcula"""
+        swr = StaleWhileRevalidateCache('test', self.compute, soft_timeout=60)
+
+        self.assertEqual([swr.get() for _ in range(3)], [1, 1, 1])
+        self.assertEqual(self.calls, 1)
+
+    def test_stale_value_is_served_while_one_refresh_is_scheduled(self):
+        """Test: Vencido el soft TTL se sirve el valor viejo y se encola un solo recálculo"""
+        swr = StaleWhileRevalidateCache('test', self.compute, soft_timeout=60)
+        swr.get()
+        self.expire(swr)
+
+        scheduled = []
+        for _ in range(5):
+            self.assertEqual(swr.get(schedule_refresh=lambda: scheduled.append(True)), 1)
+        self.assertEqual(len(scheduled), 1)
+        self.assertEqual(self.calls, 1)
+
+        # El recálculo en segundo plano guarda el valor nuevo y libera el candado
+        swr.refresh()
+        self.assertEqual(swr.get(), 2)
+        self.assertTrue(cache.add(swr.lock_key, True))
+
+    def test_failed_refresh_keeps_serving_stale_value(self):
+        """Test: Si el recálculo falla se sigue sirviendo el valor vencido"""
+        values = iter([1])
+        swr = StaleWhileRevalidateCache('test', lambda: next(values), soft_timeout=60)
+        swr.get()
+        self.expire(swr)
+
+        self.assertEqual(swr.get(), 1)
+        # El candado se liberó: el próximo acceso vuelve a intentar
+        self.assertTrue(cache.add(swr.lock_key, True))
+
+    def test_concurrent_misses_compute_once(self):
+        """Test: Sin valor en caché, las requests concurrentes esperan a un solo cálculo"""
+        def slow_compute():
+            time.sleep(0.2)
+            return self.compute()
+
+        swr = StaleWhileRevalidateCache('test', slow_compute, soft_timeout=60)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(swr.get())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [1] * 8)
+        self.assertEqual(self.calls, 1)
+
+    def test_public_stats_endpoint_serves_cached_stats(self):
+        """Test: Las estadísticas públicas se cachean y se revalidan en segundo plano"""
+        student = User.objects.create_user(username='swr@test.com', email='swr@test.com', password='testpass123')
+        UserProfile.objects.create(user=student, role=ROLE_STUDENT)
+        Course.objects.create(
+            id='c-swr', title='Curso', slug='curso-swr', description='Descripción',
+            price=Decimal('100.00'), status='published', is_active=True, provider='fagsol'
+        )
+        client = APIClient()
+
+        response = client.get('/api/v1/stats/public/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data']['students'], 1)
+        self.assertEqual(response.data['data']['courses'], 1)
+        self.assertEqual(response.data['data']['instructors']['courses_created'], 1)
+
+        second = User.objects.create_user(username='swr2@test.com', email='swr2@test.com', password='testpass123')
+        UserProfile.objects.create(user=second, role=ROLE_STUDENT)
+
+        # Fresco: sin consultas a la base de datos
+        with self.assertNumQueries(0):
+            response = client.get('/api/v1/stats/public/')
+        self.assertEqual(response.data['data']['students'], 1)
+
+        # Vencido: se sirve el valor viejo y la tarea (eager en tests) lo recalcula
+        self.expire(GetPublicStatsUseCase().cache())
+        response = client.get('/api/v1/stats/public/')
+        self.assertEqual(response.data['data']['students'], 1)
+        response = client.get('/api/v1/stats/public/')
+        self.assertEqual(response.data['data']['students'], 2)
@@ -0,0 +1,98 @@
+"""
+Tests unitarios para StudentStatsCacheService
+Estadísticas de estudiante con un número fijo de consultas, cacheadas por usuario
+"""
+
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.core.models import UserProfile
+from apps.courses.models import Course, Lesson, Module
+from apps.users.models import Certificate, Enrollment
+from apps.users.permissions import ROLE_STUDENT
+from application.use_cases.dashboard import GetStudentStatsUseCase
+from infrastructure.services.enrollment_progress_service import EnrollmentProgressService
+from infrastructure.services.enrollment_service import EnrollmentService
+
+
+class StudentStatsCacheServiceTestCase(TestCase):
+    """Tests para GetStudentStatsUseCase y GET /api/v1/dashboard/student/stats/"""
+
+    def setUp(self):
+        """Configuración inicial para cada test"""
+        cache.clear()
+        self.student = User.objects.create_user(username='student@test.com', email='student@test.com', password='testpass123')
+        UserProfile.objects.create(user=self.student, role=ROLE_STUDENT)
+
+        self.courses = []
+        for index in range(4):
+            course = Course.objects.create(
+                id=f'c-student-{index}', title=f'Curso {index}', slug=f'curso-student-{index}',
+                description='Descripción', price=Decimal('100.00'), status='published', is_active=True
+            )
+            module = Module.objects.create(id=f'm-student-{index}', course=course, title='Módulo', order=1)
+            Lesson.objects.create(
+                id=f'l-student-{index}', module=module, title='Lección', lesson_type='text', order=1, is_active=True
+            )
+            self.courses.append(course)
+
+        self.enrollments = EnrollmentService().enroll(self.student, [course.id for course in self.courses[:3]]).created
+        for enrollment in self.enrollments[:2]:
+            EnrollmentProgressService().apply_completion_delta(enrollment, 1)
+        Certificate.objects.create(
+            enrollment=self.enrollments[0], user=self.student, course=self.courses[0], verification_code='STUDENT-1'
+        )
+        cache.clear()
+
+    def test_stats_use_fixed_queries_and_certificate_set(self):
+        """Test: Contadores, recientes, completados y certificados en 4 consultas"""
+        with self.assertNumQueries(4):
+            stats = GetStudentStatsUseCase().compute_stats(self.student)
+
+        self.assertEqual(stats['enrollments'], {'total': 3, 'active': 1, 'completed': 2, 'in_progress': 0})
+        self.assertAlmostEqual(stats['progress']['average'], 66.67, places=2)
+        self.assertEqual(stats['certificates'], {'total': 1})
+        self.assertEqual(len(stats['recent_courses']), 3)
+        self.assertEqual(
+            {course['id']: course['has_certificate'] for course in stats['completed_courses']},
+            {self.courses[0].id: True, self.courses[1].id: False}
+        )
+
+    def test_endpoint_is_cached_per_user_and_invalidated_on_changes(self):
+        """Test: La respuesta se cachea y se invalida con inscripciones, progreso y certificados"""
+        client = APIClient()
+        client.force_authenticate(user=self.student)
+
+        def get_stats():
+            response = client.get('/api/v1/dashboard/student/stats/')
+            self.assertEqual(response.status_code, 200)
+            return response.data['data']
+
+        self.assertEqual(get_stats()['enrollments']['total'], 3)
+        with self.assertNumQueries(0):
+            GetStudentStatsUseCase().execute(self.student)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            EnrollmentService().enroll(self.student, [self.courses[3].id])
+        self.assertEqual(get_stats()['enrollments']['total'], 4)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            EnrollmentProgressService().apply_completion_delta(self.enrollments[2], 1)
+        self.assertEqual(get_stats()['enrollments']['completed'], 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Certificate.objects.create(
+                enrollment=self.enrollments[1], user=self.student, course=self.courses[1], verification_code='STUDENT-2'
+            )
+        self.assertEqual(get_stats()['certificates']['total'], 2)
+
+        # Los cambios de otro usuario no invalidan la caché de este
+        other = User.objects.create_user(username='other@test.com', email='other@test.com', password='testpass123')
+        with self.captureOnCommitCallbacks(execute=True):
+            Enrollment.objects.create(user=other, course=self.courses[0], status='active')
+        with self.assertNumQueries(0):
+            GetStudentStatsUseCase().execute(self.student)
@@ -0,0 +1,240 @@
+"""
+Servicio de Buffer de Tiempo Visto - FagSol Escuela Virtual
+
+Buffer write-behind para la telemetría del reproductor de video: cada tick
+suma segundos con un incr atómico en la caché, sin tocar la base de datos.
+La tarea periódica flush_watch_time_buffer (apps/users/tasks.py) vuelca lo
+acumulado a LessonProgress con bulk_update por bloques.
+
+Las claves se agrupan por generación. Al volcar se incrementa la generación
+(los ticks nuevos van a la siguiente) y se vuelca la generación que dejó de
+recibir escrituras en el ciclo anterior, de modo que ningún tick en curso se
+pierde entre la lectura y el borrado de las claves. Las lecturas suman las
+dos generaciones pendientes (pending()).
+
+Requiere una caché compartida entre procesos (CACHE_URL). Con LocMemCache
+(WATCH_TIME_BUFFER_ENABLED en False) cada tick se escribe directo en la base
+de datos, porque el worker que vuelca no vería la caché del proceso web.
+"""
+
+import logging
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from apps.courses.models import Lesson
+from apps.users.models import Enrollment, LessonProgress
+
+logger = logging.getLogger('apps')
+
+
+class WatchTimeBufferService:
+    """
+    Servicio de buffer write-behind para el tiempo visto de las lecciones
+    """
+
+    KEY_PREFIX = 'watch_time'
+    GENERATION_KEY = 'watch_time:generation'
+    BATCH_SIZE = 500
+
+    # Margen para que las claves sobrevivan aunque el worker se atrase varios ciclos
+    KEY_TIMEOUT = 60 * 60 * 24
+
+    # Validación de acceso cacheada por (usuario, enrollment, lección)
+    ACCESS_TIMEOUT = 60 * 5
+
+    # Tope por tick: el reproductor reporta cada pocos segundos
+    MAX_SECONDS_PER_TICK = 300
+
+    def _key(self, generation: int, *parts) -> str:
+        return ':'.join([self.KEY_PREFIX, f'g{generation}', *map(str, parts)])
+
+    def _generation(self) -> int:
+        cache.add(self.GENERATION_KEY, 1, timeout=None)
+        return cache.get(self.GENERATION_KEY) or 1
+
+    def has_access(self, user, enrollment_id: str, lesson_id: str) -> bool:
+        """
+        Valida que la lección pertenece a un enrollment activo del usuario.
+        El resultado positivo se cachea para que los ticks siguientes no consulten la base de datos.
+        """
+        access_key = f'{self.KEY_PREFIX}:access:{user.id}:{enrollment_id}:{lesson_id}'
+        if cache.get(access_key):
+            return True
+
+        course_id = Enrollment.objects.filter(
+            id=enrollment_id, user=user, status='active'
+        ).values_list('course_id', flat=True).first()
+        allowed = course_id is not None and Lesson.objects.filter(
+            id=lesson_id, module__course_id=course_id, is_active=True
+        ).exists()
+
+        if allowed:
+            cache.set(access_key, True, self.ACCESS_TIMEOUT)
+        return allowed
+
+    def record(self, user_id: int, enrollment_id: str, lesson_id: str, seconds: int) -> None:
+        """
+        Acumula segundos vistos de una lección (sin escribir en la base de datos).
+
+        El primer tick de cada lección en una generación la registra en un slot
+        numerado, para que el volcado pueda enumerar las claves pendientes.
+        Sin caché compartida los segundos se suman directo en la base de datos.
+        """
+        if not settings.WATCH_TIME_BUFFER_ENABLED:
+            key = (enrollment_id, lesson_id)
+            self._apply({key: (user_id, seconds)}, {key: timezone.now().timestamp()})
+            return
+
+        generation = self._generation()
+        delta_key = self._key(generation, 'delta', enrollment_id, lesson_id)
+
+        if cache.add(delta_key, 0, self.KEY_TIMEOUT):
+            seq_key = self._key(generation, 'seq')
+            cache.add(seq_key, 0, self.KEY_TIMEOUT)
+            slot = cache.incr(seq_key)
+            cache.set(
+                self._key(generation, 'slot', slot),
+                [user_id, enrollment_id, lesson_id],
+                self.KEY_TIMEOUT
+            )
+
+        try:
+            cache.incr(delta_key, seconds)
+        except ValueError:
+            # La clave expiró entre add e incr: se pierde un tick, no hay que fallar el request
+            logger.warning(f"Tick de tiempo visto descartado para {enrollment_id}/{lesson_id}")
+            return
+
+        cache.set(
+            self._key(generation, 'seen', enrollment_id, lesson_id),
+            timezone.now().timestamp(),
+            self.KEY_TIMEOUT
+        )
+
+    def pending(self, enrollment_id: str, lesson_id: str) -> Tuple[int, Optional[datetime]]:
+        """
+        Segundos aún no volcados y último acceso de una lección.
+
+        Returns:
+            Tuple[segundos, último acceso (o None si no hay ticks pendientes)]
+        """
+        current = self._generation()
+        keys = []
+        for generation in (current, current - 1):
+            keys.append(self._key(generation, 'delta', enrollment_id, lesson_id))
+            keys.append(self._key(generation, 'seen', enrollment_id, lesson_id))
+        values = cache.get_many(keys)
+
+        seconds = sum(values.get(key) or 0 for key in keys[0::2])
+        seen = [values[key] for key in keys[1::2] if values.get(key)]
+        last_seen = datetime.fromtimestamp(max(seen), tz=dt_timezone.utc) if seen else None
+        return seconds, last_seen
+
+    def flush(self) -> int:
+        """
+        Cierra la generación actual y vuelca la anterior a la base de datos.
+
+        Returns:
+            int: Número de lecciones (LessonProgress) actualizadas
+        """
+        generation = self._generation()
+        cache.incr(self.GENERATION_KEY)
+        return self.flush_generation(generation - 1)
+
+    def flush_generation(self, generation: int) -> int:
+        """Vuelca todos los ticks de una generación en bloques de BATCH_SIZE"""
+        total_slots = cache.get(self._key(generation, 'seq')) or 0
+        flushed = 0
+
+        for start in range(1, total_slots + 1, self.BATCH_SIZE):
+            slot_keys = [
+                self._key(generation, 'slot', slot)
+                for slot in range(start, min(start + self.BATCH_SIZE, total_slots + 1))
+            ]
+            entries = [entry for entry in cache.get_many(slot_keys).values() if entry]
+            flushed += self._flush_entries(generation, entries)
+            cache.delete_many(slot_keys)
+
+        cache.delete(self._key(generation, 'seq'))
+        if flushed:
+            logger.info(f"Tiempo visto volcado para {flushed} lecciones (generación {generation})")
+        return flushed
+
+    def _flush_entries(self, generation: int, entries: List[list]) -> int:
+        delta_keys = {
+            (enrollment_id, lesson_id): self._key(generation, 'delta', enrollment_id, lesson_id)
+            for _, enrollment_id, lesson_id in entries
+        }
+        seen_keys = {
+            (enrollment_id, lesson_id): self._key(generation, 'seen', enrollment_id, lesson_id)
+            for _, enrollment_id, lesson_id in entries
+        }
+        deltas = cache.get_many(list(delta_keys.values()))
+        seen = cache.get_many(list(seen_keys.values()))
+
+        pending: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        for user_id, enrollment_id, lesson_id in entries:
+            key = (enrollment_id, lesson_id)
+            seconds = deltas.get(delta_keys[key]) or 0
+            if seconds > 0:
+                pending[key] = (user_id, seconds)
+
+        if pending:
+            self._apply(pending, {key: seen.get(seen_keys[key]) for key in pending})
+
+        cache.delete_many(list(delta_keys.values()) + list(seen_keys.values()))
+        return len(pending)
+
+    def _apply(
+        self,
+        pending: Dict[Tuple[str, str], Tuple[int, int]],
+        last_seen: Dict[Tuple[str, str], Optional[float]]
+    ) -> None:
+        """Crea los LessonProgress que falten y suma los segundos con bulk_update"""
+        enrollment_ids = {enrollment_id for enrollment_id, _ in pending}
+        lesson_ids = {lesson_id for _, lesson_id in pending}
+
+        def existing_progress():
+            return {
+                (enrollment_id, lesson_id): pk
+                for pk, enrollment_id, lesson_id in LessonProgress.objects.filter(
+                    enrollment_id__in=enrollment_ids, lesson_id__in=lesson_ids
+                ).values_list('pk', 'enrollment_id', 'lesson_id')
+            }
+
+        existing = existing_progress()
+        missing = [key for key in pending if key not in existing]
+        if missing:
+            # Filas nuevas en 0: los segundos se suman abajo con el resto (sin carreras)
+            LessonProgress.objects.bulk_create(
+                [
+                    LessonProgress(user_id=pending[key][0], enrollment_id=key[0], lesson_id=key[1])
+                    for key in missing
+                ],
+                ignore_conflicts=True
+            )
+            existing = existing_progress()
+
+        now = timezone.now()
+        rows = []
+        for key, (_, seconds) in pending.items():
+            pk = existing.get(key)
+            if pk is None:
+                # Enrollment o lección eliminados mientras tanto
+                continue
+            timestamp = last_seen.get(key)
+            progress = LessonProgress(pk=pk)
+            progress.time_watched_seconds = F('time_watched_seconds') + seconds
+            progress.last_accessed_at = (
+                datetime.fromtimestamp(timestamp, tz=dt_timezone.utc) if timestamp else now
+            )
+            rows.append(progress)
+
+        LessonProgress.objects.bulk_update(
+            rows, ['time_watched_seconds', 'last_accessed_at'], batch_size=self.BATCH_SIZE
+        )
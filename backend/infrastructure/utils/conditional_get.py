@@ -0,0 +1,137 @@
+"""
+GET condicional (ETag / Last-Modified) - FagSol Escuela Virtual
+
+Los validadores se calculan con consultas de agregación baratas (updated_at
+máximo y cantidad de filas) antes de serializar la respuesta. Si el cliente
+envía If-None-Match / If-Modified-Since y nada cambió, se responde 304 sin
+construir el payload.
+
+El ETag incluye la cantidad de módulos, lecciones y materiales, por lo que
+también detecta eliminaciones. Last-Modified solo refleja updated_at: ante
+una eliminación se confía en If-None-Match, que tiene prioridad.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from django.db.models import Count, DateTimeField, IntegerField, Max, OuterRef, QuerySet, Subquery
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def build_etag(*parts) -> str:
+    """Construye un ETag fuerte a partir de valores serializables"""
+    digest = hashlib.md5(
+        json.dumps(parts, sort_keys=True, default=str).encode('utf-8')
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def _child_aggregate(queryset: QuerySet, course_field: str, aggregate, output_field):
+    """Subquery con un agregado de las filas hijas de cada curso"""
+    return Subquery(
+        queryset
+        .filter(**{course_field: OuterRef('pk')})
+        .order_by()
+        .values(course_field)
+        .annotate(value=aggregate)
+        .values('value')[:1],
+        output_field=output_field
+    )
+
+
+def course_tree_validators(course_id: str) -> Tuple[Optional[datetime], Optional[tuple]]:
+    """
+    Calcula los validadores de un curso y su árbol de contenido en una sola consulta.
+
+    Returns:
+        Tuple[last_modified, signature]: updated_at más reciente entre curso,
+        módulos, lecciones y materiales, y la firma completa para el ETag.
+        (None, None) si el curso no existe.
+    """
+    from apps.courses.models import Course, Module, Lesson, Material
+
+    row = Course.objects.filter(pk=course_id).annotate(
+        modules_updated=_child_aggregate(Module.objects.all(), 'course', Max('updated_at'), DateTimeField()),
+        modules_count=_child_aggregate(Module.objects.all(), 'course', Count('id'), IntegerField()),
+        lessons_updated=_child_aggregate(Lesson.objects.all(), 'module__course', Max('updated_at'), DateTimeField()),
+        lessons_count=_child_aggregate(Lesson.objects.all(), 'module__course', Count('id'), IntegerField()),
+        materials_updated=_child_aggregate(Material.objects.all(), 'course', Max('updated_at'), DateTimeField()),
+        materials_count=_child_aggregate(Material.objects.all(), 'course', Count('id'), IntegerField()),
+    ).values(
+        'updated_at', 'modules_updated', 'modules_count', 'lessons_updated',
+        'lessons_count', 'materials_updated', 'materials_count'
+    ).first()
+
+    if row is None:
+        return None, None
+
+    timestamps = [
+        row[field] for field in ('updated_at', 'modules_updated', 'lessons_updated', 'materials_updated')
+        if row[field] is not None
+    ]
+    signature = tuple(row[field] for field in sorted(row))
+    return max(timestamps), signature
+
+
+def queryset_validators(queryset: QuerySet) -> Tuple[Optional[datetime], tuple]:
+    """
+    Validadores de un listado: updated_at más reciente y cantidad de filas.
+
+    Returns:
+        Tuple[last_modified, signature]
+    """
+    row = queryset.order_by().aggregate(last_modified=Max('updated_at'), total=Count('id'))
+    return row['last_modified'], (row['last_modified'], row['total'])
+
+
+def user_enrollment_signature(user, course_id: Optional[str] = None) -> Optional[tuple]:
+    """
+    Firma de las inscripciones del usuario (para respuestas con datos propios
+    como is_enrolled o el progreso). None para invitados, sin consultas.
+    """
+    if not user or not user.is_authenticated:
+        return None
+
+    from apps.users.models import Enrollment
+
+    enrollments = Enrollment.objects.filter(user=user)
+    if course_id is not None:
+        enrollments = enrollments.filter(course_id=course_id)
+    row = enrollments.aggregate(updated=Max('updated_at'), total=Count('id'))
+    return (user.id, row['updated'], row['total'])
+
+
+def not_modified_response(request, etag: str, last_modified: Optional[datetime]) -> Optional[Response]:
+    """
+    Evalúa If-None-Match / If-Modified-Since.
+
+    Returns:
+        Response 304 (o 412) si corresponde, None si hay que devolver el payload
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    conditional = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if conditional is None:
+        return None
+
+    if conditional.status_code != status.HTTP_304_NOT_MODIFIED:
+        return Response(status=conditional.status_code)
+
+    return set_conditional_headers(
+        Response(status=status.HTTP_304_NOT_MODIFIED), etag, last_modified
+    )
+
+
+def set_conditional_headers(response: Response, etag: str, last_modified: Optional[datetime]) -> Response:
+    """Agrega ETag, Last-Modified y Cache-Control a la respuesta"""
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    # El cliente puede guardar la respuesta, pero debe revalidarla siempre
+    response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ('Authorization', 'Cookie'))
+    return response
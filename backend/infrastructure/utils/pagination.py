@@ -0,0 +1,153 @@
+"""
+Paginación por cursor (keyset) - FagSol Escuela Virtual
+
+A diferencia de la paginación por offset, el cursor codifica los valores de
+ordenamiento del último elemento entregado y la siguiente página se obtiene con
+un filtro WHERE sobre esos valores. El costo de cada página es constante sin
+importar cuán profunda sea y no se duplican ni pierden filas si el catálogo
+cambia entre requests.
+"""
+
+import base64
+import json
+from typing import List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursorError(ValueError):
+    """El cursor recibido no es válido para el ordenamiento solicitado"""
+
+
+def get_page_size(raw_value, default: Optional[int] = None) -> int:
+    """
+    Normaliza el tamaño de página solicitado por el cliente.
+
+    Args:
+        raw_value: Valor recibido en el query param (puede ser None o texto)
+        default: Tamaño por defecto (REST_FRAMEWORK['PAGE_SIZE'] si no se indica)
+
+    Returns:
+        int: Tamaño de página entre 1 y MAX_PAGE_SIZE
+    """
+    if default is None:
+        default = settings.REST_FRAMEWORK.get('PAGE_SIZE', 20)
+    try:
+        page_size = int(raw_value) if raw_value not in (None, '') else default
+    except (TypeError, ValueError):
+        page_size = default
+    return max(1, min(page_size, MAX_PAGE_SIZE))
+
+
+def encode_cursor(values: Sequence) -> str:
+    """Codifica los valores de ordenamiento de un elemento como cursor opaco"""
+    payload = json.dumps([
+        value.isoformat() if hasattr(value, 'isoformat') else value
+        for value in values
+    ], separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor_values(cursor: str, length: int) -> List:
+    """
+    Decodifica un cursor en su lista de valores (sin convertir tipos).
+
+    Raises:
+        InvalidCursorError: Si el cursor está corrupto o no tiene `length` valores
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except (ValueError, UnicodeError):
+        raise InvalidCursorError('Cursor inválido')
+
+    if not isinstance(values, list) or len(values) != length:
+        raise InvalidCursorError('Cursor inválido')
+    return values
+
+
+def decode_cursor(cursor: str, queryset: QuerySet, ordering: Sequence[str]) -> List:
+    """
+    Decodifica un cursor y convierte sus valores al tipo de cada campo.
+
+    Raises:
+        InvalidCursorError: Si el cursor está corrupto o no coincide con el ordenamiento
+    """
+    values = decode_cursor_values(cursor, len(ordering))
+
+    converted = []
+    for field_name, value in zip(ordering, values):
+        field = queryset.model._meta.get_field(field_name.lstrip('-'))
+        try:
+            converted.append(field.to_python(value))
+        except Exception:
+            raise InvalidCursorError('Cursor inválido')
+    return converted
+
+
+def _keyset_filter(ordering: Sequence[str], values: Sequence) -> Q:
+    """
+    Construye el predicado "estrictamente después de" para un ordenamiento compuesto.
+
+    Para ['order', '-created_at', 'id'] produce:
+        order > o
+        OR (order = o AND created_at < c)
+        OR (order = o AND created_at = c AND id > i)
+    """
+    condition = Q()
+    equal_prefix = {}
+    for field_name, value in zip(ordering, values):
+        name = field_name.lstrip('-')
+        lookup = 'lt' if field_name.startswith('-') else 'gt'
+        condition |= Q(**equal_prefix, **{f'{name}__{lookup}': value})
+        equal_prefix[name] = value
+    return condition
+
+
+def paginate_by_keyset(
+    queryset: QuerySet,
+    ordering: Sequence[str],
+    cursor: Optional[str] = None,
+    page_size: Optional[int] = None
+) -> Tuple[List, Optional[str]]:
+    """
+    Obtiene una página de resultados usando paginación keyset.
+
+    El último campo de `ordering` debe ser único (ej: 'id') para que el
+    ordenamiento sea total.
+
+    Args:
+        queryset: QuerySet base (ya filtrado)
+        ordering: Campos de ordenamiento (prefijo '-' para descendente)
+        cursor: Cursor devuelto por la página anterior (None = primera página)
+        page_size: Tamaño de página
+
+    Returns:
+        Tuple[items, next_cursor]: next_cursor es None si no hay más páginas
+
+    Raises:
+        InvalidCursorError: Si el cursor no es válido
+    """
+    page_size = get_page_size(page_size)
+    queryset = queryset.order_by(*ordering)
+
+    if cursor:
+        values = decode_cursor(cursor, queryset, ordering)
+        queryset = queryset.filter(_keyset_filter(ordering, values))
+
+    # Pedir un elemento extra para saber si existe una página siguiente
+    items = list(queryset[:page_size + 1])
+    has_more = len(items) > page_size
+    items = items[:page_size]
+
+    next_cursor = None
+    if has_more and items:
+        last = items[-1]
+        next_cursor = encode_cursor([
+            getattr(last, field_name.lstrip('-')) for field_name in ordering
+        ])
+
+    return items, next_cursor
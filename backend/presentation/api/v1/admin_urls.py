@@ -47,6 +47,8 @@ from presentation.views.admin_views import (
     delete_material,
     # Gestión de alumnos inscritos
     list_course_students,
+    get_course_roster,
+    grant_user_enrollments,
     get_student_progress,
     get_course_status_counts,
     # Gestión de mensajes de contacto
@@ -118,6 +120,8 @@ urlpatterns = [
     # Gestión de alumnos inscritos
     path('courses/<str:course_id>/students/', list_course_students, name='admin_list_course_students'),
     path('courses/<str:course_id>/students/<str:enrollment_id>/progress/', get_student_progress, name='admin_get_student_progress'),
+    path('courses/<str:course_id>/roster/', get_course_roster, name='admin_get_course_roster'),
+    path('users/<int:user_id>/enrollments/', grant_user_enrollments, name='admin_grant_user_enrollments'),
     
     # Gestión de mensajes de contacto
     path('contact-messages/', list_contact_messages, name='admin_list_contact_messages'),
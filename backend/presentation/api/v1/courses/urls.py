@@ -5,6 +5,7 @@ URLs de Cursos - FagSol Escuela Virtual
 from django.urls import path
 from presentation.views.course_views import (
     list_courses,
+    list_course_facets,
     get_course,
     get_course_by_slug,
     get_course_content,
@@ -22,6 +23,9 @@ urlpatterns = [
     path('create/', create_course, name='create_course'),  # POST /api/v1/courses/create/ (alternativa)
     # O usar el mismo path con método POST: path('', create_course, name='create_course'),
     
+    # Facetas del catálogo (debe ir antes de rutas con parámetros)
+    path('facets/', list_course_facets, name='list_course_facets'),  # GET /api/v1/courses/facets/
+    
     # Rutas con slug
     path('slug/<str:slug>/', get_course_by_slug, name='get_course_by_slug'),
     
@@ -6,6 +6,8 @@ from django.urls import path
 from presentation.views.progress_views import (
     mark_lesson_completed,
     mark_lesson_incomplete,
+    sync_lesson_progress_batch,
+    record_watch_time,
     get_course_progress,
     get_lesson_progress,
 )
@@ -17,6 +19,12 @@ urlpatterns = [
     # Marcar lección como incompleta
     path('lessons/incomplete/', mark_lesson_incomplete, name='mark_lesson_incomplete'),
     
+    # Sincronizar progreso de varias lecciones (heartbeat del reproductor)
+    path('lessons/batch/', sync_lesson_progress_batch, name='sync_lesson_progress_batch'),
+    
+    # Registrar tiempo visto (buffer write-behind, se vuelca periódicamente)
+    path('lessons/watch/', record_watch_time, name='record_watch_time'),
+    
     # Obtener progreso de una lección específica
     path('lesson/', get_lesson_progress, name='get_lesson_progress'),
     
@@ -3122,6 +3122,7 @@ def get_student_progress(request, course_id, enrollment_id):
     GET /api/v1/admin/courses/{course_id}/students/{enrollment_id}/progress/
     """
     try:
+        from django.db.models import Prefetch
         from apps.courses.models import Course, Module, Lesson
         from apps.users.models import Enrollment, LessonProgress
         
@@ -3134,15 +3135,21 @@ def get_student_progress(request, course_id, enrollment_id):
             }, status=status.HTTP_404_NOT_FOUND)
         
         try:
-            enrollment = Enrollment.objects.get(id=enrollment_id, course=course)
+            enrollment = Enrollment.objects.select_related('user').get(id=enrollment_id, course=course)
         except Enrollment.DoesNotExist:
             return Response({
                 'success': False,
                 'message': 'Inscripción no encontrada'
             }, status=status.HTTP_404_NOT_FOUND)
         
-        # Obtener módulos del curso
-        modules = Module.objects.filter(course=course).order_by('order')
+        # Obtener módulos del curso con sus lecciones activas (una consulta para todas)
+        modules = Module.objects.filter(course=course).order_by('order').prefetch_related(
+            Prefetch(
+                'lessons',
+                queryset=Lesson.objects.filter(is_active=True).order_by('order'),
+                to_attr='active_lessons'
+            )
+        )
         
         # Obtener progreso de lecciones
         lesson_progresses = LessonProgress.objects.filter(
@@ -3156,7 +3163,7 @@ def get_student_progress(request, course_id, enrollment_id):
         completed_lessons = 0
         
         for module in modules:
-            lessons = Lesson.objects.filter(module=module, is_active=True).order_by('order')
+            lessons = module.active_lessons
             lessons_data = []
             
             for lesson in lessons:
@@ -3227,6 +3234,174 @@ def get_student_progress(request, course_id, enrollment_id):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@swagger_auto_schema(
+    method='post',
+    operation_description=(
+        'Inscribe manualmente a un usuario en uno o varios cursos (sin pago). '
+        'Las inscripciones existentes se conservan y se informan en "existing".'
+    ),
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        required=['course_ids'],
+        properties={
+            'course_ids': openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Schema(type=openapi.TYPE_STRING),
+                description='IDs de los cursos'
+            ),
+        }
+    ),
+    responses={
+        201: openapi.Response(description='Inscripciones creadas'),
+        400: openapi.Response(description='Datos inválidos'),
+        403: openapi.Response(description='No autorizado'),
+        404: openapi.Response(description='Usuario no encontrado'),
+    },
+    tags=['Admin - Alumnos']
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def grant_user_enrollments(request, user_id):
+    """
+    Inscribe a un usuario en varios cursos.
+    POST /api/v1/admin/users/{user_id}/enrollments/
+    Body: { "course_ids": ["c-001", "c-002"] }
+    """
+    try:
+        from infrastructure.services.enrollment_service import EnrollmentService
+        
+        user = User.objects.get(id=user_id)
+        course_ids = request.data.get('course_ids')
+        
+        if not isinstance(course_ids, list) or not course_ids:
+            return Response({
+                'success': False,
+                'message': 'course_ids debe ser una lista no vacía'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        result = EnrollmentService().enroll(user, course_ids)
+        
+        logger.info(f'Admin {request.user.id} inscribió al usuario {user.id} en {len(result.created)} cursos')
+        
+        return Response({
+            'success': True,
+            'data': {
+                'created': [
+                    {'id': enrollment.id, 'course_id': enrollment.course_id}
+                    for enrollment in result.created
+                ],
+                'existing': [
+                    {'id': enrollment.id, 'course_id': enrollment.course_id, 'status': enrollment.status}
+                    for enrollment in result.existing
+                ],
+                'missing_course_ids': result.missing_course_ids,
+            },
+            'message': f'{len(result.created)} inscripciones creadas'
+        }, status=status.HTTP_201_CREATED)
+        
+    except User.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': 'Usuario no encontrado'
+        }, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        logger.error(f'Error granting enrollments to user {user_id}: {str(e)}')
+        return Response({
+            'success': False,
+            'message': 'Error al inscribir al usuario'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_description=(
+        'Matriz de progreso alumnos × lecciones de un curso. Cada alumno incluye un bitmap '
+        '"completed" ("1"/"0" por lección) alineado con "lessons". Paginada por alumno con cursor; '
+        'con export=csv devuelve la matriz completa como CSV en streaming. '
+        'Accesible para administradores e instructores (solo de sus propios cursos).'
+    ),
+    manual_parameters=[
+        openapi.Parameter('status', openapi.IN_QUERY, description='Filtrar por estado de la inscripción', type=openapi.TYPE_STRING, required=False),
+        openapi.Parameter('page_size', openapi.IN_QUERY, description='Alumnos por página (máx 100)', type=openapi.TYPE_INTEGER, required=False),
+        openapi.Parameter('cursor', openapi.IN_QUERY, description='Cursor de la página siguiente (next_cursor)', type=openapi.TYPE_STRING, required=False),
+        openapi.Parameter('export', openapi.IN_QUERY, description='"csv" para descargar la matriz completa', type=openapi.TYPE_STRING, enum=['csv'], required=False),
+    ],
+    responses={
+        200: openapi.Response(description='Matriz de progreso del curso'),
+        400: openapi.Response(description='Cursor inválido'),
+        404: openapi.Response(description='Curso no encontrado'),
+        401: openapi.Response(description='No autenticado'),
+        403: openapi.Response(description='No autorizado'),
+    },
+    security=[{'Bearer': []}],
+    tags=['Admin - Alumnos']
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminOrInstructor])
+def get_course_roster(request, course_id):
+    """
+    Matriz de progreso de todos los alumnos de un curso.
+    GET /api/v1/admin/courses/{course_id}/roster/?status=active&page_size=50&cursor=...
+    GET /api/v1/admin/courses/{course_id}/roster/?export=csv
+    """
+    try:
+        from django.http import StreamingHttpResponse
+        from apps.courses.models import Course
+        from infrastructure.services.course_roster_service import CourseRosterService
+        from infrastructure.utils.pagination import InvalidCursorError
+        
+        try:
+            course = Course.objects.get(id=course_id)
+        except Course.DoesNotExist:
+            return Response({
+                'success': False,
+                'message': 'Curso no encontrado'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        # Los instructores solo pueden ver el progreso de sus propios cursos
+        if get_user_role(request.user) != ROLE_ADMIN and course.created_by_id != request.user.id:
+            return Response({
+                'success': False,
+                'message': 'No tienes permiso para ver el progreso de este curso'
+            }, status=status.HTTP_403_FORBIDDEN)
+        
+        roster_service = CourseRosterService()
+        status_filter = request.query_params.get('status') or None
+        
+        if request.query_params.get('export') == 'csv':
+            response = StreamingHttpResponse(
+                roster_service.iter_csv(course, status=status_filter),
+                content_type='text/csv; charset=utf-8'
+            )
+            response['Content-Disposition'] = f'attachment; filename="progreso_{course.slug or course.id}.csv"'
+            return response
+        
+        try:
+            data = roster_service.get_page(
+                course,
+                status=status_filter,
+                cursor=request.query_params.get('cursor'),
+                page_size=request.query_params.get('page_size')
+            )
+        except InvalidCursorError as e:
+            return Response({
+                'success': False,
+                'message': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'success': True,
+            'data': data
+        }, status=status.HTTP_200_OK)
+        
+    except Exception as e:
+        logger.error(f'Error getting roster for course {course_id}: {str(e)}')
+        return Response({
+            'success': False,
+            'message': 'Error al obtener el progreso del curso'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 # ========== GESTIÓN DE MENSAJES DE CONTACTO ==========
 
 @swagger_auto_schema(
@@ -8,14 +8,24 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.db.models import F
+from django.db.models.functions import Coalesce
 from apps.courses.models import Course, Module, Lesson, Material
 from apps.users.models import Enrollment
 from apps.users.permissions import (
-    can_view_course, can_access_course_content, IsAdminOrInstructor, IsAdmin, is_admin
+    can_access_course_content, visible_courses_for, IsAdminOrInstructor, IsAdmin, is_admin
 )
 from infrastructure.services.course_service import CourseService  # Mantener para compatibilidad temporal
 from infrastructure.services.course_approval_service import CourseApprovalService  # Mantener para compatibilidad temporal
 from infrastructure.services.currency_service import CurrencyService
+from infrastructure.services.course_pricing_service import CoursePricingService
+from infrastructure.services.catalog_cache_service import CatalogCacheService
+from infrastructure.services.course_facet_service import CourseFacetService
+from infrastructure.services.course_content_snapshot_service import CourseContentSnapshotService
+from infrastructure.utils.conditional_get import (
+    build_etag, course_tree_validators, queryset_validators, user_enrollment_signature,
+    not_modified_response, set_conditional_headers
+)
 from application.use_cases.course import (
     CreateCourseUseCase,
     UpdateCourseUseCase,
@@ -88,6 +98,175 @@ def get_course_instructor_info(course, provider):
     return {'id': 'i-001', 'name': 'Equipo Fagsol'}
 
 
+# Campos disponibles en las tarjetas del catálogo (parámetro fields=)
+CATALOG_FIELDS = (
+    'id', 'title', 'slug', 'short_description', 'price', 'price_usd', 'discount_price',
+    'currency', 'thumbnail_url', 'status', 'category', 'level', 'provider', 'tags',
+    'hours', 'rating', 'ratings_count', 'instructor', 'created_at',
+)
+
+# Ordenamiento keyset del catálogo (Course.Meta.ordering + id como desempate)
+CATALOG_ORDERING = ('order', '-created_at', 'id')
+
+
+def parse_catalog_fields(raw_fields):
+    """
+    Interpreta el parámetro fields= del catálogo.
+    
+    Args:
+        raw_fields: Lista separada por comas (ej: "id,title,price") o vacío
+    
+    Returns:
+        Tuple[fields, invalid]: Campos solicitados (siempre incluye 'id') y campos desconocidos
+    """
+    if not raw_fields:
+        return CATALOG_FIELDS, []
+    
+    requested = [field.strip() for field in raw_fields.split(',') if field.strip()]
+    invalid = [field for field in requested if field not in CATALOG_FIELDS]
+    fields = tuple(field for field in CATALOG_FIELDS if field == 'id' or field in requested)
+    return fields, invalid
+
+
+def serialize_catalog_course(course, fields=CATALOG_FIELDS, currency=None, pricing_service=None):
+    """
+    Serializa un curso para el catálogo incluyendo solo los campos solicitados.
+    
+    provider e instructor solo se calculan si se piden, ya que requieren
+    cargar el creador del curso y su perfil.
+    
+    Si se indica currency, agrega localized_price con el precio precalculado
+    en esa moneda (Course.localized_prices).
+    """
+    data = {}
+    
+    if 'provider' in fields or 'instructor' in fields:
+        # Determinar provider basado en el rol del creador del curso
+        # Si el creador es instructor, provider = 'instructor'
+        # Si el creador es admin, provider = 'fagsol'
+        from apps.users.permissions import get_user_role, ROLE_INSTRUCTOR
+        provider = 'fagsol'  # Por defecto
+        if course.created_by:
+            creator_role = get_user_role(course.created_by)
+            if creator_role == ROLE_INSTRUCTOR:
+                provider = 'instructor'
+        if 'provider' in fields:
+            data['provider'] = provider  # Provider determinado por el creador
+        if 'instructor' in fields:
+            # Obtener información del instructor correcta
+            data['instructor'] = get_course_instructor_info(course, provider)
+    
+    values = {
+        'id': lambda: course.id,
+        'title': lambda: course.title,
+        'slug': lambda: course.slug,
+        'short_description': lambda: course.short_description or course.description[:200] + '...' if len(course.description) > 200 else course.description,
+        'price': lambda: float(course.price),
+        'price_usd': lambda: float(course.price_usd) if course.price_usd else None,
+        'discount_price': lambda: float(course.discount_price) if course.discount_price else None,
+        'currency': lambda: course.currency,
+        'thumbnail_url': lambda: course.thumbnail_url,
+        'status': lambda: course.status,
+        'category': lambda: course.category,
+        'level': lambda: course.level,
+        'tags': lambda: course.tags,
+        'hours': lambda: course.hours,
+        'rating': lambda: float(course.rating),
+        'ratings_count': lambda: course.ratings_count,
+        'created_at': lambda: course.created_at.isoformat(),
+    }
+    
+    # Respetar el orden de CATALOG_FIELDS en la respuesta
+    card = {
+        field: data[field] if field in data else values[field]()
+        for field in fields
+    }
+    
+    if currency:
+        pricing_service = pricing_service or CoursePricingService()
+        card['localized_price'] = pricing_service.get_localized_price(course, currency)
+    
+    return card
+
+
+def shares_public_catalog(user):
+    """
+    Indica si el usuario ve exactamente los cursos publicados del catálogo público,
+    de modo que puede recibir las respuestas cacheadas compartidas.
+    """
+    if not user or not user.is_authenticated:
+        return True
+    from apps.users.permissions import get_user_role, ROLE_ADMIN, ROLE_INSTRUCTOR, ROLE_STUDENT
+    return get_user_role(user) in [ROLE_ADMIN, ROLE_INSTRUCTOR, ROLE_STUDENT]
+
+
+def overlay_catalog_enrollments(user, courses):
+    """
+    Superpone is_enrolled del usuario sobre las tarjetas del catálogo (una sola consulta).
+    Los invitados reciben las tarjetas sin modificar.
+    """
+    if not user or not user.is_authenticated:
+        return courses
+    enrolled_ids = set(
+        Enrollment.objects.filter(
+            user=user,
+            course_id__in=[course['id'] for course in courses],
+            status='active'
+        ).values_list('course_id', flat=True)
+    )
+    return [{**course, 'is_enrolled': course['id'] in enrolled_ids} for course in courses]
+
+
+def overlay_course_detail(user, cached_detail):
+    """
+    Construye la respuesta de detalle a partir del payload cacheado compartido,
+    agregando los datos propios del usuario (is_enrolled, is_creator).
+    """
+    data = dict(cached_detail['data'])
+    if user and user.is_authenticated:
+        data['is_enrolled'] = Enrollment.objects.filter(
+            user=user,
+            course_id=data['id'],
+            status='active'
+        ).exists()
+        data['is_creator'] = cached_detail['created_by_id'] == user.id
+    return data
+
+
+def cache_course_detail(cache_service, cache_key, course, response_data, base_etag, last_modified):
+    """
+    Guarda el payload compartido del detalle de un curso junto con sus validadores.
+    Solo se cachean cursos publicados y activos (visibles para todos).
+    """
+    if course.status != 'published' or not course.is_active:
+        return
+    cache_service.set(cache_key, {
+        'data': {**response_data, 'is_enrolled': False, 'is_creator': False},
+        'created_by_id': course.created_by_id,
+        'etag': base_etag,
+        'last_modified': last_modified,
+    })
+
+
+def cached_course_detail_response(request, cached_detail):
+    """
+    Responde el detalle desde la caché compartida (304 si el cliente ya lo tiene).
+    """
+    etag = build_etag(
+        cached_detail['etag'],
+        user_enrollment_signature(request.user, cached_detail['data']['id'])
+    )
+    not_modified = not_modified_response(request, etag, cached_detail['last_modified'])
+    if not_modified:
+        return not_modified
+    
+    response = Response({
+        'success': True,
+        'data': overlay_course_detail(request.user, cached_detail)
+    }, status=status.HTTP_200_OK)
+    return set_conditional_headers(response, etag, cached_detail['last_modified'])
+
+
 @swagger_auto_schema(
     method='get',
     operation_description='Lista todos los cursos disponibles según los permisos del usuario',
@@ -102,7 +281,79 @@ def get_course_instructor_info(course, provider):
         openapi.Parameter(
             'search',
             openapi.IN_QUERY,
-            description='Búsqueda por título',
+            description='Búsqueda de texto completo (título, descripción, tags, categoría). Ordena por relevancia e incluye search_rank y search_snippet',
+            type=openapi.TYPE_STRING
+        ),
+        openapi.Parameter(
+            'category',
+            openapi.IN_QUERY,
+            description='Categorías separadas por coma',
+            type=openapi.TYPE_STRING
+        ),
+        openapi.Parameter(
+            'level',
+            openapi.IN_QUERY,
+            description='Niveles separados por coma (beginner, intermediate, advanced)',
+            type=openapi.TYPE_STRING
+        ),
+        openapi.Parameter(
+            'tags',
+            openapi.IN_QUERY,
+            description='Tags separados por coma (cursos con al menos uno)',
+            type=openapi.TYPE_STRING
+        ),
+        openapi.Parameter(
+            'min_price',
+            openapi.IN_QUERY,
+            description='Precio mínimo (usa discount_price si existe)',
+            type=openapi.TYPE_NUMBER
+        ),
+        openapi.Parameter(
+            'max_price',
+            openapi.IN_QUERY,
+            description='Precio máximo (usa discount_price si existe)',
+            type=openapi.TYPE_NUMBER
+        ),
+        openapi.Parameter(
+            'min_hours',
+            openapi.IN_QUERY,
+            description='Horas mínimas',
+            type=openapi.TYPE_INTEGER
+        ),
+        openapi.Parameter(
+            'max_hours',
+            openapi.IN_QUERY,
+            description='Horas máximas',
+            type=openapi.TYPE_INTEGER
+        ),
+        openapi.Parameter(
+            'min_rating',
+            openapi.IN_QUERY,
+            description='Calificación mínima',
+            type=openapi.TYPE_NUMBER
+        ),
+        openapi.Parameter(
+            'currency',
+            openapi.IN_QUERY,
+            description='Moneda para localized_price (PEN, USD, COP, CLP, MXN, etc.)',
+            type=openapi.TYPE_STRING
+        ),
+        openapi.Parameter(
+            'fields',
+            openapi.IN_QUERY,
+            description='Campos a incluir separados por coma (ej: id,title,price,thumbnail_url). Por defecto todos',
+            type=openapi.TYPE_STRING
+        ),
+        openapi.Parameter(
+            'page_size',
+            openapi.IN_QUERY,
+            description='Activa la paginación por cursor con el tamaño indicado (máximo 100)',
+            type=openapi.TYPE_INTEGER
+        ),
+        openapi.Parameter(
+            'cursor',
+            openapi.IN_QUERY,
+            description='Cursor de la página siguiente (valor next_cursor de la respuesta anterior)',
             type=openapi.TYPE_STRING
         ),
     ],
@@ -122,10 +373,14 @@ def get_course_instructor_info(course, provider):
                             'status': 'published'
                         }
                     ],
-                    'count': 1
+                    'count': 1,
+                    'next_cursor': 'WzAsIjIwMjUtMDEtMDFUMDA6MDA6MDArMDA6MDAiLCJjLTAwMSJd',
+                    'has_more': True
                 }
             }
         ),
+        304: openapi.Response(description='Sin cambios (If-None-Match / If-Modified-Since)'),
+        400: openapi.Response(description='Parámetros inválidos (fields o cursor)'),
         500: openapi.Response(description='Error interno del servidor')
     },
     tags=['Cursos']
@@ -139,17 +394,84 @@ def list_courses(request):
     
     Query params:
     - status: filtro por estado (published, draft)
-    - search: búsqueda por título
+    - search: búsqueda de texto completo ordenada por relevancia, con fragmentos
+      resaltados (<mark>). Siempre paginada por cursor sobre (relevancia, id):
+      páginas de page_size resultados (100 por defecto) con next_cursor / has_more.
+    - fields: campos a incluir separados por coma (por defecto todos)
+    - category, level, tags: filtros de selección múltiple separados por coma
+    - min_price, max_price, min_hours, max_hours, min_rating: filtros de rango
+      (el precio considera discount_price cuando existe)
+    - page_size / cursor: paginación keyset sobre (order, -created_at, id).
+      Sin estos parámetros se devuelve el catálogo completo (compatibilidad).
+    - currency: moneda (ej: COP) para agregar localized_price a cada tarjeta,
+      precalculado al refrescar las tasas de cambio (sin conversiones por request)
     
     Permisos:
     - Público: Solo muestra cursos publicados
     - Autenticado: Muestra cursos publicados + cursos en los que está inscrito
+    
+    El catálogo publicado se cachea (CatalogCacheService) y se invalida en cada
+    cambio de cursos o contenido. A los usuarios autenticados se les agrega
+    is_enrolled en cada tarjeta.
     """
     try:
+        from infrastructure.utils.pagination import paginate_by_keyset, InvalidCursorError
+        
         # Filtros
         status_filter = request.query_params.get('status', 'published')
         search = request.query_params.get('search', '')
         
+        fields, invalid_fields = parse_catalog_fields(request.query_params.get('fields', ''))
+        if invalid_fields:
+            return Response({
+                'success': False,
+                'message': f"Campos inválidos: {', '.join(invalid_fields)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Filtros de facetas (categoría, nivel, tags, precio, horas, calificación)
+        facet_service = CourseFacetService()
+        facet_filters, filter_errors = facet_service.parse_filters(request.query_params)
+        if filter_errors:
+            return Response({
+                'success': False,
+                'message': '; '.join(filter_errors)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Moneda de los precios localizados (opcional)
+        pricing_service = CoursePricingService()
+        currency = request.query_params.get('currency', '').upper()
+        if currency and currency not in pricing_service.currency_service.get_supported_currencies():
+            return Response({
+                'success': False,
+                'message': f'Moneda no soportada: {currency}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Caché compartida: el catálogo publicado es igual para todos los roles
+        cache_service = CatalogCacheService()
+        cache_key = None
+        if status_filter == 'published' and shares_public_catalog(request.user):
+            cache_key = cache_service.build_key('list', {
+                'search': search,
+                'fields': fields,
+                'currency': currency,
+                'filters': facet_filters,
+                'cursor': request.query_params.get('cursor'),
+                'page_size': request.query_params.get('page_size'),
+            })
+            cached_entry = cache_service.get(cache_key)
+            if cached_entry is not None:
+                etag = build_etag(cached_entry['etag'], user_enrollment_signature(request.user))
+                not_modified = not_modified_response(request, etag, cached_entry['last_modified'])
+                if not_modified:
+                    return not_modified
+                
+                cached_response = cached_entry['response']
+                response = Response({
+                    **cached_response,
+                    'data': overlay_catalog_enrollments(request.user, cached_response['data'])
+                }, status=status.HTTP_200_OK)
+                return set_conditional_headers(response, etag, cached_entry['last_modified'])
+        
         # Query base
         queryset = Course.objects.filter(is_active=True)
         
@@ -157,61 +479,98 @@ def list_courses(request):
         if status_filter:
             queryset = queryset.filter(status=status_filter)
         
-        # Búsqueda
-        if search:
-            queryset = queryset.filter(title__icontains=search)
-        
-        # Filtrar según permisos del usuario
-        filtered_courses = []
-        for course in queryset:
-            if can_view_course(request.user, course):
-                filtered_courses.append(course)
+        # Filtrar según permisos del usuario (un único filtro SQL)
+        filtered_courses = visible_courses_for(request.user, queryset)
+        filtered_courses = facet_service.apply_filters(filtered_courses, facet_filters)
+        
+        # No traer la descripción completa si no se necesita
+        if 'short_description' not in fields:
+            filtered_courses = filtered_courses.defer('description')
+        
+        # provider/instructor dependen del creador y su perfil: cargarlos en el mismo JOIN
+        if 'provider' in fields or 'instructor' in fields:
+            filtered_courses = filtered_courses.select_related('created_by__profile')
+        
+        # GET condicional: validar antes de serializar
+        last_modified, signature = queryset_validators(filtered_courses)
+        # La versión del catálogo cubre cambios hechos con bulk_update (ej: precios por moneda)
+        base_etag = build_etag('list', sorted(request.query_params.items()), signature, cache_service.get_version())
+        etag = build_etag(base_etag, user_enrollment_signature(request.user))
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified:
+            return not_modified
+        
+        # Paginación por cursor (opcional)
+        cursor = request.query_params.get('cursor')
+        page_size = request.query_params.get('page_size')
+        paginated = bool(cursor or page_size)
+        next_cursor = None
         
-        # Serializar
-        from apps.users.permissions import get_user_role, ROLE_INSTRUCTOR
-        courses = []
-        for course in filtered_courses:
-            # Determinar provider basado en el rol del creador del curso
-            # Si el creador es instructor, provider = 'instructor'
-            # Si el creador es admin, provider = 'fagsol'
-            provider = 'fagsol'  # Por defecto
-            if course.created_by:
-                creator_role = get_user_role(course.created_by)
-                if creator_role == ROLE_INSTRUCTOR:
-                    provider = 'instructor'
-                else:
-                    provider = 'fagsol'
+        if search:
+            # Búsqueda de texto completo: resultados ordenados por relevancia, paginados por cursor
+            from infrastructure.services.course_search_service import CourseSearchService
+            from infrastructure.utils.pagination import get_page_size
             
-            # Obtener información del instructor correcta
-            instructor_info = get_course_instructor_info(course, provider)
+            paginated = True
+            limit = get_page_size(page_size, default=CourseSearchService.DEFAULT_LIMIT)
+            try:
+                results, next_cursor = CourseSearchService().search_page(
+                    filtered_courses, search, limit=limit, cursor=cursor
+                )
+            except InvalidCursorError as e:
+                return Response({
+                    'success': False,
+                    'message': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
             
-            courses.append({
-                'id': course.id,
-                'title': course.title,
-                'slug': course.slug,
-                'short_description': course.short_description or course.description[:200] + '...' if len(course.description) > 200 else course.description,
-                'price': float(course.price),
-                'price_usd': float(course.price_usd) if course.price_usd else None,
-                'discount_price': float(course.discount_price) if course.discount_price else None,
-                'currency': course.currency,
-                'thumbnail_url': course.thumbnail_url,
-                'status': course.status,
-                'category': course.category,
-                'level': course.level,
-                'provider': provider,  # Provider determinado por el creador
-                'tags': course.tags,
-                'hours': course.hours,
-                'rating': float(course.rating),
-                'ratings_count': course.ratings_count,
-                'instructor': instructor_info,  # Instructor determinado correctamente
-                'created_at': course.created_at.isoformat(),
-            })
+            courses = []
+            for result in results:
+                course_data = serialize_catalog_course(result.course, fields, currency, pricing_service)
+                course_data['search_rank'] = result.rank
+                course_data['search_snippet'] = result.snippet
+                courses.append(course_data)
+        else:
+            if paginated:
+                try:
+                    filtered_courses, next_cursor = paginate_by_keyset(
+                        filtered_courses,
+                        CATALOG_ORDERING,
+                        cursor=cursor,
+                        page_size=page_size
+                    )
+                except InvalidCursorError as e:
+                    return Response({
+                        'success': False,
+                        'message': str(e)
+                    }, status=status.HTTP_400_BAD_REQUEST)
+            else:
+                filtered_courses = filtered_courses.order_by(*CATALOG_ORDERING)
+            
+            # Serializar
+            courses = [
+                serialize_catalog_course(course, fields, currency, pricing_service)
+                for course in filtered_courses
+            ]
         
-        return Response({
+        response_data = {
             'success': True,
             'data': courses,
             'count': len(courses)
-        }, status=status.HTTP_200_OK)
+        }
+        if paginated:
+            response_data['next_cursor'] = next_cursor
+            response_data['has_more'] = next_cursor is not None
+        
+        if cache_key:
+            cache_service.set(cache_key, {
+                'response': response_data,
+                'etag': base_etag,
+                'last_modified': last_modified,
+            })
+        
+        response_data['data'] = overlay_catalog_enrollments(request.user, courses)
+        response = Response(response_data, status=status.HTTP_200_OK)
+        return set_conditional_headers(response, etag, last_modified)
         
     except Exception as e:
         logger.error(f"Error en list_courses: {str(e)}")
@@ -221,6 +580,119 @@ def list_courses(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@swagger_auto_schema(
+    method='get',
+    operation_description='Conteos por faceta del catálogo (categoría, nivel, tags, precio, horas, calificación) para los filtros laterales',
+    manual_parameters=[
+        openapi.Parameter(
+            'category',
+            openapi.IN_QUERY,
+            description='Categorías separadas por coma',
+            type=openapi.TYPE_STRING
+        ),
+        openapi.Parameter(
+            'level',
+            openapi.IN_QUERY,
+            description='Niveles separados por coma (beginner, intermediate, advanced)',
+            type=openapi.TYPE_STRING
+        ),
+        openapi.Parameter(
+            'tags',
+            openapi.IN_QUERY,
+            description='Tags separados por coma (cursos con al menos uno)',
+            type=openapi.TYPE_STRING
+        ),
+        openapi.Parameter(
+            'min_price',
+            openapi.IN_QUERY,
+            description='Precio mínimo (usa discount_price si existe)',
+            type=openapi.TYPE_NUMBER
+        ),
+        openapi.Parameter(
+            'max_price',
+            openapi.IN_QUERY,
+            description='Precio máximo (usa discount_price si existe)',
+            type=openapi.TYPE_NUMBER
+        ),
+        openapi.Parameter(
+            'min_hours',
+            openapi.IN_QUERY,
+            description='Horas mínimas',
+            type=openapi.TYPE_INTEGER
+        ),
+        openapi.Parameter(
+            'max_hours',
+            openapi.IN_QUERY,
+            description='Horas máximas',
+            type=openapi.TYPE_INTEGER
+        ),
+        openapi.Parameter(
+            'min_rating',
+            openapi.IN_QUERY,
+            description='Calificación mínima',
+            type=openapi.TYPE_NUMBER
+        ),
+    ],
+    responses={
+        200: openapi.Response(description='Conteos por faceta'),
+        400: openapi.Response(description='Filtros inválidos'),
+        500: openapi.Response(description='Error interno del servidor')
+    },
+    tags=['Cursos']
+)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def list_course_facets(request):
+    """
+    Conteos por faceta del catálogo publicado
+    GET /api/v1/courses/facets/
+    
+    Acepta los mismos filtros que el listado. Cada faceta se cuenta con los
+    demás filtros aplicados pero no el suyo, y todos los conteos salen de una
+    única consulta agrupada (ver CourseFacetService).
+    """
+    try:
+        facet_service = CourseFacetService()
+        facet_filters, filter_errors = facet_service.parse_filters(request.query_params)
+        if filter_errors:
+            return Response({
+                'success': False,
+                'message': '; '.join(filter_errors)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        cache_service = CatalogCacheService()
+        cache_key = None
+        if shares_public_catalog(request.user):
+            cache_key = cache_service.build_key('facets', {'filters': facet_filters})
+            cached_facets = cache_service.get(cache_key)
+            if cached_facets is not None:
+                return Response({
+                    'success': True,
+                    'data': cached_facets
+                }, status=status.HTTP_200_OK)
+        
+        queryset = visible_courses_for(
+            request.user,
+            Course.objects.filter(status='published', is_active=True)
+        )
+        facets = facet_service.get_facets(queryset, facet_filters)
+        
+        if cache_key:
+            cache_service.set(cache_key, facets)
+        
+        return Response({
+            'success': True,
+            'data': facets
+        }, status=status.HTTP_200_OK)
+        
+    except Exception as e:
+        logger.error(f"Error en list_course_facets: {str(e)}")
+        return Response({
+            'success': False,
+            'message': 'Error interno del servidor'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @swagger_auto_schema(
     method='get',
     operation_description='Obtiene un curso por slug',
@@ -235,6 +707,7 @@ def list_courses(request):
     ],
     responses={
         200: openapi.Response(description='Detalle del curso'),
+        304: openapi.Response(description='Sin cambios (If-None-Match / If-Modified-Since)'),
         404: openapi.Response(description='Curso no encontrado'),
         500: openapi.Response(description='Error interno del servidor')
     },
@@ -248,28 +721,46 @@ def get_course_by_slug(request, slug):
     GET /api/v1/courses/slug/{slug}/
     """
     try:
+        # Caché compartida de cursos publicados (+ datos propios del usuario)
+        cache_service = CatalogCacheService()
+        cache_key = cache_service.build_key('slug', {'slug': slug})
+        cached_detail = cache_service.get(cache_key)
+        if cached_detail is not None and shares_public_catalog(request.user):
+            return cached_course_detail_response(request, cached_detail)
+        
         # Obtener curso por slug (permitir cursos inactivos si el usuario es admin o instructor)
         from apps.users.permissions import is_admin, is_instructor
         if request.user.is_authenticated and (is_admin(request.user) or is_instructor(request.user)):
             # Admin e instructores pueden ver cursos inactivos
-            try:
-                course = Course.objects.get(slug=slug)
-            except Course.DoesNotExist:
+            queryset = Course.objects.filter(slug=slug)
+        else:
+            # Usuarios normales solo pueden ver cursos activos
+            queryset = Course.objects.filter(slug=slug, is_active=True)
+        
+        # Verificar permisos (creador, perfil y revisor en una sola consulta)
+        course = visible_courses_for(request.user, queryset).select_related(
+            'created_by__profile', 'reviewed_by'
+        ).first()
+        if course is None:
+            if not queryset.exists():
                 return Response({
                     'success': False,
                     'message': 'Curso no encontrado'
                 }, status=status.HTTP_404_NOT_FOUND)
-        else:
-            # Usuarios normales solo pueden ver cursos activos
-            course = get_object_or_404(Course, slug=slug, is_active=True)
-        
-        # Verificar permisos
-        if not can_view_course(request.user, course):
             return Response({
                 'success': False,
                 'message': 'No tienes permiso para ver este curso'
             }, status=status.HTTP_403_FORBIDDEN)
         
+        # GET condicional: validar antes de serializar módulos y lecciones
+        last_modified, signature = course_tree_validators(course.id)
+        # La versión del catálogo cubre cambios del creador (nombre, rol) que no tocan el curso
+        base_etag = build_etag('detail', signature, cache_service.get_version())
+        etag = build_etag(base_etag, user_enrollment_signature(request.user, course.id))
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified:
+            return not_modified
+        
         # Obtener módulos
         modules = []
         for module in course.modules.filter(is_active=True).order_by('order'):
@@ -348,6 +839,8 @@ def get_course_by_slug(request, slug):
             'created_at': course.created_at.isoformat(),
         }
         
+        cache_course_detail(cache_service, cache_key, course, response_data, base_etag, last_modified)
+        
         # Incluir información de revisión si el curso está en needs_revision y el usuario es el creador o admin
         if course.status == 'needs_revision' and (is_creator or (request.user.is_authenticated and is_admin(request.user))):
             # Incluir comentarios si existen
@@ -363,10 +856,11 @@ def get_course_by_slug(request, slug):
             if course.reviewed_at:
                 response_data['reviewed_at'] = course.reviewed_at.isoformat()
         
-        return Response({
+        response = Response({
             'success': True,
             'data': response_data
         }, status=status.HTTP_200_OK)
+        return set_conditional_headers(response, etag, last_modified)
         
     except Course.DoesNotExist:
         return Response({
@@ -395,6 +889,7 @@ def get_course_by_slug(request, slug):
     ],
     responses={
         200: openapi.Response(description='Detalle del curso'),
+        304: openapi.Response(description='Sin cambios (If-None-Match / If-Modified-Since)'),
         404: openapi.Response(description='Curso no encontrado'),
         500: openapi.Response(description='Error interno del servidor')
     },
@@ -411,13 +906,44 @@ def get_course(request, course_id):
     Los demás usuarios solo pueden ver cursos activos.
     """
     try:
+        # Caché compartida de cursos publicados (+ datos propios del usuario)
+        cache_service = CatalogCacheService()
+        cache_key = cache_service.build_key('detail', {'course_id': course_id})
+        cached_detail = cache_service.get(cache_key)
+        if cached_detail is not None and shares_public_catalog(request.user):
+            return cached_course_detail_response(request, cached_detail)
+        
         # Obtener curso
         # Los administradores pueden ver cualquier curso (incluso archivados)
         # Los demás usuarios solo pueden ver cursos activos
         if request.user.is_authenticated and is_admin(request.user):
-            course = get_object_or_404(Course, id=course_id)
+            queryset = Course.objects.filter(id=course_id)
         else:
-            course = get_object_or_404(Course, id=course_id, is_active=True)
+            queryset = Course.objects.filter(id=course_id, is_active=True)
+        
+        # Verificar permisos (creador, perfil y revisor en una sola consulta)
+        course = visible_courses_for(request.user, queryset).select_related(
+            'created_by__profile', 'reviewed_by'
+        ).first()
+        if course is None:
+            if not queryset.exists():
+                return Response({
+                    'success': False,
+                    'message': 'Curso no encontrado'
+                }, status=status.HTTP_404_NOT_FOUND)
+            return Response({
+                'success': False,
+                'message': 'No tienes permiso para ver este curso'
+            }, status=status.HTTP_403_FORBIDDEN)
+        
+        # GET condicional: validar antes de serializar módulos y lecciones
+        last_modified, signature = course_tree_validators(course.id)
+        # La versión del catálogo cubre cambios del creador (nombre, rol) que no tocan el curso
+        base_etag = build_etag('detail', signature, cache_service.get_version())
+        etag = build_etag(base_etag, user_enrollment_signature(request.user, course.id))
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified:
+            return not_modified
         
         # Obtener módulos
         modules = []
@@ -497,6 +1023,8 @@ def get_course(request, course_id):
             'created_at': course.created_at.isoformat(),
         }
         
+        cache_course_detail(cache_service, cache_key, course, response_data, base_etag, last_modified)
+        
         # Incluir información de revisión si existe (solo para creadores del curso o admins)
         # Siempre incluir información de revisión si el curso está en needs_revision y el usuario es el creador o admin
         if course.status == 'needs_revision' and (is_creator or (request.user.is_authenticated and is_admin(request.user))):
@@ -513,10 +1041,11 @@ def get_course(request, course_id):
             if course.reviewed_at:
                 response_data['reviewed_at'] = course.reviewed_at.isoformat()
         
-        return Response({
+        response = Response({
             'success': True,
             'data': response_data
         }, status=status.HTTP_200_OK)
+        return set_conditional_headers(response, etag, last_modified)
         
     except Course.DoesNotExist:
         return Response({
@@ -545,6 +1074,7 @@ def get_course(request, course_id):
     ],
     responses={
         200: openapi.Response(description='Contenido del curso'),
+        304: openapi.Response(description='Sin cambios (If-None-Match / If-Modified-Since)'),
         403: openapi.Response(description='No tienes acceso a este curso'),
         404: openapi.Response(description='Curso no encontrado'),
         500: openapi.Response(description='Error interno del servidor')
@@ -581,6 +1111,16 @@ def get_course_content(request, course_id):
                 'message': message
             }, status=status.HTTP_403_FORBIDDEN)
         
+        # Árbol de contenido materializado (se regenera cuando cambia el contenido)
+        snapshot = CourseContentSnapshotService().get_snapshot(course)
+        
+        # GET condicional
+        last_modified = snapshot['last_modified']
+        etag = build_etag('content', snapshot['signature'], user_enrollment_signature(request.user, course.id))
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified:
+            return not_modified
+        
         # Obtener enrollment (si existe)
         enrollment = Enrollment.objects.filter(
             user=request.user,
@@ -588,69 +1128,8 @@ def get_course_content(request, course_id):
             status='active'
         ).first()
         
-        # Obtener contenido completo
-        modules = []
-        for module in course.modules.filter(is_active=True).order_by('order'):
-            lessons = []
-            for lesson in module.lessons.filter(is_active=True).order_by('order'):
-                lesson_data = {
-                    'id': lesson.id,
-                    'title': lesson.title,
-                    'description': lesson.description,
-                    'lesson_type': lesson.lesson_type,
-                    'duration_minutes': lesson.duration_minutes,
-                    'order': lesson.order
-                }
-                
-                # Incluir URL de contenido solo si está disponible
-                if lesson.content_url:
-                    lesson_data['content_url'] = lesson.content_url
-                if lesson.content_text:
-                    lesson_data['content_text'] = lesson.content_text
-                
-                lessons.append(lesson_data)
-            
-            modules.append({
-                'id': module.id,
-                'title': module.title,
-                'description': module.description,
-                'lessons': lessons,
-                'order': module.order
-            })
-        
-        # Obtener materiales del curso (solo activos)
-        materials = []
-        for material in course.materials.filter(is_active=True).order_by('order'):
-            material_data = {
-                'id': material.id,
-                'title': material.title,
-                'description': material.description,
-                'material_type': material.material_type,
-                'url': material.url,
-                'order': material.order,
-            }
-            
-            # Incluir información de asociación si existe
-            if material.module:
-                material_data['module_id'] = material.module.id
-                material_data['module_title'] = material.module.title
-            if material.lesson:
-                material_data['lesson_id'] = material.lesson.id
-                material_data['lesson_title'] = material.lesson.title
-            
-            materials.append(material_data)
-        
         # Preparar datos de respuesta
-        response_data = {
-            'course': {
-                'id': course.id,
-                'title': course.title,
-                'description': course.description,
-                'slug': course.slug,
-            },
-            'modules': modules,
-            'materials': materials  # ✅ Agregar materiales a la respuesta
-        }
+        response_data = dict(snapshot['tree'])
         
         # Incluir enrollment solo si existe
         if enrollment:
@@ -665,10 +1144,11 @@ def get_course_content(request, course_id):
             # Si es admin/instructor sin enrollment, indicar acceso especial
             response_data['access_type'] = 'admin_or_instructor'
         
-        return Response({
+        response = Response({
             'success': True,
             'data': response_data
         }, status=status.HTTP_200_OK)
+        return set_conditional_headers(response, etag, last_modified)
         
     except Course.DoesNotExist:
         return Response({
@@ -745,7 +1225,6 @@ def list_instructor_courses(request):
     """
     try:
         from apps.users.permissions import is_instructor
-        from apps.users.models import Enrollment
         
         # Validar que el usuario es instructor
         if not is_instructor(request.user):
@@ -762,16 +1241,17 @@ def list_instructor_courses(request):
         # Si el filtro es 'archived', incluir cursos archivados (is_active=False)
         # Si el filtro es 'all', excluir cursos archivados (solo activos)
         # Para otros estados, solo mostrar cursos activos
+        base_queryset = visible_courses_for(request.user)
         if status_filter == 'archived':
-            queryset = Course.objects.filter(
+            queryset = base_queryset.filter(
                 created_by=request.user,
                 status='archived'
             )
         else:
             # Para 'all' y otros estados, excluir cursos archivados
-            queryset = Course.objects.filter(
+            queryset = base_queryset.filter(
                 created_by=request.user,
-            is_active=True
+                is_active=True
             ).exclude(status='archived')
         
         # Filtrar por estado (si no es 'all' ni 'archived')
@@ -782,8 +1262,11 @@ def list_instructor_courses(request):
         if search:
             queryset = queryset.filter(title__icontains=search)
         
+        # Inscripciones (activas + completadas) desde CourseStats: JOIN por clave primaria
         # Ordenar por fecha de creación (más recientes primero)
-        queryset = queryset.order_by('-created_at')
+        queryset = queryset.select_related('created_by__profile').annotate(
+            enrollments_count=Coalesce(F('stats__active_enrollments') + F('stats__completed_enrollments'), 0)
+        ).order_by('-created_at')
         
         # Importar funciones necesarias
         from apps.users.permissions import get_user_role, ROLE_INSTRUCTOR
@@ -791,12 +1274,6 @@ def list_instructor_courses(request):
         # Serializar cursos con información adicional
         courses = []
         for course in queryset:
-            # Contar inscripciones
-            enrollments_count = Enrollment.objects.filter(
-                course=course,
-                status__in=['active', 'completed']
-            ).count()
-            
             # Determinar provider basado en el rol del creador del curso
             provider = 'fagsol'  # Por defecto
             if course.created_by:
@@ -829,7 +1306,7 @@ def list_instructor_courses(request):
                 'hours': course.hours,
                 'rating': float(course.rating),
                 'ratings_count': course.ratings_count,
-                'enrollments': enrollments_count,
+                'enrollments': course.enrollments_count,
                 'instructor': instructor_info,  # Instructor determinado correctamente
                 'created_at': course.created_at.isoformat(),
                 'updated_at': course.updated_at.isoformat(),
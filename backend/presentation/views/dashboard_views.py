@@ -9,6 +9,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from infrastructure.services.dashboard_service import DashboardService  # Mantener para compatibilidad temporal
+from infrastructure.services.admin_stats_service import AdminStatsService
 from application.use_cases.dashboard import (
     GetDashboardStatsUseCase,
     GetAdminStatsUseCase,
@@ -22,6 +23,13 @@ from drf_yasg import openapi
 logger = logging.getLogger('apps')
 
 
+def _add_server_timing(response, result):
+    """Expone los tiempos por sección de las estadísticas en el header Server-Timing"""
+    timings = (result.extra or {}).get('timings')
+    if timings:
+        response['Server-Timing'] = AdminStatsService.server_timing(timings)
+
+
 @swagger_auto_schema(
     method='get',
     operation_description='Obtiene estadísticas del dashboard según el rol del usuario autenticado. Las estadísticas varían según si el usuario es admin, instructor o estudiante.',
@@ -88,10 +96,12 @@ def get_dashboard_stats(request):
                 'message': result.error_message
             }, status=status.HTTP_403_FORBIDDEN)
         
-        return Response({
+        response = Response({
             'success': True,
             'data': result.data
         }, status=status.HTTP_200_OK)
+        _add_server_timing(response, result)
+        return response
         
     except Exception as e:
         logger.error(f"Error en get_dashboard_stats: {str(e)}")
@@ -132,10 +142,12 @@ def get_admin_stats(request):
                 'message': result.error_message
             }, status=status.HTTP_403_FORBIDDEN)
         
-        return Response({
+        response = Response({
             'success': True,
             'data': result.data
         }, status=status.HTTP_200_OK)
+        _add_server_timing(response, result)
+        return response
         
     except Exception as e:
         logger.error(f"Error en get_admin_stats: {str(e)}")
@@ -559,7 +559,9 @@ def payment_webhook(request):
     Webhook de Mercado Pago
     POST /api/v1/payments/webhook/
     
-    Recibe notificaciones de Mercado Pago sobre cambios en pagos
+    Recibe notificaciones de Mercado Pago sobre cambios en pagos.
+    Solo registra el webhook y responde; el procesamiento se hace en segundo
+    plano (apps/payments/tasks.py).
     """
     try:
         # 1. Verificar firma del webhook
@@ -575,8 +577,8 @@ def payment_webhook(request):
                 'message': 'Firma inválida'
             }, status=status.HTTP_401_UNAUTHORIZED)
         
-        # 2. Procesar webhook
-        success, error_message = payment_service.process_webhook(request.data)
+        # 2. Registrar webhook y encolar su procesamiento
+        success, error_message = payment_service.enqueue_webhook(request.data)
         
         if not success:
             return Response({
@@ -587,7 +589,7 @@ def payment_webhook(request):
         # 3. Retornar respuesta
         return Response({
             'success': True,
-            'message': 'Webhook procesado correctamente'
+            'message': 'Webhook recibido correctamente'
         }, status=status.HTTP_200_OK)
         
     except Exception as e:
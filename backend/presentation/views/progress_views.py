@@ -15,11 +15,13 @@ from apps.courses.models import Lesson
 from apps.users.models import Enrollment
 from apps.users.permissions import can_update_lesson_progress
 from infrastructure.services.lesson_progress_service import LessonProgressService  # Mantener para compatibilidad temporal
+from infrastructure.services.watch_time_buffer_service import WatchTimeBufferService
 from application.use_cases.lesson import (
     MarkLessonCompletedUseCase,
     MarkLessonIncompleteUseCase,
     GetLessonProgressUseCase,
-    GetCourseProgressUseCase
+    GetCourseProgressUseCase,
+    SyncLessonProgressBatchUseCase
 )
 
 logger = logging.getLogger('apps')
@@ -253,6 +255,184 @@ def mark_lesson_incomplete(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@swagger_auto_schema(
+    method='post',
+    operation_description=(
+        'Sincroniza en lote el progreso de varias lecciones (heartbeat del reproductor). '
+        'El progreso y el tiempo visto nunca retroceden; completed=true marca la lección como completada. '
+        'Las entradas inválidas se devuelven en "rejected" sin afectar al resto del lote.'
+    ),
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        required=['updates'],
+        properties={
+            'updates': openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                description='Actualizaciones de progreso (máximo 100)',
+                items=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    required=['lesson_id', 'enrollment_id'],
+                    properties={
+                        'lesson_id': openapi.Schema(type=openapi.TYPE_STRING, example='l-001'),
+                        'enrollment_id': openapi.Schema(type=openapi.TYPE_STRING, example='enr_abc123'),
+                        'progress_percentage': openapi.Schema(type=openapi.TYPE_NUMBER, example=42.5),
+                        'time_watched_seconds': openapi.Schema(type=openapi.TYPE_INTEGER, example=310),
+                        'completed': openapi.Schema(type=openapi.TYPE_BOOLEAN, example=False),
+                    }
+                )
+            ),
+        }
+    ),
+    responses={
+        200: openapi.Response(
+            description='Lote procesado',
+            examples={
+                'application/json': {
+                    'success': True,
+                    'data': {
+                        'processed': 2,
+                        'rejected': [],
+                        'enrollments': [
+                            {'id': 'enr_abc123', 'completion_percentage': 45.50, 'completed': False}
+                        ]
+                    }
+                }
+            }
+        ),
+        400: openapi.Response(description='Lote vacío, demasiado grande o con formato inválido'),
+        500: openapi.Response(description='Error interno del servidor')
+    },
+    security=[{'Bearer': []}],
+    tags=['Progreso']
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def sync_lesson_progress_batch(request):
+    """
+    Sincroniza el progreso de varias lecciones en una sola petición
+    POST /api/v1/progress/lessons/batch/
+    
+    Body:
+    {
+        "updates": [
+            {"lesson_id": "l-001", "enrollment_id": "enr_abc123", "progress_percentage": 42.5, "time_watched_seconds": 310},
+            {"lesson_id": "l-002", "enrollment_id": "enr_abc123", "completed": true}
+        ]
+    }
+    
+    Solo se aceptan enrollments activos del usuario autenticado.
+    """
+    try:
+        sync_batch_use_case = SyncLessonProgressBatchUseCase()
+        result = sync_batch_use_case.execute(
+            user=request.user,
+            updates=request.data.get('updates')
+        )
+        
+        if not result.success:
+            return Response({
+                'success': False,
+                'message': result.error_message
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'success': True,
+            'data': result.data
+        }, status=status.HTTP_200_OK)
+        
+    except Exception as e:
+        logger.error(f"Error en sync_lesson_progress_batch: {str(e)}")
+        return Response({
+            'success': False,
+            'message': f'Error al procesar la solicitud: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@swagger_auto_schema(
+    method='post',
+    operation_description=(
+        'Registra segundos vistos de una lección (tick del reproductor). '
+        'El tiempo se acumula en un buffer y se guarda en la base de datos de forma periódica; '
+        'GET /progress/lesson/ ya incluye el tiempo pendiente.'
+    ),
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        required=['lesson_id', 'enrollment_id', 'seconds'],
+        properties={
+            'lesson_id': openapi.Schema(type=openapi.TYPE_STRING, example='l-001'),
+            'enrollment_id': openapi.Schema(type=openapi.TYPE_STRING, example='enr_abc123'),
+            'seconds': openapi.Schema(
+                type=openapi.TYPE_INTEGER,
+                description='Segundos vistos desde el último tick (1 a 300)',
+                example=15
+            ),
+        }
+    ),
+    responses={
+        202: openapi.Response(description='Tiempo registrado'),
+        400: openapi.Response(description='Datos inválidos'),
+        404: openapi.Response(description='Lección o enrollment no encontrado'),
+        500: openapi.Response(description='Error interno del servidor')
+    },
+    security=[{'Bearer': []}],
+    tags=['Progreso']
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def record_watch_time(request):
+    """
+    Registra tiempo visto de una lección sin escribir en la base de datos
+    POST /api/v1/progress/lessons/watch/
+    
+    Body:
+    {
+        "lesson_id": "l-001",
+        "enrollment_id": "enr_abc123",
+        "seconds": 15
+    }
+    """
+    try:
+        lesson_id = request.data.get('lesson_id')
+        enrollment_id = request.data.get('enrollment_id')
+        seconds = request.data.get('seconds')
+        
+        if not lesson_id or not enrollment_id:
+            return Response({
+                'success': False,
+                'message': 'lesson_id y enrollment_id son requeridos'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        buffer_service = WatchTimeBufferService()
+        if (
+            isinstance(seconds, bool) or not isinstance(seconds, int)
+            or not 1 <= seconds <= buffer_service.MAX_SECONDS_PER_TICK
+        ):
+            return Response({
+                'success': False,
+                'message': f'seconds debe ser un entero entre 1 y {buffer_service.MAX_SECONDS_PER_TICK}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not buffer_service.has_access(request.user, enrollment_id, lesson_id):
+            return Response({
+                'success': False,
+                'message': 'Lección o enrollment no encontrado'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        buffer_service.record(request.user.id, enrollment_id, lesson_id, seconds)
+        
+        return Response({
+            'success': True,
+            'message': 'Tiempo registrado'
+        }, status=status.HTTP_202_ACCEPTED)
+        
+    except Exception as e:
+        logger.error(f"Error en record_watch_time: {str(e)}")
+        return Response({
+            'success': False,
+            'message': f'Error al procesar la solicitud: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @swagger_auto_schema(
     method='get',
     operation_description='Obtiene el progreso completo de un curso (todas las lecciones)',
@@ -264,6 +444,18 @@ def mark_lesson_incomplete(request):
             type=openapi.TYPE_STRING,
             required=True
         ),
+        openapi.Parameter(
+            'mode',
+            openapi.IN_QUERY,
+            description=(
+                'Formato de lessons_progress: "full" (por defecto, dict por lección) o "compact" '
+                '(arrays paralelos lesson_ids / completed (bitmap "1"/"0") / progress / '
+                'last_accessed_at (timestamp Unix), en el orden del temario)'
+            ),
+            type=openapi.TYPE_STRING,
+            enum=['full', 'compact'],
+            required=False
+        ),
     ],
     responses={
         200: openapi.Response(
@@ -308,11 +500,13 @@ def get_course_progress(request):
     """
     Obtiene el progreso completo de un curso
     GET /api/v1/progress/course/?enrollment_id=enr_abc123
+    GET /api/v1/progress/course/?enrollment_id=enr_abc123&mode=compact
     
     Requiere autenticación y acceso al enrollment
     """
     try:
         enrollment_id = request.query_params.get('enrollment_id')
+        mode = request.query_params.get('mode', 'full')
         
         if not enrollment_id:
             return Response({
@@ -320,6 +514,12 @@ def get_course_progress(request):
                 'message': 'enrollment_id es requerido'
             }, status=status.HTTP_400_BAD_REQUEST)
         
+        if mode not in ('full', 'compact'):
+            return Response({
+                'success': False,
+                'message': 'mode debe ser "full" o "compact"'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
         # Validar enrollment
         enrollment = get_object_or_404(Enrollment, id=enrollment_id, user=request.user, status='active')
         
@@ -327,7 +527,8 @@ def get_course_progress(request):
         get_course_progress_use_case = GetCourseProgressUseCase()
         result = get_course_progress_use_case.execute(
             user=request.user,
-            enrollment_id=enrollment_id
+            enrollment_id=enrollment_id,
+            compact=(mode == 'compact')
         )
         
         if not result.success:
@@ -0,0 +1,678 @@
+"""
+Tests de Integración para el Catálogo de Cursos - FagSol Escuela Virtual
+
+Estos tests verifican:
+- Visibilidad del catálogo según rol (filtro SQL)
+- Paginación por cursor (keyset) sobre (order, -created_at, id)
+- Selección de campos con el parámetro fields=
+- Búsqueda de texto completo con ranking y fragmentos resaltados
+- Caché versionada del catálogo y del detalle (invalidación por signals)
+- Número de consultas constante al resolver provider/instructor
+- Filtros por faceta y conteos por faceta
+- GET condicional (ETag / Last-Modified) en catálogo, detalle y contenido
+- Snapshot materializado del árbol de contenido
+"""
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.core.models import UserProfile
+from apps.courses.models import Course, Module, Lesson, Material
+from apps.users.models import Enrollment
+from apps.users.permissions import ROLE_STUDENT, ROLE_INSTRUCTOR
+from infrastructure.services.catalog_cache_service import CatalogCacheService
+
+
+class CourseCatalogIntegrationTestCase(TestCase):
+    """Tests de integración para el endpoint de catálogo"""
+
+    def setUp(self):
+        """Configuración inicial"""
+        self.client = APIClient()
+        self.url = '/api/v1/courses/'
+
+        self.student = User.objects.create_user(
+            username='student@test.com',
+            email='student@test.com',
+            password='testpass123'
+        )
+        UserProfile.objects.create(user=self.student, role=ROLE_STUDENT)
+
+        # Cursos publicados con el mismo 'order' para forzar el desempate por fecha/id
+        self.published = []
+        for index in range(7):
+            self.published.append(Course.objects.create(
+                id=f'c-cat-{index:03d}',
+                title=f'Curso Catálogo {index}',
+                slug=f'curso-catalogo-{index}',
+                description='Descripción larga del curso',
+                price=100.00,
+                status='published',
+                is_active=True,
+                order=index % 2
+            ))
+
+        self.draft = Course.objects.create(
+            id='c-cat-draft',
+            title='Curso Borrador',
+            slug='curso-borrador',
+            description='Descripción',
+            price=100.00,
+            status='draft',
+            is_active=True
+        )
+
+    def _get_auth_token(self, user):
+        """Helper para obtener token JWT"""
+        from rest_framework_simplejwt.tokens import RefreshToken
+        refresh = RefreshToken.for_user(user)
+        return str(refresh.access_token)
+
+    def test_list_courses_without_pagination_returns_all(self):
+        """Test: Sin cursor ni page_size se devuelve el catálogo completo"""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 7)
+        self.assertNotIn('next_cursor', response.data)
+
+    def test_list_courses_cursor_pagination_walks_catalog(self):
+        """Test: Recorrer el catálogo por cursor devuelve cada curso una vez y en orden"""
+        seen = []
+        cursor = None
+        pages = 0
+        while True:
+            params = {'page_size': 3}
+            if cursor:
+                params['cursor'] = cursor
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(course['id'] for course in response.data['data'])
+            pages += 1
+            cursor = response.data['next_cursor']
+            self.assertEqual(response.data['has_more'], cursor is not None)
+            if not cursor:
+                break
+
+        expected = list(
+            Course.objects.filter(status='published', is_active=True)
+            .order_by('order', '-created_at', 'id')
+            .values_list('id', flat=True)
+        )
+        self.assertEqual(seen, expected)
+        self.assertEqual(pages, 3)
+
+    def test_list_courses_invalid_cursor(self):
+        """Test: Un cursor corrupto devuelve 400"""
+        response = self.client.get(self.url, {'cursor': 'no-es-un-cursor'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.data['success'])
+
+    def test_list_courses_sparse_fields(self):
+        """Test: fields= limita los campos de cada tarjeta"""
+        response = self.client.get(self.url, {'fields': 'title,price'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for course in response.data['data']:
+            self.assertEqual(set(course.keys()), {'id', 'title', 'price'})
+
+    def test_list_courses_invalid_fields(self):
+        """Test: Campos desconocidos devuelven 400"""
+        response = self.client.get(self.url, {'fields': 'title,password'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_courses_student_sees_enrolled_draft(self):
+        """Test: Estudiante ve borradores solo si está inscrito"""
+        token = self._get_auth_token(self.student)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        response = self.client.get(self.url, {'status': 'draft'})
+        self.assertEqual(response.data['count'], 0)
+
+        Enrollment.objects.create(user=self.student, course=self.draft, status='active')
+        response = self.client.get(self.url, {'status': 'draft'})
+        self.assertEqual([course['id'] for course in response.data['data']], [self.draft.id])
+
+    def test_list_courses_query_count_is_constant(self):
+        """Test: Resolver provider/instructor no genera consultas por curso"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        def count_queries():
+            cache.clear()
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(self.url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(context.captured_queries)
+
+        for index in range(2):
+            instructor = User.objects.create_user(
+                username=f'instructor{index}@test.com',
+                email=f'instructor{index}@test.com',
+                password='testpass123',
+                first_name=f'Instructor {index}'
+            )
+            UserProfile.objects.create(user=instructor, role=ROLE_INSTRUCTOR)
+            Course.objects.filter(id=self.published[index].id).update(created_by=instructor)
+        baseline = count_queries()
+
+        instructor = User.objects.get(username='instructor0@test.com')
+        Course.objects.filter(id__in=[course.id for course in self.published[2:]]).update(created_by=instructor)
+        self.assertEqual(count_queries(), baseline)
+        response = self.client.get(self.url)
+        names = {course['instructor']['name'] for course in response.data['data']}
+        self.assertIn('Instructor 0', names)
+
+
+class CourseCatalogSearchIntegrationTestCase(TestCase):
+    """Tests de integración para la búsqueda de texto completo del catálogo"""
+
+    def setUp(self):
+        """Configuración inicial"""
+        self.client = APIClient()
+        self.url = '/api/v1/courses/'
+
+        self.title_match = Course.objects.create(
+            id='c-search-1',
+            title='Soldadura industrial',
+            slug='soldadura-industrial',
+            description='Técnicas básicas para talleres.',
+            price=100.00,
+            status='published',
+            is_active=True
+        )
+        self.description_match = Course.objects.create(
+            id='c-search-2',
+            title='Seguridad en planta',
+            slug='seguridad-en-planta',
+            description='Incluye una introducción a la soldadura y al manejo de equipos.',
+            price=100.00,
+            status='published',
+            is_active=True,
+            tags=['seguridad']
+        )
+        self.draft = Course.objects.create(
+            id='c-search-3',
+            title='Soldadura avanzada',
+            slug='soldadura-avanzada',
+            description='Borrador',
+            price=100.00,
+            status='draft',
+            is_active=True
+        )
+
+    def test_search_ranks_title_matches_first(self):
+        """Test: Las coincidencias en el título tienen mayor relevancia"""
+        response = self.client.get(self.url, {'search': 'soldadura'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [course['id'] for course in response.data['data']]
+        self.assertEqual(ids, [self.title_match.id, self.description_match.id])
+        self.assertGreater(response.data['data'][0]['search_rank'], response.data['data'][1]['search_rank'])
+
+    def test_search_returns_highlighted_snippet(self):
+        """Test: Cada resultado incluye un fragmento resaltado"""
+        response = self.client.get(self.url, {'search': 'equipos'})
+
+        self.assertEqual(response.data['count'], 1)
+        self.assertIn('<mark>', response.data['data'][0]['search_snippet'])
+
+    def test_search_matches_plural_and_accents(self):
+        """Test: La búsqueda ignora plurales y tildes"""
+        response = self.client.get(self.url, {'search': 'tecnicas'})
+        self.assertEqual([course['id'] for course in response.data['data']], [self.title_match.id])
+
+        response = self.client.get(self.url, {'search': 'plantas'})
+        self.assertEqual([course['id'] for course in response.data['data']], [self.description_match.id])
+
+    def test_search_index_updates_on_save_and_delete(self):
+        """Test: El índice se actualiza al guardar y eliminar un curso"""
+        self.title_match.title = 'Electricidad residencial'
+        self.title_match.save()
+
+        response = self.client.get(self.url, {'search': 'electricidad'})
+        self.assertEqual([course['id'] for course in response.data['data']], [self.title_match.id])
+
+        self.title_match.delete()
+        response = self.client.get(self.url, {'search': 'electricidad'})
+        self.assertEqual(response.data['count'], 0)
+
+    def test_search_paginates_by_relevance_cursor(self):
+        """Test: Los resultados se recorren por cursor (relevancia, id) sin perder ni repetir cursos"""
+        response = self.client.get(self.url, {'search': 'soldadura', 'page_size': 1})
+        self.assertEqual([course['id'] for course in response.data['data']], [self.title_match.id])
+        self.assertTrue(response.data['has_more'])
+
+        response = self.client.get(
+            self.url, {'search': 'soldadura', 'page_size': 1, 'cursor': response.data['next_cursor']}
+        )
+        self.assertEqual([course['id'] for course in response.data['data']], [self.description_match.id])
+        self.assertFalse(response.data['has_more'])
+        self.assertIsNone(response.data['next_cursor'])
+
+        response = self.client.get(self.url, {'search': 'soldadura', 'cursor': 'no-es-un-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_ignores_fts_syntax(self):
+        """Test: Operadores de FTS en el texto del usuario no provocan errores"""
+        response = self.client.get(self.url, {'search': 'soldadura" OR NEAR(*'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class CourseCatalogCacheIntegrationTestCase(TestCase):
+    """Tests de integración para la caché versionada del catálogo"""
+
+    def setUp(self):
+        """Configuración inicial"""
+        cache.clear()
+        self.client = APIClient()
+
+        self.student = User.objects.create_user(
+            username='student@test.com',
+            email='student@test.com',
+            password='testpass123'
+        )
+        UserProfile.objects.create(user=self.student, role=ROLE_STUDENT)
+
+        self.course = Course.objects.create(
+            id='c-cache-1',
+            title='Curso Cacheado',
+            slug='curso-cacheado',
+            description='Descripción',
+            price=100.00,
+            status='published',
+            is_active=True
+        )
+        self.module = Module.objects.create(course=self.course, title='Módulo 1', order=1)
+
+    def _get_auth_token(self, user):
+        """Helper para obtener token JWT"""
+        from rest_framework_simplejwt.tokens import RefreshToken
+        refresh = RefreshToken.for_user(user)
+        return str(refresh.access_token)
+
+    def test_anonymous_catalog_served_from_cache(self):
+        """Test: La segunda petición anónima no consulta la base de datos"""
+        first = self.client.get('/api/v1/courses/')
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/v1/courses/')
+        self.assertEqual(second.data, first.data)
+
+    def test_course_save_invalidates_catalog(self):
+        """Test: Guardar un curso invalida el catálogo cacheado"""
+        self.client.get('/api/v1/courses/')
+
+        self.course.title = 'Curso Renombrado'
+        self.course.save()
+
+        response = self.client.get('/api/v1/courses/')
+        self.assertEqual(response.data['data'][0]['title'], 'Curso Renombrado')
+
+    def test_lesson_change_invalidates_detail(self):
+        """Test: Crear una lección invalida el detalle cacheado"""
+        url = f'/api/v1/courses/{self.course.id}/'
+        response = self.client.get(url)
+        self.assertEqual(response.data['data']['modules'][0]['lessons'], [])
+
+        Lesson.objects.create(
+            module=self.module,
+            title='Lección nueva',
+            lesson_type='text',
+            content_text='Contenido',
+            order=1
+        )
+
+        response = self.client.get(url)
+        self.assertEqual(len(response.data['data']['modules'][0]['lessons']), 1)
+
+    def test_cached_detail_overlays_enrollment(self):
+        """Test: El detalle cacheado incluye is_enrolled propio de cada usuario"""
+        url = f'/api/v1/courses/slug/{self.course.slug}/'
+        response = self.client.get(url)
+        self.assertFalse(response.data['data']['is_enrolled'])
+
+        Enrollment.objects.create(user=self.student, course=self.course, status='active')
+        token = self._get_auth_token(self.student)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        response = self.client.get(url)
+        self.assertTrue(response.data['data']['is_enrolled'])
+
+        response = self.client.get('/api/v1/courses/')
+        self.assertTrue(response.data['data'][0]['is_enrolled'])
+
+
+    def test_creator_rename_invalidates_catalog_and_detail(self):
+        """Test: Renombrar al instructor creador invalida listado, detalle y su ETag"""
+        instructor = User.objects.create_user(
+            username='inst@test.com', email='inst@test.com', password='testpass123',
+            first_name='Ana', last_name='Pérez'
+        )
+        profile = UserProfile.objects.create(user=instructor, role=ROLE_INSTRUCTOR)
+        Course.objects.filter(pk=self.course.pk).update(created_by=instructor, provider='instructor')
+        cache.clear()
+
+        url = f'/api/v1/courses/{self.course.id}/'
+        detail = self.client.get(url)
+        self.assertEqual(detail.data['data']['instructor']['name'], 'Ana Pérez')
+        self.client.get('/api/v1/courses/')
+
+        # Guardar solo last_login (inicio de sesión) no invalida
+        version = CatalogCacheService().get_version()
+        instructor.save(update_fields=['last_login'])
+        self.assertEqual(CatalogCacheService().get_version(), version)
+
+        instructor.first_name = 'Ana María'
+        instructor.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=detail['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['instructor']['name'], 'Ana María Pérez')
+        response = self.client.get('/api/v1/courses/')
+        self.assertEqual(response.data['data'][0]['instructor']['name'], 'Ana María Pérez')
+
+        # Cambio de rol: deja de mostrarse como instructor del curso
+        profile.role = ROLE_STUDENT
+        profile.save()
+        response = self.client.get(url)
+        self.assertEqual(response.data['data']['instructor']['name'], 'Equipo Fagsol')
+
+class CourseCatalogFacetsIntegrationTestCase(TestCase):
+    """Tests de integración para filtros y facetas del catálogo"""
+
+    def setUp(self):
+        """Configuración inicial"""
+        cache.clear()
+        self.client = APIClient()
+        self.url = '/api/v1/courses/'
+        self.facets_url = '/api/v1/courses/facets/'
+
+        courses = [
+            ('c-facet-1', 'Soldadura', 'beginner', ['mig', 'tig'], '40.00', None, 4, '4.50'),
+            ('c-facet-2', 'Soldadura', 'advanced', ['tig'], '150.00', '90.00', 12, '3.20'),
+            ('c-facet-3', 'Electricidad', 'beginner', ['seguridad'], '0.00', None, 25, '4.90'),
+        ]
+        for course_id, category, level, tags, price, discount, hours, rating in courses:
+            Course.objects.create(
+                id=course_id,
+                title=f'Curso {course_id}',
+                slug=course_id,
+                description='Descripción',
+                price=price,
+                discount_price=discount,
+                status='published',
+                is_active=True,
+                category=category,
+                level=level,
+                tags=tags,
+                hours=hours,
+                rating=rating
+            )
+
+    def _ids(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(course['id'] for course in response.data['data'])
+
+    @staticmethod
+    def _counts(facet):
+        return {item['value']: item['count'] for item in facet}
+
+    def test_list_courses_filters(self):
+        """Test: Los filtros se combinan en el listado"""
+        self.assertEqual(self._ids({'category': 'Soldadura'}), ['c-facet-1', 'c-facet-2'])
+        self.assertEqual(self._ids({'level': 'beginner,advanced', 'tags': 'mig'}), ['c-facet-1'])
+        self.assertEqual(self._ids({'tags': 'tig'}), ['c-facet-1', 'c-facet-2'])
+        # El precio considera el descuento (150 -> 90)
+        self.assertEqual(self._ids({'max_price': '100', 'min_price': '1'}), ['c-facet-1', 'c-facet-2'])
+        self.assertEqual(self._ids({'min_hours': '10', 'max_hours': '20'}), ['c-facet-2'])
+        self.assertEqual(self._ids({'min_rating': '4'}), ['c-facet-1', 'c-facet-3'])
+
+    def test_list_courses_invalid_filter(self):
+        """Test: Filtros inválidos devuelven 400"""
+        response = self.client.get(self.url, {'min_price': 'barato'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(self.url, {'level': 'experto'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_facets_counts(self):
+        """Test: Conteos por faceta sin filtros"""
+        response = self.client.get(self.facets_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data['data']
+        self.assertEqual(data['total'], 3)
+        self.assertEqual(self._counts(data['facets']['category']), {'Soldadura': 2, 'Electricidad': 1})
+        self.assertEqual(self._counts(data['facets']['level']), {'beginner': 2, 'intermediate': 0, 'advanced': 1})
+        self.assertEqual(self._counts(data['facets']['tags']), {'tig': 2, 'mig': 1, 'seguridad': 1})
+        self.assertEqual(self._counts(data['facets']['price'])['0'], 1)
+        self.assertEqual(self._counts(data['facets']['price'])['50-100'], 1)
+        self.assertEqual(self._counts(data['facets']['hours'])['20+'], 1)
+        self.assertEqual(self._counts(data['facets']['rating'])['4+'], 2)
+
+    def test_facets_exclude_own_filter(self):
+        """Test: Cada faceta se cuenta sin su propio filtro"""
+        response = self.client.get(self.facets_url, {'category': 'Soldadura'})
+
+        data = response.data['data']
+        self.assertEqual(data['total'], 2)
+        # La faceta de categoría sigue mostrando las demás opciones
+        self.assertEqual(self._counts(data['facets']['category']), {'Soldadura': 2, 'Electricidad': 1})
+        # Las demás facetas se restringen a la categoría seleccionada
+        self.assertEqual(self._counts(data['facets']['tags']), {'tig': 2, 'mig': 1})
+
+    def test_facets_single_query(self):
+        """Test: Todas las facetas salen de una sola consulta"""
+        with self.assertNumQueries(1):
+            response = self.client.get(self.facets_url, {'tags': 'tig', 'min_rating': '3'})
+        self.assertEqual(response.data['data']['total'], 2)
+
+
+class CourseConditionalGetIntegrationTestCase(TestCase):
+    """Tests de integración para GET condicional (ETag / Last-Modified)"""
+
+    def setUp(self):
+        """Configuración inicial"""
+        cache.clear()
+        self.client = APIClient()
+
+        self.student = User.objects.create_user(
+            username='student@test.com',
+            email='student@test.com',
+            password='testpass123'
+        )
+        UserProfile.objects.create(user=self.student, role=ROLE_STUDENT)
+
+        self.course = Course.objects.create(
+            id='c-etag-1',
+            title='Curso Condicional',
+            slug='curso-condicional',
+            description='Descripción',
+            price=100.00,
+            status='published',
+            is_active=True
+        )
+        self.module = Module.objects.create(course=self.course, title='Módulo 1', order=1)
+        self.lesson = Lesson.objects.create(
+            module=self.module,
+            title='Lección 1',
+            lesson_type='text',
+            content_text='Contenido',
+            order=1
+        )
+
+    def _get_auth_token(self, user):
+        """Helper para obtener token JWT"""
+        from rest_framework_simplejwt.tokens import RefreshToken
+        refresh = RefreshToken.for_user(user)
+        return str(refresh.access_token)
+
+    def _assert_revalidates(self, url):
+        """Primera petición 200 con ETag; la segunda con If-None-Match devuelve 304"""
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+        not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+        return response
+
+    def test_catalog_conditional_get(self):
+        """Test: El catálogo responde 304 si no cambió"""
+        self._assert_revalidates('/api/v1/courses/')
+
+        response = self.client.get(
+            '/api/v1/courses/',
+            HTTP_IF_MODIFIED_SINCE=self.client.get('/api/v1/courses/')['Last-Modified']
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_etag_changes_when_lesson_deleted(self):
+        """Test: Eliminar una lección cambia el ETag del detalle"""
+        url = f'/api/v1/courses/slug/{self.course.slug}/'
+        first = self._assert_revalidates(url)
+
+        self.lesson.delete()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['modules'][0]['lessons'], [])
+
+    def test_detail_etag_changes_with_enrollment(self):
+        """Test: Inscribirse cambia el ETag (is_enrolled es propio del usuario)"""
+        token = self._get_auth_token(self.student)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        url = f'/api/v1/courses/{self.course.id}/'
+        first = self._assert_revalidates(url)
+
+        Enrollment.objects.create(user=self.student, course=self.course, status='active')
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['data']['is_enrolled'])
+
+    def test_content_conditional_get(self):
+        """Test: El contenido del curso responde 304 si no cambió"""
+        Enrollment.objects.create(user=self.student, course=self.course, status='active')
+        token = self._get_auth_token(self.student)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        url = f'/api/v1/courses/{self.course.id}/content/'
+        first = self._assert_revalidates(url)
+
+        self.lesson.title = 'Lección renombrada'
+        self.lesson.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class CourseContentSnapshotIntegrationTestCase(TestCase):
+    """Tests de integración para el snapshot del árbol de contenido"""
+
+    def setUp(self):
+        """Configuración inicial"""
+        cache.clear()
+        self.client = APIClient()
+
+        self.student = User.objects.create_user(
+            username='student@test.com',
+            email='student@test.com',
+            password='testpass123'
+        )
+        UserProfile.objects.create(user=self.student, role=ROLE_STUDENT)
+
+        self.course = Course.objects.create(
+            id='c-tree-1',
+            title='Curso con Árbol',
+            slug='curso-con-arbol',
+            description='Descripción',
+            price=100.00,
+            status='published',
+            is_active=True
+        )
+        Enrollment.objects.create(user=self.student, course=self.course, status='active')
+        self.url = f'/api/v1/courses/{self.course.id}/content/'
+
+        token = self._get_auth_token(self.student)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def _get_auth_token(self, user):
+        """Helper para obtener token JWT"""
+        from rest_framework_simplejwt.tokens import RefreshToken
+        refresh = RefreshToken.for_user(user)
+        return str(refresh.access_token)
+
+    def _create_modules(self, count, start=0):
+        for index in range(start, start + count):
+            module = Module.objects.create(course=self.course, title=f'Módulo {index}', order=index)
+            lesson = Lesson.objects.create(
+                module=module,
+                title=f'Lección {index}',
+                lesson_type='text',
+                content_text='Contenido',
+                order=1
+            )
+            Material.objects.create(
+                course=self.course,
+                module=module,
+                lesson=lesson,
+                title=f'Material {index}',
+                material_type='link',
+                url='https://fagsol.com/material',
+                order=index
+            )
+
+    def _count_queries(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries), response
+
+    def test_tree_built_in_constant_queries(self):
+        """Test: Construir el árbol no depende de la cantidad de módulos"""
+        self._create_modules(2)
+        small, _ = self._count_queries()
+
+        self._create_modules(10, start=2)
+        large, response = self._count_queries()
+
+        self.assertEqual(large, small)
+        self.assertEqual(len(response.data['data']['modules']), 12)
+        self.assertEqual(response.data['data']['materials'][0]['lesson_title'], 'Lección 0')
+
+    def test_snapshot_served_from_cache(self):
+        """Test: Con el snapshot en caché no se consulta el contenido"""
+        self._create_modules(3)
+        first, _ = self._count_queries()
+        cached, response = self._count_queries()
+
+        self.assertLess(cached, first)
+        self.assertEqual(len(response.data['data']['modules']), 3)
+        self.assertIn('enrollment', response.data['data'])
+
+    def test_snapshot_regenerated_on_content_change(self):
+        """Test: Cambiar una lección regenera el snapshot"""
+        self._create_modules(1)
+        self.client.get(self.url)
+
+        lesson = Lesson.objects.get(title='Lección 0')
+        lesson.title = 'Lección editada'
+        lesson.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['data']['modules'][0]['lessons'][0]['title'], 'Lección editada')
+
+        lesson.delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['data']['modules'][0]['lessons'], [])
@@ -0,0 +1,182 @@
+"""
+Tests de Integración - Roster de Progreso del Curso
+Verifica la matriz alumnos × lecciones para administradores e instructores
+"""
+
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.courses.models import Course, Module, Lesson
+from apps.users.models import Enrollment, LessonProgress
+from apps.core.models import UserProfile
+
+
+class CourseRosterIntegrationTestCase(TestCase):
+    """Tests de integración para el roster de progreso de un curso"""
+    
+    def setUp(self):
+        """Configuración inicial para cada test"""
+        self.admin_user = User.objects.create_user(
+            username='admin',
+            email='admin@test.com',
+            password='testpass123'
+        )
+        UserProfile.objects.create(user=self.admin_user, role='admin')
+        
+        self.instructor = User.objects.create_user(
+            username='instructor',
+            email='instructor@test.com',
+            password='testpass123'
+        )
+        UserProfile.objects.create(user=self.instructor, role='instructor')
+        
+        self.other_instructor = User.objects.create_user(
+            username='other_instructor',
+            email='other@test.com',
+            password='testpass123'
+        )
+        UserProfile.objects.create(user=self.other_instructor, role='instructor')
+        
+        self.course = Course.objects.create(
+            id='c-roster-001',
+            title='Curso Roster',
+            slug='curso-roster',
+            description='Descripción del curso',
+            price=100.00,
+            status='published',
+            is_active=True,
+            created_by=self.instructor
+        )
+        
+        # Dos módulos; el orden del temario sigue el orden del módulo
+        module2 = Module.objects.create(id='m-roster-002', course=self.course, title='Módulo 2', order=2, is_active=True)
+        module1 = Module.objects.create(id='m-roster-001', course=self.course, title='Módulo 1', order=1, is_active=True)
+        self.lessons = [
+            Lesson.objects.create(id='l-roster-001', module=module1, title='Lección 1', lesson_type='text', order=1, is_active=True),
+            Lesson.objects.create(id='l-roster-002', module=module1, title='Lección 2', lesson_type='text', order=2, is_active=True),
+            Lesson.objects.create(id='l-roster-003', module=module2, title='Lección 3', lesson_type='text', order=1, is_active=True),
+        ]
+        Lesson.objects.create(id='l-roster-004', module=module2, title='Inactiva', lesson_type='text', order=2, is_active=False)
+        
+        self.enrollments = []
+        for index in range(5):
+            student = User.objects.create_user(
+                username=f'student{index}',
+                email=f'student{index}@test.com',
+                password='testpass123'
+            )
+            UserProfile.objects.create(user=student, role='student')
+            self.enrollments.append(Enrollment.objects.create(user=student, course=self.course, status='active'))
+        
+        # student0: lecciones 1 y 3 completadas; student1: lección 2 vista pero no completada
+        for lesson in (self.lessons[0], self.lessons[2]):
+            LessonProgress.objects.create(
+                user=self.enrollments[0].user, lesson=lesson, enrollment=self.enrollments[0], is_completed=True
+            )
+        LessonProgress.objects.create(
+            user=self.enrollments[1].user, lesson=self.lessons[1], enrollment=self.enrollments[1], is_completed=False
+        )
+        
+        self.url = f'/api/v1/admin/courses/{self.course.id}/roster/'
+        self.client = APIClient()
+    
+    def test_roster_matrix(self):
+        """Test: La matriz devuelve el temario ordenado y un bitmap por alumno"""
+        self.client.force_authenticate(user=self.admin_user)
+        
+        response = self.client.get(self.url)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data['data']
+        self.assertEqual([lesson['id'] for lesson in data['lessons']], ['l-roster-001', 'l-roster-002', 'l-roster-003'])
+        rows = {student['enrollment_id']: student['completed'] for student in data['students']}
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[self.enrollments[0].id], '101')
+        self.assertEqual(rows[self.enrollments[1].id], '000')
+        self.assertIsNone(data['next_cursor'])
+    
+    def test_roster_pagination_constant_queries(self):
+        """Test: Las consultas no crecen con el tamaño de página y el cursor recorre todos los alumnos"""
+        self.client.force_authenticate(user=self.admin_user)
+        
+        with CaptureQueriesContext(connection) as small_page:
+            first = self.client.get(self.url, {'page_size': 2})
+        with CaptureQueriesContext(connection) as full_page:
+            self.client.get(self.url, {'page_size': 5})
+        self.assertEqual(len(small_page), len(full_page))
+        
+        seen = [student['enrollment_id'] for student in first.data['data']['students']]
+        cursor = first.data['data']['next_cursor']
+        while cursor:
+            page = self.client.get(self.url, {'page_size': 2, 'cursor': cursor}).data['data']
+            seen.extend(student['enrollment_id'] for student in page['students'])
+            cursor = page['next_cursor']
+        self.assertEqual(sorted(seen), sorted(enrollment.id for enrollment in self.enrollments))
+    
+    def test_roster_csv_export(self):
+        """Test: export=csv devuelve la matriz completa en streaming"""
+        self.client.force_authenticate(user=self.instructor)
+        
+        response = self.client.get(self.url, {'export': 'csv'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment;', response['Content-Disposition'])
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(lines[0], 'email,first_name,last_name,status,completion_percentage,Lección 1,Lección 2,Lección 3')
+        self.assertEqual(len(lines), 6)
+        self.assertTrue(any(line.startswith('student0@test.com,') and line.endswith(',1,0,1') for line in lines))
+    
+    def test_roster_csv_neutralizes_formulas(self):
+        """Test: Nombres y títulos que empiezan como fórmula se exportan como texto"""
+        import csv
+        User.objects.filter(pk=self.enrollments[0].user_id).update(first_name='=HYPERLINK("http://x")', last_name='-2+3')
+        Lesson.objects.filter(pk=self.lessons[0].pk).update(title='@SUM(A1)')
+        self.client.force_authenticate(user=self.instructor)
+        
+        response = self.client.get(self.url, {'export': 'csv'})
+        
+        rows = list(csv.reader(b''.join(response.streaming_content).decode('utf-8').splitlines()))
+        self.assertEqual(rows[0][5], "'@SUM(A1)")
+        student_row = next(row for row in rows if row[0] == 'student0@test.com')
+        self.assertEqual(student_row[1:3], ['\'=HYPERLINK("http://x")', "'-2+3"])
+    
+    def test_roster_filters_by_status(self):
+        """Test: El filtro status limita los alumnos de la matriz"""
+        Enrollment.objects.filter(pk=self.enrollments[4].pk).update(status='cancelled')
+        self.client.force_authenticate(user=self.admin_user)
+        
+        response = self.client.get(self.url, {'status': 'cancelled'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [student['enrollment_id'] for student in response.data['data']['students']],
+            [self.enrollments[4].id]
+        )
+    
+    def test_roster_invalid_cursor(self):
+        """Test: Un cursor inválido devuelve 400"""
+        self.client.force_authenticate(user=self.admin_user)
+        
+        response = self.client.get(self.url, {'cursor': 'no-es-un-cursor'})
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_roster_other_instructor_forbidden(self):
+        """Test: Un instructor no puede ver el roster de un curso ajeno"""
+        self.client.force_authenticate(user=self.other_instructor)
+        
+        response = self.client.get(self.url)
+        
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+    
+    def test_roster_student_forbidden(self):
+        """Test: Un alumno no puede ver el roster"""
+        self.client.force_authenticate(user=self.enrollments[0].user)
+        
+        response = self.client.get(self.url)
+        
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
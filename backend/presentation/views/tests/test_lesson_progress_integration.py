@@ -3,7 +3,7 @@ Tests de Integración - Progreso de Lecciones
 Verifica el flujo completo de progreso de lecciones
 """
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -367,3 +367,508 @@ class LessonProgressIntegrationTestCase(TestCase):
         progress.refresh_from_db()
         self.assertTrue(progress.is_completed)
 
+    
+    def test_enrollment_counters_updated_incrementally(self):
+        """Test: Los toggles actualizan los contadores del enrollment sin recontar"""
+        self.client.force_authenticate(user=self.student_user)
+        self.assertEqual(self.enrollment.total_lessons, 2)
+        
+        # Más lecciones no deben agregar consultas al toggle
+        with self.captureOnCommitCallbacks(execute=True):
+            for order in range(3, 8):
+                Lesson.objects.create(
+                    id=f'l-test-00{order}',
+                    module=self.module1,
+                    title=f'Lección {order}',
+                    lesson_type='text',
+                    order=order,
+                    is_active=True
+                )
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.total_lessons, 7)
+        
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                '/api/v1/progress/lessons/complete/',
+                {'lesson_id': self.lesson1.id, 'enrollment_id': self.enrollment.id},
+                format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(any(
+            'COUNT(' in query['sql'].upper() for query in queries.captured_queries
+        ))
+        
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.completed_lessons, 1)
+        self.assertEqual(float(self.enrollment.completion_percentage), 14.29)
+        self.assertEqual(float(response.data['data']['enrollment_completion_percentage']), 14.29)
+        
+        # Repetir el toggle no vuelve a contar la lección
+        self.client.post(
+            '/api/v1/progress/lessons/complete/',
+            {'lesson_id': self.lesson1.id, 'enrollment_id': self.enrollment.id},
+            format='json'
+        )
+        self.client.post(
+            '/api/v1/progress/lessons/incomplete/',
+            {'lesson_id': self.lesson1.id, 'enrollment_id': self.enrollment.id},
+            format='json'
+        )
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.completed_lessons, 0)
+        self.assertEqual(float(self.enrollment.completion_percentage), 0.0)
+    
+    def test_lesson_changes_update_enrollment_totals(self):
+        """Test: Desactivar o eliminar lecciones actualiza total_lessons"""
+        self.client.force_authenticate(user=self.student_user)
+        self.client.post(
+            '/api/v1/progress/lessons/complete/',
+            {'lesson_id': self.lesson1.id, 'enrollment_id': self.enrollment.id},
+            format='json'
+        )
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lesson2.is_active = False
+            self.lesson2.save()
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.total_lessons, 1)
+        self.assertEqual(float(self.enrollment.completion_percentage), 100.0)
+        self.assertTrue(self.enrollment.completed)
+        self.assertEqual(self.enrollment.status, 'completed')
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lesson1.delete()
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.total_lessons, 0)
+        self.assertEqual(self.enrollment.completed_lessons, 0)
+        self.assertFalse(self.enrollment.completed)
+    
+    def test_new_lesson_recomputes_completed_enrollments(self):
+        """Test: Agregar una lección recalcula el porcentaje y reabre inscripciones completadas"""
+        for lesson in (self.lesson1, self.lesson2):
+            LessonProgress.objects.create(
+                user=self.student_user, lesson=lesson, enrollment=self.enrollment, is_completed=True
+            )
+        Enrollment.objects.filter(pk=self.enrollment.pk).update(
+            completed_lessons=2, completion_percentage=100, completed=True, status='completed'
+        )
+        
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            for order in (3, 4):
+                Lesson.objects.create(
+                    id=f'l-test-00{order}',
+                    module=self.module1,
+                    title=f'Lección {order}',
+                    lesson_type='text',
+                    order=order,
+                    is_active=True
+                )
+        # Un callback por lección creada (+1: el recálculo invalida la caché de
+        # estadísticas del estudiante); la coalescencia se prueba en el test siguiente
+        self.assertEqual(len(callbacks), 3)
+        
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.total_lessons, 4)
+        self.assertEqual(self.enrollment.completed_lessons, 2)
+        self.assertEqual(float(self.enrollment.completion_percentage), 50.0)
+        self.assertFalse(self.enrollment.completed)
+        self.assertIsNone(self.enrollment.completed_at)
+        self.assertEqual(self.enrollment.status, 'active')
+        
+        # Editar el contenido de una lección no dispara el recálculo
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.lesson1.title = 'Lección 1 (editada)'
+            self.lesson1.save()
+        self.assertEqual(len(callbacks), 0)
+    
+    def test_course_recompute_is_enqueued_once_while_pending(self):
+        """Test: Varios cambios del mismo curso encolan un solo recálculo mientras esté pendiente"""
+        from unittest.mock import patch
+        from django.core.cache import cache
+        from infrastructure.services.enrollment_progress_service import EnrollmentProgressService
+        
+        service = EnrollmentProgressService()
+        pending_key = service.RECOMPUTE_PENDING_KEY.format(course_id=self.course.id)
+        cache.delete(pending_key)
+        self.addCleanup(cache.delete, pending_key)
+        with patch('apps.users.tasks.recompute_course_progress.delay') as delay:
+            for _ in range(3):
+                service._enqueue_course_recompute(self.course.id)
+            delay.assert_called_once_with(self.course.id)
+            
+            # Al empezar el recálculo se libera la marca y un cambio posterior vuelve a encolar
+            service.recompute_course(self.course.id)
+            service._enqueue_course_recompute(self.course.id)
+            self.assertEqual(delay.call_count, 2)
+    
+    def test_recompute_enrollment_progress_command(self):
+        """Test: El comando de recálculo informa el avance y corrige el progreso"""
+        from io import StringIO
+        from django.core.management import call_command
+        
+        LessonProgress.objects.create(
+            user=self.student_user, lesson=self.lesson1, enrollment=self.enrollment, is_completed=True
+        )
+        Enrollment.objects.filter(pk=self.enrollment.pk).update(total_lessons=9, completed_lessons=0)
+        
+        out = StringIO()
+        call_command('recompute_enrollment_progress', '--course', self.course.id, stdout=out)
+        
+        self.assertIn('1/1 inscripciones procesadas', out.getvalue())
+        self.assertIn('1 inscripciones actualizadas', out.getvalue())
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.total_lessons, 2)
+        self.assertEqual(self.enrollment.completed_lessons, 1)
+        self.assertEqual(float(self.enrollment.completion_percentage), 50.0)
+    
+    def test_reconcile_enrollment_progress_command(self):
+        """Test: El comando de reconciliación corrige contadores desviados"""
+        from io import StringIO
+        from django.core.management import call_command
+        
+        LessonProgress.objects.create(
+            user=self.student_user,
+            lesson=self.lesson1,
+            enrollment=self.enrollment,
+            is_completed=True
+        )
+        Enrollment.objects.filter(pk=self.enrollment.pk).update(total_lessons=9, completed_lessons=0)
+        
+        out = StringIO()
+        call_command('reconcile_enrollment_progress', stdout=out)
+        
+        self.assertIn('1 inscripciones corregidas', out.getvalue())
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.total_lessons, 2)
+        self.assertEqual(self.enrollment.completed_lessons, 1)
+        self.assertEqual(float(self.enrollment.completion_percentage), 50.0)
+    
+    def test_completion_delta_keeps_inactive_enrollments_status(self):
+        """Test: Completar lecciones no promueve inscripciones vencidas ni cursos sin lecciones"""
+        from infrastructure.services.enrollment_progress_service import EnrollmentProgressService
+        service = EnrollmentProgressService()
+        
+        Enrollment.objects.filter(pk=self.enrollment.pk).update(
+            status='expired', total_lessons=2, completed_lessons=1
+        )
+        self.enrollment.refresh_from_db()
+        service.apply_completion_delta(self.enrollment, 1)
+        self.assertEqual(self.enrollment.completed_lessons, 2)
+        self.assertEqual(float(self.enrollment.completion_percentage), 100.0)
+        self.assertFalse(self.enrollment.completed)
+        self.assertIsNone(self.enrollment.completed_at)
+        self.assertEqual(self.enrollment.status, 'expired')
+        
+        Enrollment.objects.filter(pk=self.enrollment.pk).update(
+            status='active', total_lessons=0, completed_lessons=0
+        )
+        self.enrollment.refresh_from_db()
+        service.apply_completion_delta(self.enrollment, -1)
+        self.assertFalse(self.enrollment.completed)
+        self.assertEqual(self.enrollment.status, 'active')
+    
+    def test_reconcile_derives_completion_state(self):
+        """Test: La reconciliación deriva completed, completed_at y estado igual que el recálculo"""
+        for lesson in (self.lesson1, self.lesson2):
+            LessonProgress.objects.create(
+                user=self.student_user, lesson=lesson, enrollment=self.enrollment, is_completed=True
+            )
+        Enrollment.objects.filter(pk=self.enrollment.pk).update(total_lessons=9, completed_lessons=0)
+        
+        from infrastructure.services.enrollment_progress_service import EnrollmentProgressService
+        self.assertEqual(EnrollmentProgressService().reconcile(), 1)
+        self.enrollment.refresh_from_db()
+        self.assertEqual(float(self.enrollment.completion_percentage), 100.0)
+        self.assertTrue(self.enrollment.completed)
+        self.assertIsNotNone(self.enrollment.completed_at)
+        self.assertEqual(self.enrollment.status, 'completed')
+        
+        # Contadores correctos pero marcada completada sin estarlo: se reabre
+        LessonProgress.objects.filter(lesson=self.lesson2).update(is_completed=False)
+        Enrollment.objects.filter(pk=self.enrollment.pk).update(completed_lessons=1)
+        self.assertEqual(EnrollmentProgressService().reconcile(), 1)
+        self.enrollment.refresh_from_db()
+        self.assertEqual(float(self.enrollment.completion_percentage), 50.0)
+        self.assertFalse(self.enrollment.completed)
+        self.assertIsNone(self.enrollment.completed_at)
+        self.assertEqual(self.enrollment.status, 'active')
+        
+        # Las inscripciones vencidas o canceladas conservan su estado
+        LessonProgress.objects.filter(lesson=self.lesson2).update(is_completed=True)
+        Enrollment.objects.filter(pk=self.enrollment.pk).update(completed_lessons=0, status='expired')
+        self.assertEqual(EnrollmentProgressService().reconcile(), 1)
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.completed_lessons, 2)
+        self.assertFalse(self.enrollment.completed)
+        self.assertEqual(self.enrollment.status, 'expired')
+    
+    def test_sync_lesson_progress_batch(self):
+        """Test: El endpoint de lote aplica varias actualizaciones con un upsert"""
+        existing = LessonProgress.objects.create(
+            user=self.student_user,
+            lesson=self.lesson1,
+            enrollment=self.enrollment,
+            progress_percentage=60,
+            time_watched_seconds=300
+        )
+        self.client.force_authenticate(user=self.student_user)
+        
+        response = self.client.post(
+            '/api/v1/progress/lessons/batch/',
+            {
+                'updates': [
+                    # Heartbeat atrasado: no debe hacer retroceder el progreso
+                    {'lesson_id': self.lesson1.id, 'enrollment_id': self.enrollment.id,
+                     'progress_percentage': 40, 'time_watched_seconds': 200},
+                    {'lesson_id': self.lesson1.id, 'enrollment_id': self.enrollment.id,
+                     'progress_percentage': 75.5, 'time_watched_seconds': 420},
+                    {'lesson_id': self.lesson2.id, 'enrollment_id': self.enrollment.id, 'completed': True},
+                    {'lesson_id': 'l-inexistente', 'enrollment_id': self.enrollment.id, 'completed': True},
+                    {'lesson_id': self.lesson2.id, 'enrollment_id': self.enrollment.id, 'progress_percentage': 150},
+                ]
+            },
+            format='json'
+        )
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data['data']
+        self.assertEqual(data['processed'], 2)
+        self.assertEqual([item['index'] for item in data['rejected']], [3, 4])
+        self.assertEqual(data['enrollments'][0]['completion_percentage'], 50.0)
+        
+        existing.refresh_from_db()
+        self.assertEqual(float(existing.progress_percentage), 75.5)
+        self.assertEqual(existing.time_watched_seconds, 420)
+        self.assertFalse(existing.is_completed)
+        
+        completed = LessonProgress.objects.get(lesson=self.lesson2, enrollment=self.enrollment)
+        self.assertTrue(completed.is_completed)
+        self.assertIsNotNone(completed.completed_at)
+        self.assertEqual(LessonProgress.objects.filter(enrollment=self.enrollment).count(), 2)
+        
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.completed_lessons, 1)
+        
+        # Repetir el lote no vuelve a contar la lección completada
+        self.client.post(
+            '/api/v1/progress/lessons/batch/',
+            {'updates': [{'lesson_id': self.lesson2.id, 'enrollment_id': self.enrollment.id, 'completed': True}]},
+            format='json'
+        )
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.completed_lessons, 1)
+    
+    def test_sync_lesson_progress_batch_keeps_concurrent_changes(self):
+        """Test: El lote parte del estado guardado: no pisa completadas ni segundos ya volcados"""
+        self.client.force_authenticate(user=self.student_user)
+        response = self.client.post(
+            '/api/v1/progress/lessons/complete/',
+            {'lesson_id': self.lesson1.id, 'enrollment_id': self.enrollment.id},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Segundos volcados por el buffer de tiempo visto
+        LessonProgress.objects.filter(lesson=self.lesson1, enrollment=self.enrollment).update(time_watched_seconds=500)
+        
+        response = self.client.post(
+            '/api/v1/progress/lessons/batch/',
+            {'updates': [
+                {'lesson_id': self.lesson1.id, 'enrollment_id': self.enrollment.id,
+                 'progress_percentage': 30, 'time_watched_seconds': 120, 'completed': True},
+            ]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        progress = LessonProgress.objects.get(lesson=self.lesson1, enrollment=self.enrollment)
+        self.assertTrue(progress.is_completed)
+        self.assertEqual(float(progress.progress_percentage), 100.0)
+        self.assertEqual(progress.time_watched_seconds, 500)
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.completed_lessons, 1)
+    
+    def test_sync_lesson_progress_batch_constant_queries(self):
+        """Test: El número de consultas del lote no depende de su tamaño"""
+        with self.captureOnCommitCallbacks(execute=True):
+            lessons = [
+                Lesson.objects.create(
+                    id=f'l-batch-{index}',
+                    module=self.module1,
+                    title=f'Lección lote {index}',
+                    lesson_type='video',
+                    order=10 + index,
+                    is_active=True
+                )
+                for index in range(20)
+            ]
+        self.client.force_authenticate(user=self.student_user)
+        
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        def post_batch(batch_lessons):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(
+                    '/api/v1/progress/lessons/batch/',
+                    {'updates': [
+                        {'lesson_id': lesson.id, 'enrollment_id': self.enrollment.id,
+                         'time_watched_seconds': 30, 'completed': True}
+                        for lesson in batch_lessons
+                    ]},
+                    format='json'
+                )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(queries)
+        
+        self.assertEqual(post_batch(lessons[:2]), post_batch(lessons[2:]))
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.completed_lessons, 20)
+    
+    def test_sync_lesson_progress_batch_invalid(self):
+        """Test: Lotes vacíos o demasiado grandes se rechazan"""
+        self.client.force_authenticate(user=self.student_user)
+        
+        response = self.client.post('/api/v1/progress/lessons/batch/', {'updates': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+        updates = [{'lesson_id': self.lesson1.id, 'enrollment_id': self.enrollment.id}] * 101
+        response = self.client.post('/api/v1/progress/lessons/batch/', {'updates': updates}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    @override_settings(WATCH_TIME_BUFFER_ENABLED=True)
+    def test_watch_time_buffered_and_flushed(self):
+        """Test: El tiempo visto se acumula en caché y se vuelca con la tarea periódica"""
+        from django.core.cache import cache
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from apps.users.tasks import flush_watch_time_buffer
+        cache.clear()
+        
+        self.client.force_authenticate(user=self.student_user)
+        tick = {'lesson_id': self.lesson1.id, 'enrollment_id': self.enrollment.id, 'seconds': 15}
+        
+        response = self.client.post('/api/v1/progress/lessons/watch/', tick, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        
+        # Los ticks siguientes no tocan la base de datos
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post('/api/v1/progress/lessons/watch/', tick, format='json')
+        self.assertFalse(any(
+            query['sql'].upper().startswith(('UPDATE', 'INSERT'))
+            for query in queries.captured_queries
+        ))
+        self.assertFalse(LessonProgress.objects.filter(lesson=self.lesson1).exists())
+        
+        # La lectura incluye el tiempo pendiente
+        response = self.client.get(
+            '/api/v1/progress/lesson/',
+            {'lesson_id': self.lesson1.id, 'enrollment_id': self.enrollment.id}
+        )
+        self.assertEqual(response.data['data']['time_watched_seconds'], 30)
+        self.assertIsNotNone(response.data['data']['last_accessed_at'])
+        
+        # Primer volcado: cierra la generación actual; el segundo la guarda
+        flush_watch_time_buffer()
+        self.client.post('/api/v1/progress/lessons/watch/', tick, format='json')
+        response = self.client.get(
+            '/api/v1/progress/lesson/',
+            {'lesson_id': self.lesson1.id, 'enrollment_id': self.enrollment.id}
+        )
+        self.assertEqual(response.data['data']['time_watched_seconds'], 45)
+        
+        flush_watch_time_buffer()
+        progress = LessonProgress.objects.get(lesson=self.lesson1, enrollment=self.enrollment)
+        self.assertEqual(progress.time_watched_seconds, 30)
+        
+        flush_watch_time_buffer()
+        progress.refresh_from_db()
+        self.assertEqual(progress.time_watched_seconds, 45)
+        response = self.client.get(
+            '/api/v1/progress/lesson/',
+            {'lesson_id': self.lesson1.id, 'enrollment_id': self.enrollment.id}
+        )
+        self.assertEqual(response.data['data']['time_watched_seconds'], 45)
+    
+    @override_settings(WATCH_TIME_BUFFER_ENABLED=False)
+    def test_watch_time_written_directly_without_shared_cache(self):
+        """Test: Sin caché compartida cada tick se guarda directo en la base de datos"""
+        from django.core.cache import cache
+        cache.clear()
+        
+        self.client.force_authenticate(user=self.student_user)
+        tick = {'lesson_id': self.lesson1.id, 'enrollment_id': self.enrollment.id, 'seconds': 15}
+        for _ in range(2):
+            response = self.client.post('/api/v1/progress/lessons/watch/', tick, format='json')
+            self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        
+        progress = LessonProgress.objects.get(lesson=self.lesson1, enrollment=self.enrollment)
+        self.assertEqual(progress.time_watched_seconds, 30)
+        self.assertIsNotNone(progress.last_accessed_at)
+        response = self.client.get(
+            '/api/v1/progress/lesson/',
+            {'lesson_id': self.lesson1.id, 'enrollment_id': self.enrollment.id}
+        )
+        self.assertEqual(response.data['data']['time_watched_seconds'], 30)
+    
+    def test_watch_time_validation(self):
+        """Test: Ticks inválidos o de lecciones ajenas se rechazan"""
+        from django.core.cache import cache
+        cache.clear()
+        self.client.force_authenticate(user=self.student_user)
+        
+        response = self.client.post(
+            '/api/v1/progress/lessons/watch/',
+            {'lesson_id': self.lesson1.id, 'enrollment_id': self.enrollment.id, 'seconds': 5000},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+        response = self.client.post(
+            '/api/v1/progress/lessons/watch/',
+            {'lesson_id': 'l-inexistente', 'enrollment_id': self.enrollment.id, 'seconds': 10},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+    
+    def test_get_course_progress_compact(self):
+        """Test: El modo compacto devuelve arrays paralelos en el orden del temario"""
+        LessonProgress.objects.create(
+            user=self.student_user,
+            lesson=self.lesson2,
+            enrollment=self.enrollment,
+            is_completed=True,
+            progress_percentage=100
+        )
+        self.client.force_authenticate(user=self.student_user)
+        
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                '/api/v1/progress/course/',
+                {'enrollment_id': self.enrollment.id, 'mode': 'compact'}
+            )
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data['data']
+        self.assertEqual(data['lessons_progress']['lesson_ids'], [self.lesson1.id, self.lesson2.id])
+        self.assertEqual(data['lessons_progress']['completed'], '01')
+        self.assertEqual(data['lessons_progress']['progress'], [0.0, 100.0])
+        self.assertIsNone(data['lessons_progress']['last_accessed_at'][0])
+        self.assertIsInstance(data['lessons_progress']['last_accessed_at'][1], int)
+        self.assertEqual(data['completed_lessons'], 1)
+        
+        # Lecciones y progreso salen de una sola consulta con JOIN
+        lesson_queries = [
+            query['sql'] for query in queries.captured_queries
+            if 'lesson_progress' in query['sql'] and 'FROM "lessons"' in query['sql']
+        ]
+        self.assertEqual(len(lesson_queries), 1)
+        
+        response = self.client.get(
+            '/api/v1/progress/course/',
+            {'enrollment_id': self.enrollment.id, 'mode': 'tiny'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
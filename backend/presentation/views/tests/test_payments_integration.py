@@ -8,14 +8,16 @@ Estos tests verifican los flujos completos de pagos:
 - Validación de roles
 """
 
-from django.test import TestCase, override_settings
+import threading
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
 from django.contrib.auth.models import User
 from rest_framework.test import APIClient
 from rest_framework import status
 from unittest.mock import patch, MagicMock
 from apps.core.models import UserProfile
 from apps.courses.models import Course
-from apps.payments.models import PaymentIntent, Payment
+from apps.payments.models import PaymentIntent, Payment, PaymentWebhook
 from apps.users.models import Enrollment
 from apps.users.permissions import ROLE_STUDENT, ROLE_ADMIN, ROLE_INSTRUCTOR
 
@@ -596,3 +598,310 @@ class PaymentsIntegrationTestCase(TestCase):
         self.assertIn(self.course1.title, payment['course_names'])
         self.assertIn(self.course2.title, payment['course_names'])
 
+    
+    def _create_pending_payment(self, mercado_pago_payment_id='mp_webhook_1'):
+        payment_intent = PaymentIntent.objects.create(
+            user=self.student,
+            total=100.00,
+            currency='PEN',
+            status='pending',
+            course_ids=[self.course1.id]
+        )
+        return Payment.objects.create(
+            payment_intent=payment_intent,
+            user=self.student,
+            amount=100.00,
+            currency='PEN',
+            status='pending',
+            installments=1,
+            mercado_pago_payment_id=mercado_pago_payment_id
+        )
+    
+    def _webhook_body(self, webhook_id, payment_id, mp_status='approved'):
+        return {'id': webhook_id, 'type': 'payment', 'data': {'id': payment_id, 'status': mp_status}}
+    
+    def test_payment_webhook_acknowledges_before_processing(self):
+        """Test: El webhook se registra y se responde sin procesar el pago en el request"""
+        payment = self._create_pending_payment()
+        
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            response = self.client.post(
+                f'{self.base_url}/webhook/',
+                self._webhook_body('wh-1', payment.mercado_pago_payment_id),
+                format='json'
+            )
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(callbacks), 1)
+        webhook = PaymentWebhook.objects.get(mercado_pago_id='wh-1')
+        self.assertFalse(webhook.processed)
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, 'pending')
+        self.assertFalse(Enrollment.objects.filter(payment=payment).exists())
+    
+    def test_payment_webhook_processed_by_worker(self):
+        """Test: La tarea procesa el webhook encolado (Celery en modo eager)"""
+        payment = self._create_pending_payment()
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f'{self.base_url}/webhook/',
+                self._webhook_body('wh-2', payment.mercado_pago_payment_id),
+                format='json'
+            )
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        webhook = PaymentWebhook.objects.get(mercado_pago_id='wh-2')
+        self.assertTrue(webhook.processed)
+        self.assertEqual(webhook.attempts, 0)
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, 'approved')
+        self.assertEqual(payment.payment_intent.status, 'succeeded')
+        self.assertTrue(Enrollment.objects.filter(payment=payment, course=self.course1).exists())
+        
+        # Un reenvío del mismo webhook no vuelve a encolarse
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            response = self.client.post(
+                f'{self.base_url}/webhook/',
+                self._webhook_body('wh-2', payment.mercado_pago_payment_id),
+                format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(callbacks), 0)
+    
+    def test_payment_webhook_retries_then_dead_letters(self):
+        """Test: Un webhook que falla se reintenta y se descarta al agotar los intentos"""
+        from infrastructure.services.enrollment_service import EnrollmentService
+        from infrastructure.services.payment_service import PaymentService, WebhookRetryError
+        payment = self._create_pending_payment()
+        
+        with patch.object(EnrollmentService, 'enroll', side_effect=RuntimeError('DB caída')):
+            # El fallo en la tarea no afecta la respuesta a Mercado Pago
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    f'{self.base_url}/webhook/',
+                    self._webhook_body('wh-3', payment.mercado_pago_payment_id),
+                    format='json'
+                )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            webhook = PaymentWebhook.objects.get(mercado_pago_id='wh-3')
+            self.assertEqual(webhook.attempts, 1)
+            
+            # Reintentos del worker hasta agotar los intentos
+            for _ in range(2, PaymentService.WEBHOOK_MAX_ATTEMPTS):
+                with self.assertRaises(WebhookRetryError):
+                    PaymentService().process_queued_webhooks(webhook.pk)
+            self.assertEqual(PaymentService().process_queued_webhooks(webhook.pk), 0)
+        
+        webhook.refresh_from_db()
+        self.assertFalse(webhook.processed)
+        self.assertEqual(webhook.attempts, PaymentService.WEBHOOK_MAX_ATTEMPTS)
+        self.assertIn('DB caída', webhook.error_message)
+        self.assertFalse(PaymentService().pending_webhooks().filter(pk=webhook.pk).exists())
+        # Cada intento fallido se revierte por completo
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, 'pending')
+    
+    def test_requeue_skips_webhooks_waiting_for_backoff(self):
+        """Test: El reencolado periódico no adelanta los reintentos con backoff de un webhook"""
+        from datetime import timedelta
+        from django.utils import timezone
+        from apps.payments.tasks import requeue_pending_payment_webhooks
+        from infrastructure.services.enrollment_service import EnrollmentService
+        from infrastructure.services.payment_service import PaymentService
+        payment = self._create_pending_payment()
+        
+        with patch.object(EnrollmentService, 'enroll', side_effect=RuntimeError('DB caída')):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(
+                    f'{self.base_url}/webhook/',
+                    self._webhook_body('wh-6a', payment.mercado_pago_payment_id),
+                    format='json'
+                )
+        with self.captureOnCommitCallbacks(execute=False):
+            self.client.post(
+                f'{self.base_url}/webhook/',
+                self._webhook_body('wh-6b', payment.mercado_pago_payment_id),
+                format='json'
+            )
+        failed = PaymentWebhook.objects.get(mercado_pago_id='wh-6a')
+        self.assertEqual(failed.attempts, 1)
+        self.assertIsNotNone(failed.next_attempt_at)
+        PaymentWebhook.objects.filter(payment_id=payment.mercado_pago_payment_id).update(
+            created_at=timezone.now() - timedelta(minutes=30)
+        )
+        
+        # El primero espera su reintento: ni él ni el siguiente del pago se reencolan
+        with patch.object(PaymentService, 'dispatch_webhook') as dispatch:
+            self.assertEqual(requeue_pending_payment_webhooks(), 0)
+        dispatch.assert_not_called()
+        
+        # Reintento atrasado (su tarea se perdió): se reencola el primero del pago
+        PaymentWebhook.objects.filter(pk=failed.pk).update(next_attempt_at=timezone.now() - timedelta(minutes=30))
+        with patch.object(PaymentService, 'dispatch_webhook') as dispatch:
+            self.assertEqual(requeue_pending_payment_webhooks(), 1)
+        dispatch.assert_called_once_with(failed.pk)
+    
+    def test_payment_webhooks_processed_in_order_per_payment(self):
+        """Test: Los webhooks pendientes de un mismo pago se procesan en orden de llegada"""
+        from infrastructure.services.payment_service import PaymentService
+        payment = self._create_pending_payment()
+        
+        with self.captureOnCommitCallbacks(execute=False):
+            for webhook_id, mp_status in (('wh-4a', 'pending'), ('wh-4b', 'approved')):
+                self.client.post(
+                    f'{self.base_url}/webhook/',
+                    self._webhook_body(webhook_id, payment.mercado_pago_payment_id, mp_status),
+                    format='json'
+                )
+        
+        # La tarea del segundo webhook procesa también el primero, antes que él
+        last = PaymentWebhook.objects.get(mercado_pago_id='wh-4b')
+        self.assertEqual(PaymentService().process_queued_webhooks(last.pk), 2)
+        first = PaymentWebhook.objects.get(mercado_pago_id='wh-4a')
+        last.refresh_from_db()
+        self.assertTrue(first.processed and last.processed)
+        self.assertLessEqual(first.processed_at, last.processed_at)
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, 'approved')
+    
+    def test_payment_webhook_finished_before_claim_does_not_stop_queue(self):
+        """Test: Un webhook terminado por otro worker antes del reclamo no detiene los siguientes"""
+        from django.utils import timezone
+        from infrastructure.services.payment_service import PaymentService
+        payment = self._create_pending_payment()
+        
+        with self.captureOnCommitCallbacks(execute=False):
+            for webhook_id, mp_status in (('wh-5a', 'pending'), ('wh-5b', 'approved')):
+                self.client.post(
+                    f'{self.base_url}/webhook/',
+                    self._webhook_body(webhook_id, payment.mercado_pago_payment_id, mp_status),
+                    format='json'
+                )
+        first = PaymentWebhook.objects.get(mercado_pago_id='wh-5a')
+        last = PaymentWebhook.objects.get(mercado_pago_id='wh-5b')
+        claim_webhook = PaymentService._claim_webhook
+        
+        def finished_by_other_worker(service, webhook_pk):
+            if webhook_pk == first.pk:
+                PaymentWebhook.objects.filter(pk=webhook_pk).update(processed=True, processed_at=timezone.now())
+            return claim_webhook(service, webhook_pk)
+        
+        with patch.object(PaymentService, '_claim_webhook', autospec=True, side_effect=finished_by_other_worker):
+            self.assertEqual(PaymentService().process_queued_webhooks(last.pk), 1)
+        last.refresh_from_db()
+        self.assertTrue(last.processed)
+        
+        # Si otro worker mantiene el reclamo, los siguientes del pago esperan a ese worker
+        with self.captureOnCommitCallbacks(execute=False):
+            for webhook_id, mp_status in (('wh-5c', 'pending'), ('wh-5d', 'approved')):
+                self.client.post(
+                    f'{self.base_url}/webhook/',
+                    self._webhook_body(webhook_id, payment.mercado_pago_payment_id, mp_status),
+                    format='json'
+                )
+        PaymentWebhook.objects.filter(mercado_pago_id='wh-5c').update(claimed_at=timezone.now())
+        held = PaymentWebhook.objects.get(mercado_pago_id='wh-5d')
+        self.assertEqual(PaymentService().process_queued_webhooks(held.pk), 0)
+        held.refresh_from_db()
+        self.assertFalse(held.processed)
+
+
+@skipUnlessDBFeature('has_select_for_update')  # SQLite no admite escrituras concurrentes entre hilos
+class PaymentWebhookConcurrencyTestCase(TransactionTestCase):
+    """Tests de concurrencia: reintentos paralelos de Mercado Pago sobre el mismo evento"""
+    
+    THREADS = 8
+    
+    def setUp(self):
+        """Configuración inicial"""
+        self.student = User.objects.create_user(
+            username='student@test.com',
+            email='student@test.com',
+            password='testpass123'
+        )
+        UserProfile.objects.create(user=self.student, role=ROLE_STUDENT)
+        self.course = Course.objects.create(
+            id='course-1',
+            title='Curso 1',
+            slug='curso-1',
+            description='Descripción',
+            price=100.00,
+            currency='PEN',
+            status='published',
+            is_active=True
+        )
+        payment_intent = PaymentIntent.objects.create(
+            user=self.student,
+            total=100.00,
+            currency='PEN',
+            status='pending',
+            course_ids=[self.course.id]
+        )
+        self.payment = Payment.objects.create(
+            payment_intent=payment_intent,
+            user=self.student,
+            amount=100.00,
+            currency='PEN',
+            status='pending',
+            installments=1,
+            mercado_pago_payment_id='mp_parallel'
+        )
+    
+    def _run_in_threads(self, target):
+        """Ejecuta target en THREADS hilos que arrancan a la vez; devuelve sus resultados"""
+        barrier = threading.Barrier(self.THREADS)
+        results = [None] * self.THREADS
+        
+        def worker(index):
+            try:
+                barrier.wait()
+                results[index] = target()
+            except Exception as e:
+                results[index] = e
+            finally:
+                connection.close()
+        
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+    
+    def test_parallel_duplicate_webhooks_processed_once(self):
+        """Test: Muchas entregas simultáneas del mismo webhook se registran y aplican una sola vez"""
+        from infrastructure.services.enrollment_service import EnrollmentService
+        body = {'id': 'wh-parallel', 'type': 'payment', 'data': {'id': 'mp_parallel', 'status': 'approved'}}
+        
+        def deliver():
+            return APIClient().post('/api/v1/payments/webhook/', body, format='json').status_code
+        
+        with patch.object(EnrollmentService, 'enroll', autospec=True, side_effect=EnrollmentService.enroll) as enroll:
+            results = self._run_in_threads(deliver)
+        
+        self.assertEqual(results, [status.HTTP_200_OK] * self.THREADS)
+        self.assertEqual(PaymentWebhook.objects.filter(mercado_pago_id='wh-parallel').count(), 1)
+        self.assertEqual(enroll.call_count, 1)
+        self.assertTrue(PaymentWebhook.objects.get(mercado_pago_id='wh-parallel').processed)
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, 'approved')
+        self.assertEqual(Enrollment.objects.filter(user=self.student, course=self.course).count(), 1)
+    
+    def test_parallel_workers_claim_webhook_once(self):
+        """Test: Varios workers con el mismo webhook: solo uno lo reclama y lo aplica"""
+        from infrastructure.services.payment_service import PaymentService
+        webhook = PaymentWebhook.objects.create(
+            mercado_pago_id='wh-claim',
+            event_type='payment',
+            payment_id='mp_parallel',
+            data={'id': 'wh-claim', 'type': 'payment', 'data': {'id': 'mp_parallel', 'status': 'approved'}}
+        )
+        
+        results = self._run_in_threads(lambda: PaymentService().process_queued_webhooks(webhook.pk))
+        
+        self.assertEqual(sorted(results), [0] * (self.THREADS - 1) + [1])
+        webhook.refresh_from_db()
+        self.assertTrue(webhook.processed)
+        self.assertIsNone(webhook.claimed_at)
+        self.assertEqual(Enrollment.objects.filter(user=self.student, course=self.course).count(), 1)